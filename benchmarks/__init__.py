@@ -0,0 +1,16 @@
+"""
+导出性能基准测试
+
+用 FFmpeg testsrc 按 RESOLUTION_SPECS 中的每种分辨率生成合成视频和图片，
+在没有 Qt 事件循环的情况下直接调用导出各阶段，记录耗时、帧率、峰值内存和临时磁盘占用，
+结果追加到 JSON 历史文件，并与基线对比。
+
+用法:
+    python -m benchmarks [--resolutions 360x640 ...] [--stages video ...] [--frames N]
+                         [--repeat N] [--save-baseline] [--threshold 0.1] [--trend 10]
+
+结果默认保存在 benchmarks/results/（已加入 .gitignore）:
+    history.json    每次运行追加一条记录
+    baseline.json   --save-baseline 保存的基线
+    sources/        合成测试素材（按尺寸和帧数复用）
+"""
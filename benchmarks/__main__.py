@@ -0,0 +1,182 @@
+"""
+基准测试命令行入口
+
+    python -m benchmarks --help
+
+退出码:
+    0 - 完成，没有超过阈值的退化
+    1 - 有阶段的耗时相对基线退化超过阈值
+    2 - 参数错误
+"""
+import os
+import sys
+import argparse
+import logging
+import tempfile
+import shutil
+from typing import List, Optional
+
+from config.constants import RESOLUTION_SPECS, get_resolution_spec
+from core.export_service import ExportWorker
+from benchmarks import history
+from benchmarks.sources import make_test_video, make_test_image
+from benchmarks.stages import STAGES, BenchContext, run_stage, stage_available
+
+logger = logging.getLogger(__name__)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_USAGE = 2
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="导出流程性能基准测试"
+    )
+    parser.add_argument("-r", "--resolutions", nargs="+", default=list(RESOLUTION_SPECS),
+                        choices=list(RESOLUTION_SPECS), help="测试的分辨率（默认全部）")
+    parser.add_argument("-s", "--stages", nargs="+", default=list(STAGES),
+                        choices=list(STAGES), help="测试的阶段（默认全部）")
+    parser.add_argument("-n", "--frames", type=int, default=90,
+                        help="测试视频帧数（默认 90）")
+    parser.add_argument("--fps", type=float, default=30.0, help="测试视频帧率")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="每个阶段重复次数，耗时取中位数（默认 3）")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR,
+                        help="历史、基线和测试素材的保存目录")
+    parser.add_argument("--ffmpeg", default="", help="ffmpeg 路径（默认自动查找）")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="相对基线变慢/变大超过该比例视为退化（默认 0.10）")
+    parser.add_argument("--trend", type=int, default=10,
+                        help="显示最近 N 次运行的耗时趋势（0 不显示）")
+    parser.add_argument("--no-history", action="store_true",
+                        help="不写入历史文件")
+    return parser
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def _print_result(result):
+    print(
+        f"  {result.key:<26} {result.wall_time:8.3f}s  {result.fps:8.1f} fps  "
+        f"RSS {_format_bytes(result.peak_rss):>9}  "
+        f"ffmpeg {_format_bytes(result.peak_child_rss):>9}  "
+        f"临时 {_format_bytes(result.peak_temp_bytes):>9}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数，默认读取 sys.argv
+
+    Returns:
+        退出码
+    """
+    parser = build_arg_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    if args.frames <= 0 or args.repeat <= 0:
+        print("帧数和重复次数必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    ffmpeg_path = args.ffmpeg or ExportWorker()._find_ffmpeg()
+    if not ffmpeg_path:
+        print("未找到 ffmpeg，跳过视频相关阶段", file=sys.stderr)
+
+    sources_dir = os.path.join(args.results_dir, "sources")
+    history_path = os.path.join(args.results_dir, "history.json")
+    baseline_path = os.path.join(args.results_dir, "baseline.json")
+    work_root = tempfile.mkdtemp(prefix="assetmaker_bench_")
+
+    results = []
+    try:
+        for resolution in args.resolutions:
+            spec = get_resolution_spec(resolution)
+            width, height = spec["width"], spec["height"]
+            ctx = BenchContext(
+                resolution=resolution,
+                ffmpeg_path=ffmpeg_path,
+                video_path=make_test_video(ffmpeg_path, sources_dir, width, height, args.frames, args.fps),
+                image_path=make_test_image(ffmpeg_path, sources_dir, width, height),
+                frames=args.frames,
+                fps=args.fps,
+                work_root=work_root
+            )
+            print(f"{resolution}:")
+            for stage in args.stages:
+                reason = stage_available(stage, ctx)
+                if reason:
+                    print(f"  {stage}@{resolution:<{25 - len(stage)}} 跳过: {reason}")
+                    continue
+                result = run_stage(stage, ctx, args.repeat)
+                results.append(result)
+                _print_result(result)
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    if not results:
+        print("没有可运行的阶段", file=sys.stderr)
+        return EXIT_OK
+
+    record = history.make_run_record(
+        [r.to_dict() for r in results], REPO_DIR,
+        frames=args.frames, fps=args.fps, repeat=args.repeat
+    )
+
+    exit_code = EXIT_OK
+    baseline = history.load_baseline(baseline_path)
+    if baseline is not None:
+        print(f"\n与基线对比 ({baseline.get('commit') or '?'} {baseline.get('timestamp', '')}):")
+        for comparison in history.compare_to_baseline(record, baseline):
+            regressed = comparison.is_regression(args.threshold)
+            if regressed and comparison.metric == "wall_time":
+                exit_code = EXIT_REGRESSION
+            mark = "  <-- 退化" if regressed else ""
+            print(
+                f"  {comparison.key:<26} {history.COMPARED_METRICS[comparison.metric]:<4} "
+                f"{comparison.ratio:6.2f}x{mark}"
+            )
+
+    if not args.no_history:
+        history.append_history(history_path, record)
+    if args.save_baseline:
+        history.save_baseline(baseline_path, record)
+        print(f"\n已保存基线: {baseline_path}")
+
+    if args.trend > 0:
+        runs = history.load_history(history_path) if not args.no_history else [record]
+        print(f"\n耗时趋势（最近 {args.trend} 次）:")
+        for result in results:
+            values = history.trend(runs, result.key, last=args.trend)
+            if values:
+                print(
+                    f"  {result.key:<26} {history.sparkline(values)}  "
+                    f"{values[0]:.3f}s -> {values[-1]:.3f}s"
+                )
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
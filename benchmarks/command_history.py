@@ -0,0 +1,277 @@
+"""
+撤销历史基准测试 - 回放一段很长的随机编辑会话，检查撤销/重做的正确性并测量内存
+
+    python -m benchmarks.command_history
+    python -m benchmarks.command_history -n 20000 --seed 7
+
+编辑混合了输入文字（连续按键会被合并）、切换叠加类型和过渡类型（整个嵌套对象被替换）、
+拖动裁剪框和设置入点/出点。检查:
+1. 不限内存时全部撤销回到初始状态，全部重做回到最终状态
+2. 默认上限下历史占用不超过 HISTORY_MAX_BYTES，并与每次保存完整配置快照的做法比较
+
+退出码:
+    0 - 完成
+    1 - 撤销/重做后的状态与预期不一致
+    2 - 参数错误
+"""
+import sys
+import random
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.epconfig import (
+    EPConfig, ScreenType, TransitionType, OverlayType, Transition, TransitionOptions,
+    Overlay, ArknightsOverlayOptions, ImageOverlayOptions, diff
+)
+from core.command_history import (
+    CommandHistory, KIND_CONFIG, KIND_CROPBOX, KIND_IN_OUT, HISTORY_MAX_BYTES, apply_config
+)
+from benchmarks.measure import Timer
+
+EXIT_OK = 0
+EXIT_MISMATCH = 1
+EXIT_USAGE = 2
+
+
+class FakeClock:
+    """回放用时钟，每次编辑前前进一段随机时间"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Session:
+    """编辑会话状态: 配置 + 界面状态（裁剪框、入点/出点）"""
+
+    def __init__(self):
+        self.config = EPConfig(uuid="bench")
+        self.snapshot = self.config.copy()
+        self.ui: Dict[str, tuple] = {
+            "cropbox:loop": (0, 0, 360, 640),
+            "cropbox:intro": (0, 0, 360, 640),
+            "in_out:loop": (0, 299),
+            "in_out:intro": (0, 149),
+        }
+
+    def state(self) -> Tuple[dict, dict]:
+        return self.config.to_dict(), dict(self.ui)
+
+
+def _type_text(rng: random.Random, text: str) -> str:
+    """模拟输入: 追加或删除一个字符"""
+    if text and rng.random() < 0.2:
+        return text[:-1]
+    return text + rng.choice("abcdefghijklmnopqrstuvwxyz ")
+
+
+def _config_edits(rng: random.Random) -> List[Callable[[EPConfig], None]]:
+    """对配置的各种编辑"""
+
+    def ark_options(config: EPConfig) -> ArknightsOverlayOptions:
+        if config.overlay.type != OverlayType.ARKNIGHTS:
+            config.overlay = Overlay(type=OverlayType.ARKNIGHTS, arknights_options=ArknightsOverlayOptions())
+        return config.overlay.arknights_options
+
+    def name(config: EPConfig):
+        config.name = _type_text(rng, config.name)
+
+    def description(config: EPConfig):
+        config.description = _type_text(rng, config.description)
+
+    def operator_name(config: EPConfig):
+        options = ark_options(config)
+        options.operator_name = _type_text(rng, options.operator_name)
+
+    def overlay_type(config: EPConfig):
+        overlay_type = rng.choice([OverlayType.NONE, OverlayType.ARKNIGHTS, OverlayType.IMAGE])
+        if overlay_type == OverlayType.ARKNIGHTS:
+            config.overlay = Overlay(type=overlay_type, arknights_options=ArknightsOverlayOptions(
+                operator_name=rng.choice(["AMIYA", "KAL'TSIT", "W"])
+            ))
+        elif overlay_type == OverlayType.IMAGE:
+            config.overlay = Overlay(type=overlay_type, image_options=ImageOverlayOptions(image="overlay.png"))
+        else:
+            config.overlay = Overlay()
+
+    def transition(config: EPConfig):
+        transition_type = rng.choice(list(TransitionType))
+        options = None if transition_type == TransitionType.NONE else TransitionOptions(
+            duration=rng.randrange(100000, 2000000, 100000)
+        )
+        setattr(config, rng.choice(["transition_in", "transition_loop"]), Transition(transition_type, options))
+
+    def intro(config: EPConfig):
+        config.intro.enabled = not config.intro.enabled
+        config.intro.duration = rng.randrange(1000000, 10000000, 500000)
+
+    def screen(config: EPConfig):
+        config.screen = rng.choice(list(ScreenType))
+
+    # 输入文字最常见
+    return [name, name, name, description, description, operator_name, operator_name,
+            overlay_type, transition, intro, screen]
+
+
+def replay(
+    history: CommandHistory,
+    clock: FakeClock,
+    edits: int,
+    seed: int,
+    snapshots: Optional[list] = None
+) -> Session:
+    """
+    回放随机编辑会话
+
+    Args:
+        snapshots: 提供时每次编辑后追加一份完整配置快照（对比用）
+    """
+    rng = random.Random(seed)
+    session = Session()
+    config_edits = _config_edits(rng)
+
+    def edit_config(edit: Callable[[EPConfig], None]):
+        edit(session.config)
+        changes = diff(session.snapshot, session.config)
+        if changes:
+            history.record_config(session.snapshot, session.config, changes)
+            session.snapshot = session.config.copy()
+
+    def drag_cropbox(key: str):
+        x, y, w, h = before = session.ui[key]
+        after = (max(0, x + rng.randint(-20, 20)), max(0, y + rng.randint(-20, 20)), w, h)
+        session.ui[key] = after
+        history.record(KIND_CROPBOX, {key: (before, after)}, "调整裁剪框")
+
+    def set_in_out(key: str):
+        before = session.ui[key]
+        in_point = rng.randint(0, 100)
+        after = (in_point, in_point + rng.randint(1, 200))
+        session.ui[key] = after
+        history.record(KIND_IN_OUT, {key: (before, after)}, "设置入点")
+
+    done = 0
+    while done < edits:
+        # 一段连续操作（输入一个词、拖动裁剪框、按几次 WASD）之后停顿
+        roll = rng.random()
+        if roll < 0.7:
+            action, target = edit_config, rng.choice(config_edits)
+        elif roll < 0.9:
+            action, target = drag_cropbox, rng.choice(["cropbox:loop", "cropbox:intro"])
+        else:
+            action, target = set_in_out, rng.choice(["in_out:loop", "in_out:intro"])
+        clock.now += rng.uniform(1.5, 10.0)
+        for _ in range(min(rng.randint(1, 12), edits - done)):
+            clock.now += rng.uniform(0.05, 0.4)
+            action(target)
+            done += 1
+            if snapshots is not None:
+                snapshots.append(session.config.copy())
+    return session
+
+
+def _apply(session: Session, command, undo: bool):
+    if command.kind == KIND_CONFIG:
+        apply_config(session.config, command, undo)
+    else:
+        session.ui.update(command.before() if undo else command.after())
+
+
+def check_round_trip(edits: int, seed: int) -> Tuple[bool, int]:
+    """
+    不限内存地回放，全部撤销后应回到初始状态，全部重做后应回到最终状态
+
+    Returns:
+        (是否一致, 命令数)
+    """
+    clock = FakeClock()
+    history = CommandHistory(max_bytes=1 << 40, max_commands=1 << 30, clock=clock)
+    session = replay(history, clock, edits, seed)
+    final_state = session.state()
+    commands = len(history)
+
+    initial = Session()
+    while history.can_undo:
+        _apply(session, history.undo(), undo=True)
+    if session.state() != initial.state():
+        print("全部撤销后与初始状态不一致", file=sys.stderr)
+        return False, commands
+    while history.can_redo:
+        _apply(session, history.redo(), undo=False)
+    if session.state() != final_state:
+        print("全部重做后与最终状态不一致", file=sys.stderr)
+        return False, commands
+    return True, commands
+
+
+def measure_memory(edits: int, seed: int) -> Tuple[int, int, int, int]:
+    """
+    Returns:
+        (默认上限下保留的命令数, 估算字节数, tracemalloc 测得字节数, 完整快照做法的 tracemalloc 字节数)
+    """
+    tracemalloc.start()
+    clock = FakeClock()
+    history = CommandHistory(clock=clock)
+    base = tracemalloc.get_traced_memory()[0]
+    session = replay(history, clock, edits, seed)
+    del session
+    history_bytes = tracemalloc.get_traced_memory()[0] - base
+
+    snapshots: list = []
+    clock = FakeClock()
+    base = tracemalloc.get_traced_memory()[0]
+    replay(CommandHistory(max_commands=0, clock=clock), clock, edits, seed, snapshots)
+    snapshot_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return len(history), history.nbytes, history_bytes, snapshot_bytes
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.command_history",
+        description="撤销历史回放测试"
+    )
+    parser.add_argument("-n", "--edits", type=int, default=10000, help="编辑次数（默认 10000）")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数，默认读取 sys.argv
+
+    Returns:
+        退出码
+    """
+    parser = build_arg_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    if args.edits <= 0:
+        print("编辑次数必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+
+    with Timer() as timer:
+        ok, commands = check_round_trip(args.edits, args.seed)
+    print(f"回放 {args.edits} 次编辑 -> {commands} 条命令（合并后），"
+          f"撤销/重做往返 {'一致' if ok else '不一致'}，{timer.elapsed:.2f}s")
+    if not ok:
+        return EXIT_MISMATCH
+
+    kept, estimated, traced, snapshot_bytes = measure_memory(args.edits, args.seed)
+    print(f"默认上限 ({HISTORY_MAX_BYTES / 1024:.0f} KB): 保留 {kept} 条命令，"
+          f"估算 {estimated / 1024:.1f} KB，实测 {traced / 1024:.1f} KB")
+    print(f"每次编辑保存完整配置快照: {snapshot_bytes / 1024:.1f} KB")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
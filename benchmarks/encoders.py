@@ -0,0 +1,246 @@
+"""
+编码器基准测试 - 比较各视频编码器和图片编码器，选出最快且输出合规的编码器
+
+    python -m benchmarks.encoders              # 默认 360x640
+    python -m benchmarks.encoders --apply      # 把最快的合规编码器保存为导出默认
+
+视频编码器使用与 ffmpeg_2pass 阶段相同的输入（对齐后的帧存储）和码率，
+输出经 MediaConformanceValidator 校验，有 ERROR 的编码器不参与选择。
+
+退出码:
+    0 - 完成
+    1 - 没有合规的视频编码器
+    2 - 参数错误
+"""
+import os
+import sys
+import argparse
+import logging
+import tempfile
+import shutil
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from config.constants import RESOLUTION_SPECS, get_resolution_spec
+from core.encoders import (
+    STILL_ENCODERS, VIDEO_ENCODERS, available_video_encoders, load_preferred_encoder, save_preferred_encoder
+)
+from core.export_service import ExportWorker
+from core.media_validator import MediaConformanceValidator
+from core.still_encoder import PngOptions, TRANSIENT_PNG, FINAL_PNG
+from core.validator import ValidationLevel
+from benchmarks.measure import Timer
+from benchmarks.sources import make_test_video, make_test_image
+from benchmarks.stages import BenchContext, run_stage, stage_available
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+EXIT_OK = 0
+EXIT_NO_ENCODER = 1
+EXIT_USAGE = 2
+
+VIDEO_STAGE = "ffmpeg_2pass"
+# 比较的 PNG 预设
+PNG_PRESETS = {
+    "transient": TRANSIENT_PNG,
+    "default": PngOptions(),
+    "final": FINAL_PNG,
+}
+
+
+@dataclass
+class EncoderResult:
+    """一个视频编码器的测量结果"""
+    name: str
+    label: str
+    wall_time: float = 0.0
+    fps: float = 0.0
+    output_bytes: int = 0
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def conforming(self) -> bool:
+        return not self.errors
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_time": round(self.wall_time, 4),
+            "fps": round(self.fps, 1),
+            "output_bytes": self.output_bytes,
+            "conforming": self.conforming,
+            "errors": self.errors,
+        }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.encoders",
+        description="视频/图片编码器基准测试"
+    )
+    parser.add_argument("-r", "--resolution", default="360x640",
+                        choices=list(RESOLUTION_SPECS), help="测试分辨率（默认 360x640）")
+    parser.add_argument("-n", "--frames", type=int, default=90,
+                        help="测试视频帧数（默认 90）")
+    parser.add_argument("--fps", type=float, default=30.0, help="测试视频帧率")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="每个编码器重复次数，耗时取中位数（默认 3）")
+    parser.add_argument("--results-dir", default=DEFAULT_RESULTS_DIR,
+                        help="测试素材的保存目录")
+    parser.add_argument("--ffmpeg", default="", help="ffmpeg 路径（默认自动查找）")
+    parser.add_argument("--apply", action="store_true",
+                        help="把最快的合规视频编码器保存为导出默认")
+    return parser
+
+
+def bench_video_encoder(ctx: BenchContext, validator: MediaConformanceValidator, repeat: int) -> EncoderResult:
+    """测量一个视频编码器，并校验每次运行的输出"""
+    result = EncoderResult(ctx.encoder, VIDEO_ENCODERS[ctx.encoder].label)
+
+    def inspect(output_path: str):
+        config = {"screen": ctx.resolution, "loop": {"file": os.path.basename(output_path)}}
+        for item in validator.validate(config, os.path.dirname(output_path)):
+            target = result.errors if item.level == ValidationLevel.ERROR else result.warnings
+            if item.message not in target:
+                target.append(item.message)
+
+    try:
+        stage = run_stage(VIDEO_STAGE, ctx, repeat, inspect_output=inspect)
+    except (RuntimeError, OSError) as e:
+        result.errors.append(str(e).splitlines()[0] if str(e) else type(e).__name__)
+        return result
+    result.wall_time = stage.wall_time
+    result.fps = stage.fps
+    result.output_bytes = stage.output_bytes
+    return result
+
+
+def bench_still_encoders(image: np.ndarray, work_dir: str, repeat: int) -> List[tuple]:
+    """
+    测量各图片编码器在各 PNG 预设下的表现
+
+    Returns:
+        (名称, 预设名, 最短耗时, 输出字节数, 实际格式) 列表
+    """
+    results = []
+    for backend in STILL_ENCODERS.values():
+        if not backend.is_available(frozenset()):
+            continue
+        for preset_name, options in PNG_PRESETS.items():
+            path = os.path.join(work_dir, f"{backend.name}-{preset_name}.png")
+            times = []
+            stats = None
+            for _ in range(max(1, repeat)):
+                with Timer() as timer:
+                    stats = backend.encode(image, path, options)
+                times.append(timer.elapsed)
+            results.append((backend.name, preset_name, min(times), stats.bytes, stats.detail))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数，默认读取 sys.argv
+
+    Returns:
+        退出码
+    """
+    parser = build_arg_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    if args.frames <= 0 or args.repeat <= 0:
+        print("帧数和重复次数必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+
+    ffmpeg_path = args.ffmpeg or ExportWorker()._find_ffmpeg()
+    spec = get_resolution_spec(args.resolution)
+    width, height = spec["width"], spec["height"]
+    sources_dir = os.path.join(args.results_dir, "sources")
+    work_root = tempfile.mkdtemp(prefix="assetmaker_encbench_")
+
+    video_results: List[EncoderResult] = []
+    try:
+        # ===== 图片编码器 =====
+        image_path = make_test_image(ffmpeg_path, sources_dir, width, height)
+        if image_path and HAS_CV2:
+            image = cv2.cvtColor(cv2.imread(image_path), cv2.COLOR_BGR2BGRA)
+            print(f"图片编码器 ({args.resolution} BGRA):")
+            for name, preset, seconds, nbytes, detail in bench_still_encoders(image, work_root, args.repeat):
+                print(f"  {name:<12} {preset:<10} {seconds * 1000:8.1f} ms  {nbytes / 1024:8.1f} KB  {detail}")
+        else:
+            print("图片编码器: 跳过（没有测试图片）", file=sys.stderr)
+
+        # ===== 视频编码器 =====
+        backends = available_video_encoders(ffmpeg_path) if ffmpeg_path else []
+        if not backends:
+            print("没有可用的视频编码器（未找到 ffmpeg 或不支持 libx264/libopenh264）", file=sys.stderr)
+            return EXIT_NO_ENCODER
+
+        validator = MediaConformanceValidator()
+        video_path = make_test_video(ffmpeg_path, sources_dir, width, height, args.frames, args.fps)
+        print(f"\n视频编码器 ({args.resolution}, {args.frames} 帧):")
+        for backend in backends:
+            ctx = BenchContext(
+                resolution=args.resolution,
+                ffmpeg_path=ffmpeg_path,
+                video_path=video_path,
+                image_path=image_path,
+                frames=args.frames,
+                fps=args.fps,
+                work_root=work_root,
+                encoder=backend.name
+            )
+            reason = stage_available(VIDEO_STAGE, ctx)
+            if reason:
+                print(f"  {backend.name:<16} 跳过: {reason}")
+                continue
+            result = bench_video_encoder(ctx, validator, args.repeat)
+            video_results.append(result)
+            status = "合规" if result.conforming else "不合规: " + "; ".join(result.errors)
+            print(
+                f"  {result.name:<16} {result.wall_time:8.3f}s  {result.fps:8.1f} fps  "
+                f"{result.output_bytes / 1024:8.1f} KB  {status}"
+            )
+            for warning in result.warnings:
+                print(f"  {'':<16} 警告: {warning}")
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    conforming = [r for r in video_results if r.conforming]
+    if not conforming:
+        print("\n没有输出合规的视频编码器", file=sys.stderr)
+        return EXIT_NO_ENCODER
+
+    fastest = min(conforming, key=lambda r: r.wall_time)
+    print(f"\n最快的合规编码器: {fastest.name} ({fastest.label})，当前默认: {load_preferred_encoder() or '未设置'}")
+    if args.apply:
+        save_preferred_encoder(fastest.name, {
+            "resolution": args.resolution,
+            "frames": args.frames,
+            "encoders": {r.name: r.to_dict() for r in video_results},
+        })
+        print(f"已保存为导出默认编码器: {fastest.name}")
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
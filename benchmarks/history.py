@@ -0,0 +1,152 @@
+"""
+基准测试历史 - JSON 历史文件、基线对比和趋势
+"""
+import os
+import sys
+import json
+import platform
+import subprocess
+import logging
+from datetime import datetime
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+HISTORY_VERSION = 1
+# 比较的指标及其显示名
+COMPARED_METRICS = {
+    "wall_time": "耗时",
+    "peak_rss": "内存",
+    "peak_temp_bytes": "临时文件",
+}
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def _git_commit(repo_dir: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repo_dir, capture_output=True, text=True, timeout=10
+        )
+        return result.stdout.strip() if result.returncode == 0 else ""
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+
+def make_run_record(results: List[Dict[str, Any]], repo_dir: str, **settings) -> Dict[str, Any]:
+    """
+    生成一次运行的记录
+
+    Args:
+        results: StageResult.to_dict() 列表
+        repo_dir: 仓库目录（记录当前提交）
+        settings: 运行参数（帧数、重复次数等）
+    """
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(repo_dir),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "settings": settings,
+        "results": {f"{r['stage']}@{r['resolution']}": r for r in results},
+    }
+
+
+def _write_json(path: str, data: Any):
+    """原子写入 JSON"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    """读取历史记录，文件不存在或损坏时返回空列表"""
+    if not os.path.isfile(path):
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return list(data.get("runs", []))
+    except (OSError, ValueError, AttributeError) as e:
+        logger.warning(f"读取基准测试历史失败: {e}")
+        return []
+
+
+def append_history(path: str, record: Dict[str, Any]):
+    """追加一条运行记录"""
+    runs = load_history(path)
+    runs.append(record)
+    _write_json(path, {"version": HISTORY_VERSION, "runs": runs})
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    """读取基线，不存在返回 None"""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"读取基线失败: {e}")
+        return None
+
+
+def save_baseline(path: str, record: Dict[str, Any]):
+    """保存基线"""
+    _write_json(path, record)
+
+
+@dataclass
+class Comparison:
+    """单项指标与基线的对比"""
+    key: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        if self.baseline <= 0:
+            return 1.0 if self.current <= 0 else float("inf")
+        return self.current / self.baseline
+
+    def is_regression(self, threshold: float) -> bool:
+        return self.ratio > 1.0 + threshold
+
+
+def compare_to_baseline(record: Dict[str, Any], baseline: Dict[str, Any]) -> List[Comparison]:
+    """对比本次运行与基线中都存在的阶段"""
+    comparisons = []
+    base_results = baseline.get("results", {})
+    for key, result in record["results"].items():
+        base = base_results.get(key)
+        if base is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric in result and metric in base:
+                comparisons.append(Comparison(key, metric, float(base[metric]), float(result[metric])))
+    return comparisons
+
+
+def sparkline(values: List[float]) -> str:
+    """用方块字符画出数值趋势"""
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    if high - low <= 1e-12:
+        return SPARK_CHARS[0] * len(values)
+    scale = (len(SPARK_CHARS) - 1) / (high - low)
+    return "".join(SPARK_CHARS[round((v - low) * scale)] for v in values)
+
+
+def trend(runs: List[Dict[str, Any]], key: str, metric: str = "wall_time", last: int = 10) -> List[float]:
+    """某个阶段最近 last 次运行的指标值（旧到新）"""
+    values = []
+    for run in runs:
+        result = run.get("results", {}).get(key)
+        if result is not None and metric in result:
+            values.append(float(result[metric]))
+    return values[-last:]
@@ -0,0 +1,173 @@
+"""
+资源测量 - 在后台线程中定时采样内存和临时目录占用
+
+Python 进程和 FFmpeg 子进程分开统计；峰值取采样期间的最大值，
+采样间隔内的短暂尖峰可能漏掉，因此数值偏保守（偏小）。
+"""
+import os
+import sys
+import time
+import threading
+from dataclasses import dataclass
+from typing import Optional, Callable, Set
+
+# 采样间隔（秒）
+SAMPLE_INTERVAL = 0.02
+
+
+def _rss_linux(pid: Optional[int]) -> int:
+    with open(f"/proc/{pid or 'self'}/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_windows(pid: Optional[int]) -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    psapi = ctypes.WinDLL("psapi", use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+
+    if pid is None:
+        handle, owned = kernel32.GetCurrentProcess(), False
+    else:
+        # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+        handle, owned = kernel32.OpenProcess(0x1000 | 0x0010, False, pid), True
+        if not handle:
+            return 0
+    try:
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return 0
+        return int(counters.WorkingSetSize)
+    finally:
+        if owned:
+            kernel32.CloseHandle(handle)
+
+
+def process_rss(pid: Optional[int] = None) -> int:
+    """
+    进程当前常驻内存（字节）
+
+    Args:
+        pid: 进程 ID，None 表示当前进程
+
+    Returns:
+        常驻内存字节数；无法获取时返回 0
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            return _rss_linux(pid)
+        if os.name == "nt":
+            return _rss_windows(pid)
+        if pid is None:
+            # 其他平台只能拿到进程生命周期内的峰值（macOS 单位为字节）
+            import resource
+            return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return 0
+
+
+def directory_size(path: str, exclude: Optional[Set[str]] = None) -> int:
+    """目录下所有文件的总字节数（文件可能在遍历期间被删除，忽略这类错误）"""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if exclude and os.path.normcase(os.path.abspath(file_path)) in exclude:
+                continue
+            try:
+                total += os.path.getsize(file_path)
+            except OSError:
+                pass
+    return total
+
+
+@dataclass
+class ResourceUsage:
+    """一次测量的资源占用"""
+    peak_rss: int = 0          # Python 进程峰值常驻内存
+    peak_child_rss: int = 0    # FFmpeg 子进程峰值常驻内存
+    peak_temp_bytes: int = 0   # 工作目录中临时文件的峰值占用（不含最终输出）
+
+
+class ResourceSampler:
+    """
+    资源采样器
+
+    with ResourceSampler(work_dir, exclude=[output_path], child_pid=lambda: ...) as sampler:
+        ...
+    sampler.usage
+    """
+
+    def __init__(
+        self,
+        work_dir: str,
+        exclude: Optional[list] = None,
+        child_pid: Optional[Callable[[], Optional[int]]] = None,
+        interval: float = SAMPLE_INTERVAL
+    ):
+        self._work_dir = work_dir
+        self._exclude = {os.path.normcase(os.path.abspath(p)) for p in (exclude or [])}
+        self._child_pid = child_pid
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.usage = ResourceUsage()
+
+    def _sample(self):
+        usage = self.usage
+        usage.peak_rss = max(usage.peak_rss, process_rss())
+        if self._child_pid is not None:
+            pid = self._child_pid()
+            if pid:
+                usage.peak_child_rss = max(usage.peak_child_rss, process_rss(pid))
+        usage.peak_temp_bytes = max(
+            usage.peak_temp_bytes, directory_size(self._work_dir, self._exclude)
+        )
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self._interval)
+
+    def __enter__(self) -> "ResourceSampler":
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="bench-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+
+
+class Timer:
+    """墙钟计时"""
+
+    def __enter__(self) -> "Timer":
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
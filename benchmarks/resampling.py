@@ -0,0 +1,140 @@
+"""
+重采样基准测试 - 比较旧的双线性缩放与 core.resampling 在各 process_for_* 目标尺寸上的耗时和混叠
+
+    python -m benchmarks.resampling
+
+源图为 4K 波带片（zone plate，频率从中心向外线性增加）和一张小图（测放大）。
+混叠指标: 输出中频率超过目标奈奎斯特频率的区域理想情况下应为均匀灰色，
+取该区域亮度的标准差，越小越好（旧方法的摩尔纹会让它明显变大）。
+"""
+import sys
+import argparse
+import statistics
+import time
+from typing import List, Optional, Tuple, Callable
+
+import numpy as np
+
+from config.constants import LOGO_WIDTH, LOGO_HEIGHT, RESOLUTION_SPECS, get_resolution_spec
+from core.resampling import resize_cover, cover_crop_box
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+EXIT_OK = 0
+EXIT_USAGE = 2
+
+SOURCE_SIZE = (3840, 2160)
+SMALL_SOURCE_SIZE = (180, 320)
+# 超过目标奈奎斯特频率多少倍的区域计入混叠（留出滤波器过渡带）
+ALIAS_MARGIN = 1.2
+
+
+def zone_plate(width: int, height: int) -> np.ndarray:
+    """BGRA 波带片，角落处频率为 0.5 周期/像素"""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    r2 = (x - width / 2) ** 2 + (y - height / 2) ** 2
+    r_max = np.hypot(width / 2, height / 2)
+    # 相位 pi*r^2/(2*r_max) -> 局部频率 r/(2*r_max)
+    gray = (127.5 + 127.5 * np.cos(np.pi * r2 / (2 * r_max))).astype(np.uint8)
+    img = np.empty((height, width, 4), dtype=np.uint8)
+    img[:, :, :3] = gray[:, :, np.newaxis]
+    img[:, :, 3] = 255
+    return img
+
+
+def legacy_resize(img: np.ndarray, width: int, height: int) -> np.ndarray:
+    """旧实现: 整图双线性缩放后居中裁剪"""
+    h, w = img.shape[:2]
+    scale = max(width / w, height / h)
+    new_w, new_h = int(w * scale), int(h * scale)
+    resized = cv2.resize(img, (new_w, new_h))
+    x, y = (new_w - width) // 2, (new_h - height) // 2
+    return resized[y:y + height, x:x + width]
+
+
+def aliasing(output: np.ndarray, src_w: int, src_h: int) -> Optional[float]:
+    """
+    波带片缩小结果的混叠指标
+
+    Returns:
+        高频区域亮度标准差；放大或没有高频区域时返回 None
+    """
+    out_h, out_w = output.shape[:2]
+    x0, y0, crop_w, crop_h = cover_crop_box(src_w, src_h, out_w, out_h)
+    scale = out_w / crop_w
+    if scale >= 1:
+        return None
+    v, u = np.mgrid[0:out_h, 0:out_w].astype(np.float32)
+    r = np.hypot(x0 + (u + 0.5) / scale - src_w / 2, y0 + (v + 0.5) / scale - src_h / 2)
+    frequency = r / (2 * np.hypot(src_w / 2, src_h / 2))
+    mask = frequency > 0.5 * scale * ALIAS_MARGIN
+    if not mask.any():
+        return None
+    return float(output[:, :, 1][mask].std())
+
+
+def _time(func: Callable[[], np.ndarray], repeat: int) -> Tuple[float, np.ndarray]:
+    result = func()  # 预热（同时填充缓冲池）
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def targets() -> List[Tuple[str, int, int]]:
+    """process_for_logo / process_for_overlay 的目标尺寸"""
+    items = [("logo", LOGO_WIDTH, LOGO_HEIGHT)]
+    for resolution in RESOLUTION_SPECS:
+        spec = get_resolution_spec(resolution)
+        items.append((f"overlay@{resolution}", spec["width"], spec["height"]))
+    return items
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Returns:
+        退出码
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.resampling", description="图片重采样基准测试")
+    parser.add_argument("--repeat", type=int, default=10, help="每项重复次数，耗时取中位数（默认 10）")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+    if args.repeat <= 0:
+        print("重复次数必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+    if not HAS_CV2:
+        print("需要 opencv-python", file=sys.stderr)
+        return EXIT_USAGE
+
+    sources = [
+        (f"{SOURCE_SIZE[0]}x{SOURCE_SIZE[1]}", zone_plate(*SOURCE_SIZE)),
+        (f"{SMALL_SOURCE_SIZE[0]}x{SMALL_SOURCE_SIZE[1]}", zone_plate(*SMALL_SOURCE_SIZE)),
+    ]
+    print(f"{'目标':<20} {'源图':<10} {'旧 ms':>8} {'新 ms':>8} {'旧混叠':>8} {'新混叠':>8}")
+    for name, width, height in targets():
+        for source_name, img in sources:
+            src_h, src_w = img.shape[:2]
+            legacy_time, legacy_out = _time(lambda: legacy_resize(img, width, height), args.repeat)
+            new_time, new_out = _time(lambda: resize_cover(img, width, height), args.repeat)
+            legacy_alias = aliasing(legacy_out, src_w, src_h)
+            new_alias = aliasing(new_out, src_w, src_h)
+            print(
+                f"{name:<20} {source_name:<10} {legacy_time * 1000:8.2f} {new_time * 1000:8.2f} "
+                f"{'-' if legacy_alias is None else f'{legacy_alias:.1f}':>8} "
+                f"{'-' if new_alias is None else f'{new_alias:.1f}':>8}"
+            )
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+合成测试素材 - 使用 FFmpeg testsrc 生成视频和图片
+
+生成的素材按尺寸和帧数命名并复用，多次运行基准测试时不会重复生成。
+没有 FFmpeg 时图片改用 numpy 生成（视频相关阶段本身也需要 FFmpeg，会被跳过）。
+"""
+import os
+import subprocess
+import logging
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+# 生成素材的超时时间（秒）
+GENERATE_TIMEOUT = 300
+
+
+def _run_ffmpeg(ffmpeg_path: str, args: list, output_path: str) -> bool:
+    """运行 FFmpeg 生成文件（先写临时文件，成功后再改名）"""
+    root, ext = os.path.splitext(output_path)
+    tmp_path = f"{root}.tmp{ext}"
+    cmd = [ffmpeg_path, "-hide_banner", "-loglevel", "error", "-y", *args, tmp_path]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=GENERATE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"生成测试素材失败: {e}")
+        return False
+    if result.returncode != 0 or not os.path.isfile(tmp_path):
+        logger.warning(f"生成测试素材失败: {result.stderr.strip()[-500:]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, output_path)
+    return True
+
+
+def make_test_video(
+    ffmpeg_path: str,
+    directory: str,
+    width: int,
+    height: int,
+    frames: int,
+    fps: float = 30.0
+) -> Optional[str]:
+    """
+    生成 testsrc 测试视频（H.264，与常见素材相同的编码）
+
+    Returns:
+        视频路径；没有 FFmpeg 或生成失败返回 None
+    """
+    if not ffmpeg_path:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"testsrc_{width}x{height}_{frames}f.mp4")
+    if os.path.isfile(path):
+        return path
+
+    ok = _run_ffmpeg(ffmpeg_path, [
+        "-f", "lavfi",
+        "-i", f"testsrc=size={width}x{height}:rate={fps:g}",
+        "-frames:v", str(frames),
+        "-c:v", "libx264",
+        "-preset", "ultrafast",
+        "-pix_fmt", "yuv420p",
+    ], path)
+    return path if ok else None
+
+
+def _synthetic_image(width: int, height: int) -> np.ndarray:
+    """numpy 生成的测试图（彩条 + 渐变 + 噪声，避免过于容易压缩）"""
+    bars = np.array([
+        [255, 255, 255], [0, 255, 255], [255, 255, 0], [0, 255, 0],
+        [255, 0, 255], [0, 0, 255], [255, 0, 0], [0, 0, 0],
+    ], dtype=np.uint8)
+    columns = bars[np.arange(width) * len(bars) // width]
+    img = np.repeat(columns[np.newaxis], height, axis=0).astype(np.int16)
+    img += (np.arange(height, dtype=np.int16) * 64 // height)[:, np.newaxis, np.newaxis]
+    img += np.random.default_rng(0).integers(-8, 9, img.shape, dtype=np.int16)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def make_test_image(
+    ffmpeg_path: str,
+    directory: str,
+    width: int,
+    height: int
+) -> Optional[str]:
+    """
+    生成测试图片（PNG）
+
+    Returns:
+        图片路径；生成失败返回 None
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"testsrc_{width}x{height}.png")
+    if os.path.isfile(path):
+        return path
+
+    if ffmpeg_path and _run_ffmpeg(ffmpeg_path, [
+        "-f", "lavfi",
+        "-i", f"testsrc=size={width}x{height}",
+        "-frames:v", "1",
+    ], path):
+        return path
+
+    if not HAS_CV2:
+        return None
+    return path if cv2.imwrite(path, _synthetic_image(width, height)) else None
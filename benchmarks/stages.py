@@ -0,0 +1,250 @@
+"""
+导出阶段 - 不经过 Qt 事件循环，直接调用导出代码
+
+每个阶段分为准备（不计时）和执行（计时）两步。ExportWorker 只作为普通对象使用，
+不调用 start()，信号没有连接，emit 不会排队。
+"""
+import os
+import shutil
+import tempfile
+import logging
+import statistics
+from dataclasses import dataclass, asdict
+from typing import Optional, Callable, Dict, Any, List, Tuple
+
+import numpy as np
+
+from config.constants import get_resolution_spec
+from core.encoders import VIDEO_ENCODERS
+from core.export_service import ExportWorker, VideoExportParams
+from core.frame_store import FrameStore
+from core.image_processor import ImageProcessor
+from benchmarks.measure import ResourceSampler, Timer, directory_size
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+
+@dataclass
+class BenchContext:
+    """一种分辨率下的测试环境"""
+    resolution: str
+    ffmpeg_path: str
+    video_path: Optional[str]
+    image_path: Optional[str]
+    frames: int
+    fps: float
+    work_root: str
+    encoder: Optional[str] = None  # 视频编码器名称，None 为导出默认选择
+
+
+@dataclass
+class StageResult:
+    """一个阶段在一种分辨率下的测量结果"""
+    stage: str
+    resolution: str
+    repeat: int
+    frames: int
+    wall_time: float        # 各次运行的中位数（秒）
+    wall_time_min: float
+    fps: float              # frames / wall_time
+    peak_rss: int
+    peak_child_rss: int
+    peak_temp_bytes: int
+    output_bytes: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.stage}@{self.resolution}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# 阶段准备函数: (上下文, 工作目录) -> (计时执行的函数, 帧数, 输出路径, ExportWorker)
+StageSetup = Callable[[BenchContext, str], Tuple[Callable[[], None], int, str, Optional[ExportWorker]]]
+
+
+def _make_worker(ctx: BenchContext, work_dir: str) -> ExportWorker:
+    worker = ExportWorker()
+    worker.setup([], work_dir, ffmpeg_path=ctx.ffmpeg_path, resolution=ctx.resolution)
+    return worker
+
+
+def _load_image(ctx: BenchContext) -> np.ndarray:
+    img = ImageProcessor.load_image(ctx.image_path) if ctx.image_path else None
+    if img is None:
+        raise RuntimeError("测试图片不可用")
+    return img
+
+
+def _setup_logo(ctx: BenchContext, work_dir: str):
+    img = _load_image(ctx)
+    output_path = os.path.join(work_dir, "logo.argb")
+
+    def run():
+        mat = ImageProcessor.process_for_logo(img)
+        _make_worker(ctx, work_dir)._export_argb(output_path, mat, is_logo=True)
+
+    return run, 1, output_path, None
+
+
+def _setup_argb(ctx: BenchContext, work_dir: str):
+    mat = ImageProcessor.process_for_overlay(_load_image(ctx), ctx.resolution)
+    worker = _make_worker(ctx, work_dir)
+    output_path = os.path.join(work_dir, "overlay.argb")
+
+    def run():
+        worker._export_argb(output_path, mat, is_logo=False)
+
+    return run, 1, output_path, None
+
+
+def _setup_video(ctx: BenchContext, work_dir: str):
+    spec = get_resolution_spec(ctx.resolution)
+    worker = _make_worker(ctx, work_dir)
+    output_path = os.path.join(work_dir, "loop.mp4")
+    params = VideoExportParams(
+        video_path=ctx.video_path,
+        cropbox=(0, 0, spec["width"], spec["height"]),
+        start_frame=0,
+        end_frame=ctx.frames,
+        fps=ctx.fps,
+        resolution=ctx.resolution
+    )
+
+    def run():
+        worker._export_video(output_path, params, 0, 1)
+
+    return run, ctx.frames, output_path, worker
+
+
+def _setup_ffmpeg_2pass(ctx: BenchContext, work_dir: str):
+    """只测编码：先把源视频处理成对齐后的帧写入帧存储（不计时）"""
+    spec = get_resolution_spec(ctx.resolution)
+    pad_right = spec["padded_width"] - spec["width"] if spec["padding_side"] == "right" else 0
+    pad_bottom = spec["padded_height"] - spec["height"] if spec["padding_side"] == "bottom" else 0
+
+    store = FrameStore.create(
+        os.path.join(work_dir, "input.epfs"),
+        spec["width"] + pad_right, spec["height"] + pad_bottom, ctx.frames, ctx.fps
+    )
+    cap = cv2.VideoCapture(ctx.video_path)
+    try:
+        while len(store) < ctx.frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = cv2.resize(frame, (spec["width"], spec["height"]))
+            store.append(cv2.copyMakeBorder(frame, 0, pad_bottom, 0, pad_right, cv2.BORDER_CONSTANT))
+    finally:
+        cap.release()
+        store.close()
+
+    worker = _make_worker(ctx, work_dir)
+    output_path = os.path.join(work_dir, "encoded.mp4")
+
+    def run():
+        worker._run_ffmpeg_2pass(
+            output_file=output_path.replace("\\", "/"),
+            fps=ctx.fps,
+            input_args=store.ffmpeg_input_args(),
+            max_frames=len(store),
+            encoder=VIDEO_ENCODERS[ctx.encoder] if ctx.encoder else None
+        )
+
+    return run, len(store), output_path, worker
+
+
+# 阶段名 -> (准备函数, 是否需要 FFmpeg 和测试视频)
+STAGES: Dict[str, Tuple[StageSetup, bool]] = {
+    "logo": (_setup_logo, False),
+    "argb": (_setup_argb, False),
+    "video": (_setup_video, True),
+    "ffmpeg_2pass": (_setup_ffmpeg_2pass, True),
+}
+
+
+def stage_available(stage: str, ctx: BenchContext) -> Optional[str]:
+    """
+    检查阶段能否运行
+
+    Returns:
+        不能运行的原因；可以运行返回 None
+    """
+    if not HAS_CV2:
+        return "未安装 opencv-python"
+    needs_video = STAGES[stage][1]
+    if needs_video and not ctx.ffmpeg_path:
+        return "未找到 ffmpeg"
+    if needs_video and not ctx.video_path:
+        return "测试视频生成失败"
+    if not needs_video and not ctx.image_path:
+        return "测试图片生成失败"
+    return None
+
+
+def run_stage(
+    stage: str,
+    ctx: BenchContext,
+    repeat: int = 1,
+    inspect_output: Optional[Callable[[str], None]] = None
+) -> StageResult:
+    """
+    运行一个阶段 repeat 次并汇总
+
+    每次运行使用新的工作目录，结束后删除。内存和临时文件取各次运行中的最大值。
+
+    Args:
+        inspect_output: 删除工作目录前对输出文件的检查（如一致性校验），每次运行调用一次
+    """
+    setup = STAGES[stage][0]
+    times: List[float] = []
+    peak_rss = peak_child_rss = peak_temp_bytes = output_bytes = 0
+    frames = 0
+
+    for _ in range(max(1, repeat)):
+        work_dir = tempfile.mkdtemp(prefix=f"{stage}_", dir=ctx.work_root)
+        try:
+            run, frames, output_path, worker = setup(ctx, work_dir)
+            # 准备阶段生成的输入文件不算临时占用
+            baseline_bytes = directory_size(work_dir)
+            child_pid = None
+            if worker is not None:
+                child_pid = lambda: getattr(worker._ffmpeg_process, "pid", None)
+
+            with ResourceSampler(work_dir, exclude=[output_path], child_pid=child_pid) as sampler:
+                with Timer() as timer:
+                    run()
+
+            times.append(timer.elapsed)
+            usage = sampler.usage
+            peak_rss = max(peak_rss, usage.peak_rss)
+            peak_child_rss = max(peak_child_rss, usage.peak_child_rss)
+            peak_temp_bytes = max(peak_temp_bytes, usage.peak_temp_bytes - baseline_bytes)
+            if os.path.isfile(output_path):
+                output_bytes = os.path.getsize(output_path)
+            if inspect_output is not None:
+                inspect_output(output_path)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    wall_time = statistics.median(times)
+    return StageResult(
+        stage=stage,
+        resolution=ctx.resolution,
+        repeat=len(times),
+        frames=frames,
+        wall_time=wall_time,
+        wall_time_min=min(times),
+        fps=frames / wall_time if wall_time > 0 else 0.0,
+        peak_rss=peak_rss,
+        peak_child_rss=peak_child_rss,
+        peak_temp_bytes=max(0, peak_temp_bytes),
+        output_bytes=output_bytes
+    )
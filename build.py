@@ -238,8 +238,14 @@ def run_cxfreeze(skip_flasher=False):
     includes = [
         "config", "config.constants", "config.epconfig",
         "core", "core.validator", "core.video_processor", "core.image_processor",
-        "core.export_service", "core.overlay_renderer",
-        "core.operator_lookup", "core.update_service",
+        "core.export_service", "core.overlay_renderer", "core.batch_validator",
+        "core.media_validator", "core.operator_lookup", "core.update_service",
+        "core.download_engine", "core.release_cache", "core.mirror_health",
+        "core.simulator_client", "core.thumbnail_service", "core.loop_finder",
+        "core.video_analysis", "core.auto_crop", "core.frame_store",
+        "core.export_metrics", "core.ffmpeg_runner",
+        "core.encoders", "core.resampling", "core.batch_image_processor", "core.still_encoder",
+        "core.asset_importer", "core.asset_index", "core.command_history", "core.autosave", "core.workspace", "core.templates",
         "gui", "gui.main_window", "gui.dialogs",
         "gui.dialogs.export_progress_dialog", "gui.dialogs.welcome_dialog",
         "gui.dialogs.shortcuts_dialog", "gui.dialogs.update_dialog",
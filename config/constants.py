@@ -53,10 +53,21 @@ RESOLUTION_SPECS: Dict[str, Dict[str, Any]] = {
     }
 }
 
+# ===== 设备解码能力 =====
+# 导出视频编码为 H.264 yuv420p @ 3000k，设备解码预算留有余量
+DEVICE_VIDEO_CODEC = "h264"
+DEVICE_PIX_FMT = "yuv420p"
+DEVICE_MAX_BITRATE = 4_000_000          # 比特/秒
+DEVICE_MAX_PIXEL_RATE = 720 * 1080 * 30  # 像素/秒（宽 x 高 x 帧率）
+
 # ===== 支持的文件格式 =====
 SUPPORTED_VIDEO_FORMATS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv')
 SUPPORTED_IMAGE_FORMATS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
 
+# ===== 项目缓存 =====
+# 分析结果等派生数据保存在项目目录下的隐藏目录中，随项目一起移动
+PROJECT_CACHE_DIRNAME = ".assetmaker"
+
 # ===== 时间单位换算 =====
 # 项目中时间统一采用微秒（microseconds）
 # 1秒 = 1,000,000微秒
@@ -70,6 +81,7 @@ DEFAULT_BACKGROUND_COLOR = "#000000"
 
 # ===== 过渡效果类型 =====
 TRANSITION_TYPES = ["none", "fade", "move", "swipe"]
+TRANSITION_IMAGE_SIZE = (360, 640)  # 过渡图片缩放尺寸（保持比例）
 
 # ===== 叠加UI类型 =====
 OVERLAY_TYPES = ["none", "arknights", "image"]
@@ -176,3 +188,16 @@ DOWNLOAD_SOURCES: List[UpdateSource] = [
         timeout=120.0
     ),
 ]
+
+# 镜像健康度参数
+MIRROR_RACE_TOP_K = 2                # 竞速时只同时请求得分最好的前 k 个源
+MIRROR_EWMA_ALPHA = 0.3              # EWMA 平滑系数（越大越偏向最近的结果）
+MIRROR_CIRCUIT_FAILURES = 3          # 连续失败多少次后熔断
+MIRROR_CIRCUIT_COOLDOWN = 300.0      # 首次熔断冷却时间（秒）
+MIRROR_CIRCUIT_MAX_COOLDOWN = 3600.0  # 熔断冷却时间上限（秒）
+
+# 下载引擎参数
+DOWNLOAD_MIN_CHUNK_SIZE = 64 * 1024          # 自适应读取块下限
+DOWNLOAD_MAX_CHUNK_SIZE = 4 * 1024 * 1024    # 自适应读取块上限
+DOWNLOAD_PARALLEL_SEGMENTS = 4               # 多镜像并行分段数（1 表示禁用）
+DOWNLOAD_PARALLEL_MIN_SIZE = 16 * 1024 * 1024  # 小于此大小不分段
@@ -56,8 +56,87 @@ class OverlayType(Enum):
         return cls.NONE
 
 
-@dataclass
-class TransitionOptions:
+class _ConfigNode:
+    """
+    配置数据类的公共基类（需配合 @dataclass(slots=True) 使用）
+
+    字段只有字符串、数字、布尔、枚举（不可变）和嵌套的配置数据类，
+    结构拷贝只需逐层复制数据类，不必经过 to_dict()/from_dict()。
+    """
+    __slots__ = ()
+
+    def copy(self):
+        """结构深拷贝（嵌套的配置数据类逐层复制，其余字段共享不可变值）"""
+        cls = type(self)
+        clone = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = getattr(self, name)
+            setattr(clone, name, value.copy() if isinstance(value, _ConfigNode) else value)
+        return clone
+
+
+def diff(old: Optional[_ConfigNode], new: Optional[_ConfigNode], prefix: str = "") -> List[str]:
+    """
+    比较两个配置，返回发生变化的字段路径
+
+    路径以点号分隔，如 "loop.file"、"overlay.arknights_options.operator_name"。
+    嵌套对象一侧为 None 或类型不同时返回该对象本身的路径（如 "transition_in.options"）。
+
+    Args:
+        old: 旧配置（通常是 copy() 得到的快照）
+        new: 新配置
+        prefix: 路径前缀（递归使用）
+
+    Returns:
+        变化的字段路径列表，没有变化时为空列表
+    """
+    if old is new:
+        return []
+    if type(old) is not type(new) or not isinstance(new, _ConfigNode):
+        return [] if old == new else [prefix]
+    changed = []
+    for name in type(new).__slots__:
+        a, b = getattr(old, name), getattr(new, name)
+        if a is b:
+            continue
+        path = f"{prefix}.{name}" if prefix else name
+        if isinstance(a, _ConfigNode) or isinstance(b, _ConfigNode):
+            changed.extend(diff(a, b, path))
+        elif a != b:
+            changed.append(path)
+    return changed
+
+
+def get_field(node: _ConfigNode, path: str) -> Any:
+    """按 diff() 返回的路径读取字段"""
+    for name in path.split("."):
+        node = getattr(node, name)
+    return node
+
+
+def set_field(node: _ConfigNode, path: str, value: Any):
+    """
+    按 diff() 返回的路径写入字段
+
+    Raises:
+        AttributeError: 路径中间的对象为 None 或字段不存在
+    """
+    *parents, name = path.split(".")
+    for parent in parents:
+        node = getattr(node, parent)
+    setattr(node, name, value)
+
+
+def touches(changes: List[str], *prefixes: str) -> bool:
+    """变化路径中是否有位于任一前缀（字段或其子字段）下的"""
+    return any(
+        path == prefix or path.startswith(prefix + ".")
+        for path in changes for prefix in prefixes
+    )
+
+
+@dataclass(slots=True)
+class TransitionOptions(_ConfigNode):
     """过渡效果选项"""
     duration: int = 500000  # 微秒 (0.5秒)
     image: str = ""
@@ -81,8 +160,8 @@ class TransitionOptions:
         )
 
 
-@dataclass
-class Transition:
+@dataclass(slots=True)
+class Transition(_ConfigNode):
     """过渡效果配置"""
     type: TransitionType = TransitionType.NONE
     options: Optional[TransitionOptions] = None
@@ -106,8 +185,8 @@ class Transition:
         return cls(type=trans_type, options=options)
 
 
-@dataclass
-class LoopConfig:
+@dataclass(slots=True)
+class LoopConfig(_ConfigNode):
     """循环动画配置"""
     file: str = ""
     is_image: bool = False  # True=图片模式，False=视频模式
@@ -126,8 +205,8 @@ class LoopConfig:
         )
 
 
-@dataclass
-class IntroConfig:
+@dataclass(slots=True)
+class IntroConfig(_ConfigNode):
     """入场动画配置"""
     enabled: bool = False
     file: str = ""
@@ -153,8 +232,8 @@ class IntroConfig:
         )
 
 
-@dataclass
-class ArknightsOverlayOptions:
+@dataclass(slots=True)
+class ArknightsOverlayOptions(_ConfigNode):
     """明日方舟叠加UI选项"""
     appear_time: int = 100000  # 微秒
     operator_name: str = "OPERATOR"
@@ -197,8 +276,8 @@ class ArknightsOverlayOptions:
         )
 
 
-@dataclass
-class ImageOverlayOptions:
+@dataclass(slots=True)
+class ImageOverlayOptions(_ConfigNode):
     """图片叠加UI选项"""
     appear_time: int = 100000  # 微秒
     duration: int = 0  # 微秒 (0 表示无限显示)
@@ -222,8 +301,8 @@ class ImageOverlayOptions:
         )
 
 
-@dataclass
-class Overlay:
+@dataclass(slots=True)
+class Overlay(_ConfigNode):
     """叠加UI配置"""
     type: OverlayType = OverlayType.NONE
     arknights_options: Optional[ArknightsOverlayOptions] = None
@@ -257,8 +336,8 @@ class Overlay:
         )
 
 
-@dataclass
-class EPConfig:
+@dataclass(slots=True)
+class EPConfig(_ConfigNode):
     """epconfig.json 完整数据模型"""
     version: int = 1
     uuid: str = field(default_factory=lambda: str(uuid_lib.uuid4()))
@@ -340,22 +419,35 @@ class EPConfig:
         return cls.from_dict(data)
 
     def save_to_file(self, filepath: str):
-        """保存配置到文件"""
+        """
+        保存配置到文件（先写临时文件再替换，中途崩溃不会留下写了一半的配置）
+
+        Raises:
+            RuntimeError: 权限不足
+            OSError: 其他写入错误
+        """
+        tmp_path = filepath + ".tmp"
         try:
             # 确保目录存在
             directory = os.path.dirname(filepath)
             if directory and not os.path.exists(directory):
                 os.makedirs(directory)
 
-            with open(filepath, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
         except PermissionError:
             raise RuntimeError(f"无法保存到 {filepath}，权限不足")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
     def generate_new_uuid(self):
         """生成新的UUID"""
         self.uuid = str(uuid_lib.uuid4())
 
     def copy(self) -> "EPConfig":
-        """创建配置的深拷贝"""
-        return EPConfig.from_dict(self.to_dict())
+        """创建配置的深拷贝（结构拷贝，不经过字典）"""
+        return _ConfigNode.copy(self)
@@ -0,0 +1,286 @@
+"""
+素材导入 - 把用户选择的文件放进项目目录，尽量不复制数据
+
+按以下顺序尝试，前一种成功就不再继续:
+1. 项目目录中已有同一用途（同一 base_name）且内容相同的文件（按大小筛选后比较 SHA-256）:
+   直接使用，不产生新文件。不跨用途复用：icon.png、trans_in_image.png 等会被程序按固定名称改写，
+   其他字段引用它们时会被一起改掉
+2. 写时复制克隆（reflink: Linux btrfs/XFS 的 FICLONE，macOS APFS 的 clonefile）: 瞬间完成，不占额外空间
+3. 硬链接（同一文件系统）: 瞬间完成，不占额外空间
+4. 分块复制到临时文件再改名，支持进度回调和取消（跨文件系统时，大视频在后台线程中复制）
+
+硬链接与源文件共享数据，项目内会改写的文件（如截取的图标）写入前应先调用 detach_asset。
+"""
+import os
+import re
+import sys
+import shutil
+import logging
+from dataclasses import dataclass
+from typing import Optional, Callable
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from utils.file_utils import compute_file_hash, compute_quick_hash
+
+logger = logging.getLogger(__name__)
+
+# 分块复制的块大小
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+# Linux FICLONE ioctl（_IOW(0x94, 9, int)）
+FICLONE = 0x40049409
+
+METHOD_EXISTING = "existing"  # 项目中已有相同内容的文件
+METHOD_REFLINK = "reflink"
+METHOD_HARDLINK = "hardlink"
+METHOD_COPY = "copy"
+
+
+@dataclass
+class ImportResult:
+    """导入结果"""
+    src_path: str
+    dest_path: str
+    method: str
+    bytes_copied: int = 0  # 实际复制的字节数（链接和复用时为 0）
+
+    @property
+    def rel_path(self) -> str:
+        """相对项目目录的路径"""
+        return os.path.basename(self.dest_path)
+
+
+def _matches_base_name(filename: str, base_name: str) -> bool:
+    """文件名是否为 base_name.ext 或 unique_dest_path 生成的 base_name_N.ext"""
+    stem, _ = os.path.splitext(filename)
+    return stem == base_name or re.fullmatch(rf"{re.escape(base_name)}_\d+", stem) is not None
+
+
+def find_duplicate(src_path: str, base_dir: str, base_name: str = "") -> str:
+    """
+    在项目目录中查找与源文件内容相同的文件
+
+    只比较大小相同的文件；先比较快速指纹，一致时再比较完整 SHA-256。
+
+    Args:
+        src_path: 源文件路径
+        base_dir: 项目目录
+        base_name: 只比较以该名称导入的文件（见 import_asset），为空时比较所有文件
+
+    Returns:
+        相同文件的路径，没有时返回空字符串
+    """
+    size = os.path.getsize(src_path)
+    src_quick = src_full = ""
+    with os.scandir(base_dir) as entries:
+        candidates = [
+            entry.path for entry in entries
+            if entry.is_file() and not entry.name.endswith(".part")
+            and (not base_name or _matches_base_name(entry.name, base_name))
+            and entry.stat().st_size == size
+        ]
+    for path in sorted(candidates):
+        try:
+            if os.path.samefile(src_path, path):
+                return path
+            src_quick = src_quick or compute_quick_hash(src_path)
+            if compute_quick_hash(path) != src_quick:
+                continue
+            src_full = src_full or compute_file_hash(src_path)
+            if compute_file_hash(path) == src_full:
+                return path
+        except OSError as e:
+            logger.debug(f"比较文件失败 {path}: {e}")
+    return ""
+
+
+def unique_dest_path(base_dir: str, base_name: str, ext: str) -> str:
+    """base_name.ext，已存在时依次尝试 base_name_1.ext、base_name_2.ext ..."""
+    dest_path = os.path.join(base_dir, f"{base_name}{ext}")
+    counter = 1
+    while os.path.lexists(dest_path):
+        dest_path = os.path.join(base_dir, f"{base_name}_{counter}{ext}")
+        counter += 1
+    return dest_path
+
+
+def _reflink(src_path: str, dest_path: str) -> bool:
+    """写时复制克隆，文件系统不支持时返回 False"""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src_path, "rb") as src, open(dest_path, "xb") as dest:
+                try:
+                    fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+                    return True
+                except OSError:
+                    pass
+        except OSError:
+            return False
+        os.remove(dest_path)
+        return False
+    if sys.platform == "darwin":
+        import ctypes
+        import ctypes.util
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            return libc.clonefile(os.fsencode(src_path), os.fsencode(dest_path), 0) == 0
+        except (OSError, AttributeError):
+            return False
+    return False
+
+
+def link_asset(src_path: str, dest_path: str) -> str:
+    """
+    不复制数据地创建 dest_path（先尝试 reflink，再尝试硬链接）
+
+    Returns:
+        METHOD_REFLINK / METHOD_HARDLINK，都不支持（如跨文件系统）时返回空字符串
+    """
+    if _reflink(src_path, dest_path):
+        return METHOD_REFLINK
+    try:
+        os.link(src_path, dest_path)
+        return METHOD_HARDLINK
+    except (OSError, NotImplementedError):
+        return ""
+
+
+def copy_asset(
+    src_path: str,
+    dest_path: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    chunk_size: int = COPY_CHUNK_SIZE
+) -> int:
+    """
+    分块复制文件（先写 .part 临时文件，完成后改名）
+
+    Args:
+        progress: 进度回调 (已复制字节数, 总字节数)
+        should_cancel: 返回 True 时停止复制并删除临时文件
+
+    Returns:
+        复制的字节数；取消时返回 -1
+
+    Raises:
+        OSError: 读写失败
+    """
+    total = os.path.getsize(src_path)
+    tmp_path = dest_path + ".part"
+    copied = 0
+    try:
+        with open(src_path, "rb") as src, open(tmp_path, "wb") as dest:
+            while True:
+                if should_cancel is not None and should_cancel():
+                    break
+                chunk = src.read(chunk_size)
+                if not chunk:
+                    break
+                dest.write(chunk)
+                copied += len(chunk)
+                if progress is not None:
+                    progress(copied, total)
+        if copied < total:
+            os.remove(tmp_path)
+            return -1
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return copied
+
+
+def detach_asset(path: str):
+    """
+    改写项目内文件前调用: 文件是硬链接时先删除，让写入创建新文件而不是改写用户的源文件
+
+    普通文件和 reflink 克隆（数据已独立）不受影响。
+    """
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def import_asset(
+    src_path: str,
+    base_dir: str,
+    base_name: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    should_cancel: Optional[Callable[[], bool]] = None
+) -> Optional[ImportResult]:
+    """
+    把文件导入项目目录
+
+    Args:
+        src_path: 源文件路径
+        base_dir: 项目目录
+        base_name: 目标文件名（不含扩展名，扩展名沿用源文件）
+        progress: 复制时的进度回调 (已复制字节数, 总字节数)
+        should_cancel: 复制时返回 True 则取消
+
+    Returns:
+        导入结果，取消时返回 None
+
+    Raises:
+        OSError: 读取源文件或写入项目目录失败
+    """
+    # 只复用同一用途的文件，按固定名称改写的文件（如截取的 icon.png）不会影响其他字段
+    existing = find_duplicate(src_path, base_dir, base_name)
+    if existing:
+        return ImportResult(src_path, existing, METHOD_EXISTING)
+
+    _, ext = os.path.splitext(src_path)
+    dest_path = unique_dest_path(base_dir, base_name, ext)
+    method = link_asset(src_path, dest_path)
+    if method:
+        return ImportResult(src_path, dest_path, method)
+
+    copied = copy_asset(src_path, dest_path, progress, should_cancel)
+    if copied < 0:
+        return None
+    return ImportResult(src_path, dest_path, METHOD_COPY, copied)
+
+
+class AssetImportWorker(QThread):
+    """
+    后台导入线程
+
+    复用、reflink、硬链接都在几毫秒内完成；只有跨文件系统复制时才会持续发出进度。
+    """
+
+    progress_updated = pyqtSignal(int, str)   # (百分比, 文件名)
+    import_completed = pyqtSignal(object)     # ImportResult
+    import_failed = pyqtSignal(str)
+
+    def __init__(self, src_path: str, base_dir: str, base_name: str, parent=None):
+        super().__init__(parent)
+        self.src_path = src_path
+        self._base_dir = base_dir
+        self._base_name = base_name
+        self._last_percent = -1
+
+    def _on_progress(self, copied: int, total: int):
+        percent = copied * 100 // total if total else 100
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.progress_updated.emit(percent, os.path.basename(self.src_path))
+
+    def run(self):
+        try:
+            result = import_asset(
+                self.src_path, self._base_dir, self._base_name,
+                progress=self._on_progress,
+                should_cancel=self.isInterruptionRequested
+            )
+            if result is None:
+                return
+            logger.info(f"已导入素材 {result.src_path} -> {result.rel_path} ({result.method})")
+            self.import_completed.emit(result)
+        except OSError as e:
+            logger.warning(f"导入素材失败: {e}")
+            self.import_failed.emit(str(e))
@@ -0,0 +1,353 @@
+"""
+项目素材索引 - 每个项目一个 SQLite 文件（<项目目录>/.assetmaker/assets.sqlite）
+
+记录项目引用的每个文件的大小、修改时间、内容指纹、图片尺寸、媒体探测结果，
+以及由它派生的缓存文件（缩略图、分析索引）。
+
+- AssetIndex 是 FileProbeCache 的子类，可直接传给 EPConfigValidator；
+  探测结果留在内存中，直到 AssetWatcher 报告文件变化，重复校验不再访问磁盘。
+- 哈希、图片尺寸、媒体信息按 (大小, 修改时间) 校验后复用，重新打开项目也不必重新计算。
+- 文件内容变化时，旧的派生缓存文件随之删除。
+
+没有 AssetWatcher 时内存中的探测结果不会过期（与 FileProbeCache 相同），
+长期持有的索引应配合 AssetWatcher 使用。
+"""
+import os
+import json
+import sqlite3
+import threading
+import logging
+from typing import Optional, Callable, Set
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, pyqtSignal
+
+from core.validator import FileProbe, FileProbeCache
+from utils.file_utils import compute_file_hash, compute_quick_hash, get_project_cache_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILENAME = "assets.sqlite"
+# 表结构版本（PRAGMA user_version），不一致时重建
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    quick_hash TEXT,
+    sha256 TEXT,
+    image_w INTEGER,
+    image_h INTEGER,
+    media TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (path, kind)
+);
+"""
+
+
+class AssetIndex(FileProbeCache):
+    """
+    项目素材索引（线程安全）
+
+    index = AssetIndex(base_dir)
+    validator = EPConfigValidator(base_dir, probe_cache=index)
+    digest = index.file_hash(path)
+    """
+
+    def __init__(self, base_dir: str, db_path: Optional[str] = None):
+        """
+        Args:
+            base_dir: 项目目录（目录内的文件按相对路径记录，移动项目后索引仍有效）
+            db_path: 索引文件路径，None 时为 <项目目录>/.assetmaker/assets.sqlite
+        """
+        super().__init__()
+        self.base_dir = os.path.abspath(base_dir) if base_dir else ""
+        self._db_lock = threading.Lock()
+        self._recorded: Set[str] = set()
+        # 首次探测某个路径时调用（AssetWatcher 用它开始监视该文件）
+        self.record_added: Optional[Callable[[str], None]] = None
+        self._conn = self._connect(db_path or os.path.join(get_project_cache_dir(base_dir), INDEX_FILENAME))
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        if conn.execute("PRAGMA user_version").fetchone()[0] not in (0, SCHEMA_VERSION):
+            conn.executescript("DROP TABLE IF EXISTS assets; DROP TABLE IF EXISTS artifacts;")
+        conn.executescript(_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.commit()
+        return conn
+
+    @classmethod
+    def _connect(cls, db_path: str) -> sqlite3.Connection:
+        """打开索引文件；文件损坏时重建，仍失败则使用内存数据库（本次会话有效）"""
+        try:
+            return cls._open(db_path)
+        except sqlite3.Error as e:
+            logger.warning(f"素材索引损坏，重建: {e}")
+        try:
+            os.remove(db_path)
+            return cls._open(db_path)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"无法创建素材索引 {db_path}: {e}")
+        return cls._open(":memory:")
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
+
+    def _key(self, abs_path: str) -> str:
+        """数据库中的路径键：项目内为相对路径，项目外为绝对路径"""
+        path = os.path.normcase(os.path.abspath(abs_path))
+        if self.base_dir:
+            base = os.path.normcase(self.base_dir)
+            if path.startswith(base + os.sep):
+                return os.path.relpath(path, base)
+        return path
+
+    # ------------------------------------------------------------------
+    # 探测（FileProbeCache 接口）
+    # ------------------------------------------------------------------
+
+    def _do_probe(self, abs_path: str, as_image: bool) -> FileProbe:
+        """内存未命中时探测；图片尺寸在文件未变化时从索引读取，不重新解码"""
+        path = os.path.normcase(os.path.abspath(abs_path))
+        with self._lock:
+            is_new = path not in self._recorded
+            self._recorded.add(path)
+        if is_new and self.record_added is not None:
+            self.record_added(path)
+
+        if not as_image:
+            return FileProbeCache._do_probe(abs_path, as_image)
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return FileProbe(exists=False, readable=False)
+        row = self._select(abs_path, "image_w, image_h", st.st_size, st.st_mtime_ns)
+        if row is not None and row[0] is not None:
+            return FileProbe(
+                exists=True, readable=os.access(abs_path, os.R_OK),
+                size=st.st_size, mtime_ns=st.st_mtime_ns, image_size=(row[0], row[1])
+            )
+        probe = FileProbeCache._do_probe(abs_path, as_image)
+        if probe.image_size is not None:
+            self._update(abs_path, probe, image_w=probe.image_size[0], image_h=probe.image_size[1])
+        return probe
+
+    def invalidate(self, path: str):
+        """丢弃文件的内存探测结果（下次访问时重新 stat）"""
+        path = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            for as_image in (False, True):
+                self._probes.pop((path, as_image), None)
+
+    def invalidate_dir(self, dir_path: str):
+        """丢弃目录下所有文件的内存探测结果（文件新增、删除、改名时）"""
+        dir_path = os.path.normcase(os.path.abspath(dir_path))
+        with self._lock:
+            for key in [k for k in self._probes if os.path.dirname(k[0]) == dir_path]:
+                del self._probes[key]
+
+    def recorded_paths(self) -> Set[str]:
+        """探测过的所有路径"""
+        with self._lock:
+            return set(self._recorded)
+
+    # ------------------------------------------------------------------
+    # 持久化字段
+    # ------------------------------------------------------------------
+
+    def _select(self, abs_path: str, columns: str, size: int, mtime_ns: int) -> Optional[tuple]:
+        """读取一行；大小或修改时间不一致（文件已变化）时返回 None"""
+        with self._db_lock:
+            row = self._conn.execute(
+                f"SELECT size, mtime_ns, {columns} FROM assets WHERE path = ?", (self._key(abs_path),)
+            ).fetchone()
+        if row is None or row[0] != size or row[1] != mtime_ns:
+            return None
+        return row[2:]
+
+    def _update(self, abs_path: str, probe: FileProbe, **columns):
+        """
+        写入字段
+
+        记录的大小或修改时间与 probe 不一致时，先清空旧字段并删除旧的派生缓存文件。
+        """
+        key = self._key(abs_path)
+        stale_files = []
+        with self._db_lock:
+            row = self._conn.execute("SELECT size, mtime_ns FROM assets WHERE path = ?", (key,)).fetchone()
+            if row is None or row != (probe.size, probe.mtime_ns):
+                stale_files = [r[0] for r in self._conn.execute(
+                    "SELECT value FROM artifacts WHERE path = ?", (key,)
+                )]
+                self._conn.execute("DELETE FROM artifacts WHERE path = ?", (key,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO assets (path, size, mtime_ns) VALUES (?, ?, ?)",
+                    (key, probe.size, probe.mtime_ns)
+                )
+            if columns:
+                assignments = ", ".join(f"{name} = ?" for name in columns)
+                self._conn.execute(
+                    f"UPDATE assets SET {assignments} WHERE path = ?", (*columns.values(), key)
+                )
+            self._conn.commit()
+        for path in stale_files:
+            try:
+                os.remove(path)
+                logger.debug(f"已删除过期的派生缓存: {path}")
+            except OSError:
+                pass
+
+    def _current(self, abs_path: str) -> FileProbe:
+        """
+        当前探测结果（监视中的文件不访问磁盘）
+
+        Raises:
+            FileNotFoundError: 文件不存在
+        """
+        probe = self.probe(abs_path)
+        if not probe.exists:
+            raise FileNotFoundError(abs_path)
+        return probe
+
+    def _cached_column(self, abs_path: str, column: str, compute: Callable[[str], str]) -> str:
+        probe = self._current(abs_path)
+        row = self._select(abs_path, column, probe.size, probe.mtime_ns)
+        if row is not None and row[0]:
+            return row[0]
+        value = compute(abs_path)
+        self._update(abs_path, probe, **{column: value})
+        return value
+
+    def quick_hash(self, abs_path: str) -> str:
+        """
+        快速指纹（见 utils.file_utils.compute_quick_hash）
+
+        Raises:
+            OSError: 文件不存在或无法读取
+        """
+        return self._cached_column(abs_path, "quick_hash", compute_quick_hash)
+
+    def file_hash(self, abs_path: str) -> str:
+        """
+        完整内容 SHA-256
+
+        Raises:
+            OSError: 文件不存在或无法读取
+        """
+        return self._cached_column(abs_path, "sha256", compute_file_hash)
+
+    def media_info(self, abs_path: str) -> Optional[dict]:
+        """媒体探测结果（文件变化后返回 None）"""
+        try:
+            probe = self._current(abs_path)
+        except OSError:
+            return None
+        row = self._select(abs_path, "media", probe.size, probe.mtime_ns)
+        if row is None or not row[0]:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def set_media_info(self, abs_path: str, info: dict):
+        try:
+            probe = self._current(abs_path)
+        except OSError:
+            return
+        self._update(abs_path, probe, media=json.dumps(info))
+
+    def artifact(self, abs_path: str, kind: str) -> str:
+        """
+        派生缓存文件路径（源文件变化后返回空字符串）
+
+        Args:
+            kind: 缓存类型，如 "thumbs"、"analysis"
+        """
+        try:
+            probe = self._current(abs_path)
+        except OSError:
+            return ""
+        if self._select(abs_path, "path", probe.size, probe.mtime_ns) is None:
+            return ""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value FROM artifacts WHERE path = ? AND kind = ?", (self._key(abs_path), kind)
+            ).fetchone()
+        return row[0] if row else ""
+
+    def set_artifact(self, abs_path: str, kind: str, value: str):
+        """记录派生缓存文件（源文件内容变化时会被删除）"""
+        try:
+            probe = self._current(abs_path)
+        except OSError:
+            return
+        self._update(abs_path, probe)
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, kind, value) VALUES (?, ?, ?)",
+                (self._key(abs_path), kind, value)
+            )
+            self._conn.commit()
+
+
+class AssetWatcher(QObject):
+    """
+    监视索引中的文件，变化时使内存探测结果失效
+
+    监视每个探测过的文件（内容修改）及其所在目录（新增、删除、改名），
+    包括项目目录外的素材（如用原路径引用的视频）。
+    """
+
+    assets_changed = pyqtSignal(str)  # 变化的文件或目录
+    _path_recorded = pyqtSignal(str)  # 跨线程转发 AssetIndex.record_added
+
+    def __init__(self, index: AssetIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._path_recorded.connect(self._watch)
+        index.record_added = self._path_recorded.emit
+        if index.base_dir and os.path.isdir(index.base_dir):
+            self._watcher.addPath(index.base_dir)
+        for path in index.recorded_paths():
+            self._watch(path)
+
+    def stop(self):
+        """停止监视"""
+        self.index.record_added = None
+        watched = self._watcher.files() + self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+
+    def _watch(self, path: str):
+        dir_path = os.path.dirname(path)
+        if os.path.isdir(dir_path) and dir_path not in self._watcher.directories():
+            self._watcher.addPath(dir_path)
+        if os.path.isfile(path) and path not in self._watcher.files():
+            self._watcher.addPath(path)
+
+    def _on_file_changed(self, path: str):
+        self.index.invalidate(path)
+        # 保存时先删除再写入的编辑器会让监视失效，文件仍存在时重新添加
+        self._watch(path)
+        self.assets_changed.emit(path)
+
+    def _on_directory_changed(self, dir_path: str):
+        self.index.invalidate_dir(dir_path)
+        # 之前不存在的文件可能刚被创建
+        for path in self.index.recorded_paths():
+            if os.path.dirname(path) == os.path.normcase(dir_path):
+                self._watch(path)
+        self.assets_changed.emit(dir_path)
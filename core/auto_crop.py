@@ -0,0 +1,265 @@
+"""
+智能跟随裁切 - 按画面显著区域为每一帧计算裁切框
+
+横屏素材裁成竖屏时，固定裁切框容易丢掉移动中的主体。流程:
+1. 低分辨率解码（长视频按步长采样），每个采样帧计算显著图:
+   频谱残差显著性（Spectral Residual）+ 与上一采样帧的差异（运动）。
+2. 在显著图上用积分图求裁切窗口（尺寸不变）内显著性总和最大的位置。
+3. 采样点插值到每一帧，按场景切换分段做高斯平滑，并限制平移速度，得到平稳的镜头路径。
+
+结果为 (N, 4) int32 数组，第 i 行是源视频第 i 帧的 (x, y, w, h)，原始视频坐标系。
+"""
+import logging
+from typing import Optional, Tuple, Callable, Sequence
+
+import numpy as np
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+    logger.warning("OpenCV 未安装，自动裁切不可用")
+
+# 显著性计算使用的图像宽度（频谱残差法在 64 像素左右效果最好）
+SALIENCY_WIDTH = 64
+# 最多采样帧数
+MAX_SAMPLES = 1500
+# 运动显著性的权重（其余为频谱残差）
+MOTION_WEIGHT = 0.5
+# 路径平滑的高斯 sigma（秒）
+SMOOTH_SECONDS = 0.4
+# 最大平移速度（每秒移动画面宽/高的比例）
+MAX_PAN_PER_SECOND = 0.5
+
+
+def spectral_residual_saliency(gray: np.ndarray) -> np.ndarray:
+    """
+    频谱残差显著图
+
+    Args:
+        gray: 灰度图 (float32)
+
+    Returns:
+        与输入同尺寸的显著图，归一化到 0~1
+    """
+    spectrum = np.fft.fft2(gray)
+    log_amplitude = np.log(np.abs(spectrum) + 1e-6).astype(np.float32)
+    phase = np.angle(spectrum)
+    residual = log_amplitude - cv2.blur(log_amplitude, (3, 3))
+    saliency = np.abs(np.fft.ifft2(np.exp(residual + 1j * phase))) ** 2
+    saliency = cv2.GaussianBlur(saliency.astype(np.float32), (0, 0), 2.0)
+    peak = float(saliency.max())
+    return saliency / peak if peak > 0 else saliency
+
+
+def best_window(saliency: np.ndarray, win_w: int, win_h: int) -> Tuple[float, float]:
+    """
+    显著性总和最大的窗口中心（积分图，一次求出所有位置的窗口和）
+
+    Args:
+        saliency: 显著图
+        win_w, win_h: 窗口尺寸（显著图坐标）
+
+    Returns:
+        窗口中心 (cx, cy)，显著图坐标
+    """
+    h, w = saliency.shape
+    win_w = max(1, min(win_w, w))
+    win_h = max(1, min(win_h, h))
+
+    integral = cv2.integral(saliency.astype(np.float32))
+    sums = (
+        integral[win_h:, win_w:] - integral[:-win_h, win_w:]
+        - integral[win_h:, :-win_w] + integral[:-win_h, :-win_w]
+    )
+    y, x = np.unravel_index(int(np.argmax(sums)), sums.shape)
+    return x + win_w / 2.0, y + win_h / 2.0
+
+
+def _gaussian_smooth(values: np.ndarray, sigma: float) -> np.ndarray:
+    """一维高斯平滑（边缘值填充）"""
+    if sigma <= 0 or len(values) < 3:
+        return values.astype(np.float64)
+    radius = int(3 * sigma)
+    radius = min(radius, len(values) - 1)
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    padded = np.pad(values.astype(np.float64), radius, mode='edge')
+    return np.convolve(padded, kernel, mode='valid')
+
+
+def _limit_speed(values: np.ndarray, max_step: float) -> np.ndarray:
+    """限制相邻帧的最大变化量（前向、后向各一遍，避免整体偏移）"""
+    result = values.astype(np.float64).copy()
+    for i in range(1, len(result)):
+        result[i] = np.clip(result[i], result[i - 1] - max_step, result[i - 1] + max_step)
+    for i in range(len(result) - 2, -1, -1):
+        result[i] = np.clip(result[i], result[i + 1] - max_step, result[i + 1] + max_step)
+    return result
+
+
+def smooth_path(
+    centers: np.ndarray,
+    fps: float,
+    max_step: float,
+    cuts: Optional[Sequence[int]] = None
+) -> np.ndarray:
+    """
+    平滑中心点路径，场景切换处分段（切换时镜头直接跳转，不做平滑过渡）
+
+    Args:
+        centers: 每帧中心坐标 (N,)
+        fps: 帧率
+        max_step: 每帧最大移动量
+        cuts: 场景切换帧号
+    """
+    bounds = [0] + [int(c) for c in (cuts or []) if 0 < c < len(centers)] + [len(centers)]
+    sigma = SMOOTH_SECONDS * fps
+    result = np.empty(len(centers), dtype=np.float64)
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        segment = _gaussian_smooth(centers[start:end], sigma)
+        result[start:end] = _limit_speed(segment, max_step)
+    return result
+
+
+def compute_crop_path(
+    video_path: str,
+    crop_size: Tuple[int, int],
+    cuts: Optional[Sequence[int]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Optional[np.ndarray]:
+    """
+    计算跟随裁切路径
+
+    Args:
+        video_path: 视频路径
+        crop_size: 裁切框尺寸 (w, h)，原始视频坐标
+        cuts: 场景切换帧号（如 VideoAnalysis.cuts），None 表示不分段
+        should_stop: 返回 True 时停止
+        progress: 进度回调 (已处理帧数, 总帧数)
+
+    Returns:
+        (N, 4) int32 数组，每帧 (x, y, w, h)；失败或中断返回 None
+    """
+    if not HAS_CV2:
+        return None
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.warning(f"无法打开视频: {video_path}")
+        return None
+
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if total <= 0 or width <= 0 or height <= 0:
+            return None
+
+        crop_w = min(int(crop_size[0]), width)
+        crop_h = min(int(crop_size[1]), height)
+        scale = SALIENCY_WIDTH / width
+        small_size = (SALIENCY_WIDTH, max(1, round(height * scale)))
+        win_w, win_h = max(1, round(crop_w * scale)), max(1, round(crop_h * scale))
+        stride = max(1, -(-total // MAX_SAMPLES))
+
+        sample_frames, sample_x, sample_y = [], [], []
+        prev_gray: Optional[np.ndarray] = None
+        frame_idx = 0
+        while True:
+            if should_stop and should_stop():
+                return None
+            if frame_idx % stride:
+                if not cap.grab():
+                    break
+                frame_idx += 1
+                continue
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+
+            gray = cv2.cvtColor(
+                cv2.resize(frame, small_size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY
+            ).astype(np.float32)
+            saliency = spectral_residual_saliency(gray)
+            if prev_gray is not None:
+                motion = cv2.GaussianBlur(cv2.absdiff(gray, prev_gray), (0, 0), 2.0)
+                peak = float(motion.max())
+                if peak > 1.0:
+                    saliency = (1 - MOTION_WEIGHT) * saliency + MOTION_WEIGHT * motion / peak
+            prev_gray = gray
+
+            cx, cy = best_window(saliency, win_w, win_h)
+            sample_frames.append(frame_idx)
+            sample_x.append(cx / scale)
+            sample_y.append(cy / scale)
+
+            if progress and len(sample_frames) % 20 == 0:
+                progress(frame_idx, total)
+            frame_idx += 1
+
+        if not sample_frames:
+            return None
+
+        # frame_idx 为实际读到的帧数（可能少于 CAP_PROP_FRAME_COUNT）
+        frames = np.arange(frame_idx)
+        centers_x = np.interp(frames, sample_frames, sample_x)
+        centers_y = np.interp(frames, sample_frames, sample_y)
+
+        max_step_x = width * MAX_PAN_PER_SECOND / fps
+        max_step_y = height * MAX_PAN_PER_SECOND / fps
+        centers_x = smooth_path(centers_x, fps, max_step_x, cuts)
+        centers_y = smooth_path(centers_y, fps, max_step_y, cuts)
+
+        path = np.empty((frame_idx, 4), dtype=np.int32)
+        path[:, 0] = np.clip(np.round(centers_x - crop_w / 2), 0, width - crop_w)
+        path[:, 1] = np.clip(np.round(centers_y - crop_h / 2), 0, height - crop_h)
+        path[:, 2] = crop_w
+        path[:, 3] = crop_h
+        return path
+    finally:
+        cap.release()
+
+
+class AutoCropWorker(QThread):
+    """后台自动裁切线程"""
+
+    progress_updated = pyqtSignal(int, int)   # (已处理帧数, 总帧数)
+    path_ready = pyqtSignal(str, object)      # (视频路径, np.ndarray 裁切路径)
+    crop_failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        video_path: str,
+        crop_size: Tuple[int, int],
+        cuts: Optional[Sequence[int]] = None,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.video_path = video_path
+        self._crop_size = crop_size
+        self._cuts = cuts
+
+    def run(self):
+        try:
+            path = compute_crop_path(
+                self.video_path, self._crop_size, self._cuts,
+                should_stop=self.isInterruptionRequested,
+                progress=self.progress_updated.emit
+            )
+            if self.isInterruptionRequested():
+                return
+            if path is None:
+                self.crop_failed.emit("无法分析视频")
+                return
+            self.path_ready.emit(self.video_path, path)
+        except Exception as e:
+            logger.exception("自动裁切失败")
+            self.crop_failed.emit(str(e))
@@ -0,0 +1,367 @@
+"""
+自动保存与崩溃恢复 - 只追加的配置修改日志
+
+每个项目一个日志文件（<项目目录>/.assetmaker/<项目文件名>.journal），每行一条 JSON:
+    {"op": "base", "config": {...}}                      # 日志开头：完整配置
+    {"op": "delta", "seq": 1, "changes": {"name": "A"}}  # 之后每次修改只追加变化的字段
+
+- 界面线程只把变化字段编码后放进队列，写入、fsync、压缩都在后台线程中完成
+- 待压缩的修改超过 COMPACT_DELTAS 条或最早一条超过 COMPACT_INTERVAL 秒时，
+  后台线程把当前配置原子替换写入 epconfig.json，并把日志重写为只有一条 base
+  （新项目在用户第一次保存之前只压缩日志，不自动创建或覆盖 epconfig.json）
+- 程序崩溃后日志仍在：recover() 回放日志，结果与 epconfig.json 不同时即为未保存的修改
+
+日志中的值按结构编码（枚举、嵌套的配置对象），回放结果与崩溃前内存中的配置完全一致，
+不经过会省略部分字段的 to_dict()。
+"""
+import os
+import json
+import time
+import queue
+import threading
+import logging
+from enum import Enum
+from dataclasses import is_dataclass
+from typing import Any, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from config.epconfig import (
+    EPConfig, ScreenType, TransitionType, OverlayType, TransitionOptions, Transition,
+    LoopConfig, IntroConfig, ArknightsOverlayOptions, ImageOverlayOptions, Overlay, get_field, set_field
+)
+from utils.file_utils import get_project_cache_dir
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".journal"
+# 待压缩的修改条数上限
+COMPACT_DELTAS = 200
+# 最早一条待压缩修改的最长等待时间（秒）
+COMPACT_INTERVAL = 30.0
+# 关闭时等待后台线程写完的时间（秒）
+CLOSE_TIMEOUT = 5.0
+
+# 日志中可出现的枚举和配置类型
+_TYPES = {cls.__name__: cls for cls in (
+    ScreenType, TransitionType, OverlayType, TransitionOptions, Transition, LoopConfig,
+    IntroConfig, ArknightsOverlayOptions, ImageOverlayOptions, Overlay, EPConfig
+)}
+
+
+def journal_path(project_path: str) -> str:
+    """项目文件对应的日志路径"""
+    base_dir = os.path.dirname(os.path.abspath(project_path))
+    return os.path.join(get_project_cache_dir(base_dir), os.path.basename(project_path) + JOURNAL_SUFFIX)
+
+
+def encode_value(value: Any) -> Any:
+    """把配置字段的值编码为可 JSON 序列化的结构"""
+    if is_dataclass(value):
+        return {"$node": type(value).__name__, "fields": {
+            name: encode_value(getattr(value, name)) for name in type(value).__slots__
+        }}
+    if isinstance(value, Enum):
+        return {"$enum": type(value).__name__, "value": value.value}
+    return value
+
+
+def decode_value(data: Any) -> Any:
+    """
+    encode_value 的逆操作
+
+    Raises:
+        ValueError: 未知的类型或枚举值
+    """
+    if isinstance(data, dict):
+        if "$enum" in data:
+            return _type(data["$enum"])(data["value"])
+        if "$node" in data:
+            fields = {name: decode_value(value) for name, value in data["fields"].items()}
+            try:
+                return _type(data["$node"])(**fields)
+            except TypeError as e:
+                raise ValueError(f"日志中的 {data['$node']} 字段不匹配: {e}")
+    return data
+
+
+def _type(name: str):
+    try:
+        return _TYPES[name]
+    except KeyError:
+        raise ValueError(f"日志中有未知的类型: {name}")
+
+
+def read_journal(path: str) -> Tuple[Optional[EPConfig], int]:
+    """
+    回放日志
+
+    崩溃时最后一行可能只写了一半，遇到无法解析的行时停止回放（之前的修改仍然有效）。
+
+    Returns:
+        (回放后的配置, 回放的修改条数)；日志不存在或开头的 base 无法读取时配置为 None
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None, 0
+
+    config: Optional[EPConfig] = None
+    applied = 0
+    for number, line in enumerate(lines, 1):
+        try:
+            record = json.loads(line)
+            if config is None:
+                if record.get("op") != "base":
+                    break
+                config = decode_value(record["config"])
+                if not isinstance(config, EPConfig):
+                    config = None
+                    break
+                continue
+            if record.get("op") == "delta":
+                for field_path, value in record["changes"].items():
+                    set_field(config, field_path, decode_value(value))
+                applied += 1
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"日志第 {number} 行无法回放，已忽略之后的内容: {e}")
+            break
+    return config, applied
+
+
+def recover(project_path: str, saved: Optional[EPConfig] = None) -> Optional[EPConfig]:
+    """
+    检查项目是否有崩溃前未保存的修改
+
+    Args:
+        project_path: 项目文件路径
+        saved: 已从项目文件读取的配置（None 时表示项目文件不存在）
+
+    Returns:
+        回放日志得到的配置；没有日志或内容与项目文件相同时返回 None
+    """
+    config, _ = read_journal(journal_path(project_path))
+    if config is None:
+        return None
+    if saved is not None and config.to_dict() == saved.to_dict():
+        return None
+    return config
+
+
+def discard_journal(project_path: str):
+    """删除项目的日志（放弃未保存的修改）"""
+    try:
+        os.remove(journal_path(project_path))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"无法删除自动保存日志: {e}")
+
+
+class AutosaveJournal(QObject):
+    """
+    项目的自动保存日志
+
+    journal = AutosaveJournal(project_path, config)
+    journal.saved.connect(...)
+    journal.record(config, changes)   # 每次修改后（只追加变化的字段）
+    journal.save(config)              # 立即保存（不等待写入完成）
+    journal.close()
+    """
+
+    saved = pyqtSignal(str)         # 已写入项目文件（路径）
+    save_failed = pyqtSignal(str)   # 写入失败（错误信息）
+
+    def __init__(
+        self,
+        project_path: str,
+        config: EPConfig,
+        parent=None,
+        compact_deltas: int = COMPACT_DELTAS,
+        compact_interval: float = COMPACT_INTERVAL,
+        write_project: bool = True
+    ):
+        """
+        Args:
+            project_path: 项目文件路径（压缩时写入该文件）
+            config: 当前配置（作为日志开头的 base，会被拷贝）
+            compact_deltas: 待压缩的修改条数上限
+            compact_interval: 最早一条待压缩修改的最长等待时间（秒）
+            write_project: False 时自动压缩只重写日志，不写入项目文件，
+                           直到 save() 第一次成功（新项目在用户保存前不创建/覆盖项目文件）
+        """
+        super().__init__(parent)
+        self.project_path = project_path
+        self.path = journal_path(project_path)
+        self.compact_deltas = compact_deltas
+        self.compact_interval = compact_interval
+        self.write_project = write_project
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._seq = 0          # 已记录的修改条数（界面线程）
+        self._saved_seq = 0    # 已写入项目文件的修改条数（后台线程更新）
+        self.last_error = ""   # 最近一次写入项目文件失败的原因，成功后清空
+        self._closed = False
+        self._queue.put(("base", config.copy()))
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> bool:
+        """是否有尚未写入项目文件的修改"""
+        return self._saved_seq < self._seq
+
+    def record(self, config: EPConfig, changes: List[str]):
+        """
+        记录一次修改（只编码变化的字段，写入在后台线程中进行）
+
+        Args:
+            config: 修改后的配置
+            changes: diff() 返回的变化路径
+        """
+        if self._closed or not changes:
+            return
+        self._seq += 1
+        encoded = {path: encode_value(get_field(config, path)) for path in changes}
+        self._queue.put(("delta", self._seq, encoded))
+
+    def save(self, config: EPConfig):
+        """立即把配置写入项目文件（在后台线程中进行，完成后发出 saved 或 save_failed）"""
+        if not self._closed:
+            self._queue.put(("save", self._seq, config.copy()))
+
+    def flush(self, timeout: float = CLOSE_TIMEOUT) -> bool:
+        """等待队列中的写入完成，超时返回 False"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def close(self, discard: bool = False):
+        """
+        停止后台线程
+
+        Args:
+            discard: True 时删除日志（放弃尚未写入项目文件的修改）；
+                     否则只在所有修改都已写入项目文件时删除日志，有剩余修改时保留以便恢复
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(("stop",))
+        self._thread.join(CLOSE_TIMEOUT)
+        if discard or not self.pending:
+            discard_journal(self.project_path)
+
+    # ------------------------------------------------------------------
+    # 后台线程
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        state: Optional[EPConfig] = None
+        journal = None
+        first_pending = 0.0   # 最早一条待压缩修改的时间
+        pending = 0           # 待压缩的修改条数
+        seq = 0               # 已写入日志的修改序号
+
+        def rewrite(base: EPConfig):
+            """把日志重写为只有一条 base（原子替换）"""
+            nonlocal journal
+            if journal is not None:
+                journal.close()
+                journal = None
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps({"op": "base", "config": encode_value(base)}, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            journal = open(self.path, "a", encoding="utf-8")
+
+        def compact(upto: int, to_project: bool):
+            """把当前状态写入项目文件（to_project 为 False 时不写入），日志重写为新的 base"""
+            nonlocal pending, first_pending
+            try:
+                if to_project:
+                    state.save_to_file(self.project_path)
+                rewrite(state)
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"自动保存失败: {e}")
+                # 下一次尝试至少等待一个间隔
+                first_pending = time.monotonic()
+                self.last_error = str(e)
+                self.save_failed.emit(str(e))
+                return
+            pending = 0
+            if not to_project:
+                # 只压缩了日志，修改仍未写入项目文件
+                return
+            self.write_project = True
+            self._saved_seq = upto
+            self.last_error = ""
+            logger.debug(f"已自动保存 {self.project_path}")
+            self.saved.emit(self.project_path)
+
+        stopping = False
+        while not stopping:
+            timeout = None
+            if pending:
+                timeout = max(0.0, first_pending + self.compact_interval - time.monotonic())
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            # 一次取出所有排队的操作，合并为一次写入和 fsync
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            events = []
+            save_requested = False
+            for op in batch:
+                kind = op[0]
+                if kind == "base":
+                    state = op[1]
+                    try:
+                        rewrite(state)
+                    except OSError as e:
+                        logger.warning(f"无法创建自动保存日志 {self.path}: {e}")
+                elif kind == "delta":
+                    _, seq, changes = op
+                    for field_path, value in changes.items():
+                        set_field(state, field_path, decode_value(value))
+                    lines.append(json.dumps({"op": "delta", "seq": seq, "changes": changes}, ensure_ascii=False))
+                    if not pending:
+                        first_pending = time.monotonic()
+                    pending += 1
+                elif kind == "save":
+                    # 以界面线程的配置为准（与回放结果应一致）
+                    _, seq, state = op
+                    save_requested = True
+                elif kind == "flush":
+                    events.append(op[1])
+                elif kind == "stop":
+                    stopping = True
+
+            if lines and journal is not None:
+                try:
+                    journal.write("\n".join(lines) + "\n")
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                except OSError as e:
+                    logger.warning(f"写入自动保存日志失败: {e}")
+
+            if state is not None and (
+                save_requested or pending >= self.compact_deltas
+                or (pending and time.monotonic() - first_pending >= self.compact_interval)
+            ):
+                compact(seq, save_requested or self.write_project)
+            for event in events:
+                event.set()
+
+        if journal is not None:
+            journal.close()
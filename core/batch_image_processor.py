@@ -0,0 +1,313 @@
+"""
+批量图片处理 - 在线程池中并行解码、缩放和编码图片素材
+
+导出时的 Logo、ImageOverlay 和 arknights 自定义图片（职业图标、Logo）互不依赖，
+OpenCV 的解码、缩放、编码都会释放 GIL，线程池即可并行。
+
+结果按源文件内容哈希去重：同一张图片（如多个干员共用的职业图标）只解码一次，
+相同的 (图片, 目标) 只处理一次；处理结果在处理器实例中缓存，再次导出时直接复用。
+已按目标处理好的图片（如项目模板中预处理的职业图标，见 core.templates）直接链接到输出路径，不解码也不编码。
+"""
+import os
+import shutil
+import threading
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Tuple, Callable, TYPE_CHECKING
+
+import numpy as np
+
+from core.asset_importer import detach_asset, link_asset
+from core.encoders import select_still_encoder
+from core.image_processor import ImageProcessor
+from core.still_encoder import EncodeStats, FINAL_PNG
+from utils.file_utils import compute_file_hash
+
+if TYPE_CHECKING:
+    from core.asset_index import AssetIndex
+
+logger = logging.getLogger(__name__)
+
+# 默认线程数（图片数量通常很少，线程过多没有收益）
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+# 实例中缓存的处理结果数量
+RESULT_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class ImageTarget:
+    """
+    图片处理目标
+
+    kind:
+        logo    - process_for_logo（256x256 BGRA，旋转 180 度）
+        overlay - process_for_overlay（按 resolution）
+        resize  - 缩放到 width x height
+    """
+    kind: str
+    width: int = 0
+    height: int = 0
+    resolution: str = ""
+    keep_aspect: bool = False
+
+    @classmethod
+    def logo(cls) -> "ImageTarget":
+        return cls("logo")
+
+    @classmethod
+    def overlay(cls, resolution: str) -> "ImageTarget":
+        return cls("overlay", resolution=resolution)
+
+    @classmethod
+    def resize(cls, width: int, height: int, keep_aspect: bool = False) -> "ImageTarget":
+        return cls("resize", width, height, keep_aspect=keep_aspect)
+
+    def apply(self, img: np.ndarray) -> np.ndarray:
+        """
+        处理图片
+
+        Raises:
+            ValueError: 未知的 kind
+        """
+        if self.kind == "logo":
+            return ImageProcessor.process_for_logo(img)
+        if self.kind == "overlay":
+            return ImageProcessor.process_for_overlay(img, self.resolution)
+        if self.kind == "resize":
+            return ImageProcessor.resize_image(img, self.width, self.height, keep_aspect=self.keep_aspect)
+        raise ValueError(f"未知的图片处理目标: {self.kind}")
+
+
+@dataclass
+class ImageJob:
+    """一个图片处理任务"""
+    source: str
+    target: ImageTarget
+    output_path: str = ""  # 非空时把结果编码为 PNG 写入该路径
+
+
+@dataclass
+class ImageResult:
+    """图片处理结果"""
+    job: ImageJob
+    image: Optional[np.ndarray] = None  # 只读，多个任务可能共享同一数组
+    error: str = ""
+    cached: bool = False                # 结果来自缓存或同批次的其他任务
+    encode_stats: Optional[EncodeStats] = None  # 写入 output_path 时的编码统计
+    prerendered: bool = False           # 源图片已是处理好的结果，直接链接到 output_path（image 为 None）
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class BatchImageProcessor:
+    """
+    批量图片处理器
+
+    processor = BatchImageProcessor()
+    results = processor.run([ImageJob(path, ImageTarget.logo()), ...])
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        cache_size: int = RESULT_CACHE_SIZE,
+        asset_index: Optional["AssetIndex"] = None,
+        prerendered: Optional[Callable[[str, ImageTarget], bool]] = None
+    ):
+        """
+        Args:
+            max_workers: 线程池大小
+            cache_size: 缓存的处理结果数量（0 表示不缓存）
+            asset_index: 项目素材索引，提供时源文件哈希从索引读取（文件未变化时不重新读取）
+            prerendered: (源文件内容哈希, 目标) -> 源文件是否已是该目标的处理结果；
+                         是时有 output_path 的任务直接链接源文件
+        """
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.asset_index = asset_index
+        self.prerendered = prerendered
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, ImageTarget], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.decode_count = 0
+
+    def _cache_get(self, key: Tuple[str, ImageTarget]) -> Optional[np.ndarray]:
+        with self._lock:
+            image = self._cache.get(key)
+            if image is not None:
+                self._cache.move_to_end(key)
+            return image
+
+    def _cache_put(self, key: Tuple[str, ImageTarget], image: np.ndarray):
+        if self._cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[key] = image
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _process_source(
+        self,
+        digest: str,
+        source: str,
+        jobs: List[ImageJob]
+    ) -> Dict[ImageTarget, Tuple[Optional[np.ndarray], str, bool]]:
+        """
+        处理同一源图片的所有任务（最多解码一次）
+
+        Returns:
+            目标 -> (图片, 错误信息, 是否来自缓存)
+        """
+        outcomes: Dict[ImageTarget, Tuple[Optional[np.ndarray], str, bool]] = {}
+        decoded: Optional[np.ndarray] = None
+        for target in dict.fromkeys(job.target for job in jobs):
+            image = self._cache_get((digest, target))
+            if image is not None:
+                outcomes[target] = (image, "", True)
+                continue
+            try:
+                if decoded is None:
+                    decoded = ImageProcessor.load_image(source)
+                    with self._lock:
+                        self.decode_count += 1
+                    if decoded is None:
+                        raise ValueError(f"无法加载图片: {source}")
+                image = target.apply(decoded)
+                image.flags.writeable = False
+                self._cache_put((digest, target), image)
+                outcomes[target] = (image, "", False)
+            except (ValueError, ImportError, OSError) as e:
+                outcomes[target] = (None, str(e), False)
+        return outcomes
+
+    @staticmethod
+    def _link_output(source: str, path: str):
+        """
+        把已处理好的源图片放到输出路径（reflink/硬链接，不支持时复制）
+
+        Raises:
+            OSError: 写入失败
+        """
+        if os.path.lexists(path):
+            if os.path.exists(path) and os.path.samefile(source, path):
+                return
+            os.remove(path)
+        if not link_asset(source, path):
+            shutil.copyfile(source, path)
+
+    @staticmethod
+    def _write_outputs(image: np.ndarray, paths: List[str]) -> EncodeStats:
+        """编码一次（按最终导出图片压缩），写入所有输出路径"""
+        first, *others = paths
+        stats = select_still_encoder().encode(image, first, FINAL_PNG)
+        for path in others:
+            detach_asset(path)
+            shutil.copyfile(first, path)
+        return stats
+
+    def run(
+        self,
+        jobs: List[ImageJob],
+        should_cancel: Optional[Callable[[], bool]] = None
+    ) -> List[ImageResult]:
+        """
+        并行处理所有任务
+
+        Args:
+            jobs: 任务列表
+            should_cancel: 返回 True 时不再开始新的源图片
+
+        Returns:
+            与 jobs 顺序一致的结果列表
+        """
+        results = [ImageResult(job) for job in jobs]
+        if not jobs:
+            return results
+
+        def hash_source(source: str) -> Tuple[str, str]:
+            try:
+                if self.asset_index is not None:
+                    return self.asset_index.file_hash(source), ""
+                return compute_file_hash(source), ""
+            except OSError as e:
+                return "", f"无法读取图片: {e}"
+
+        sources = list(dict.fromkeys(job.source for job in jobs))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            digests = dict(zip(sources, executor.map(hash_source, sources)))
+
+            # 按内容哈希分组（不同路径的相同文件也只处理一次）
+            groups: Dict[str, List[int]] = {}
+            for index, job in enumerate(jobs):
+                digest, error = digests[job.source]
+                if error:
+                    results[index].error = error
+                else:
+                    groups.setdefault(digest, []).append(index)
+
+            def process_group(digest: str, indices: List[int]):
+                if should_cancel is not None and should_cancel():
+                    for index in indices:
+                        results[index].error = "已取消"
+                    return
+                if self.prerendered is not None:
+                    remaining = []
+                    for index in indices:
+                        job = jobs[index]
+                        if not (job.output_path and self.prerendered(digest, job.target)):
+                            remaining.append(index)
+                            continue
+                        result = results[index]
+                        result.cached = result.prerendered = True
+                        try:
+                            self._link_output(job.source, job.output_path)
+                        except OSError as e:
+                            result.error = f"写入失败: {e}"
+                    indices = remaining
+                    if not indices:
+                        return
+                group_jobs = [jobs[i] for i in indices]
+                outcomes = self._process_source(digest, group_jobs[0].source, group_jobs)
+
+                written: Dict[ImageTarget, List[str]] = {}
+                for index in indices:
+                    result = results[index]
+                    image, error, cached = outcomes[result.job.target]
+                    result.image, result.error = image, error
+                    # 同一批次中第二个及以后相同目标的任务也算复用
+                    result.cached = cached or result.job.target in written
+                    written.setdefault(result.job.target, [])
+                    if image is not None and result.job.output_path:
+                        written[result.job.target].append(result.job.output_path)
+
+                for target, paths in written.items():
+                    if not paths:
+                        continue
+                    try:
+                        stats = self._write_outputs(outcomes[target][0], paths)
+                        logger.info(f"已写入图片 {stats}")
+                    except OSError as e:
+                        stats, error = None, f"写入失败: {e}"
+                    for index in indices:
+                        if results[index].job.output_path in paths:
+                            if stats is None:
+                                results[index].error = error
+                            results[index].encode_stats = stats
+
+            futures = [executor.submit(process_group, d, idx) for d, idx in groups.items()]
+            for future in futures:
+                future.result()
+
+        failed = [r for r in results if r.error]
+        for result in failed:
+            logger.warning(f"处理图片失败 {result.job.source}: {result.error}")
+        logger.info(
+            f"批量处理图片: {len(jobs)} 个任务，{len(groups)} 张不同图片，"
+            f"{sum(r.cached for r in results)} 个复用（{sum(r.prerendered for r in results)} 个已预处理），"
+            f"{len(failed)} 个失败"
+        )
+        return results
@@ -0,0 +1,263 @@
+"""
+批量校验 - 并行校验整个素材库中的 epconfig.json
+
+用法:
+    python main.py validate-all <素材库根目录> [--output report.json] [--workers N] [--strict] [--deep]
+
+    --deep 会调用 ffprobe 检查导出视频的编码、分辨率、帧数和码率
+
+退出码:
+    0 - 全部通过
+    1 - 存在校验错误（--strict 时警告也视为失败）
+    2 - 参数错误或根目录不存在
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any
+
+from core.validator import (
+    EPConfigValidator, FileProbeCache, ValidationLevel, ValidationResult
+)
+from core.media_validator import MediaConformanceValidator
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILENAME = "epconfig.json"
+
+# 遍历时跳过的目录（导出临时目录、版本控制目录等）
+SKIP_DIR_NAMES = {"_temp_frames", "__pycache__", "node_modules"}
+
+EXIT_OK = 0
+EXIT_INVALID = 1
+EXIT_USAGE = 2
+
+
+@dataclass
+class ConfigReport:
+    """单个配置文件的校验报告"""
+    path: str
+    errors: List[ValidationResult] = field(default_factory=list)
+    warnings: List[ValidationResult] = field(default_factory=list)
+    infos: List[ValidationResult] = field(default_factory=list)
+    load_error: str = ""
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.load_error and not self.errors
+
+    def to_dict(self) -> dict:
+        def _items(results: List[ValidationResult]) -> List[dict]:
+            return [{"field": r.field, "message": r.message} for r in results]
+
+        result = {
+            "path": self.path,
+            "valid": self.is_valid,
+            "errors": _items(self.errors),
+            "warnings": _items(self.warnings),
+            "infos": _items(self.infos),
+        }
+        if self.load_error:
+            result["load_error"] = self.load_error
+        return result
+
+
+@dataclass
+class BatchReport:
+    """批量校验报告"""
+    root: str
+    configs: List[ConfigReport] = field(default_factory=list)
+    elapsed: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def failed(self) -> List[ConfigReport]:
+        return [c for c in self.configs if not c.is_valid]
+
+    @property
+    def warning_count(self) -> int:
+        return sum(len(c.warnings) for c in self.configs)
+
+    def exit_code(self, strict: bool = False) -> int:
+        """根据校验结果计算退出码"""
+        if self.failed:
+            return EXIT_INVALID
+        if strict and self.warning_count > 0:
+            return EXIT_INVALID
+        return EXIT_OK
+
+    def to_dict(self) -> dict:
+        return {
+            "root": self.root,
+            "total": len(self.configs),
+            "passed": len(self.configs) - len(self.failed),
+            "failed": len(self.failed),
+            "warnings": self.warning_count,
+            "elapsed": round(self.elapsed, 3),
+            "probe_cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+            "configs": [c.to_dict() for c in self.configs],
+        }
+
+
+class BatchValidator:
+    """
+    批量校验器
+
+    在线程池中并行校验多个配置文件。校验工作以文件 I/O 为主，
+    线程即可获得并行收益；所有校验器共享同一个 FileProbeCache，
+    被多个素材引用的文件只探测一次。
+    """
+
+    def __init__(self, root_dir: str, max_workers: Optional[int] = None, deep: bool = False):
+        """
+        初始化批量校验器
+
+        Args:
+            root_dir: 素材库根目录
+            max_workers: 线程池大小，默认按 CPU 数量推算
+            deep: 是否对导出视频进行媒体一致性校验
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.probe_cache = FileProbeCache()
+        self.media_validator = MediaConformanceValidator() if deep else None
+
+    def find_configs(self) -> List[str]:
+        """递归查找根目录下所有 epconfig.json"""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.root_dir):
+            # 原地修改 dirnames 以跳过隐藏目录和临时目录
+            dirnames[:] = sorted(
+                d for d in dirnames
+                if not d.startswith('.') and d not in SKIP_DIR_NAMES
+            )
+            if CONFIG_FILENAME in filenames:
+                found.append(os.path.join(dirpath, CONFIG_FILENAME))
+        return found
+
+    def validate_file(self, config_path: str) -> ConfigReport:
+        """校验单个配置文件"""
+        report = ConfigReport(path=os.path.relpath(config_path, self.root_dir))
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            report.load_error = f"无法读取配置: {e}"
+            return report
+
+        if not isinstance(data, dict):
+            report.load_error = "配置文件顶层必须为对象"
+            return report
+
+        # 结构异常的配置（如字段类型错误）可能让校验器抛出异常，记录到该文件的报告中，不影响其他文件
+        validator = EPConfigValidator(os.path.dirname(config_path), probe_cache=self.probe_cache)
+        try:
+            validator.validate(data)
+        except Exception as e:
+            logger.warning(f"校验 {config_path} 时出错: {e}")
+            report.load_error = f"校验时出错: {e}"
+            return report
+        report.errors = validator.get_errors()
+        report.warnings = validator.get_warnings()
+        report.infos = validator.get_infos()
+
+        if self.media_validator is not None:
+            try:
+                media_results = self.media_validator.validate(data, os.path.dirname(config_path))
+            except Exception as e:
+                logger.warning(f"媒体校验 {config_path} 时出错: {e}")
+                report.load_error = f"媒体校验时出错: {e}"
+                media_results = []
+            for result in media_results:
+                if result.level == ValidationLevel.ERROR:
+                    report.errors.append(result)
+                elif result.level == ValidationLevel.WARNING:
+                    report.warnings.append(result)
+                else:
+                    report.infos.append(result)
+        return report
+
+    def validate_all(self) -> BatchReport:
+        """并行校验所有配置"""
+        start_time = time.perf_counter()
+        config_paths = self.find_configs()
+        logger.info(f"找到 {len(config_paths)} 个配置文件，使用 {self.max_workers} 个线程校验")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # map() 保持输入顺序，报告按路径排序输出
+            reports = list(executor.map(self.validate_file, config_paths))
+
+        if self.media_validator is not None:
+            self.media_validator.cache.save()
+
+        return BatchReport(
+            root=self.root_dir,
+            configs=reports,
+            elapsed=time.perf_counter() - start_time,
+            cache_hits=self.probe_cache.hits,
+            cache_misses=self.probe_cache.misses
+        )
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="validate-all",
+        description="批量校验素材库中的所有 epconfig.json"
+    )
+    parser.add_argument("root", help="素材库根目录")
+    parser.add_argument("-o", "--output", default="",
+                        help="JSON 报告输出路径（默认输出到标准输出）")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="并行线程数")
+    parser.add_argument("--strict", action="store_true",
+                        help="警告也视为失败")
+    parser.add_argument("--deep", action="store_true",
+                        help="使用 ffprobe 检查导出视频的编码、分辨率、帧数和码率")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行入口
+
+    Args:
+        argv: 命令行参数（不含子命令名），默认读取 sys.argv
+
+    Returns:
+        退出码
+    """
+    parser = build_arg_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+
+    if not os.path.isdir(args.root):
+        print(f"根目录不存在: {args.root}", file=sys.stderr)
+        return EXIT_USAGE
+
+    report = BatchValidator(
+        args.root, max_workers=args.workers, deep=args.deep
+    ).validate_all()
+    summary: Dict[str, Any] = report.to_dict()
+    report_json = json.dumps(summary, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report_json)
+        print(
+            f"校验完成: {summary['total']} 个配置, {summary['failed']} 个失败, "
+            f"{summary['warnings']} 个警告, 耗时 {summary['elapsed']:.2f}s",
+            file=sys.stderr
+        )
+    else:
+        print(report_json)
+
+    return report.exit_code(strict=args.strict)
@@ -0,0 +1,253 @@
+"""
+撤销/重做历史 - 只保存变化的字段，连续的同类修改合并为一条
+
+每条命令记录若干 (键 -> (修改前, 修改后))：
+- 配置修改的键是 config.epconfig.diff() 返回的字段路径，值为该字段的旧值/新值
+  （嵌套对象整体替换时保存它的结构拷贝）
+- 裁剪框、入点/出点等界面状态的键由调用方指定，如 "cropbox:loop"
+
+同一目标、同一组键在 COALESCE_SECONDS 内的修改（输入文字、拖动滑块/裁剪框）合并为一条命令，
+总大小超过 max_bytes 或条数超过 max_commands 时丢弃最早的命令。
+
+历史本身不修改任何对象：undo()/redo() 返回命令，由调用方把 before/after 应用回去
+（配置可用 apply_config）。
+"""
+import sys
+import time
+import logging
+from dataclasses import dataclass, field
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from config.epconfig import EPConfig, get_field, set_field
+
+logger = logging.getLogger(__name__)
+
+# 合并连续修改的时间窗口（秒）
+COALESCE_SECONDS = 1.0
+# 历史占用内存上限（估算值）
+HISTORY_MAX_BYTES = 2 * 1024 * 1024
+# 最多保留的命令数
+HISTORY_MAX_COMMANDS = 500
+
+KIND_CONFIG = "config"
+KIND_CROPBOX = "cropbox"
+KIND_IN_OUT = "in_out"
+
+
+def _estimate_size(value: Any) -> int:
+    """估算值占用的内存（只需数量级正确）"""
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    slots = getattr(type(value), "__slots__", None)
+    if slots:
+        return sys.getsizeof(value) + sum(_estimate_size(getattr(value, name)) for name in slots)
+    return sys.getsizeof(value)
+
+
+@dataclass
+class Command:
+    """一条可撤销的修改"""
+    kind: str
+    changes: Dict[str, Tuple[Any, Any]]  # 键 -> (修改前, 修改后)
+    label: str = ""
+    timestamp: float = 0.0               # 最后一次合并的时间
+    nbytes: int = field(default=0, compare=False)
+
+    def before(self) -> Dict[str, Any]:
+        return {key: old for key, (old, _new) in self.changes.items()}
+
+    def after(self) -> Dict[str, Any]:
+        return {key: new for key, (_old, new) in self.changes.items()}
+
+    def _measure(self):
+        self.nbytes = sys.getsizeof(self) + sum(
+            sys.getsizeof(key) + _estimate_size(old) + _estimate_size(new)
+            for key, (old, new) in self.changes.items()
+        )
+
+
+class CommandHistory:
+    """
+    撤销/重做历史
+
+    history = CommandHistory()
+    history.record_config(snapshot, config, diff(snapshot, config))
+    command = history.undo()
+    apply_config(config, command, undo=True)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = HISTORY_MAX_BYTES,
+        max_commands: int = HISTORY_MAX_COMMANDS,
+        coalesce_seconds: float = COALESCE_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            max_bytes: 撤销栈占用内存上限（估算）
+            max_commands: 撤销栈最多保留的命令数
+            coalesce_seconds: 合并连续修改的时间窗口，0 表示不合并
+            clock: 时钟（回放测试时可替换）
+        """
+        self.max_bytes = max_bytes
+        self.max_commands = max_commands
+        self.coalesce_seconds = coalesce_seconds
+        self._clock = clock
+        self._undo: Deque[Command] = deque()
+        self._redo: List[Command] = []
+        self._undo_bytes = 0
+        # undo/redo 之后的下一次修改不与之前的命令合并
+        self._can_coalesce = False
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+
+    def record(self, kind: str, changes: Dict[str, Tuple[Any, Any]], label: str = "") -> Optional[Command]:
+        """
+        记录一次修改（清空重做栈）
+
+        Args:
+            kind: 命令类型（KIND_CONFIG / KIND_CROPBOX / KIND_IN_OUT）
+            changes: 键 -> (修改前, 修改后)，调用方保证值之后不会被原地修改
+            label: 显示在菜单中的描述
+
+        Returns:
+            新建或合并后的命令；修改前后相同（如合并后改回原值）时返回 None
+        """
+        changes = {key: (old, new) for key, (old, new) in changes.items() if old != new}
+        now = self._clock()
+        last = self._undo[-1] if self._undo else None
+        self._redo.clear()
+
+        if (self._can_coalesce and last is not None and last.kind == kind
+                and last.changes.keys() == changes.keys()
+                and now - last.timestamp <= self.coalesce_seconds):
+            # 合并：保留最早的修改前值，更新为最新的修改后值
+            self._undo.pop()
+            self._undo_bytes -= last.nbytes
+            changes = {key: (last.changes[key][0], new) for key, (_old, new) in changes.items()}
+            changes = {key: (old, new) for key, (old, new) in changes.items() if old != new}
+            label = label or last.label
+
+        self._can_coalesce = True
+        if not changes:
+            return None
+        command = Command(kind, changes, label, now)
+        command._measure()
+        self._undo.append(command)
+        self._undo_bytes += command.nbytes
+        self._trim()
+        return command
+
+    def record_config(self, old: EPConfig, new: EPConfig, paths: List[str], label: str = "") -> Optional[Command]:
+        """
+        记录一次配置修改
+
+        Args:
+            old: 修改前的配置快照
+            new: 修改后的配置（嵌套对象会被拷贝，之后可以继续原地修改）
+            paths: diff(old, new) 的结果
+        """
+        changes = {}
+        for path in paths:
+            before, after = get_field(old, path), get_field(new, path)
+            changes[path] = (_detach(before), _detach(after))
+        return self.record(KIND_CONFIG, changes, label or _config_label(paths))
+
+    def break_coalescing(self):
+        """下一次修改单独成为一条命令（如保存项目之后）"""
+        self._can_coalesce = False
+
+    def _trim(self):
+        """超过条数或内存上限时丢弃最早的命令（至少保留最近一条）"""
+        while len(self._undo) > 1 and (
+            len(self._undo) > self.max_commands or self._undo_bytes > self.max_bytes
+        ):
+            dropped = self._undo.popleft()
+            self._undo_bytes -= dropped.nbytes
+
+    # ------------------------------------------------------------------
+    # 撤销/重做
+    # ------------------------------------------------------------------
+
+    def undo(self) -> Optional[Command]:
+        """取出最近的命令（调用方应用它的 before），没有时返回 None"""
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        self._undo_bytes -= command.nbytes
+        self._redo.append(command)
+        self._can_coalesce = False
+        return command
+
+    def redo(self) -> Optional[Command]:
+        """取出最近撤销的命令（调用方应用它的 after），没有时返回 None"""
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        self._undo.append(command)
+        self._undo_bytes += command.nbytes
+        self._can_coalesce = False
+        self._trim()
+        return command
+
+    def clear(self):
+        """清空历史（如打开其他项目时）"""
+        self._undo.clear()
+        self._redo.clear()
+        self._undo_bytes = 0
+        self._can_coalesce = False
+
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    @property
+    def undo_label(self) -> str:
+        return self._undo[-1].label if self._undo else ""
+
+    @property
+    def redo_label(self) -> str:
+        return self._redo[-1].label if self._redo else ""
+
+    @property
+    def nbytes(self) -> int:
+        """撤销栈和重做栈的估算内存占用"""
+        return self._undo_bytes + sum(command.nbytes for command in self._redo)
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+
+def _detach(value: Any) -> Any:
+    """嵌套的配置对象保存拷贝，避免之后的原地修改影响历史"""
+    copy = getattr(value, "copy", None)
+    return copy() if copy is not None and hasattr(type(value), "__slots__") else value
+
+
+def _config_label(paths: List[str]) -> str:
+    """菜单中显示的描述，如 "修改 loop.file" """
+    if len(paths) == 1:
+        return f"修改 {paths[0]}"
+    return f"修改 {paths[0]} 等 {len(paths)} 项"
+
+
+def apply_config(config: EPConfig, command: Command, undo: bool):
+    """
+    把配置命令应用到配置上
+
+    Args:
+        config: 要修改的配置
+        command: KIND_CONFIG 命令
+        undo: True 应用修改前的值，False 应用修改后的值
+    """
+    values = command.before() if undo else command.after()
+    for path, value in values.items():
+        set_field(config, path, _detach(value))
@@ -0,0 +1,483 @@
+"""
+下载引擎 - 断点续传、多源故障转移、并行分段和流式校验
+
+- 读取块大小按实际吞吐自适应调整（64KB ~ 4MB），减少小块读取的系统调用开销
+- 数据先写入 <目标>.part，切换下载源时通过 HTTP Range 从已下载位置继续
+- 文件大小已知时可把文件切成多个分段，同时从多个镜像下载
+- 顺序下载时边下载边计算 SHA-256，完成后与 Release 中的摘要比对
+
+提供 MirrorHealthTracker 时按镜像健康度排序下载源，并记录各源的吞吐和失败。
+
+网络请求通过可注入的 opener 发出（默认 urllib.request.urlopen），
+可以指向本地 HTTP 服务进行测试。
+"""
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional, List, Set, Callable
+from urllib.error import HTTPError
+from urllib.request import urlopen, Request
+
+from config.constants import (
+    UpdateSource,
+    DOWNLOAD_MIN_CHUNK_SIZE, DOWNLOAD_MAX_CHUNK_SIZE,
+    DOWNLOAD_PARALLEL_MIN_SIZE
+)
+from core.mirror_health import MirrorHealthTracker
+
+logger = logging.getLogger(__name__)
+
+# 进度回调: (已下载字节, 总字节(未知为0), 当前源名称)
+ProgressCallback = Callable[[int, int, str], None]
+
+HASH_READ_SIZE = 1024 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+class DownloadError(Exception):
+    """下载失败"""
+
+
+class ChecksumMismatchError(DownloadError):
+    """下载内容与期望的 SHA-256 不一致"""
+
+
+@dataclass
+class DownloadResult:
+    """下载结果"""
+    path: str
+    sha256: str
+    size: int
+    source_name: str
+
+
+class AdaptiveChunkSize:
+    """
+    自适应读取块大小
+
+    单次读取耗时明显低于目标值时块大小翻倍，明显高于目标值时减半，
+    使每次读取的耗时保持在目标值附近：快速网络下用大块，慢速网络下保持进度刷新。
+    """
+
+    TARGET_SECONDS = 0.2
+
+    def __init__(self, min_size: int = DOWNLOAD_MIN_CHUNK_SIZE, max_size: int = DOWNLOAD_MAX_CHUNK_SIZE):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.size = min_size
+
+    def update(self, nbytes: int, elapsed: float):
+        """根据本次读取结果调整块大小"""
+        if nbytes < self.size:
+            return  # 读到末尾的短块不参与调整
+        if elapsed < self.TARGET_SECONDS / 2:
+            self.size = min(self.size * 2, self.max_size)
+        elif elapsed > self.TARGET_SECONDS * 2:
+            self.size = max(self.size // 2, self.min_size)
+
+
+class DownloadEngine:
+    """
+    下载引擎
+
+    用法:
+        engine = DownloadEngine(sources, output_path, expected_size, expected_sha256)
+        result = engine.download()
+    """
+
+    def __init__(
+        self,
+        sources: List[UpdateSource],
+        output_path: str,
+        expected_size: int = 0,
+        expected_sha256: str = "",
+        parallel_segments: int = 1,
+        user_agent: str = "",
+        health: Optional[MirrorHealthTracker] = None,
+        opener: Optional[Callable] = None,
+        cancel_event: Optional[threading.Event] = None,
+        progress_callback: Optional[ProgressCallback] = None
+    ):
+        """
+        Args:
+            sources: 下载源列表（url_template 为完整下载地址），
+                按健康度（未提供 health 时按 priority）尝试
+            output_path: 最终文件路径
+            expected_size: 期望文件大小，0 表示未知
+            expected_sha256: 期望的 SHA-256（十六进制），为空时不校验
+            parallel_segments: 并行分段数，1 表示只顺序下载
+            user_agent: User-Agent 请求头
+            health: 镜像健康度跟踪器
+            opener: 发起请求的函数，签名同 urlopen(request, timeout=...)
+            cancel_event: 取消事件
+            progress_callback: 进度回调
+        """
+        enabled_sources = [s for s in sources if s.enabled]
+        if health is not None:
+            self.sources = health.rank(enabled_sources)
+        else:
+            self.sources = sorted(enabled_sources, key=lambda s: s.priority)
+        self._health = health
+        self.output_path = output_path
+        self.part_path = output_path + ".part"
+        self.expected_size = expected_size
+        self.expected_sha256 = expected_sha256.lower()
+        self.parallel_segments = max(1, parallel_segments)
+        self.user_agent = user_agent
+        self._opener = opener or urlopen
+        self._cancel_event = cancel_event or threading.Event()
+        self._progress_callback = progress_callback
+
+        self._progress_lock = threading.Lock()
+        self._downloaded = 0
+        self._source_bytes = 0
+        # 不支持 Range 的源：分段下载时跳过（能力不匹配，不计入健康度），顺序下载时仍可使用
+        self._no_range: Set[str] = set()
+
+    def download(self) -> DownloadResult:
+        """
+        执行下载
+
+        Returns:
+            DownloadResult
+
+        Raises:
+            InterruptedError: 下载被取消（.part 文件保留，下次可续传）
+            DownloadError: 所有下载源均失败
+        """
+        if not self.sources:
+            raise DownloadError("没有可用的下载源")
+
+        if self._can_download_parallel():
+            try:
+                return self._download_parallel()
+            except InterruptedError:
+                raise
+            except Exception as e:
+                logger.info(f"并行分段下载失败，改为顺序下载: {e}")
+
+        return self._download_sequential()
+
+    # ------------------------------------------------------------------
+    # 顺序下载（支持断点续传）
+    # ------------------------------------------------------------------
+
+    def _download_sequential(self) -> DownloadResult:
+        last_error = "所有下载源均失败"
+
+        for source in self.sources:
+            self._check_cancelled()
+            start_time = time.perf_counter()
+            try:
+                hasher = self._stream_to_part(source)
+                result = self._finalize(self.part_path, hasher, source.name)
+                self._record_success(source.name, self._source_bytes, start_time)
+                return result
+            except InterruptedError:
+                raise
+            except ChecksumMismatchError as e:
+                # 内容已损坏，不能再续传
+                self._remove(self.part_path)
+                self._record_failure(source.name)
+                last_error = str(e)
+                logger.warning(f"[{source.name}] {e}")
+            except Exception as e:
+                self._record_failure(source.name)
+                last_error = f"{source.name}: {e}"
+                logger.debug(f"源 {source.name} 下载失败: {e}")
+
+        raise DownloadError(last_error)
+
+    def _stream_to_part(self, source: UpdateSource):
+        """从单个源下载到 .part 文件，返回已覆盖全部内容的哈希对象"""
+        self._source_bytes = 0
+        offset = os.path.getsize(self.part_path) if os.path.exists(self.part_path) else 0
+        if self.expected_size and offset > self.expected_size:
+            offset = 0
+
+        hasher = self._hash_existing(offset)
+        if self.expected_size and offset == self.expected_size:
+            return hasher
+
+        try:
+            response = self._open(source, offset)
+        except HTTPError as e:
+            if e.code != 416 or offset == 0:
+                raise
+            # 已下载部分与服务器文件不匹配，从头下载
+            logger.info(f"[{source.name}] 续传位置无效，从头下载")
+            offset = 0
+            hasher = hashlib.sha256()
+            response = self._open(source, 0)
+
+        with response:
+            if offset and not self._range_honoured(response, offset):
+                logger.info(f"[{source.name}] 不支持断点续传，从头下载")
+                offset = 0
+                hasher = hashlib.sha256()
+
+            total = self.expected_size
+            if not total:
+                length = response.headers.get('Content-Length')
+                total = offset + int(length) if length and length.isdigit() else 0
+
+            self._set_progress(offset)
+            if offset:
+                logger.info(f"[{source.name}] 从 {offset} 字节处续传")
+
+            with open(self.part_path, 'ab' if offset else 'wb') as f:
+                self._source_bytes = self._copy_stream(response, f, hasher, total, source.name)
+
+        return hasher
+
+    def _hash_existing(self, size: int):
+        """对已下载的部分计算哈希，续传后得到完整文件的摘要"""
+        hasher = hashlib.sha256()
+        if size <= 0:
+            return hasher
+        with open(self.part_path, 'rb') as f:
+            remaining = size
+            while remaining > 0:
+                block = f.read(min(HASH_READ_SIZE, remaining))
+                if not block:
+                    break
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    def _copy_stream(self, response, f, hasher, total: int, source_name: str, limit: int = 0):
+        """
+        按自适应块大小复制响应数据
+
+        Args:
+            limit: 最多读取的字节数，0 表示读到末尾
+        """
+        chunker = AdaptiveChunkSize()
+        received = 0
+
+        while True:
+            self._check_cancelled()
+
+            size = chunker.size
+            if limit:
+                size = min(size, limit - received)
+                if size <= 0:
+                    break
+
+            start = time.perf_counter()
+            chunk = response.read(size)
+            if not chunk:
+                break
+            chunker.update(len(chunk), time.perf_counter() - start)
+
+            f.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+            received += len(chunk)
+            self._add_progress(len(chunk), total, source_name)
+
+        return received
+
+    def _finalize(self, path: str, hasher, source_name: str) -> DownloadResult:
+        """校验大小和摘要，并把临时文件移动到目标位置"""
+        size = os.path.getsize(path)
+        if self.expected_size and size != self.expected_size:
+            if size > self.expected_size:
+                self._remove(path)
+            raise DownloadError(f"文件大小不符: {size} / {self.expected_size}")
+
+        digest = hasher.hexdigest()
+        if self.expected_sha256 and digest != self.expected_sha256:
+            raise ChecksumMismatchError(f"SHA-256 校验失败: {digest}")
+
+        os.replace(path, self.output_path)
+        return DownloadResult(path=self.output_path, sha256=digest, size=size, source_name=source_name)
+
+    # ------------------------------------------------------------------
+    # 并行分段下载
+    # ------------------------------------------------------------------
+
+    def _can_download_parallel(self) -> bool:
+        return (
+            self.parallel_segments > 1
+            and self.expected_size >= DOWNLOAD_PARALLEL_MIN_SIZE
+            # 已有部分下载时优先续传
+            and not os.path.exists(self.part_path)
+        )
+
+    def _download_parallel(self) -> DownloadResult:
+        """
+        把文件切成多个分段，从不同镜像同时下载
+
+        分段乱序到达，因此 SHA-256 在全部分段完成后统一计算。
+        任一分段在所有源上都失败时整体失败，由调用方退回顺序下载。
+        不支持 Range 的源不算失败，只是不再用于分段下载。
+        """
+        size = self.expected_size
+        count = self.parallel_segments
+        segment_size = -(-size // count)
+        segments = [
+            (start, min(start + segment_size, size) - 1)
+            for start in range(0, size, segment_size)
+        ]
+
+        segments_path = self.output_path + ".segments"
+        with open(segments_path, 'wb') as f:
+            f.truncate(size)
+
+        self._set_progress(0)
+        abort = threading.Event()
+        names = "+".join(s.name for s in self.sources)
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(segments)) as executor:
+                futures = []
+                for index, (start, end) in enumerate(segments):
+                    # 各分段从不同的源开始，失败时轮换到下一个源
+                    shift = index % len(self.sources)
+                    order = self.sources[shift:] + self.sources[:shift]
+                    futures.append(executor.submit(
+                        self._fetch_segment, segments_path, start, end, order, abort, size, names
+                    ))
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except BaseException:
+                        abort.set()
+                        raise
+
+            hasher = hashlib.sha256()
+            with open(segments_path, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_READ_SIZE), b''):
+                    hasher.update(block)
+            return self._finalize(segments_path, hasher, names)
+        except BaseException:
+            self._remove(segments_path)
+            raise
+
+    def _fetch_segment(
+        self,
+        path: str,
+        start: int,
+        end: int,
+        sources: List[UpdateSource],
+        abort: threading.Event,
+        total: int,
+        progress_name: str
+    ):
+        """下载 [start, end] 字节区间，源失败时从当前位置切换到下一个源"""
+        position = start
+        last_error = ""
+
+        with open(path, 'r+b') as f:
+            for source in sources:
+                if abort.is_set():
+                    raise DownloadError("其他分段已失败")
+                if source.name in self._no_range:
+                    continue
+                start_time = time.perf_counter()
+                received = 0
+                try:
+                    with self._open(source, position, end) as response:
+                        if not self._range_honoured(response, position):
+                            self._no_range.add(source.name)
+                            last_error = f"{source.name}: 不支持分段下载"
+                            logger.info(f"[{source.name}] 不支持分段下载，分段下载时跳过该源")
+                            continue
+                        f.seek(position)
+                        received = self._copy_stream(
+                            response, f, None, total, progress_name,
+                            limit=end + 1 - position
+                        )
+                        position += received
+                    if position > end:
+                        self._record_success(source.name, received, start_time)
+                        return
+                    last_error = f"{source.name}: 连接提前关闭"
+                    self._record_failure(source.name)
+                except InterruptedError:
+                    raise
+                except Exception as e:
+                    self._record_failure(source.name)
+                    last_error = f"{source.name}: {e}"
+                    logger.debug(f"分段 {start}-{end} 从 {source.name} 下载失败: {e}")
+
+        raise DownloadError(last_error or f"分段 {start}-{end} 下载失败")
+
+    # ------------------------------------------------------------------
+    # 辅助方法
+    # ------------------------------------------------------------------
+
+    def _open(self, source: UpdateSource, start: int = 0, end: Optional[int] = None):
+        """发起请求，start/end 非默认值时附带 Range 头"""
+        request = Request(source.url_template)
+        if self.user_agent:
+            request.add_header('User-Agent', self.user_agent)
+        if start or end is not None:
+            end_str = str(end) if end is not None else ""
+            request.add_header('Range', f"bytes={start}-{end_str}")
+        return self._opener(request, timeout=source.timeout)
+
+    @staticmethod
+    def _range_honoured(response, offset: int) -> bool:
+        """检查服务器是否按请求的起始位置返回了 206"""
+        status = getattr(response, 'status', None) or response.getcode()
+        if status != 206:
+            return False
+        match = _CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+        return match is not None and int(match.group(1)) == offset
+
+    def _record_success(self, name: str, nbytes: int, start_time: float):
+        if self._health is not None:
+            self._health.record_success(
+                name, nbytes=nbytes, elapsed=time.perf_counter() - start_time
+            )
+
+    def _record_failure(self, name: str):
+        if self._health is not None and not self._cancel_event.is_set():
+            self._health.record_failure(name)
+
+    def _check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise InterruptedError("下载已取消")
+
+    def _set_progress(self, downloaded: int):
+        with self._progress_lock:
+            self._downloaded = downloaded
+
+    def _add_progress(self, nbytes: int, total: int, source_name: str):
+        with self._progress_lock:
+            self._downloaded += nbytes
+            downloaded = self._downloaded
+        if self._progress_callback:
+            self._progress_callback(downloaded, total, source_name)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def parse_asset_digest(digest: str) -> str:
+    """
+    解析 GitHub Release 资源的 digest 字段
+
+    Args:
+        digest: 形如 "sha256:<hex>" 的字符串
+
+    Returns:
+        SHA-256 十六进制字符串，非 sha256 摘要返回空字符串
+    """
+    algorithm, _, value = (digest or "").partition(':')
+    if algorithm.lower() == 'sha256' and re.fullmatch(r'[0-9a-fA-F]{64}', value):
+        return value.lower()
+    return ""
@@ -0,0 +1,281 @@
+"""
+编码器后端 - 视频编码器参数和静态图片编码
+
+视频编码器（libx264 各预设、libopenh264）只负责生成 FFmpeg 编码参数，
+由调用方拼接输入/输出参数后运行；可用性通过 `ffmpeg -encoders` 检测一次并缓存。
+静态图片编码器直接写文件（编码见 core.still_encoder），其中纯标准库 PNG 编码器不依赖 FFmpeg 和 OpenCV。
+
+各机器上最快且输出符合设备要求的编码器由基准测试（python -m benchmarks.encoders --apply）选出，
+保存在缓存目录，导出时通过 select_video_encoder() 读取。
+"""
+import os
+import json
+import threading
+import subprocess
+import logging
+import sys
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, FrozenSet
+
+import numpy as np
+
+from core.still_encoder import HAS_CV2, PngOptions, EncodeStats, FINAL_PNG, write_png
+from utils.file_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VIDEO_ENCODER = "libx264-medium"
+PREFERENCE_FILENAME = "preferred_encoder.json"
+
+_encoder_cache: Dict[str, FrozenSet[str]] = {}
+_encoder_cache_lock = threading.Lock()
+
+
+def detect_ffmpeg_encoders(ffmpeg_path: str) -> FrozenSet[str]:
+    """
+    检测 FFmpeg 支持的编码器（每个 ffmpeg 路径只检测一次）
+
+    Returns:
+        编码器名称集合，如 {"libx264", "libopenh264", "png", ...}；ffmpeg 不可用时为空集合
+    """
+    if not ffmpeg_path:
+        return frozenset()
+    with _encoder_cache_lock:
+        cached = _encoder_cache.get(ffmpeg_path)
+        if cached is not None:
+            return cached
+
+        run_kwargs = {}
+        if sys.platform == 'win32':
+            run_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+        names = set()
+        try:
+            result = subprocess.run(
+                [ffmpeg_path, "-hide_banner", "-encoders"],
+                capture_output=True, text=True, encoding='utf-8', errors='replace',
+                timeout=30, **run_kwargs
+            )
+            # 输出格式: " V....D libx264   libx264 H.264 / AVC / ..."，标志列之前是说明文字，以 " ------" 分隔
+            listing = result.stdout.split("------", 1)[-1]
+            for line in listing.splitlines():
+                parts = line.split()
+                if len(parts) >= 2 and len(parts[0]) == 6:
+                    names.add(parts[1])
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"检测 FFmpeg 编码器失败: {e}")
+
+        encoders = frozenset(names)
+        _encoder_cache[ffmpeg_path] = encoders
+        return encoders
+
+
+class EncoderBackend(ABC):
+    """编码器后端"""
+
+    #: 后端名称（唯一，用于配置和基准测试结果）
+    name: str = ""
+    #: 显示名
+    label: str = ""
+    #: 依赖的 FFmpeg 编码器，为空表示不需要 FFmpeg
+    ffmpeg_encoder: str = ""
+
+    def is_available(self, ffmpeg_encoders: FrozenSet[str]) -> bool:
+        """当前环境是否可用"""
+        return not self.ffmpeg_encoder or self.ffmpeg_encoder in ffmpeg_encoders
+
+
+class VideoEncoderBackend(EncoderBackend):
+    """视频编码器（生成 FFmpeg 编码参数）"""
+
+    #: 是否支持 2pass 码率控制
+    supports_two_pass: bool = False
+
+    @abstractmethod
+    def bitrate_args(
+        self,
+        bitrate: str,
+        pass_number: Optional[int] = None,
+        passlog_prefix: str = ""
+    ) -> List[str]:
+        """
+        码率模式的编码参数
+
+        Args:
+            bitrate: 目标码率，如 "3000k"
+            pass_number: 2pass 的第几遍（1/2），None 表示单遍
+            passlog_prefix: 2pass 日志文件前缀
+        """
+
+    @abstractmethod
+    def quality_args(self, crf: int) -> List[str]:
+        """恒定质量模式的编码参数（不支持时返回接近的码率参数）"""
+
+
+class X264Backend(VideoEncoderBackend):
+    """libx264（High@4.0，设备硬解兼容）"""
+
+    ffmpeg_encoder = "libx264"
+    supports_two_pass = True
+
+    def __init__(self, preset: str):
+        self.preset = preset
+        self.name = f"libx264-{preset}"
+        self.label = f"x264 ({preset})"
+
+    def _common_args(self) -> List[str]:
+        return [
+            "-c:v", "libx264",
+            "-preset", self.preset,
+            "-profile:v", "high",
+            "-level", "4.0",
+            "-pix_fmt", "yuv420p",
+        ]
+
+    def bitrate_args(self, bitrate, pass_number=None, passlog_prefix=""):
+        args = self._common_args() + ["-b:v", bitrate]
+        if pass_number is not None:
+            args += ["-pass", str(pass_number), "-passlogfile", passlog_prefix]
+        return args
+
+    def quality_args(self, crf):
+        return self._common_args() + ["-crf", str(crf)]
+
+
+class OpenH264Backend(VideoEncoderBackend):
+    """libopenh264（Cisco，许可更宽松；不支持 2pass，单遍码率控制）"""
+
+    name = "libopenh264"
+    label = "OpenH264"
+    ffmpeg_encoder = "libopenh264"
+
+    def bitrate_args(self, bitrate, pass_number=None, passlog_prefix=""):
+        return [
+            "-c:v", "libopenh264",
+            "-pix_fmt", "yuv420p",
+            "-rc_mode", "bitrate",
+            "-b:v", bitrate,
+        ]
+
+    def quality_args(self, crf):
+        # OpenH264 没有 CRF，按设备码率上限的一半近似高质量
+        return self.bitrate_args("2000k")
+
+
+class StillEncoderBackend(EncoderBackend):
+    """静态图片编码器"""
+
+    #: 是否使用 OpenCV 编码（见 core.still_encoder.write_png）
+    use_cv2: bool = False
+
+    def encode(self, image: np.ndarray, path: str, options: PngOptions = FINAL_PNG) -> EncodeStats:
+        """
+        编码并写入文件
+
+        Args:
+            image: 灰度、BGR 或 BGRA 图片（uint8）
+            options: PNG 编码选项，默认按最终导出的图片处理
+
+        Returns:
+            编码统计（字节数、耗时）
+
+        Raises:
+            OSError: 写入失败
+        """
+        return write_png(image, path, options, use_cv2=self.use_cv2)
+
+
+class OpenCVPngBackend(StillEncoderBackend):
+    """OpenCV PNG 编码（调色板图片仍由标准库写出）"""
+
+    name = "png-opencv"
+    label = "PNG (OpenCV)"
+    use_cv2 = True
+
+    def is_available(self, ffmpeg_encoders):
+        return HAS_CV2
+
+
+class StdlibPngBackend(StillEncoderBackend):
+    """纯标准库 PNG 编码（zlib + struct），没有 FFmpeg/OpenCV 时使用"""
+
+    name = "png-stdlib"
+    label = "PNG (标准库)"
+
+
+VIDEO_ENCODERS: Dict[str, VideoEncoderBackend] = {
+    backend.name: backend for backend in (
+        X264Backend("medium"),
+        X264Backend("fast"),
+        X264Backend("veryfast"),
+        OpenH264Backend(),
+    )
+}
+
+STILL_ENCODERS: Dict[str, StillEncoderBackend] = {
+    backend.name: backend for backend in (
+        OpenCVPngBackend(),
+        StdlibPngBackend(),
+    )
+}
+
+
+def available_video_encoders(ffmpeg_path: str) -> List[VideoEncoderBackend]:
+    """当前 FFmpeg 可用的视频编码器（按 VIDEO_ENCODERS 顺序）"""
+    encoders = detect_ffmpeg_encoders(ffmpeg_path)
+    return [backend for backend in VIDEO_ENCODERS.values() if backend.is_available(encoders)]
+
+
+def _preference_path() -> str:
+    return os.path.join(get_cache_dir("encoders"), PREFERENCE_FILENAME)
+
+
+def load_preferred_encoder() -> Optional[str]:
+    """读取基准测试选出的视频编码器名称"""
+    try:
+        with open(_preference_path(), "r", encoding="utf-8") as f:
+            return json.load(f).get("video")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_preferred_encoder(name: str, results: Optional[dict] = None):
+    """保存视频编码器偏好（附带基准测试结果，便于排查）"""
+    path = _preference_path()
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"video": name, "results": results or {}}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"保存编码器偏好失败: {e}")
+
+
+def select_video_encoder(ffmpeg_path: str, preferred: Optional[str] = None) -> VideoEncoderBackend:
+    """
+    选择视频编码器
+
+    优先级: preferred 参数 -> 基准测试保存的偏好 -> DEFAULT_VIDEO_ENCODER -> 任一可用编码器
+
+    Raises:
+        RuntimeError: 没有可用的 H.264 编码器
+    """
+    encoders = detect_ffmpeg_encoders(ffmpeg_path)
+    for name in (preferred, load_preferred_encoder(), DEFAULT_VIDEO_ENCODER):
+        backend = VIDEO_ENCODERS.get(name or "")
+        if backend is not None and backend.is_available(encoders):
+            return backend
+    for backend in VIDEO_ENCODERS.values():
+        if backend.is_available(encoders):
+            return backend
+    if not encoders:
+        # 检测失败（如旧版 ffmpeg 输出格式不同）时按默认编码器尝试
+        return VIDEO_ENCODERS[DEFAULT_VIDEO_ENCODER]
+    raise RuntimeError("FFmpeg 不支持 H.264 编码（需要 libx264 或 libopenh264）")
+
+
+def select_still_encoder() -> StillEncoderBackend:
+    """选择静态图片编码器（有 OpenCV 时用 OpenCV，否则用纯标准库实现）"""
+    for backend in STILL_ENCODERS.values():
+        if backend.is_available(frozenset()):
+            return backend
+    return STILL_ENCODERS["png-stdlib"]
@@ -0,0 +1,157 @@
+"""
+导出指标 - 分阶段计时和计数
+
+每个导出任务（loop.mp4、overlay.argb 等）记录各阶段耗时（解码、变换、PNG 编码、写盘、视频编码各遍）、
+调用次数、写入字节数，以及帧数、FFmpeg 报告的 speed/fps 等计数；导出结束时汇总所有任务。
+记录为普通 dict，可直接 json.dumps 写入 JSON lines 日志或通过信号发给界面。
+"""
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterator, Optional
+
+# 阶段显示名（界面汇总用）
+STAGE_LABELS = {
+    "decode": "解码",
+    "transform": "变换",
+    "frame_store_write": "写帧",
+    "png_encode": "PNG编码",
+    "disk_write": "写盘",
+    "argb_write": "ARGB",
+    "icon_write": "图标",
+    "encode_pass1": "编码 第一遍",
+    "encode_pass2": "编码 第二遍",
+}
+
+
+@dataclass
+class StageStats:
+    """单个阶段的累计统计"""
+    seconds: float = 0.0
+    calls: int = 0
+    bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ms": round(self.seconds * 1000, 1), "calls": self.calls, "bytes": self.bytes}
+
+
+class TaskMetrics:
+    """单个导出任务的指标"""
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, stage: str, seconds: float, nbytes: int = 0):
+        """累加一次阶段耗时"""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.seconds += seconds
+        stats.calls += 1
+        stats.bytes += nbytes
+
+    @contextmanager
+    def stage(self, stage: str, nbytes: int = 0) -> Iterator[None]:
+        """计时代码块: with metrics.stage("decode"): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start, nbytes)
+
+    def add_bytes(self, stage: str, nbytes: int):
+        """补记阶段写入的字节数（字节数在计时结束后才知道时使用）"""
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.bytes += nbytes
+
+    def count(self, name: str, value: float = 1):
+        """累加计数"""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_value(self, name: str, value: float):
+        """设置计数（覆盖）"""
+        self.counters[name] = value
+
+    def finish(self):
+        """任务结束，记录总耗时"""
+        self.elapsed = time.perf_counter() - self._started
+
+    def to_dict(self, export_id: str = "") -> Dict[str, Any]:
+        return {
+            "event": "export_task",
+            "export_id": export_id,
+            "task": self.name,
+            "type": self.kind,
+            "total_ms": round(self.elapsed * 1000, 1),
+            "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+            "counters": dict(self.counters),
+        }
+
+
+class ExportMetrics:
+    """一次导出的指标（包含多个任务）"""
+
+    def __init__(self):
+        self.export_id = uuid.uuid4().hex[:12]
+        self.tasks: List[TaskMetrics] = []
+        self._started = time.perf_counter()
+
+    def start_task(self, name: str, kind: str) -> TaskMetrics:
+        """开始记录一个任务"""
+        task = TaskMetrics(name, kind)
+        self.tasks.append(task)
+        return task
+
+    def summary(self, status: str) -> Dict[str, Any]:
+        """
+        汇总所有任务
+
+        Args:
+            status: completed / failed / cancelled
+        """
+        stages: Dict[str, StageStats] = {}
+        counters: Dict[str, float] = {}
+        for task in self.tasks:
+            for name, stats in task.stages.items():
+                total = stages.setdefault(name, StageStats())
+                total.seconds += stats.seconds
+                total.calls += stats.calls
+                total.bytes += stats.bytes
+            for name, value in task.counters.items():
+                # 速度类指标不能相加，只在任务记录中保留
+                if name.startswith("ffmpeg_"):
+                    continue
+                counters[name] = counters.get(name, 0) + value
+
+        return {
+            "event": "export_summary",
+            "export_id": self.export_id,
+            "status": status,
+            "total_ms": round((time.perf_counter() - self._started) * 1000, 1),
+            "tasks": [task.name for task in self.tasks],
+            "stages": {name: stats.to_dict() for name, stats in stages.items()},
+            "counters": counters,
+        }
+
+
+def format_summary(summary: Dict[str, Any], limit: Optional[int] = 5) -> str:
+    """
+    把汇总格式化为一行文字（按耗时从高到低）
+
+    Example:
+        "编码 第二遍 5.1s · 解码 1.2s · 变换 0.8s"
+    """
+    stages = sorted(summary.get("stages", {}).items(), key=lambda item: -item[1]["ms"])
+    if limit:
+        stages = stages[:limit]
+    return " · ".join(
+        f"{STAGE_LABELS.get(name, name)} {stats['ms'] / 1000:.1f}s" for name, stats in stages
+    )
@@ -2,12 +2,11 @@
 导出服务 - 素材导出和打包
 """
 import os
-import sys
-import struct
 import shutil
 import subprocess
 import logging
 import tempfile
+import time
 import glob
 from typing import Optional, Dict, Any, Tuple, List
 from dataclasses import dataclass
@@ -25,7 +24,13 @@ from PyQt6.QtCore import QThread, pyqtSignal, QObject
 
 from config.constants import get_resolution_spec
 from config.epconfig import EPConfig
-from utils.file_utils import get_app_dir
+from core.encoders import VideoEncoderBackend, select_video_encoder, select_still_encoder
+from core.still_encoder import FINAL_PNG, TRANSIENT_PNG, encode_png, write_argb
+from core.export_metrics import ExportMetrics, TaskMetrics, format_summary
+from core.ffmpeg_runner import FFmpegRunner, FFmpegProgress
+from core.frame_store import FrameStore, FrameStoreError
+from utils.file_utils import find_tool
+from utils.logger import log_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,8 @@ class VideoExportParams:
     resolution: str = "360x640"
     is_image: bool = False  # True=从图片生成视频
     rotation: int = 0  # 旋转角度 (0, 90, 180, 270)
+    # 每帧裁剪框 (N, 4)，按源视频帧号索引，原始坐标系；None 时使用固定 cropbox
+    crop_path: Optional[np.ndarray] = None
 
 
 @dataclass
@@ -66,6 +73,8 @@ class ExportWorker(QThread):
     progress_updated = pyqtSignal(int, str)
     export_completed = pyqtSignal(str)
     export_failed = pyqtSignal(str)
+    # 分阶段指标 dict（见 core.export_metrics）：每个任务一条 export_task，结束时一条 export_summary
+    stage_metrics = pyqtSignal(object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -78,6 +87,12 @@ class ExportWorker(QThread):
         # 当前FFmpeg进程引用，用于支持取消操作
         # 参考: Python subprocess文档 - Popen.terminate() 可终止子进程
         self._ffmpeg_process: Optional[subprocess.Popen] = None
+        self._metrics = ExportMetrics()
+        # 当前任务的指标（直接调用导出方法时也可用，不会报错）
+        self._task_metrics = TaskMetrics("", "")
+        # 视频编码器（首次编码时选择，同一次导出的所有视频使用同一个）
+        self._video_encoder_name: Optional[str] = None
+        self._video_encoder: Optional[VideoEncoderBackend] = None
 
     def setup(
         self,
@@ -85,16 +100,37 @@ class ExportWorker(QThread):
         output_dir: str,
         ffmpeg_path: str = "",
         epconfig: Optional[EPConfig] = None,
-        resolution: str = "360x640"
+        resolution: str = "360x640",
+        video_encoder: Optional[str] = None
     ):
-        """设置导出任务"""
+        """
+        设置导出任务
+
+        Args:
+            video_encoder: 视频编码器名称（见 core.encoders.VIDEO_ENCODERS），
+                默认使用基准测试选出的编码器
+        """
         self._tasks = tasks
         self._output_dir = output_dir
         self._ffmpeg_path = ffmpeg_path or self._find_ffmpeg()
         self._epconfig = epconfig
         self._resolution = resolution
+        self._video_encoder_name = video_encoder
+        self._video_encoder = None
         self._cancelled = False
 
+    def _get_video_encoder(self) -> VideoEncoderBackend:
+        """
+        本次导出使用的视频编码器
+
+        Raises:
+            RuntimeError: FFmpeg 没有可用的 H.264 编码器
+        """
+        if self._video_encoder is None:
+            self._video_encoder = select_video_encoder(self._ffmpeg_path, self._video_encoder_name)
+            logger.info(f"视频编码器: {self._video_encoder.name}")
+        return self._video_encoder
+
     def cancel(self):
         """
         取消导出
@@ -116,67 +152,78 @@ class ExportWorker(QThread):
 
     def _find_ffmpeg(self) -> str:
         """查找ffmpeg（支持打包环境）"""
-        # 1. 先在应用程序目录查找（支持 Nuitka/PyInstaller 打包）
-        app_ffmpeg = os.path.join(get_app_dir(), "ffmpeg.exe")
-        if os.path.isfile(app_ffmpeg):
-            return app_ffmpeg
-
-        # 2. 在当前工作目录查找
-        local_ffmpeg = os.path.join(os.getcwd(), "ffmpeg.exe")
-        if os.path.isfile(local_ffmpeg):
-            return local_ffmpeg
-
-        # 3. 在系统 PATH 中查找
-        try:
-            cmd = ["where", "ffmpeg"] if os.name == 'nt' else ["which", "ffmpeg"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip().split('\n')[0]
-        except Exception:
-            pass
-
-        return ""
+        return find_tool("ffmpeg")
 
     def run(self):
         """执行导出"""
+        self._metrics = ExportMetrics()
         try:
-            total_tasks = len(self._tasks)
-            if total_tasks == 0 and not self._epconfig:
-                self.export_completed.emit("没有需要导出的任务")
-                return
+            success, message = self._run_tasks()
+        except Exception as e:
+            logger.exception("导出过程发生错误")
+            success, message = False, f"导出失败: {str(e)}"
 
-            os.makedirs(self._output_dir, exist_ok=True)
+        # 先发出指标汇总，再发出完成/失败信号（接收方收到完成信号后会释放本对象）
+        status = "completed" if success else ("cancelled" if self._cancelled else "failed")
+        summary = self._metrics.summary(status)
+        logger.info(f"导出耗时 {summary['total_ms'] / 1000:.2f}s: {format_summary(summary, None)}")
+        self._emit_metrics(summary)
 
-            completed = 0
-            for i, task in enumerate(self._tasks):
-                if self._cancelled:
-                    self.export_failed.emit("导出已取消")
-                    return
+        if success:
+            self.export_completed.emit(message)
+        else:
+            self.export_failed.emit(message)
 
-                base_progress = int((i / (total_tasks + 1)) * 100)
+    def _run_tasks(self) -> Tuple[bool, str]:
+        """
+        依次执行所有任务
 
-                try:
-                    self._execute_task(task, base_progress, total_tasks)
-                    completed += 1
-                except Exception as e:
-                    logger.exception(f"执行任务 {task.export_type.value} 失败")
-                    self.export_failed.emit(f"导出 {task.export_type.value} 失败: {str(e)}")
-                    return
+        Returns:
+            (是否成功, 完成或失败信息)
+        """
+        total_tasks = len(self._tasks)
+        if total_tasks == 0 and not self._epconfig:
+            return True, "没有需要导出的任务"
 
-            # 生成epconfig.json
-            if self._epconfig:
-                self.progress_updated.emit(95, "正在生成 epconfig.json...")
-                self._generate_epconfig()
+        os.makedirs(self._output_dir, exist_ok=True)
 
-            self.progress_updated.emit(100, "导出完成")
-            self.export_completed.emit(f"成功导出到 {self._output_dir}")
+        completed = 0
+        for i, task in enumerate(self._tasks):
+            if self._cancelled:
+                return False, "导出已取消"
 
-        except Exception as e:
-            logger.exception("导出过程发生错误")
-            self.export_failed.emit(f"导出失败: {str(e)}")
+            base_progress = int((i / (total_tasks + 1)) * 100)
+
+            try:
+                self._execute_task(task, base_progress, total_tasks)
+                completed += 1
+            except Exception as e:
+                logger.exception(f"执行任务 {task.export_type.value} 失败")
+                return False, f"导出 {task.export_type.value} 失败: {str(e)}"
+
+        # 生成epconfig.json
+        if self._epconfig:
+            self.progress_updated.emit(95, "正在生成 epconfig.json...")
+            self._generate_epconfig()
+
+        self.progress_updated.emit(100, "导出完成")
+        return True, f"成功导出到 {self._output_dir}"
+
+    def _emit_metrics(self, record: Dict[str, Any]):
+        """发出指标信号并写入指标日志"""
+        log_metrics(record)
+        self.stage_metrics.emit(record)
 
     def _execute_task(self, task: ExportTask, base_progress: int, total_tasks: int):
         """执行单个任务"""
+        self._task_metrics = self._metrics.start_task(task.output_path, task.export_type.value)
+        try:
+            self._execute_task_inner(task, base_progress, total_tasks)
+        finally:
+            self._task_metrics.finish()
+            self._emit_metrics(self._task_metrics.to_dict(self._metrics.export_id))
+
+    def _execute_task_inner(self, task: ExportTask, base_progress: int, total_tasks: int):
         output_path = os.path.join(self._output_dir, task.output_path)
 
         if task.export_type == ExportType.LOGO:
@@ -189,35 +236,109 @@ class ExportWorker(QThread):
 
         elif task.export_type == ExportType.ICON:
             self.progress_updated.emit(base_progress, f"正在导出 {task.output_path}...")
-            if HAS_CV2:
-                cv2.imwrite(output_path, task.data)
+            # 没有 OpenCV 时使用纯标准库 PNG 编码，不再跳过图标
+            stats = select_still_encoder().encode(task.data, output_path, FINAL_PNG)
+            self._task_metrics.add("icon_write", stats.seconds, stats.bytes)
+            logger.info(f"已导出图片 {stats}")
 
         elif task.export_type in (ExportType.LOOP_VIDEO, ExportType.INTRO_VIDEO):
             self.progress_updated.emit(base_progress, f"正在导出 {task.output_path}...")
             self._export_video(output_path, task.data, base_progress, total_tasks)
 
     def _export_argb(self, output_path: str, mat: np.ndarray, is_logo: bool = False):
-        """导出ARGB格式文件"""
+        """导出ARGB格式文件（每像素 b, g, r, a，按块写入）"""
         # 旋转180度
         mat = cv2.rotate(mat, cv2.ROTATE_180) if HAS_CV2 else np.rot90(mat, 2)
-        mat = mat.astype(np.uint8)
-        h, w = mat.shape[:2]
-        channels = mat.shape[-1] if len(mat.shape) == 3 else 1
+        stats = write_argb(mat, output_path, should_cancel=lambda: self._cancelled)
+        self._task_metrics.add("argb_write", stats.seconds, stats.bytes)
+        logger.info(f"已导出 {stats}")
 
-        with open(output_path, "wb") as f:
-            for y in range(h):
-                if self._cancelled:
-                    raise InterruptedError("导出已取消")
-                for x in range(w):
-                    if channels == 4:
-                        b, g, r, a = mat[y, x]
-                    elif channels == 3:
-                        b, g, r = mat[y, x]
-                        a = 255
-                    else:
-                        b = g = r = mat[y, x]
-                        a = 255
-                    f.write(struct.pack("BBBB", b, g, r, a))
+    def _prepare_temp_dir(self) -> str:
+        """创建空的临时帧目录（清除上次异常退出遗留的文件，避免混入旧帧）"""
+        temp_dir = os.path.join(self._output_dir, "_temp_frames").replace("\\", "/")
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir, exist_ok=True)
+        return temp_dir
+
+    def _create_frame_store(
+        self, temp_dir: str, width: int, height: int, capacity: int, fps: float
+    ) -> Optional[FrameStore]:
+        """
+        创建中间帧存储
+
+        Returns:
+            帧存储；磁盘空间不足等情况返回 None，调用方改用 PNG 序列（压缩后占用空间更小）
+        """
+        try:
+            return FrameStore.create(
+                os.path.join(temp_dir, "frames.epfs"), width, height, capacity, fps
+            )
+        except (FrameStoreError, OSError) as e:
+            logger.warning(f"无法创建中间帧存储，改用 PNG 序列: {e}")
+            return None
+
+    def _write_intermediate_frame(
+        self, store: Optional[FrameStore], temp_dir: str, frame_idx: int, frame: np.ndarray
+    ) -> bool:
+        """写入一帧中间结果（帧存储或 PNG）"""
+        if store is not None:
+            with self._task_metrics.stage("frame_store_write", nbytes=frame.nbytes):
+                store.append(frame)
+            return True
+        frame_path = os.path.join(temp_dir, f"frame_{frame_idx:06d}.png").replace("\\", "/")
+        # 临时帧马上被 FFmpeg 读取，用低压缩级别换取速度
+        with self._task_metrics.stage("png_encode"):
+            data, _stats = encode_png(frame, TRANSIENT_PNG)
+        with self._task_metrics.stage("disk_write", nbytes=len(data)), open(frame_path, 'wb') as f:
+            f.write(data)
+        return True
+
+    def _encode_intermediate(
+        self,
+        store: Optional[FrameStore],
+        temp_dir: str,
+        output_path: str,
+        fps: float,
+        frame_count: int,
+        progress_range: Tuple[int, int]
+    ):
+        """
+        编码中间结果为最终视频
+
+        Args:
+            frame_count: 已写入的帧数
+            progress_range: 编码阶段占用的进度区间
+        """
+        self.progress_updated.emit(progress_range[0], f"正在编码视频 ({self._get_video_encoder().label})...")
+        output_file = output_path.replace("\\", "/")
+        if store is not None:
+            # 刷新内存映射中尚未写盘的数据
+            with self._task_metrics.stage("disk_write"):
+                store.close()
+            self._run_ffmpeg_2pass(
+                input_args=store.ffmpeg_input_args(),
+                output_file=output_file,
+                fps=fps,
+                bitrate="3000k",
+                max_frames=len(store),
+                progress_range=progress_range
+            )
+        else:
+            self._run_ffmpeg_2pass(
+                input_pattern=f"{temp_dir}/frame_%06d.png",
+                output_file=output_file,
+                fps=fps,
+                bitrate="3000k",
+                total_frames=frame_count,
+                progress_range=progress_range
+            )
+
+    @staticmethod
+    def _encode_progress_range(base_progress: int, total_tasks: int) -> Tuple[int, int]:
+        """编码阶段的进度区间（紧接在写帧阶段的 base_progress + 50/total_tasks 之后）"""
+        start = base_progress + 50 // max(1, total_tasks)
+        return start, min(94, start + 50 // max(1, total_tasks))
 
     def _export_video(
         self,
@@ -246,9 +367,9 @@ class ExportWorker(QThread):
         padding_side = spec["padding_side"]
         rotate_180 = spec["rotate_180"]
 
-        temp_dir = os.path.join(self._output_dir, "_temp_frames").replace("\\", "/")
-        os.makedirs(temp_dir, exist_ok=True)
+        temp_dir = self._prepare_temp_dir()
 
+        store = None
         try:
             cap = cv2.VideoCapture(params.video_path)
             if not cap.isOpened():
@@ -257,41 +378,40 @@ class ExportWorker(QThread):
             cap.set(cv2.CAP_PROP_POS_FRAMES, params.start_frame)
             total_frames = params.end_frame - params.start_frame
 
-            # 预计算旋转后的裁剪框坐标
-            orig_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            orig_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            x, y, w, h = params.cropbox
-            rotation = params.rotation
-
-            # 将cropbox从原始坐标变换到旋转后坐标
-            if rotation == 90:
-                rx, ry, rw, rh = (orig_h - y - h, x, h, w)
-            elif rotation == 180:
-                rx, ry, rw, rh = (orig_w - x - w, orig_h - y - h, w, h)
-            elif rotation == 270:
-                rx, ry, rw, rh = (y, orig_w - x - w, h, w)
-            else:
-                rx, ry, rw, rh = (x, y, w, h)
+            store_w = padded_w if padding_side == "right" else target_w
+            store_h = padded_h if padding_side == "bottom" else target_h
+            store = self._create_frame_store(temp_dir, store_w, store_h, max(1, total_frames), params.fps)
 
+            rotation = params.rotation
+            rotate_code = {
+                90: cv2.ROTATE_90_CLOCKWISE,
+                180: cv2.ROTATE_180,
+                270: cv2.ROTATE_90_COUNTERCLOCKWISE,
+            }.get(rotation)
+            crop_path = params.crop_path
+
+            metrics = self._task_metrics
             frames_written = 0
             for frame_idx in range(total_frames):
                 if self._cancelled:
                     raise InterruptedError("导出已取消")
 
-                ret, frame = cap.read()
+                with metrics.stage("decode"):
+                    ret, frame = cap.read()
                 if not ret:
                     break
-
-                # 应用用户设置的旋转
-                if rotation == 90:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
-                elif rotation == 180:
-                    frame = cv2.rotate(frame, cv2.ROTATE_180)
-                elif rotation == 270:
-                    frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
-
-                # 应用裁剪（使用旋转后的坐标）
-                frame = frame[ry:ry+rh, rx:rx+rw]
+                metrics.count("frames_decoded")
+                transform_start = time.perf_counter()
+
+                # 先在原始坐标系中裁剪（切片视图，不复制整帧），再只旋转裁剪区域
+                source_idx = params.start_frame + frame_idx
+                if crop_path is not None and source_idx < len(crop_path):
+                    x, y, w, h = (int(v) for v in crop_path[source_idx])
+                else:
+                    x, y, w, h = params.cropbox
+                frame = frame[y:y+h, x:x+w]
+                if rotate_code is not None:
+                    frame = cv2.rotate(frame, rotate_code)
                 frame = cv2.resize(frame, (target_w, target_h))
 
                 if rotate_180:
@@ -307,13 +427,11 @@ class ExportWorker(QThread):
                     if pad_h > 0:
                         padding = np.zeros((pad_h, target_w, 3), dtype=np.uint8)
                         frame = np.vstack([frame, padding])
+                metrics.add("transform", time.perf_counter() - transform_start)
 
-                frame_path = os.path.join(temp_dir, f"frame_{frame_idx:06d}.png").replace("\\", "/")
-                success, encoded = cv2.imencode('.png', frame)
-                if success:
-                    with open(frame_path, 'wb') as f:
-                        f.write(encoded.tobytes())
+                if self._write_intermediate_frame(store, temp_dir, frame_idx, frame):
                     frames_written += 1
+                    metrics.count("frames_written")
 
                 if frame_idx % 10 == 0:
                     progress = base_progress + int((frame_idx / total_frames) * 50 / total_tasks)
@@ -325,159 +443,116 @@ class ExportWorker(QThread):
                 raise RuntimeError("没有成功写入任何视频帧")
             logger.info(f"成功写入 {frames_written} 帧")
 
-            self.progress_updated.emit(base_progress + 50, "正在编码视频(2pass)...")
-            input_pattern = f"{temp_dir}/frame_%06d.png"
-            output_file = output_path.replace("\\", "/")
-
             # 使用2pass编码以获得更好的码率分配
             # 参考: x264 ratecontrol.txt - "2pass: Given some data about each frame of a 1st pass,
             # we try to choose QPs to maximize quality while matching a specified total size"
-            self._run_ffmpeg_2pass(
-                input_pattern=input_pattern,
-                output_file=output_file,
-                fps=params.fps,
-                bitrate="3000k"
+            self._encode_intermediate(
+                store, temp_dir, output_path, params.fps, frames_written,
+                self._encode_progress_range(base_progress, total_tasks)
             )
 
         finally:
+            if store is not None:
+                store.close()
             if os.path.exists(temp_dir):
                 shutil.rmtree(temp_dir)
 
     def _run_ffmpeg_2pass(
         self,
-        input_pattern: str,
         output_file: str,
         fps: float,
-        bitrate: str = "3000k"
+        bitrate: str = "3000k",
+        input_pattern: str = "",
+        input_args: Optional[List[str]] = None,
+        max_frames: Optional[int] = None,
+        total_frames: Optional[int] = None,
+        progress_range: Optional[Tuple[int, int]] = None,
+        encoder: Optional[VideoEncoderBackend] = None
     ):
-        
-        """使用FFmpeg进行2pass编码"""
+        """
+        使用FFmpeg进行2pass编码（编码器不支持 2pass 时单遍编码）
+
+        Args:
+            output_file: 输出文件
+            fps: 帧率
+            bitrate: 目标码率
+            input_pattern: PNG 序列路径模式（未指定 input_args 时使用）
+            input_args: 完整的输入参数（如 FrameStore.ffmpeg_input_args()）
+            max_frames: 最多编码的帧数
+            total_frames: 预计编码帧数（用于进度百分比），默认等于 max_frames
+            progress_range: 两遍编码占用的总进度区间 (起, 止)，None 表示不报告进度
+            encoder: 视频编码器，默认为本次导出选定的编码器
+        """
+        if input_args is None:
+            input_args = ["-framerate", str(fps), "-i", input_pattern]
+        limit_args = ["-frames:v", str(max_frames)] if max_frames else []
+        if encoder is None:
+            encoder = self._get_video_encoder()
+
+        if not encoder.supports_two_pass:
+            cmd = [
+                self._ffmpeg_path,
+                "-hide_banner",
+                *input_args,
+                *limit_args,
+                *encoder.bitrate_args(bitrate),
+                "-an",
+                "-y",
+                output_file
+            ]
+            self._run_ffmpeg_pass(cmd, 1, total_frames or max_frames, progress_range, pass_count=1)
+            if os.path.exists(output_file):
+                self._task_metrics.add_bytes("encode_pass1", os.path.getsize(output_file))
+            logger.info(f"单遍编码完成 ({encoder.name})")
+            return
+
         # 生成临时passlogfile前缀
         passlog_prefix = tempfile.mktemp(prefix="ffmpeg2pass_", dir=os.path.dirname(output_file))
-        
+
+        # 两遍各占进度区间的一半
+        pass_ranges: List[Optional[Tuple[int, int]]] = [None, None]
+        if progress_range is not None:
+            start, end = progress_range
+            middle = (start + end) // 2
+            pass_ranges = [(start, middle), (middle, end)]
+
         try:
             # ===== Pass 1: 分析阶段 =====
             pass1_cmd = [
                 self._ffmpeg_path,
                 "-hide_banner",
-                "-framerate", str(fps),
-                "-i", input_pattern,
-                "-c:v", "libx264",
-                "-profile:v", "high",
-                "-level", "4.0",
-                "-pix_fmt", "yuv420p",
-                "-b:v", bitrate,
-                "-pass", "1",
-                "-passlogfile", passlog_prefix,
+                *input_args,
+                *limit_args,
+                *encoder.bitrate_args(bitrate, 1, passlog_prefix),
                 "-an",
                 "-f", "null",
                 "-y",
                 os.devnull
             ]
-            
-            logger.info(f"执行ffmpeg 2pass第一遍: {' '.join(pass1_cmd)}")
-
-            popen_kwargs = {
-                'stdout': subprocess.PIPE,
-                'stderr': subprocess.PIPE,
-                'encoding': 'utf-8',
-                'errors': 'replace'
-            }
-            if sys.platform == 'win32':
-                popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
-
-            self._ffmpeg_process = subprocess.Popen(pass1_cmd, **popen_kwargs)
-
-            # 使用 communicate(timeout) 循环等待进程完成
-            # Python文档警告: 使用 poll() + PIPE 会导致死锁，必须用 communicate()
-            # https://docs.python.org/3/library/subprocess.html#subprocess.Popen.wait
-            stdout, stderr = "", ""
-            while True:
-                try:
-                    out, err = self._ffmpeg_process.communicate(timeout=0.5)
-                    stdout = out or ""
-                    stderr = err or ""
-                    break  # 进程已结束
-                except subprocess.TimeoutExpired:
-                    # 进程仍在运行，检查取消标志
-                    if self._cancelled:
-                        self._ffmpeg_process.kill()
-                        self._ffmpeg_process.communicate()  # 清理管道
-                        self._ffmpeg_process = None
-                        raise InterruptedError("导出已取消")
-                    # 继续等待
-
-            returncode = self._ffmpeg_process.returncode
-            self._ffmpeg_process = None
+            self._run_ffmpeg_pass(pass1_cmd, 1, total_frames or max_frames, pass_ranges[0])
 
-            if returncode != 0:
-                stderr_msg = stderr[-500:] if stderr else "未知错误"
-                logger.error(f"ffmpeg pass1 stderr: {stderr}")
-                raise RuntimeError(f"ffmpeg 2pass第一遍失败 (code {returncode}): {stderr_msg}")
-            
             # ===== 两个pass之间检查取消 =====
             if self._cancelled:
                 raise InterruptedError("导出已取消")
-            
+
             # ===== Pass 2: 编码阶段 =====
             pass2_cmd = [
                 self._ffmpeg_path,
                 "-hide_banner",
-                "-framerate", str(fps),
-                "-i", input_pattern,
-                "-c:v", "libx264",
-                "-profile:v", "high",
-                "-level", "4.0",
-                "-pix_fmt", "yuv420p",
-                "-b:v", bitrate,
-                "-pass", "2",
-                "-passlogfile", passlog_prefix,
+                *input_args,
+                *limit_args,
+                *encoder.bitrate_args(bitrate, 2, passlog_prefix),
                 "-an",
                 "-y",
                 output_file
             ]
-            
-            logger.info(f"执行ffmpeg 2pass第二遍: {' '.join(pass2_cmd)}")
-
-            popen_kwargs2 = {
-                'stdout': subprocess.PIPE,
-                'stderr': subprocess.PIPE,
-                'encoding': 'utf-8',
-                'errors': 'replace'
-            }
-            if sys.platform == 'win32':
-                popen_kwargs2['creationflags'] = subprocess.CREATE_NO_WINDOW
-
-            self._ffmpeg_process = subprocess.Popen(pass2_cmd, **popen_kwargs2)
-
-            # 使用 communicate(timeout) 循环等待进程完成
-            stdout, stderr = "", ""
-            while True:
-                try:
-                    out, err = self._ffmpeg_process.communicate(timeout=0.5)
-                    stdout = out or ""
-                    stderr = err or ""
-                    break
-                except subprocess.TimeoutExpired:
-                    if self._cancelled:
-                        self._ffmpeg_process.kill()
-                        self._ffmpeg_process.communicate()  # 清理管道
-                        self._ffmpeg_process = None
-                        raise InterruptedError("导出已取消")
-
-            returncode = self._ffmpeg_process.returncode
-            self._ffmpeg_process = None
+            self._run_ffmpeg_pass(pass2_cmd, 2, total_frames or max_frames, pass_ranges[1])
+
+            if os.path.exists(output_file):
+                self._task_metrics.add_bytes("encode_pass2", os.path.getsize(output_file))
+            logger.info(f"2pass编码完成 ({encoder.name})")
 
-            if returncode != 0:
-                stderr_msg = stderr[-500:] if stderr else "未知错误"
-                logger.error(f"ffmpeg pass2 stderr: {stderr}")
-                raise RuntimeError(f"ffmpeg 2pass第二遍失败 (code {returncode}): {stderr_msg}")
-                
-            logger.info("2pass编码完成")
-            
         finally:
-            # 确保进程引用被清理
-            self._ffmpeg_process = None
             # 清理passlogfile生成的临时文件
             # FFmpeg 创建 PREFIX-N.log 和 PREFIX-N.log.mbtree，*.log* 可匹配两者
             for f in glob.glob(f"{passlog_prefix}*.log*"):
@@ -487,6 +562,70 @@ class ExportWorker(QThread):
                 except OSError:
                     pass
 
+    def _run_ffmpeg_pass(
+        self,
+        cmd: List[str],
+        pass_number: int,
+        total_frames: Optional[int],
+        progress_range: Optional[Tuple[int, int]],
+        pass_count: int = 2
+    ):
+        """
+        运行一遍编码，把 FFmpeg 进度映射到 progress_range 区间
+
+        Args:
+            pass_number: 第几遍
+            pass_count: 总遍数（单遍编码为 1）
+
+        Raises:
+            InterruptedError: 已取消
+            RuntimeError: FFmpeg 返回非 0
+        """
+        def on_progress(progress: FFmpegProgress):
+            if progress_range is None:
+                return
+            start, end = progress_range
+            value = start + int((end - start) * progress.percent / 100)
+            details = [f"{progress.percent:.0f}%" if total_frames else f"{progress.frame} 帧"]
+            if progress.fps > 0:
+                details.append(f"{progress.fps:.0f} fps")
+            if progress.speed > 0:
+                details.append(f"{progress.speed:.2f}x")
+            if progress.eta is not None and not progress.finished:
+                details.append(f"剩余 {progress.eta:.0f}s")
+            title = f"正在编码视频 第{pass_number}/{pass_count}遍" if pass_count > 1 else "正在编码视频"
+            self.progress_updated.emit(value, f"{title}: {'  '.join(details)}")
+
+        logger.info(f"执行ffmpeg 第{pass_number}/{pass_count}遍: {' '.join(cmd)}")
+        runner = FFmpegRunner(cmd, total_frames=total_frames, on_progress=on_progress)
+        pass_start = time.perf_counter()
+        runner.start()
+        # 当前FFmpeg进程引用，供 cancel() 立即终止
+        self._ffmpeg_process = runner.process
+        try:
+            returncode = runner.wait(should_cancel=lambda: self._cancelled)
+        finally:
+            self._ffmpeg_process = None
+        self._record_ffmpeg_pass(f"encode_pass{pass_number}", time.perf_counter() - pass_start, runner.last_progress)
+
+        if returncode != 0:
+            stderr = runner.stderr_tail()
+            logger.error(f"ffmpeg pass{pass_number} stderr: {stderr}")
+            stderr_msg = stderr[-500:] if stderr else "未知错误"
+            if pass_count == 1:
+                raise RuntimeError(f"ffmpeg 编码失败 (code {returncode}): {stderr_msg}")
+            pass_name = "第一遍" if pass_number == 1 else "第二遍"
+            raise RuntimeError(f"ffmpeg 2pass{pass_name}失败 (code {returncode}): {stderr_msg}")
+
+    def _record_ffmpeg_pass(self, stage: str, seconds: float, progress: FFmpegProgress):
+        """记录一遍编码的耗时和 FFmpeg 报告的最终 speed/fps"""
+        self._task_metrics.add(stage, seconds)
+        suffix = stage.rsplit("_", 1)[-1]
+        if progress.speed > 0:
+            self._task_metrics.set_value(f"ffmpeg_speed_{suffix}", progress.speed)
+        if progress.fps > 0:
+            self._task_metrics.set_value(f"ffmpeg_fps_{suffix}", progress.fps)
+
     def _export_video_from_image(
         self,
         output_path: str,
@@ -503,12 +642,16 @@ class ExportWorker(QThread):
         padding_side = spec["padding_side"]
         rotate_180 = spec["rotate_180"]
 
+        metrics = self._task_metrics
+
         # 读取图片
         image_path = params.video_path
-        img_array = np.fromfile(image_path, dtype=np.uint8)
-        frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+        with metrics.stage("decode"):
+            img_array = np.fromfile(image_path, dtype=np.uint8)
+            frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
         if frame is None:
             raise RuntimeError(f"无法打开图片: {image_path}")
+        transform_start = time.perf_counter()
 
         # 缩放到目标分辨率
         frame = cv2.resize(frame, (target_w, target_h))
@@ -528,24 +671,22 @@ class ExportWorker(QThread):
             if pad_h > 0:
                 padding = np.zeros((pad_h, target_w, 3), dtype=np.uint8)
                 frame = np.vstack([frame, padding])
+        metrics.add("transform", time.perf_counter() - transform_start)
 
-        temp_dir = os.path.join(self._output_dir, "_temp_frames").replace("\\", "/")
-        os.makedirs(temp_dir, exist_ok=True)
+        temp_dir = self._prepare_temp_dir()
 
-        try:
-            # 生成30帧（1秒@30fps）
-            fps = 30.0
-            total_frames = 30
+        # 生成30帧（1秒@30fps）
+        fps = 30.0
+        total_frames = 30
+        store = self._create_frame_store(temp_dir, frame.shape[1], frame.shape[0], total_frames, fps)
 
+        try:
             for frame_idx in range(total_frames):
                 if self._cancelled:
                     raise InterruptedError("导出已取消")
 
-                frame_path = os.path.join(temp_dir, f"frame_{frame_idx:06d}.png").replace("\\", "/")
-                success, encoded = cv2.imencode('.png', frame)
-                if success:
-                    with open(frame_path, 'wb') as f:
-                        f.write(encoded.tobytes())
+                if self._write_intermediate_frame(store, temp_dir, frame_idx, frame):
+                    metrics.count("frames_written")
 
                 if frame_idx % 10 == 0:
                     progress = base_progress + int((frame_idx / total_frames) * 50 / total_tasks)
@@ -554,18 +695,14 @@ class ExportWorker(QThread):
             logger.info(f"成功生成 {total_frames} 帧")
 
             # 使用2pass ffmpeg编码
-            self.progress_updated.emit(base_progress + 50, "正在编码视频(2pass)...")
-            input_pattern = f"{temp_dir}/frame_%06d.png"
-            output_file = output_path.replace("\\", "/")
-
-            self._run_ffmpeg_2pass(
-                input_pattern=input_pattern,
-                output_file=output_file,
-                fps=fps,
-                bitrate="3000k"
+            self._encode_intermediate(
+                store, temp_dir, output_path, fps, total_frames,
+                self._encode_progress_range(base_progress, total_tasks)
             )
 
         finally:
+            if store is not None:
+                store.close()
             if os.path.exists(temp_dir):
                 shutil.rmtree(temp_dir)
 
@@ -598,6 +735,7 @@ class ExportService(QObject):
     progress_updated = pyqtSignal(int, str)
     export_completed = pyqtSignal(str)
     export_failed = pyqtSignal(str)
+    stage_metrics = pyqtSignal(object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -616,26 +754,7 @@ class ExportService(QObject):
 
     def _find_ffmpeg(self) -> str:
         """查找ffmpeg（支持打包环境）"""
-        # 1. 先在应用程序目录查找（支持 Nuitka/PyInstaller 打包）
-        app_ffmpeg = os.path.join(get_app_dir(), "ffmpeg.exe")
-        if os.path.isfile(app_ffmpeg):
-            return app_ffmpeg
-
-        # 2. 在当前工作目录查找
-        local_ffmpeg = os.path.join(os.getcwd(), "ffmpeg.exe")
-        if os.path.isfile(local_ffmpeg):
-            return local_ffmpeg
-
-        # 3. 在系统 PATH 中查找
-        try:
-            cmd = ["where", "ffmpeg"] if os.name == 'nt' else ["which", "ffmpeg"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip().split('\n')[0]
-        except Exception:
-            pass
-
-        return ""
+        return find_tool("ffmpeg")
 
     def export_all(
         self,
@@ -729,6 +848,7 @@ class ExportService(QObject):
         )
 
         self._worker.progress_updated.connect(self.progress_updated.emit)
+        self._worker.stage_metrics.connect(self.stage_metrics.emit)
         self._worker.export_completed.connect(self._on_completed)
         self._worker.export_failed.connect(self._on_failed)
 
@@ -0,0 +1,208 @@
+"""
+FFmpeg 进程运行器 - 解析 -progress 输出
+
+FFmpeg 加上 -progress pipe:1 后，每隔约 0.5 秒向 stdout 输出一组 key=value 行
+（frame、fps、out_time_us、speed 等），以 progress=continue / progress=end 结尾。
+读取线程逐行解析，每组结束时回调一次进度；stderr 由另一个线程读取，只保留最后若干行，
+避免长时间编码时日志在内存中堆积，又能在失败时给出错误信息。
+
+两个管道都由读取线程持续消费，主线程可以安全地 wait()，不会因管道写满而死锁。
+"""
+import sys
+import time
+import threading
+import subprocess
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, List, Callable, Deque
+
+logger = logging.getLogger(__name__)
+
+# stderr 保留的行数
+STDERR_TAIL_LINES = 200
+# 等待进程结束时检查取消标志的间隔（秒）
+POLL_INTERVAL = 0.2
+
+
+@dataclass
+class FFmpegProgress:
+    """一次进度报告"""
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0          # 相对实时的倍速，未知为 0
+    out_time: float = 0.0       # 已输出的媒体时长（秒）
+    percent: float = 0.0        # 0~100，总量未知时为 0
+    eta: Optional[float] = None  # 预计剩余秒数，未知为 None
+    finished: bool = False
+
+
+def _parse_float(value: str) -> float:
+    try:
+        return float(value.rstrip("x"))
+    except ValueError:
+        return 0.0  # "N/A"
+
+
+class FFmpegRunner:
+    """
+    运行一条 FFmpeg 命令并解析进度
+
+    runner = FFmpegRunner(cmd, total_frames=300, on_progress=callback)
+    runner.start()
+    returncode = runner.wait(should_cancel=lambda: cancelled)
+    """
+
+    def __init__(
+        self,
+        cmd: List[str],
+        total_frames: Optional[int] = None,
+        duration: Optional[float] = None,
+        on_progress: Optional[Callable[[FFmpegProgress], None]] = None,
+        stderr_lines: int = STDERR_TAIL_LINES
+    ):
+        """
+        Args:
+            cmd: FFmpeg 命令（第一个元素为可执行文件路径）
+            total_frames: 预计输出帧数（用于计算百分比）
+            duration: 预计输出时长（秒），未提供 total_frames 时使用
+            on_progress: 进度回调（在读取线程中调用）
+            stderr_lines: stderr 保留的行数
+        """
+        # -progress / -nostats 是全局选项，放在可执行文件之后即可
+        self.cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
+        self._total_frames = total_frames
+        self._duration = duration
+        self._on_progress = on_progress
+        self._stderr: Deque[str] = deque(maxlen=stderr_lines)
+        self._threads: List[threading.Thread] = []
+        self._started = 0.0
+        self.process: Optional[subprocess.Popen] = None
+        self.last_progress = FFmpegProgress()
+
+    def start(self):
+        """启动进程和读取线程"""
+        popen_kwargs = {
+            'stdout': subprocess.PIPE,
+            'stderr': subprocess.PIPE,
+            'stdin': subprocess.DEVNULL,
+            'encoding': 'utf-8',
+            'errors': 'replace',
+        }
+        if sys.platform == 'win32':
+            popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+
+        self._started = time.perf_counter()
+        self.process = subprocess.Popen(self.cmd, **popen_kwargs)
+        self._threads = [
+            threading.Thread(target=self._read_progress, name="ffmpeg-progress", daemon=True),
+            threading.Thread(target=self._read_stderr, name="ffmpeg-stderr", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _read_progress(self):
+        values = {}
+        for line in self.process.stdout:
+            key, sep, value = line.strip().partition("=")
+            if not sep:
+                continue
+            if key != "progress":
+                values[key] = value
+                continue
+
+            progress = self._make_progress(values, finished=(value == "end"))
+            self.last_progress = progress
+            values = {}
+            if self._on_progress is not None:
+                try:
+                    self._on_progress(progress)
+                except Exception as e:
+                    logger.debug(f"进度回调出错: {e}")
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            line = line.rstrip()
+            if line:
+                self._stderr.append(line)
+
+    def _make_progress(self, values: dict, finished: bool) -> FFmpegProgress:
+        frame = int(_parse_float(values.get("frame", "0")))
+        # out_time_us 为微秒；旧版本的 out_time_ms 实际也是微秒
+        out_time_us = values.get("out_time_us") or values.get("out_time_ms") or "0"
+        out_time = max(0.0, _parse_float(out_time_us) / 1_000_000)
+
+        fraction = 0.0
+        if finished:
+            fraction = 1.0
+        elif self._total_frames:
+            fraction = min(1.0, frame / self._total_frames)
+        elif self._duration:
+            fraction = min(1.0, out_time / self._duration)
+
+        eta = None
+        elapsed = time.perf_counter() - self._started
+        if 0 < fraction < 1:
+            eta = elapsed * (1 - fraction) / fraction
+        elif fraction >= 1:
+            eta = 0.0
+
+        return FFmpegProgress(
+            frame=frame,
+            fps=_parse_float(values.get("fps", "0")),
+            speed=_parse_float(values.get("speed", "0")),
+            out_time=out_time,
+            percent=fraction * 100,
+            eta=eta,
+            finished=finished
+        )
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process is not None else None
+
+    def stderr_tail(self, max_chars: Optional[int] = None) -> str:
+        """stderr 的最后若干行"""
+        text = "\n".join(self._stderr)
+        return text[-max_chars:] if max_chars else text
+
+    def terminate(self):
+        """终止进程"""
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.process.terminate()
+            except OSError as e:
+                logger.warning(f"终止FFmpeg进程时出错: {e}")
+
+    def wait(self, should_cancel: Optional[Callable[[], bool]] = None) -> int:
+        """
+        等待进程结束
+
+        Args:
+            should_cancel: 返回 True 时结束进程
+
+        Returns:
+            进程返回码
+
+        Raises:
+            InterruptedError: 已取消
+        """
+        try:
+            while True:
+                try:
+                    returncode = self.process.wait(timeout=POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if should_cancel is not None and should_cancel():
+                        self.process.kill()
+                        self.process.wait()
+                        raise InterruptedError("导出已取消")
+        finally:
+            # 进程结束后管道关闭，读取线程随即退出
+            for thread in self._threads:
+                thread.join(timeout=5)
+
+        # 取消时进程可能已被直接终止（返回码非 0），仍按取消处理
+        if returncode != 0 and should_cancel is not None and should_cancel():
+            raise InterruptedError("导出已取消")
+        return returncode
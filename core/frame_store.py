@@ -0,0 +1,209 @@
+"""
+中间帧存储 - 内存映射的原始帧文件
+
+导出时每一帧经过解码、裁剪、缩放、补边后写入一个原始 BGR 文件（而不是逐帧编码 PNG），
+2pass 编码的两遍都直接读取该文件，省去 PNG 的编码和两次解码。
+
+文件格式:
+    [0, 4096)       头部（JSON，不足部分补 0），4096 字节对齐便于内存映射
+    [4096, ...)     帧数据，每帧 height*width*3 字节（bgr24），按帧号连续存放
+
+读取方通过 np.memmap 按帧号零拷贝访问；ffmpeg 通过 rawvideo 格式加 -skip_initial_bytes 直接读取。
+"""
+import os
+import json
+import shutil
+import logging
+from typing import Optional, Iterator, Tuple, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAME_STORE_MAGIC = "EPFS"
+FRAME_STORE_VERSION = 1
+HEADER_SIZE = 4096
+# 写入前要求的额外可用空间（编码输出、日志等）
+DISK_SPACE_MARGIN = 64 * 1024 * 1024
+
+
+class FrameStoreError(Exception):
+    """帧存储错误"""
+    pass
+
+
+class InsufficientDiskSpaceError(FrameStoreError):
+    """磁盘空间不足"""
+    pass
+
+
+def check_disk_space(directory: str, required_bytes: int):
+    """
+    检查目录所在磁盘的可用空间
+
+    Raises:
+        InsufficientDiskSpaceError: 可用空间不足 required_bytes + DISK_SPACE_MARGIN
+    """
+    free = shutil.disk_usage(directory).free
+    if free < required_bytes + DISK_SPACE_MARGIN:
+        raise InsufficientDiskSpaceError(
+            f"磁盘空间不足: 需要 {(required_bytes + DISK_SPACE_MARGIN) / 1024 / 1024:.0f} MB，"
+            f"可用 {free / 1024 / 1024:.0f} MB"
+        )
+
+
+class FrameStore:
+    """
+    内存映射帧存储
+
+    写入:
+        store = FrameStore.create(path, width, height, capacity, fps)
+        store.append(frame)
+        store.close()
+
+    读取:
+        store = FrameStore.open(path)
+        frame = store[i]        # np.ndarray 视图，不复制
+    """
+
+    def __init__(self, path: str, width: int, height: int, fps: float,
+                 frames: np.memmap, count: int, writable: bool):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self._frames: Optional[np.memmap] = frames
+        self._count = count
+        self._writable = writable
+
+    @property
+    def frame_size(self) -> int:
+        return self.width * self.height * 3
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._frames is None else len(self._frames)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        if self._frames is None:
+            raise FrameStoreError("帧存储已关闭")
+        if not -self._count <= index < self._count:
+            raise IndexError(f"帧号超出范围: {index}")
+        return self._frames[index % self._count]
+
+    @staticmethod
+    def _write_header(path: str, width: int, height: int, fps: float, count: int):
+        header = json.dumps({
+            "magic": FRAME_STORE_MAGIC,
+            "version": FRAME_STORE_VERSION,
+            "width": width,
+            "height": height,
+            "pix_fmt": "bgr24",
+            "fps": fps,
+            "count": count,
+        }).encode("ascii")
+        with open(path, "r+b") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+
+    @classmethod
+    def create(cls, path: str, width: int, height: int, capacity: int, fps: float) -> "FrameStore":
+        """
+        创建可写的帧存储（预分配 capacity 帧）
+
+        Raises:
+            InsufficientDiskSpaceError: 磁盘空间不足
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        check_disk_space(directory, capacity * width * height * 3)
+
+        with open(path, "wb") as f:
+            f.truncate(HEADER_SIZE + capacity * width * height * 3)
+        cls._write_header(path, width, height, fps, 0)
+
+        frames = np.memmap(
+            path, dtype=np.uint8, mode="r+", offset=HEADER_SIZE,
+            shape=(max(1, capacity), height, width, 3)
+        )
+        return cls(path, width, height, fps, frames, 0, writable=True)
+
+    @classmethod
+    def open(cls, path: str) -> "FrameStore":
+        """
+        以只读方式打开帧存储
+
+        Raises:
+            FrameStoreError: 文件不是有效的帧存储
+        """
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.read(HEADER_SIZE).rstrip(b"\0").decode("ascii"))
+        except (OSError, ValueError) as e:
+            raise FrameStoreError(f"无法读取帧存储头部: {e}") from e
+
+        if header.get("magic") != FRAME_STORE_MAGIC or header.get("version") != FRAME_STORE_VERSION:
+            raise FrameStoreError(f"不支持的帧存储格式: {path}")
+
+        width, height, count = int(header["width"]), int(header["height"]), int(header["count"])
+        frames = None
+        if count > 0:
+            frames = np.memmap(
+                path, dtype=np.uint8, mode="r", offset=HEADER_SIZE,
+                shape=(count, height, width, 3)
+            )
+        return cls(path, width, height, float(header.get("fps", 30.0)), frames, count, writable=False)
+
+    def append(self, frame: np.ndarray):
+        """追加一帧（尺寸必须与存储一致）"""
+        if not self._writable or self._frames is None:
+            raise FrameStoreError("帧存储不可写")
+        if self._count >= len(self._frames):
+            raise FrameStoreError(f"帧存储已满: {len(self._frames)} 帧")
+        if frame.shape != (self.height, self.width, 3):
+            raise FrameStoreError(
+                f"帧尺寸不匹配: {frame.shape}，应为 {(self.height, self.width, 3)}"
+            )
+        self._frames[self._count] = frame
+        self._count += 1
+
+    def iter_frames(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """逐帧产出 (帧号, 帧视图)，与 core.video_analysis.iter_frames 的输出格式相同"""
+        for index in range(self._count):
+            yield index, self[index]
+
+    def close(self):
+        """关闭存储；可写存储会刷新数据、写入最终帧数并截去未使用的预分配空间"""
+        if self._frames is None:
+            return
+        if self._writable:
+            self._frames.flush()
+            self._frames = None
+            self._write_header(self.path, self.width, self.height, self.fps, self._count)
+            try:
+                with open(self.path, "r+b") as f:
+                    f.truncate(HEADER_SIZE + self._count * self.frame_size)
+            except OSError as e:
+                # 仍有帧视图引用映射时（Windows）无法截断；头部帧数已正确，读取不受影响
+                logger.debug(f"截断帧存储失败: {e}")
+        else:
+            self._frames = None
+
+    def __enter__(self) -> "FrameStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def ffmpeg_input_args(self) -> List[str]:
+        """ffmpeg 读取本存储的输入参数（放在输出参数之前）"""
+        return [
+            "-f", "rawvideo",
+            "-pix_fmt", "bgr24",
+            "-video_size", f"{self.width}x{self.height}",
+            "-framerate", str(self.fps),
+            "-skip_initial_bytes", str(HEADER_SIZE),
+            "-i", self.path.replace("\\", "/"),
+        ]
@@ -23,6 +23,7 @@ from config.constants import (
     LOGO_WIDTH, LOGO_HEIGHT,
     get_resolution_spec
 )
+from core.resampling import resize_cover, resize_exact
 
 logger = logging.getLogger(__name__)
 
@@ -114,16 +115,18 @@ class ImageProcessor:
         img: np.ndarray,
         target_width: int,
         target_height: int,
-        keep_aspect: bool = True
+        keep_aspect: bool = True,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
-        缩放图片
+        缩放图片（缩小用面积插值，放大用 Lanczos，见 core.resampling）
 
         Args:
             img: 输入图片
             target_width: 目标宽度
             target_height: 目标高度
-            keep_aspect: 是否保持宽高比（居中裁剪/填充）
+            keep_aspect: 是否保持宽高比（先居中裁剪再缩放）
+            out: 输出缓冲区，None 时新分配
 
         Returns:
             缩放后的图片
@@ -131,25 +134,9 @@ class ImageProcessor:
         if not HAS_CV2:
             raise ImportError("resize_image 需要 opencv-python")
 
-        h, w = img.shape[:2]
-
         if not keep_aspect:
-            return cv2.resize(img, (target_width, target_height))
-
-        # 计算缩放比例
-        scale = max(target_width / w, target_height / h)
-        new_w = int(w * scale)
-        new_h = int(h * scale)
-
-        # 缩放
-        resized = cv2.resize(img, (new_w, new_h))
-
-        # 居中裁剪
-        start_x = (new_w - target_width) // 2
-        start_y = (new_h - target_height) // 2
-        cropped = resized[start_y:start_y+target_height, start_x:start_x+target_width]
-
-        return cropped
+            return resize_exact(img, target_width, target_height, out)
+        return resize_cover(img, target_width, target_height, out)
 
     @staticmethod
     def rotate_180(img: np.ndarray) -> np.ndarray:
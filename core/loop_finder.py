@@ -0,0 +1,430 @@
+"""
+无缝循环点查找 - 为循环视频推荐入点/出点
+
+导出时循环视频播放 [入点, 出点) 区间，出点帧本身不导出，播放完出点前一帧后回到入点。
+因此出点帧与入点帧越相似，循环接缝越不明显。
+
+流程:
+1. 低分辨率解码一次（已有视频分析索引时直接使用其中的灰度缩略图）：对裁切框内区域计算感知签名（16×16 灰度缩略图 + 64 位 dHash）。
+   长视频按固定步长采样（grab() 跳帧，不做颜色转换），采样数不超过 MAX_SAMPLES。
+2. 向量化计算全部采样帧两两之间的距离矩阵（分块矩阵乘法），
+   沿对角线平滑（同时比较前后相邻帧，兼顾运动连续性）。
+3. 取距离最小且互不重叠的若干 (入点, 出点) 对；采样步长大于 1 时，
+   在候选点附近逐帧解码细化到精确帧。
+"""
+import logging
+from dataclasses import dataclass
+from typing import Optional, List, Tuple, Callable, TYPE_CHECKING
+
+import numpy as np
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+if TYPE_CHECKING:
+    from core.video_analysis import VideoAnalysis
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+    logger.warning("OpenCV 未安装，循环点查找不可用")
+
+# 灰度签名边长（16×16 = 256 维）
+SIGNATURE_SIZE = 16
+# 粗搜索最多采样帧数（距离矩阵 MAX_SAMPLES² 个 float32）
+MAX_SAMPLES = 2400
+# 计算距离矩阵时每块的行数
+DISTANCE_BLOCK = 512
+# 灰度距离与哈希距离的权重
+GRAY_WEIGHT = 0.7
+HASH_WEIGHT = 0.3
+# 默认最短循环时长（秒）
+DEFAULT_MIN_LOOP_SECONDS = 1.0
+# 默认返回的候选数量
+DEFAULT_CANDIDATES = 5
+
+
+@dataclass
+class LoopCandidate:
+    """循环点候选"""
+    in_frame: int
+    out_frame: int       # 不包含，与导出参数 end_frame 含义相同
+    score: float         # 0~1，越小越无缝
+
+    @property
+    def length(self) -> int:
+        return self.out_frame - self.in_frame
+
+
+@dataclass
+class FrameSignatures:
+    """采样帧签名"""
+    frames: np.ndarray   # 采样帧号 (N,)
+    gray: np.ndarray     # 归一化灰度签名 (N, SIGNATURE_SIZE²) float32，取值 0~1
+    bits: np.ndarray     # dHash 位 (N, 64) float32，取值 0/1
+    stride: int
+    total_frames: int
+    fps: float
+
+
+def open_capture(video_path: str):
+    """打开视频，可用时启用硬件解码（解码是整个流程的主要耗时）"""
+    try:
+        cap = cv2.VideoCapture(
+            video_path, cv2.CAP_ANY,
+            [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        )
+        if cap.isOpened():
+            return cap
+    except cv2.error:
+        pass
+    return cv2.VideoCapture(video_path)
+
+
+def _gray_signature(gray: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """由灰度图计算签名（灰度向量, dHash 位）"""
+    small = cv2.resize(gray, (SIGNATURE_SIZE, SIGNATURE_SIZE), interpolation=cv2.INTER_AREA)
+    hash_src = cv2.resize(small, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = hash_src[:, 1:] > hash_src[:, :-1]
+    return small.reshape(-1).astype(np.float32) / 255.0, bits.reshape(-1).astype(np.float32)
+
+
+def _signature(frame: np.ndarray, cropbox: Optional[Tuple[int, int, int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """计算单帧签名（灰度向量, dHash 位）"""
+    if cropbox:
+        x, y, w, h = cropbox
+        region = frame[max(0, y):y + h, max(0, x):x + w]
+        if region.size:
+            frame = region
+    return _gray_signature(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+
+
+def _read_signatures(
+    cap, start: int, count: int, cropbox, step: int = 1,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[int], None]] = None
+) -> Tuple[List[int], List[np.ndarray], List[np.ndarray]]:
+    """从 start 开始顺序读取 count 帧，每 step 帧计算一次签名"""
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frames, grays, bits = [], [], []
+    for offset in range(count):
+        if should_stop and should_stop():
+            break
+        if offset % step:
+            if not cap.grab():
+                break
+            continue
+        ok, frame = cap.read()
+        if not ok or frame is None:
+            break
+        gray, bit = _signature(frame, cropbox)
+        frames.append(start + offset)
+        grays.append(gray)
+        bits.append(bit)
+        if progress and len(frames) % 100 == 0:
+            progress(offset)
+    return frames, grays, bits
+
+
+def compute_signatures(
+    video_path: str,
+    cropbox: Optional[Tuple[int, int, int, int]] = None,
+    max_samples: int = MAX_SAMPLES,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Optional[FrameSignatures]:
+    """
+    解码视频一次，计算采样帧签名
+
+    Args:
+        video_path: 视频路径
+        cropbox: 裁切框 (x, y, w, h)，原始视频坐标
+        max_samples: 最多采样帧数
+        should_stop: 返回 True 时停止
+        progress: 进度回调 (已处理帧数, 总帧数)
+
+    Returns:
+        签名，无法读取时返回 None
+    """
+    if not HAS_CV2:
+        return None
+
+    cap = open_capture(video_path)
+    if not cap.isOpened():
+        logger.warning(f"无法打开视频: {video_path}")
+        return None
+
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if total <= 1:
+            return None
+        stride = max(1, -(-total // max_samples))
+
+        frames, grays, bits = _read_signatures(
+            cap, 0, total, cropbox, stride, should_stop,
+            (lambda done: progress(done, total)) if progress else None
+        )
+        if len(frames) < 2:
+            return None
+        return FrameSignatures(
+            frames=np.asarray(frames, dtype=np.int64),
+            gray=np.stack(grays),
+            bits=np.stack(bits),
+            stride=stride,
+            total_frames=total,
+            fps=fps
+        )
+    finally:
+        cap.release()
+
+
+def signatures_from_analysis(
+    analysis: "VideoAnalysis",
+    cropbox: Optional[Tuple[int, int, int, int]] = None,
+    max_samples: int = MAX_SAMPLES
+) -> Optional[FrameSignatures]:
+    """
+    由视频分析索引中的灰度缩略图计算签名（不解码视频）
+
+    Args:
+        analysis: 视频分析结果
+        cropbox: 裁切框 (x, y, w, h)，原始视频坐标，按比例映射到缩略图
+        max_samples: 最多采样帧数
+    """
+    if not HAS_CV2 or analysis.total_frames < 2:
+        return None
+
+    miniatures = analysis.miniatures
+    mini_h, mini_w = miniatures.shape[1:3]
+    if cropbox:
+        x, y, w, h = cropbox
+        sx, sy = mini_w / analysis.width, mini_h / analysis.height
+        x0, y0 = int(x * sx), int(y * sy)
+        x1 = max(x0 + 1, int(round((x + w) * sx)))
+        y1 = max(y0 + 1, int(round((y + h) * sy)))
+        miniatures = miniatures[:, y0:y1, x0:x1]
+
+    stride = max(1, -(-analysis.total_frames // max_samples))
+    frames = np.arange(0, analysis.total_frames, stride, dtype=np.int64)
+    grays, bits = zip(*(_gray_signature(miniatures[i]) for i in frames))
+    return FrameSignatures(
+        frames=frames,
+        gray=np.stack(grays),
+        bits=np.stack(bits),
+        stride=stride,
+        total_frames=analysis.total_frames,
+        fps=analysis.fps
+    )
+
+
+def distance_matrix(
+    gray_a: np.ndarray, bits_a: np.ndarray,
+    gray_b: np.ndarray, bits_b: np.ndarray,
+    block: int = DISTANCE_BLOCK
+) -> np.ndarray:
+    """
+    签名距离矩阵
+
+    灰度部分为 RMS 差（0~1），哈希部分为汉明距离 / 64，两者加权。
+    均通过矩阵乘法计算：|a-b|² = |a|² + |b|² - 2a·b，
+    汉明(a, b) = Σa + Σb - 2a·b（a、b 为 0/1 向量）。
+
+    Returns:
+        (len(a), len(b)) float32 矩阵
+    """
+    dim = gray_a.shape[1]
+    sq_a = np.einsum('ij,ij->i', gray_a, gray_a)
+    sq_b = np.einsum('ij,ij->i', gray_b, gray_b)
+    pop_a = bits_a.sum(axis=1)
+    pop_b = bits_b.sum(axis=1)
+
+    result = np.empty((len(gray_a), len(gray_b)), dtype=np.float32)
+    for start in range(0, len(gray_a), block):
+        end = min(start + block, len(gray_a))
+        sq = sq_a[start:end, None] + sq_b[None, :] - 2.0 * (gray_a[start:end] @ gray_b.T)
+        gray_dist = np.sqrt(np.maximum(sq, 0.0) / dim)
+        ham = pop_a[start:end, None] + pop_b[None, :] - 2.0 * (bits_a[start:end] @ bits_b.T)
+        result[start:end] = GRAY_WEIGHT * gray_dist + HASH_WEIGHT * ham / bits_a.shape[1]
+    return result
+
+
+def _smooth_diagonal(dist: np.ndarray) -> np.ndarray:
+    """沿对角线对 3 个相邻位置取平均（入点前后帧与出点前后帧同时匹配）"""
+    smoothed = dist.copy()
+    count = np.ones_like(dist)
+    smoothed[1:, 1:] += dist[:-1, :-1]
+    count[1:, 1:] += 1
+    smoothed[:-1, :-1] += dist[1:, 1:]
+    count[:-1, :-1] += 1
+    return smoothed / count
+
+
+def _select_candidates(
+    score: np.ndarray, min_gap: int, count: int, radius: int
+) -> List[Tuple[int, int, float]]:
+    """
+    选取得分最小且互不重叠的 (i, j) 对
+
+    Args:
+        score: 平滑后的距离矩阵
+        min_gap: j - i 的最小值（采样下标）
+        count: 数量
+        radius: 抑制半径（采样下标），入点和出点都落在已选候选半径内的跳过
+    """
+    n = score.shape[0]
+    rows, cols = np.triu_indices(n, k=max(1, min_gap))
+    if rows.size == 0:
+        return []
+    values = score[rows, cols]
+
+    # 只对最好的一部分排序
+    keep = min(values.size, max(count * 200, 1000))
+    order = np.argpartition(values, keep - 1)[:keep]
+    order = order[np.argsort(values[order])]
+
+    selected: List[Tuple[int, int, float]] = []
+    for idx in order:
+        i, j = int(rows[idx]), int(cols[idx])
+        if any(abs(i - si) <= radius and abs(j - sj) <= radius for si, sj, _ in selected):
+            continue
+        selected.append((i, j, float(values[idx])))
+        if len(selected) >= count:
+            break
+    return selected
+
+
+def _refine(
+    cap, signatures: FrameSignatures, in_frame: int, out_frame: int, cropbox
+) -> Tuple[int, int, float]:
+    """在粗搜索结果附近逐帧解码，细化到精确帧"""
+    stride = signatures.stride
+    total = signatures.total_frames
+
+    in_start = max(0, in_frame - stride)
+    out_start = max(0, out_frame - stride)
+    in_frames, in_gray, in_bits = _read_signatures(cap, in_start, 2 * stride + 1, cropbox)
+    out_frames, out_gray, out_bits = _read_signatures(
+        cap, out_start, min(2 * stride + 1, total - out_start), cropbox
+    )
+    if not in_frames or not out_frames:
+        return in_frame, out_frame, float("inf")
+
+    dist = _smooth_diagonal(distance_matrix(
+        np.stack(in_gray), np.stack(in_bits), np.stack(out_gray), np.stack(out_bits)
+    ))
+    i, j = np.unravel_index(int(np.argmin(dist)), dist.shape)
+    return in_frames[i], out_frames[j], float(dist[i, j])
+
+
+def find_loop_points(
+    video_path: str,
+    cropbox: Optional[Tuple[int, int, int, int]] = None,
+    min_length: Optional[int] = None,
+    count: int = DEFAULT_CANDIDATES,
+    signatures: Optional[FrameSignatures] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> List[LoopCandidate]:
+    """
+    查找无缝循环点
+
+    Args:
+        video_path: 视频路径
+        cropbox: 裁切框 (x, y, w, h)，原始视频坐标；只比较框内画面
+        min_length: 最短循环帧数，None 时为 1 秒
+        count: 返回的候选数量
+        signatures: 已计算的签名（如由 signatures_from_analysis() 得到）
+        should_stop: 返回 True 时停止
+        progress: 解码进度回调 (已处理帧数, 总帧数)
+
+    Returns:
+        按得分从好到差排列的候选列表
+    """
+    if signatures is None:
+        signatures = compute_signatures(video_path, cropbox, should_stop=should_stop, progress=progress)
+    if signatures is None or (should_stop and should_stop()):
+        return []
+
+    if min_length is None:
+        min_length = max(2, int(round(signatures.fps * DEFAULT_MIN_LOOP_SECONDS)))
+    stride = signatures.stride
+    min_gap = max(1, -(-min_length // stride))
+
+    dist = _smooth_diagonal(distance_matrix(
+        signatures.gray, signatures.bits, signatures.gray, signatures.bits
+    ))
+    radius = max(1, min_gap // 2)
+    coarse = _select_candidates(dist, min_gap, count, radius)
+
+    candidates = []
+    if stride == 1:
+        candidates = [
+            LoopCandidate(int(signatures.frames[i]), int(signatures.frames[j]), s)
+            for i, j, s in coarse
+        ]
+    else:
+        cap = open_capture(video_path)
+        try:
+            for i, j, s in coarse:
+                if should_stop and should_stop():
+                    break
+                in_frame, out_frame, fine = _refine(
+                    cap, signatures, int(signatures.frames[i]), int(signatures.frames[j]), cropbox
+                )
+                if out_frame - in_frame < min_length:
+                    in_frame, out_frame, fine = int(signatures.frames[i]), int(signatures.frames[j]), s
+                candidates.append(LoopCandidate(in_frame, out_frame, min(fine, s)))
+        finally:
+            cap.release()
+
+    candidates.sort(key=lambda c: c.score)
+    return candidates
+
+
+class LoopFinderWorker(QThread):
+    """后台循环点查找线程"""
+
+    progress_updated = pyqtSignal(int, int)     # (已处理帧数, 总帧数)
+    candidates_found = pyqtSignal(list)         # List[LoopCandidate]
+    search_failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        video_path: str,
+        cropbox: Optional[Tuple[int, int, int, int]] = None,
+        min_length: Optional[int] = None,
+        count: int = DEFAULT_CANDIDATES,
+        analysis: Optional["VideoAnalysis"] = None,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.cropbox = cropbox
+        self._min_length = min_length
+        self._count = count
+        self._analysis = analysis
+
+    def run(self):
+        try:
+            signatures = None
+            if self._analysis is not None:
+                signatures = signatures_from_analysis(self._analysis, self.cropbox)
+            candidates = find_loop_points(
+                self.video_path, self.cropbox, self._min_length, self._count,
+                signatures=signatures,
+                should_stop=self.isInterruptionRequested,
+                progress=self.progress_updated.emit
+            )
+            if self.isInterruptionRequested():
+                return
+            if not candidates:
+                self.search_failed.emit("未找到合适的循环点")
+                return
+            self.candidates_found.emit(candidates)
+        except Exception as e:
+            logger.exception("查找循环点失败")
+            self.search_failed.emit(str(e))
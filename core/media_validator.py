@@ -0,0 +1,346 @@
+"""
+媒体一致性校验 - 检查导出视频的编码、分辨率、帧数和码率
+
+每个视频只调用一次 ffprobe，结果按文件内容哈希缓存（持久化到缓存目录），
+素材未变化时重复校验无需再次探测。
+"""
+import os
+import json
+import threading
+import subprocess
+import logging
+import sys
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Tuple, TYPE_CHECKING
+
+from config.constants import (
+    get_resolution_spec, MICROSECONDS_PER_SECOND,
+    DEVICE_VIDEO_CODEC, DEVICE_PIX_FMT,
+    DEVICE_MAX_BITRATE, DEVICE_MAX_PIXEL_RATE
+)
+from core.validator import ValidationLevel, ValidationResult
+from utils.file_utils import compute_file_hash, find_tool, get_cache_dir
+
+if TYPE_CHECKING:
+    from core.asset_index import AssetIndex
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "media_probe_cache.json"
+CACHE_VERSION = 1
+
+
+@dataclass
+class MediaProbe:
+    """ffprobe 探测结果"""
+    codec: str
+    pix_fmt: str
+    width: int
+    height: int
+    fps: float
+    frame_count: int
+    duration: float  # 秒
+    bit_rate: int    # 比特/秒
+
+    @classmethod
+    def from_ffprobe(cls, data: dict) -> "MediaProbe":
+        """从 ffprobe -of json 输出解析"""
+        streams = data.get("streams") or []
+        if not streams:
+            raise ValueError("未找到视频流")
+        stream = streams[0]
+        fmt = data.get("format") or {}
+
+        fps = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+        duration = _parse_float(stream.get("duration")) or _parse_float(fmt.get("duration"))
+
+        # mp4 头部通常带 nb_frames；缺失时回退到 -count_packets 统计的包数
+        frame_count = _parse_int(stream.get("nb_frames")) or _parse_int(stream.get("nb_read_packets"))
+        if frame_count == 0 and duration > 0 and fps > 0:
+            frame_count = round(duration * fps)
+
+        bit_rate = _parse_int(stream.get("bit_rate")) or _parse_int(fmt.get("bit_rate"))
+
+        return cls(
+            codec=stream.get("codec_name", ""),
+            pix_fmt=stream.get("pix_fmt", ""),
+            width=_parse_int(stream.get("width")),
+            height=_parse_int(stream.get("height")),
+            fps=fps,
+            frame_count=frame_count,
+            duration=duration,
+            bit_rate=bit_rate
+        )
+
+
+def _parse_rate(value: Optional[str]) -> float:
+    """解析 "30000/1001" 形式的帧率"""
+    if not value:
+        return 0.0
+    try:
+        if '/' in value:
+            num, den = value.split('/', 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def _parse_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _parse_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class MediaProbeCache:
+    """
+    媒体探测缓存（线程安全）
+
+    以文件内容 SHA-256 为键保存探测结果；另记录 (路径, 大小, 修改时间) -> 哈希，
+    文件未变化时连哈希也无需重新计算。
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Args:
+            cache_path: 缓存文件路径，None 使用默认缓存目录
+        """
+        self._cache_path = cache_path or os.path.join(get_cache_dir("media"), CACHE_FILENAME)
+        self._lock = threading.Lock()
+        self._probes: Dict[str, dict] = {}
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        """加载持久化缓存"""
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._probes = data.get("probes", {})
+                self._hashes = {k: tuple(v) for k, v in data.get("hashes", {}).items()}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """保存缓存（无变化时跳过）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "version": CACHE_VERSION,
+                "probes": self._probes,
+                "hashes": self._hashes,
+            }
+            self._dirty = False
+        tmp_path = f"{self._cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            logger.warning(f"保存媒体探测缓存失败: {e}")
+
+    def file_hash(self, path: str) -> str:
+        """获取文件哈希（大小和修改时间不变时复用上次结果）"""
+        st = os.stat(path)
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+
+        digest = compute_file_hash(path)
+        with self._lock:
+            self._hashes[key] = (st.st_size, st.st_mtime_ns, digest)
+            self._dirty = True
+        return digest
+
+    def get(self, digest: str) -> Optional[MediaProbe]:
+        with self._lock:
+            data = self._probes.get(digest)
+        if data is None:
+            return None
+        try:
+            return MediaProbe(**data)
+        except TypeError:
+            return None
+
+    def put(self, digest: str, probe: MediaProbe):
+        with self._lock:
+            self._probes[digest] = asdict(probe)
+            self._dirty = True
+
+
+class MediaConformanceValidator:
+    """
+    导出视频一致性校验器
+
+    检查项:
+    - 编码为 H.264、像素格式为 yuv420p
+    - 分辨率与 RESOLUTION_SPECS 中的对齐尺寸一致
+    - intro 帧数与 intro.duration 对应
+    - 码率和像素吞吐不超过设备解码预算
+    """
+
+    # intro 帧数允许的误差（帧）
+    FRAME_COUNT_TOLERANCE = 2
+
+    def __init__(
+        self,
+        ffprobe_path: str = "",
+        cache: Optional[MediaProbeCache] = None,
+        asset_index: Optional["AssetIndex"] = None
+    ):
+        """
+        Args:
+            ffprobe_path: ffprobe 路径，为空时自动查找
+            cache: 探测缓存，可在多个校验器之间共享
+            asset_index: 项目素材索引，提供时先查索引中的媒体信息（文件未变化时不计算哈希）
+        """
+        self.ffprobe_path = ffprobe_path or find_tool("ffprobe")
+        self.cache = cache if cache is not None else MediaProbeCache()
+        self.asset_index = asset_index
+
+    def probe(self, path: str) -> MediaProbe:
+        """
+        探测视频（命中缓存时不调用 ffprobe）
+
+        Raises:
+            RuntimeError: ffprobe 不可用或探测失败
+        """
+        if self.asset_index is not None:
+            info = self.asset_index.media_info(path)
+            if info is not None:
+                try:
+                    return MediaProbe(**info)
+                except TypeError:
+                    pass
+            digest = self.asset_index.file_hash(path)
+        else:
+            digest = self.cache.file_hash(path)
+        cached = self.cache.get(digest)
+        if cached is not None:
+            if self.asset_index is not None:
+                self.asset_index.set_media_info(path, asdict(cached))
+            return cached
+
+        if not self.ffprobe_path:
+            raise RuntimeError("未找到ffprobe，无法进行媒体校验")
+
+        cmd = [
+            self.ffprobe_path, "-v", "error",
+            "-select_streams", "v:0",
+            "-count_packets",
+            "-show_entries",
+            "stream=codec_name,pix_fmt,width,height,avg_frame_rate,r_frame_rate,"
+            "nb_frames,nb_read_packets,duration,bit_rate:format=duration,bit_rate",
+            "-of", "json",
+            path
+        ]
+        run_kwargs = {}
+        if sys.platform == 'win32':
+            run_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+
+        try:
+            result = subprocess.run(
+                cmd, capture_output=True, text=True,
+                encoding='utf-8', errors='replace', timeout=60, **run_kwargs
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError("ffprobe 超时")
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe 失败: {result.stderr.strip()[-200:]}")
+
+        try:
+            probe = MediaProbe.from_ffprobe(json.loads(result.stdout))
+        except ValueError as e:
+            raise RuntimeError(f"无法解析 ffprobe 输出: {e}")
+
+        self.cache.put(digest, probe)
+        if self.asset_index is not None:
+            self.asset_index.set_media_info(path, asdict(probe))
+        return probe
+
+    def validate(self, config: dict, base_dir: str) -> List[ValidationResult]:
+        """
+        校验配置引用的导出视频
+
+        Args:
+            config: 配置字典
+            base_dir: 素材目录
+
+        Returns:
+            校验结果列表
+        """
+        results: List[ValidationResult] = []
+        spec = get_resolution_spec(config.get("screen", "360x640"))
+
+        loop = config.get("loop") or {}
+        if loop.get("file") and not loop.get("is_image"):
+            self._validate_video(results, "loop.file", os.path.join(base_dir, loop["file"]), spec)
+
+        intro = config.get("intro") or {}
+        if intro.get("enabled") and intro.get("file"):
+            self._validate_video(
+                results, "intro.file", os.path.join(base_dir, intro["file"]), spec,
+                expected_duration_us=intro.get("duration", 0)
+            )
+
+        return results
+
+    def _validate_video(
+        self,
+        results: List[ValidationResult],
+        field: str,
+        path: str,
+        spec: dict,
+        expected_duration_us: int = 0
+    ):
+        """校验单个视频文件"""
+        if not os.path.isfile(path):
+            return  # 文件存在性由 EPConfigValidator 负责
+
+        def add(level: ValidationLevel, message: str):
+            results.append(ValidationResult(level, field, message))
+
+        try:
+            probe = self.probe(path)
+        except (OSError, RuntimeError) as e:
+            add(ValidationLevel.ERROR, f"无法探测视频: {e}")
+            return
+
+        if probe.codec != DEVICE_VIDEO_CODEC:
+            add(ValidationLevel.ERROR, f"编码必须为{DEVICE_VIDEO_CODEC}，当前为: {probe.codec}")
+        if probe.pix_fmt != DEVICE_PIX_FMT:
+            add(ValidationLevel.ERROR, f"像素格式必须为{DEVICE_PIX_FMT}，当前为: {probe.pix_fmt}")
+
+        padded = (spec["padded_width"], spec["padded_height"])
+        if (probe.width, probe.height) != padded:
+            add(ValidationLevel.ERROR,
+                f"分辨率必须为{padded[0]}x{padded[1]}，当前为: {probe.width}x{probe.height}")
+
+        if expected_duration_us > 0 and probe.fps > 0:
+            expected_frames = round(expected_duration_us / MICROSECONDS_PER_SECOND * probe.fps)
+            if abs(probe.frame_count - expected_frames) > self.FRAME_COUNT_TOLERANCE:
+                add(ValidationLevel.WARNING,
+                    f"帧数 {probe.frame_count} 与 duration 对应的 {expected_frames} 帧不一致")
+
+        if probe.bit_rate > DEVICE_MAX_BITRATE:
+            add(ValidationLevel.WARNING,
+                f"码率 {probe.bit_rate // 1000}kbps 超过设备解码预算 "
+                f"{DEVICE_MAX_BITRATE // 1000}kbps，可能播放卡顿")
+
+        pixel_rate = probe.width * probe.height * probe.fps
+        if pixel_rate > DEVICE_MAX_PIXEL_RATE:
+            add(ValidationLevel.WARNING,
+                f"帧率 {probe.fps:.1f}fps 在当前分辨率下超过设备解码预算")
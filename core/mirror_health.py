@@ -0,0 +1,199 @@
+"""
+镜像健康度跟踪 - 按历史表现为更新源排序
+
+对每个 UpdateSource 记录（指数加权移动平均，EWMA）:
+- 响应时间（秒）
+- 下载吞吐（字节/秒）
+- 失败率（0~1）
+
+连续失败达到阈值时熔断该源一段时间（circuit breaker），期间排序时跳过；
+冷却结束后允许一次试探请求，成功则恢复，失败则冷却时间翻倍。
+数据保存在缓存目录的小 JSON 文件中，跨启动保留。
+"""
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import dataclass, asdict, fields
+from typing import Optional, List, Dict
+
+from config.constants import (
+    UpdateSource,
+    MIRROR_EWMA_ALPHA, MIRROR_CIRCUIT_FAILURES,
+    MIRROR_CIRCUIT_COOLDOWN, MIRROR_CIRCUIT_MAX_COOLDOWN
+)
+from utils.file_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+
+# 没有响应时间记录（只有吞吐或失败记录）时假定的响应时间（秒）
+DEFAULT_LATENCY = 1.0
+# 失败率对得分的放大系数：失败率 50% 的源得分约为原来的 3 倍
+FAILURE_PENALTY = 4.0
+# 计算吞吐时忽略过小的传输（响应头、短 JSON）
+MIN_THROUGHPUT_BYTES = 64 * 1024
+# 以此大小估算传输耗时，把吞吐折算进得分
+REFERENCE_TRANSFER_SIZE = 1024 * 1024
+
+
+@dataclass
+class MirrorStats:
+    """单个源的健康数据"""
+    latency: Optional[float] = None      # 响应时间 EWMA（秒）
+    throughput: Optional[float] = None   # 吞吐 EWMA（字节/秒）
+    failure_rate: float = 0.0            # 失败率 EWMA
+    consecutive_failures: int = 0
+    open_until: float = 0.0              # 熔断截止时间（time.time()）
+    cooldown: float = 0.0                # 当前熔断冷却时长
+    samples: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MirrorStats":
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+
+def _ewma(previous: Optional[float], value: float, alpha: float = MIRROR_EWMA_ALPHA) -> float:
+    return value if previous is None else previous + alpha * (value - previous)
+
+
+class MirrorHealthTracker:
+    """镜像健康度跟踪器（线程安全）"""
+
+    def __init__(self, store_name: str, store_path: Optional[str] = None):
+        """
+        Args:
+            store_name: 存储名称（如 "api"、"download"），不同用途的源分开统计
+            store_path: 存储文件路径，None 使用默认缓存目录
+        """
+        self._store_path = store_path or os.path.join(
+            get_cache_dir("update"), f"mirror_health_{store_name}.json"
+        )
+        self._lock = threading.Lock()
+        self._stats: Dict[str, MirrorStats] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self._store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == STORE_VERSION:
+                self._stats = {
+                    name: MirrorStats.from_dict(item)
+                    for name, item in data.get("mirrors", {}).items()
+                }
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+
+    def save(self):
+        """写入存储文件"""
+        with self._lock:
+            data = {
+                "version": STORE_VERSION,
+                "mirrors": {name: asdict(stats) for name, stats in self._stats.items()},
+            }
+        tmp_path = f"{self._store_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._store_path)
+        except OSError as e:
+            logger.warning(f"保存镜像健康数据失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 记录
+    # ------------------------------------------------------------------
+
+    def record_success(
+        self,
+        name: str,
+        latency: Optional[float] = None,
+        nbytes: int = 0,
+        elapsed: float = 0.0
+    ):
+        """
+        记录一次成功请求
+
+        Args:
+            name: 源名称
+            latency: 响应时间（秒）
+            nbytes: 传输字节数
+            elapsed: 传输耗时（秒），与 nbytes 一起计算吞吐
+        """
+        with self._lock:
+            stats = self._stats.setdefault(name, MirrorStats())
+            if latency is not None:
+                stats.latency = _ewma(stats.latency, latency)
+            if nbytes >= MIN_THROUGHPUT_BYTES and elapsed > 0:
+                stats.throughput = _ewma(stats.throughput, nbytes / elapsed)
+            stats.failure_rate = _ewma(stats.failure_rate, 0.0)
+            stats.consecutive_failures = 0
+            stats.open_until = 0.0
+            stats.cooldown = 0.0
+            stats.samples += 1
+
+    def record_failure(self, name: str):
+        """记录一次失败，连续失败达到阈值时熔断"""
+        with self._lock:
+            stats = self._stats.setdefault(name, MirrorStats())
+            stats.failure_rate = _ewma(stats.failure_rate, 1.0)
+            stats.consecutive_failures += 1
+            stats.samples += 1
+
+            if stats.consecutive_failures >= MIRROR_CIRCUIT_FAILURES:
+                # 首次熔断使用基础冷却时间，试探失败后翻倍
+                stats.cooldown = min(
+                    stats.cooldown * 2 if stats.cooldown else MIRROR_CIRCUIT_COOLDOWN,
+                    MIRROR_CIRCUIT_MAX_COOLDOWN
+                )
+                stats.open_until = time.time() + stats.cooldown
+                logger.info(f"源 {name} 连续失败 {stats.consecutive_failures} 次，暂停 {stats.cooldown:.0f} 秒")
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def get_stats(self, name: str) -> MirrorStats:
+        with self._lock:
+            stats = self._stats.get(name)
+            return MirrorStats(**asdict(stats)) if stats else MirrorStats()
+
+    def get_latency(self, name: str) -> Optional[float]:
+        with self._lock:
+            stats = self._stats.get(name)
+            return stats.latency if stats else None
+
+    def is_available(self, name: str) -> bool:
+        """源是否未处于熔断状态"""
+        with self._lock:
+            stats = self._stats.get(name)
+            return stats is None or time.time() >= stats.open_until
+
+    def score(self, source: UpdateSource) -> float:
+        """
+        源得分（预计耗时，越小越好）
+
+        响应时间 + 以参考大小折算的传输时间，再按失败率放大。
+        没有历史数据的源得分最低（按 priority 排列），保证每个源至少被尝试一次。
+        """
+        with self._lock:
+            stats = self._stats.get(source.name)
+            if stats is None:
+                return source.priority * 0.001
+            latency = stats.latency if stats.latency is not None else DEFAULT_LATENCY
+            transfer = REFERENCE_TRANSFER_SIZE / stats.throughput if stats.throughput else 0.0
+            return (latency + transfer) * (1.0 + FAILURE_PENALTY * stats.failure_rate)
+
+    def rank(self, sources: List[UpdateSource]) -> List[UpdateSource]:
+        """
+        按得分排序，跳过熔断中的源
+
+        全部熔断时返回全部源（总要尝试一次，而不是直接放弃）。
+        """
+        available = [s for s in sources if self.is_available(s.name)]
+        if not available:
+            available = list(sources)
+        return sorted(available, key=lambda s: (self.score(s), s.priority))
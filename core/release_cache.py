@@ -0,0 +1,137 @@
+"""
+Release 元数据缓存 - 持久化最近一次更新检查的结果
+
+记录内容:
+- 最近一次成功检查的时间和 Release 信息，检查间隔内直接复用
+- 各更新源返回的 ETag，下次请求附带 If-None-Match，未变化时服务器返回 304
+
+各源的响应时间由 core/mirror_health.py 统计。
+"""
+import os
+import json
+import time
+import logging
+import threading
+from dataclasses import asdict
+from typing import Optional, Dict, TYPE_CHECKING
+
+from config.constants import UPDATE_CHECK_INTERVAL_HOURS
+from utils.file_utils import get_cache_dir
+
+if TYPE_CHECKING:
+    from core.update_service import ReleaseInfo
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILENAME = "release_cache.json"
+CACHE_VERSION = 1
+
+
+class ReleaseCache:
+    """Release 元数据缓存（线程安全）"""
+
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Args:
+            cache_path: 缓存文件路径，None 使用默认缓存目录
+        """
+        self._cache_path = cache_path or os.path.join(get_cache_dir("update"), CACHE_FILENAME)
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._release: Optional[dict] = None
+        self._etags: Dict[str, str] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self._cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return
+            self._checked_at = float(data.get("checked_at", 0))
+            self._release = data.get("release")
+            self._etags = dict(data.get("etags", {}))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+
+    def save(self):
+        """写入缓存文件（先写临时文件再替换，避免中途退出损坏缓存）"""
+        with self._lock:
+            data = {
+                "version": CACHE_VERSION,
+                "checked_at": self._checked_at,
+                "release": self._release,
+                "etags": self._etags,
+            }
+        tmp_path = f"{self._cache_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            logger.warning(f"保存更新缓存失败: {e}")
+
+    # ------------------------------------------------------------------
+    # 检查间隔与 Release
+    # ------------------------------------------------------------------
+
+    def is_fresh(self, interval_hours: float = UPDATE_CHECK_INTERVAL_HOURS) -> bool:
+        """距上次成功检查是否仍在间隔内"""
+        with self._lock:
+            if self._release is None:
+                return False
+            return time.time() - self._checked_at < interval_hours * 3600
+
+    def get_release(self) -> Optional["ReleaseInfo"]:
+        """获取缓存的 Release 信息"""
+        from core.update_service import ReleaseInfo
+
+        with self._lock:
+            data = self._release
+        if not data:
+            return None
+        try:
+            return ReleaseInfo(**data)
+        except TypeError:
+            return None
+
+    def store_release(self, release: "ReleaseInfo", source_name: str = "", etag: str = ""):
+        """
+        记录一次成功的检查
+
+        Release 变化时清除其他源的 ETag：它们对应旧的 Release，之后返回 304 会误用新缓存的结果。
+
+        Args:
+            release: 检查结果
+            source_name: 返回该结果的源
+            etag: 该源返回的 ETag（与 release 对应）
+        """
+        data = asdict(release)
+        with self._lock:
+            if data != self._release:
+                self._etags.clear()
+            self._release = data
+            self._checked_at = time.time()
+            if source_name:
+                self._set_etag(source_name, etag)
+
+    # ------------------------------------------------------------------
+    # ETag
+    # ------------------------------------------------------------------
+
+    def get_etag(self, source_name: str) -> str:
+        """获取源的 ETag（没有缓存的 Release 时不返回，避免 304 后无数据可用）"""
+        with self._lock:
+            if self._release is None:
+                return ""
+            return self._etags.get(source_name, "")
+
+    def set_etag(self, source_name: str, etag: str):
+        with self._lock:
+            self._set_etag(source_name, etag)
+
+    def _set_etag(self, source_name: str, etag: str):
+        if etag:
+            self._etags[source_name] = etag
+        else:
+            self._etags.pop(source_name, None)
@@ -0,0 +1,250 @@
+"""
+模拟器 IPC 客户端 - 通过 --stdio 与常驻的 Rust 模拟器通信
+
+协议为每行一个 JSON 消息（见 simulator/src/ipc/protocol.rs）:
+    {"type": "load_config", "payload": {"config": {...}, "base_dir": "...", "cropbox": [x, y, w, h], "rotation": 0}}
+    {"type": "control", "payload": "play"}
+    {"type": "set_transition", "payload": {"transition_in": "fade", "transition_loop": "move"}}
+    {"type": "shutdown"}
+模拟器回复 ready / state_update / error。
+
+模拟器进程在多次预览之间保持运行，配置或裁切框变化时只重新发送 load_config，
+内容与上次发送的完全相同时跳过，避免重复加载视频。
+"""
+import sys
+import json
+import logging
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Optional, List, Tuple, Callable, Any, IO
+
+logger = logging.getLogger(__name__)
+
+READY_TIMEOUT = 10.0
+SHUTDOWN_TIMEOUT = 3.0
+
+
+@dataclass
+class SimulatorState:
+    """模拟器上报的播放状态"""
+    state: int = 0
+    frame: int = 0
+    is_playing: bool = False
+
+
+class SimulatorClient:
+    """
+    常驻模拟器会话
+
+    用法:
+        client = SimulatorClient(simulator_path, app_dir)
+        client.start()
+        client.load_config(config_dict, base_dir, cropbox, rotation)
+        client.control("play")
+        ...
+        client.shutdown()
+    """
+
+    def __init__(
+        self,
+        simulator_path: str,
+        app_dir: str = "",
+        on_state: Optional[Callable[[SimulatorState], None]] = None,
+        on_error: Optional[Callable[[int, str], None]] = None
+    ):
+        """
+        Args:
+            simulator_path: 模拟器可执行文件路径
+            app_dir: 程序资源目录（--app-dir）
+            on_state: 收到 state_update 时的回调（在读取线程中调用）
+            on_error: 收到 error 时的回调（在读取线程中调用）
+        """
+        self.simulator_path = simulator_path
+        self.app_dir = app_dir
+        self._on_state = on_state
+        self._on_error = on_error
+
+        self._process: Optional[subprocess.Popen] = None
+        self._reader_thread: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._state = SimulatorState()
+        self._last_load: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    @property
+    def state(self) -> SimulatorState:
+        return self._state
+
+    def start(self, extra_args: Optional[List[str]] = None):
+        """
+        启动模拟器进程（已在运行时直接返回）
+
+        不等待 ready：模拟器就绪前写入的消息会留在管道缓冲中，就绪后按顺序处理。
+
+        Args:
+            extra_args: 额外的命令行参数
+        """
+        if self.is_running:
+            return
+
+        args = [self.simulator_path, "--stdio"]
+        if self.app_dir:
+            args += ["--app-dir", self.app_dir]
+        if extra_args:
+            args += extra_args
+
+        popen_kwargs = {}
+        if sys.platform == 'win32':
+            popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+
+        self._ready.clear()
+        self._last_load = None
+        self._process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            **popen_kwargs
+        )
+        self._reader_thread = threading.Thread(
+            target=self._read_loop, args=(self._process.stdout,), daemon=True
+        )
+        self._reader_thread.start()
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT) -> bool:
+        """等待模拟器发送 ready 消息"""
+        return self._ready.wait(timeout)
+
+    def _read_loop(self, stdout: IO[str]):
+        """读取线程：解析模拟器输出"""
+        for line in stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                # 日志等非协议输出
+                logger.debug(f"模拟器输出: {line}")
+                continue
+            if isinstance(message, dict):
+                self._dispatch(message)
+        logger.info("模拟器会话已结束")
+
+    def _dispatch(self, message: dict):
+        msg_type = message.get("type")
+        payload: Any = message.get("payload") or {}
+
+        if msg_type == "ready":
+            self._ready.set()
+            logger.info("模拟器会话已就绪")
+        elif msg_type == "state_update":
+            self._state = SimulatorState(
+                state=int(payload.get("state", 0)),
+                frame=int(payload.get("frame", 0)),
+                is_playing=bool(payload.get("is_playing", False))
+            )
+            if self._on_state:
+                self._on_state(self._state)
+        elif msg_type == "error":
+            code = int(payload.get("code", 0))
+            text = payload.get("message", "")
+            logger.warning(f"模拟器错误 {code}: {text}")
+            if self._on_error:
+                self._on_error(code, text)
+
+    def _send(self, message: dict) -> bool:
+        """发送一行 JSON 消息"""
+        if not self.is_running:
+            return False
+        line = json.dumps(message, ensure_ascii=False) + "\n"
+        try:
+            with self._write_lock:
+                self._process.stdin.write(line)
+                self._process.stdin.flush()
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning(f"向模拟器发送消息失败: {e}")
+            return False
+
+    def load_config(
+        self,
+        config: dict,
+        base_dir: str,
+        cropbox: Optional[Tuple[int, int, int, int]] = None,
+        rotation: int = 0,
+        force: bool = False
+    ) -> bool:
+        """
+        推送配置（内容与上次相同时跳过）
+
+        Args:
+            config: 配置字典（EPConfig.to_dict()）
+            base_dir: 素材目录
+            cropbox: 循环视频裁切框（原始视频坐标）
+            rotation: 循环视频旋转角度
+            force: 即使未变化也重新发送
+
+        Returns:
+            是否发送了消息
+        """
+        payload = {
+            "config": config,
+            "base_dir": base_dir,
+            "cropbox": list(cropbox) if cropbox else None,
+            "rotation": rotation,
+        }
+        message = {"type": "load_config", "payload": payload}
+        key = json.dumps(message, sort_keys=True, ensure_ascii=False)
+        if not force and key == self._last_load:
+            return False
+
+        if self._send(message):
+            self._last_load = key
+            return True
+        return False
+
+    def control(self, command: str) -> bool:
+        """
+        发送控制命令
+
+        Args:
+            command: play / pause / stop / reset
+        """
+        return self._send({"type": "control", "payload": command})
+
+    def seek_to(self, state: int) -> bool:
+        """跳转到指定播放状态"""
+        return self._send({"type": "control", "payload": {"seek_to": state}})
+
+    def set_transition(self, transition_in: str, transition_loop: str) -> bool:
+        """设置过渡效果"""
+        return self._send({
+            "type": "set_transition",
+            "payload": {"transition_in": transition_in, "transition_loop": transition_loop},
+        })
+
+    def shutdown(self):
+        """关闭模拟器进程"""
+        if self._process is None:
+            return
+        if self.is_running:
+            self._send({"type": "shutdown"})
+            try:
+                self._process.wait(timeout=SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        try:
+            self._process.stdin.close()
+        except (OSError, ValueError):
+            pass
+        self._process = None
+        self._last_load = None
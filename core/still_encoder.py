@@ -0,0 +1,350 @@
+"""
+静态图片编码 - 可调压缩的 PNG 编码和流式 ARGB 写入
+
+PNG:
+- 压缩级别 0-9 和 zlib 策略（default/filtered/huffman/rle/fixed）可调。
+  导出视频时的临时帧用 TRANSIENT_PNG（级别 1、只做霍夫曼编码，速度和体积都较好），
+  最终导出的图片用 FINAL_PNG（级别 9，尝试多种策略取最小，并做无损颜色缩减）。
+- 无损颜色缩减: 完全不透明时去掉 alpha；灰度图写为灰度；不超过 256 种颜色时写为调色板
+  （颜色少时用 1/2/4 位深）。调色板 PNG 由纯标准库写出，OpenCV 不支持。
+- 纯标准库编码器按行自适应选择 PNG 滤波器（None/Sub/Up/Average/Paeth），没有 OpenCV 时也能使用。
+
+ARGB: 按块写入 BGRA 字节（每像素 b, g, r, a），块之间可检查取消。
+
+每次编码返回 EncodeStats（字节数、耗时、实际使用的格式），用于按素材调整速度和包体大小。
+"""
+import os
+import time
+import zlib
+import struct
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple, Callable
+
+import numpy as np
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+logger = logging.getLogger(__name__)
+
+# zlib 策略（数值与 zlib 的 Z_* 常量及 OpenCV 的 IMWRITE_PNG_STRATEGY_* 相同）
+PNG_STRATEGIES = {
+    "default": 0,
+    "filtered": 1,
+    "huffman": 2,
+    "rle": 3,
+    "fixed": 4,
+}
+# optimize=True 时尝试的策略
+OPTIMIZE_STRATEGIES = ("default", "filtered", "huffman", "rle")
+# 写入 ARGB 时每块的行数
+ARGB_CHUNK_ROWS = 64
+
+# PNG 颜色类型
+COLOR_GRAY = 0
+COLOR_RGB = 2
+COLOR_PALETTE = 3
+COLOR_GRAY_ALPHA = 4
+COLOR_RGBA = 6
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass(frozen=True)
+class PngOptions:
+    """PNG 编码选项"""
+    level: int = 6
+    strategy: str = "default"
+    reduce_colors: bool = False  # 无损颜色缩减（调色板/灰度/去掉不透明 alpha）
+    optimize: bool = False       # 尝试 OPTIMIZE_STRATEGIES 取最小
+
+    def __post_init__(self):
+        if not 0 <= self.level <= 9:
+            raise ValueError(f"PNG 压缩级别必须在 0-9 之间: {self.level}")
+        if self.strategy not in PNG_STRATEGIES:
+            raise ValueError(f"未知的 PNG 压缩策略: {self.strategy}")
+
+
+# 导出视频的临时帧（马上被 FFmpeg 读取后删除）
+TRANSIENT_PNG = PngOptions(level=1, strategy="huffman")
+# 最终导出的图片（icon.png、class_icon.png、ark_logo.png）
+FINAL_PNG = PngOptions(level=9, reduce_colors=True, optimize=True)
+
+
+@dataclass
+class EncodeStats:
+    """一次编码的统计"""
+    asset: str
+    bytes: int
+    seconds: float
+    detail: str = ""  # 实际格式，如 "palette 4bit level 9 default"
+
+    def __str__(self) -> str:
+        return f"{self.asset}: {self.bytes / 1024:.1f} KB, {self.seconds * 1000:.1f} ms ({self.detail})"
+
+
+@dataclass
+class _PngImage:
+    """PNG 编码前的像素数据"""
+    color_type: int
+    bit_depth: int
+    rows: np.ndarray        # (高, 每行字节数) uint8，未滤波
+    bpp: int                # 滤波时的每像素字节数（至少 1）
+    palette: bytes = b""
+    transparency: bytes = b""
+
+    @property
+    def description(self) -> str:
+        names = {COLOR_GRAY: "gray", COLOR_RGB: "rgb", COLOR_PALETTE: "palette",
+                 COLOR_GRAY_ALPHA: "gray+alpha", COLOR_RGBA: "rgba"}
+        return f"{names[self.color_type]} {self.bit_depth}bit"
+
+
+def _chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def _pack_indices(indices: np.ndarray, bit_depth: int) -> np.ndarray:
+    """把调色板索引按位深打包为字节（每行末尾补 0）"""
+    if bit_depth == 8:
+        return indices.astype(np.uint8)
+    per_byte = 8 // bit_depth
+    height, width = indices.shape
+    padded_width = -(-width // per_byte) * per_byte
+    padded = np.zeros((height, padded_width), dtype=np.uint8)
+    padded[:, :width] = indices
+    packed = np.zeros((height, padded_width // per_byte), dtype=np.uint8)
+    for k in range(per_byte):
+        packed |= padded[:, k::per_byte] << (8 - bit_depth * (k + 1))
+    return packed
+
+
+def _prepare(image: np.ndarray, reduce_colors: bool) -> _PngImage:
+    """转换为 PNG 像素布局（RGB 顺序），可选无损颜色缩减"""
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    if image.ndim == 3 and image.shape[2] == 1:
+        image = image[:, :, 0]
+
+    if image.ndim == 2:
+        return _PngImage(COLOR_GRAY, 8, image.reshape(height, width), 1)
+
+    has_alpha = image.shape[2] == 4
+    if reduce_colors:
+        if has_alpha and bool((image[:, :, 3] == 255).all()):
+            image, has_alpha = image[:, :, :3], False
+
+        channels = image.shape[2]
+        packed = image.reshape(-1, channels)
+        keys = packed[:, 0].astype(np.uint32) | (packed[:, 1].astype(np.uint32) << 8) \
+            | (packed[:, 2].astype(np.uint32) << 16)
+        if has_alpha:
+            keys |= packed[:, 3].astype(np.uint32) << 24
+        colors, indices = np.unique(keys, return_inverse=True)
+
+        if len(colors) <= 256:
+            bit_depth = next(d for d in (1, 2, 4, 8) if len(colors) <= 1 << d)
+            b = (colors & 0xFF).astype(np.uint8)
+            g = ((colors >> 8) & 0xFF).astype(np.uint8)
+            r = ((colors >> 16) & 0xFF).astype(np.uint8)
+            palette = np.stack([r, g, b], axis=1).tobytes()
+            transparency = b""
+            if has_alpha:
+                alpha = ((colors >> 24) & 0xFF).astype(np.uint8)
+                # tRNS 只需写到最后一个非不透明颜色
+                last = np.nonzero(alpha < 255)[0]
+                if len(last):
+                    transparency = alpha[:last[-1] + 1].tobytes()
+            rows = _pack_indices(indices.reshape(height, width), bit_depth)
+            return _PngImage(COLOR_PALETTE, bit_depth, rows, 1, palette, transparency)
+
+        if bool((image[:, :, 0] == image[:, :, 1]).all() and (image[:, :, 1] == image[:, :, 2]).all()):
+            if has_alpha:
+                rows = image[:, :, [0, 3]].reshape(height, -1)
+                return _PngImage(COLOR_GRAY_ALPHA, 8, rows, 2)
+            return _PngImage(COLOR_GRAY, 8, np.ascontiguousarray(image[:, :, 0]), 1)
+
+    if has_alpha:
+        return _PngImage(COLOR_RGBA, 8, image[:, :, [2, 1, 0, 3]].reshape(height, -1), 4)
+    return _PngImage(COLOR_RGB, 8, image[:, :, 2::-1].reshape(height, -1), 3)
+
+
+def _filter_rows(rows: np.ndarray, bpp: int, adaptive: bool) -> bytes:
+    """
+    PNG 行滤波
+
+    滤波只依赖未滤波的原始字节，五种滤波可以对整幅图一次性向量化计算，
+    再按行选择绝对值和最小的一种（libpng 的启发式）。
+    """
+    height = rows.shape[0]
+    if not adaptive:
+        return np.hstack([np.zeros((height, 1), dtype=np.uint8), rows]).tobytes()
+
+    x = rows.astype(np.int16)
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    up_left = np.zeros_like(x)
+    up_left[1:, bpp:] = x[:-1, :-bpp]
+
+    p = left + up - up_left
+    pa, pb, pc = np.abs(p - left), np.abs(p - up), np.abs(p - up_left)
+    paeth = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+
+    candidates = np.stack([
+        x,
+        x - left,
+        x - up,
+        x - ((left + up) >> 1),
+        x - paeth,
+    ]).astype(np.uint8)
+    # 按有符号字节的绝对值和选择
+    cost = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    choice = cost.argmin(axis=0)
+    filtered = candidates[choice, np.arange(height)]
+    return np.hstack([choice.astype(np.uint8)[:, np.newaxis], filtered]).tobytes()
+
+
+def _encode_stdlib(png: _PngImage, width: int, height: int, level: int, strategy: str) -> bytes:
+    """纯标准库写出 PNG"""
+    # 调色板和低位深图片滤波效果差，按 PNG 规范建议不滤波
+    adaptive = png.color_type != COLOR_PALETTE and png.bit_depth == 8
+    raw = _filter_rows(png.rows, png.bpp, adaptive)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, PNG_STRATEGIES[strategy])
+    data = compressor.compress(raw) + compressor.flush()
+
+    header = struct.pack(">IIBBBBB", width, height, png.bit_depth, png.color_type, 0, 0, 0)
+    parts = [PNG_SIGNATURE, _chunk(b"IHDR", header)]
+    if png.palette:
+        parts.append(_chunk(b"PLTE", png.palette))
+    if png.transparency:
+        parts.append(_chunk(b"tRNS", png.transparency))
+    parts += [_chunk(b"IDAT", data), _chunk(b"IEND", b"")]
+    return b"".join(parts)
+
+
+def _encode_cv2(image: np.ndarray, level: int, strategy: str) -> Optional[bytes]:
+    success, encoded = cv2.imencode(".png", image, [
+        cv2.IMWRITE_PNG_COMPRESSION, level,
+        cv2.IMWRITE_PNG_STRATEGY, PNG_STRATEGIES[strategy],
+    ])
+    return encoded.tobytes() if success else None
+
+
+def encode_png(
+    image: np.ndarray,
+    options: PngOptions = PngOptions(),
+    use_cv2: Optional[bool] = None,
+    asset: str = ""
+) -> Tuple[bytes, EncodeStats]:
+    """
+    编码 PNG
+
+    Args:
+        image: 灰度、BGR 或 BGRA 图片（uint8）
+        options: 编码选项
+        use_cv2: 是否用 OpenCV 编码非调色板图片，None 表示有 OpenCV 就用
+        asset: 统计中的素材名
+
+    Returns:
+        (PNG 字节, 统计)
+    """
+    start = time.perf_counter()
+    if use_cv2 is None:
+        use_cv2 = HAS_CV2
+    height, width = image.shape[:2]
+    png = _prepare(image, options.reduce_colors)
+    strategies = OPTIMIZE_STRATEGIES if options.optimize else (options.strategy,)
+
+    best: Optional[bytes] = None
+    best_strategy = options.strategy
+    for strategy in strategies:
+        data = None
+        if use_cv2 and png.color_type in (COLOR_GRAY, COLOR_RGB, COLOR_RGBA):
+            # OpenCV（libpng）更快；按缩减后的通道数传入 BGR/BGRA/灰度
+            if png.color_type == COLOR_RGB and image.ndim == 3 and image.shape[2] == 4:
+                source = image[:, :, :3]
+            elif png.color_type == COLOR_GRAY and image.ndim == 3:
+                source = image[:, :, 0]
+            else:
+                source = image
+            data = _encode_cv2(source, options.level, strategy)
+        if data is None:
+            data = _encode_stdlib(png, width, height, options.level, strategy)
+        if best is None or len(data) < len(best):
+            best, best_strategy = data, strategy
+
+    stats = EncodeStats(
+        asset=asset,
+        bytes=len(best),
+        seconds=time.perf_counter() - start,
+        detail=f"{png.description} level {options.level} {best_strategy}"
+    )
+    return best, stats
+
+
+def write_png(image: np.ndarray, path: str, options: PngOptions = PngOptions(),
+              use_cv2: Optional[bool] = None) -> EncodeStats:
+    """
+    编码 PNG 并写入文件（支持中文路径）
+
+    先写临时文件再替换，目标是硬链接时不会改写链接的另一端。
+
+    Raises:
+        OSError: 写入失败
+    """
+    data, stats = encode_png(image, options, use_cv2, asset=os.path.basename(path))
+    write_start = time.perf_counter()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    stats.seconds += time.perf_counter() - write_start
+    return stats
+
+
+def to_bgra(image: np.ndarray) -> np.ndarray:
+    """灰度/BGR/BGRA 转为 BGRA（uint8）"""
+    image = image.astype(np.uint8, copy=False)
+    if image.ndim == 2:
+        image = image[:, :, np.newaxis]
+    channels = image.shape[2]
+    if channels == 4:
+        return image
+    bgra = np.empty(image.shape[:2] + (4,), dtype=np.uint8)
+    bgra[:, :, :3] = image[:, :, :3] if channels == 3 else image[:, :, :1]
+    bgra[:, :, 3] = 255
+    return bgra
+
+
+def write_argb(
+    image: np.ndarray,
+    path: str,
+    should_cancel: Optional[Callable[[], bool]] = None,
+    chunk_rows: int = ARGB_CHUNK_ROWS
+) -> EncodeStats:
+    """
+    写入 ARGB 文件（每像素 b, g, r, a 四个字节，按行顺序，不旋转）
+
+    Raises:
+        InterruptedError: should_cancel 返回 True
+        OSError: 写入失败
+    """
+    start = time.perf_counter()
+    bgra = np.ascontiguousarray(to_bgra(image))
+    with open(path, "wb") as f:
+        for row in range(0, bgra.shape[0], chunk_rows):
+            if should_cancel is not None and should_cancel():
+                raise InterruptedError("导出已取消")
+            f.write(bgra[row:row + chunk_rows].tobytes())
+    return EncodeStats(
+        asset=os.path.basename(path),
+        bytes=bgra.nbytes,
+        seconds=time.perf_counter() - start,
+        detail="argb"
+    )
@@ -0,0 +1,266 @@
+"""
+项目模板 - 多个通行证共用的叠加样式、职业图标、Logo 和过渡图片
+
+模板保存在模板缓存目录（get_cache_dir("templates")/<模板名>/）:
+    template.json                              模板名、共用的配置字段和预处理图片清单
+    class_icon.png / ark_logo.png              已缩放到导出尺寸的职业图标和 Logo
+    trans_in_image.png / trans_loop_image.png  已缩放的过渡图片
+
+- save_template(): 把项目的共用部分存为模板，共用图片只在这里处理一次
+- create_from_template(): 新建项目时拷贝共用配置，预处理好的图片以 reflink/硬链接放进项目目录
+  （见 core.asset_importer），不解码、不缩放
+- is_prerendered(): 导出时交给 BatchImageProcessor，源图片的内容哈希与模板清单一致时
+  直接链接到导出目录，跳过解码、缩放和编码
+
+每个通行证不同的部分（名称、图标、循环/入场视频）不进入模板。
+"""
+import os
+import re
+import json
+import shutil
+import threading
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.epconfig import EPConfig, get_field, set_field
+from config.constants import ARK_CLASS_ICON_SIZE, ARK_LOGO_SIZE, TRANSITION_IMAGE_SIZE
+from core.asset_importer import import_asset
+from core.autosave import encode_value, decode_value
+from core.batch_image_processor import BatchImageProcessor, ImageJob, ImageTarget
+from utils.file_utils import get_cache_dir, compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_FILENAME = "template.json"
+TEMPLATE_VERSION = 1
+
+# 模板保存的配置字段（整个字段拷贝，叠加选项中的干员名等作为新项目的默认值）
+SHARED_FIELDS = ("screen", "transition_in", "transition_loop", "overlay")
+
+
+@dataclass(frozen=True)
+class SharedImage:
+    """模板中预处理的图片"""
+    field_path: str      # 配置中引用该图片的字段
+    filename: str        # 模板目录和新项目中的文件名
+    target: ImageTarget  # 导出时的处理目标
+
+
+SHARED_IMAGES = (
+    SharedImage("overlay.arknights_options.operator_class_icon", "class_icon.png",
+                ImageTarget.resize(*ARK_CLASS_ICON_SIZE)),
+    SharedImage("overlay.arknights_options.logo", "ark_logo.png", ImageTarget.resize(*ARK_LOGO_SIZE)),
+    SharedImage("transition_in.options.image", "trans_in_image.png",
+                ImageTarget.resize(*TRANSITION_IMAGE_SIZE, keep_aspect=True)),
+    SharedImage("transition_loop.options.image", "trans_loop_image.png",
+                ImageTarget.resize(*TRANSITION_IMAGE_SIZE, keep_aspect=True)),
+)
+
+
+@dataclass
+class ProjectTemplate:
+    """一个项目模板"""
+    name: str
+    path: str                                     # 模板目录
+    config: EPConfig                              # 只有 SHARED_FIELDS 有意义，图片为模板目录中的文件名
+    images: Dict[str, Tuple[str, ImageTarget]]    # 文件名 -> (内容 SHA-256, 处理目标)
+
+    def image_path(self, filename: str) -> str:
+        return os.path.join(self.path, filename)
+
+
+def get_templates_dir() -> str:
+    """模板缓存目录"""
+    return get_cache_dir("templates")
+
+
+def _dir_name(name: str) -> str:
+    """模板名 -> 目录名（去掉文件名中不允许的字符）"""
+    return re.sub(r'[\\/:*?"<>|]', "_", name).strip(" .") or "template"
+
+
+def _read_field(config: EPConfig, path: str):
+    """读取字段，路径中间的对象为 None（如未设置过渡选项）时返回 None"""
+    try:
+        return get_field(config, path)
+    except AttributeError:
+        return None
+
+
+def load_template(path: str) -> ProjectTemplate:
+    """
+    读取模板目录
+
+    Raises:
+        OSError: 无法读取 template.json
+        ValueError: 内容格式错误
+    """
+    with open(os.path.join(path, TEMPLATE_FILENAME), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    try:
+        config = EPConfig()
+        for name, value in data["fields"].items():
+            if name in SHARED_FIELDS:
+                setattr(config, name, decode_value(value))
+        images = {
+            filename: (entry["sha256"], ImageTarget(**entry["target"]))
+            for filename, entry in data.get("images", {}).items()
+        }
+        return ProjectTemplate(data["name"], path, config, images)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"模板格式错误: {e}")
+
+
+def list_templates() -> List[ProjectTemplate]:
+    """所有模板（按名称排序），无法读取的模板跳过"""
+    root = get_templates_dir()
+    templates = []
+    try:
+        entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+    except OSError:
+        return []
+    for entry in entries:
+        if not entry.is_dir() or entry.name.endswith(".tmp"):
+            continue
+        try:
+            templates.append(load_template(entry.path))
+        except (OSError, ValueError) as e:
+            logger.warning(f"无法读取模板 {entry.path}: {e}")
+    return sorted(templates, key=lambda template: template.name)
+
+
+def save_template(
+    name: str,
+    config: EPConfig,
+    base_dir: str,
+    processor: Optional[BatchImageProcessor] = None
+) -> ProjectTemplate:
+    """
+    把项目的共用部分保存为模板（同名模板被替换）
+
+    Args:
+        name: 模板名
+        config: 项目配置
+        base_dir: 项目目录（解析配置中的相对路径）
+        processor: 图片处理器（可复用已有实例的缓存）
+
+    Returns:
+        保存的模板
+
+    Raises:
+        OSError: 写入模板目录失败
+    """
+    processor = processor or BatchImageProcessor()
+    path = os.path.join(get_templates_dir(), _dir_name(name))
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    template_config = EPConfig()
+    for field_name in SHARED_FIELDS:
+        value = getattr(config, field_name)
+        setattr(template_config, field_name, value.copy() if hasattr(value, "copy") else value)
+
+    # 共用图片按导出目标处理，写入模板目录
+    jobs: Dict[SharedImage, ImageJob] = {}
+    for image in SHARED_IMAGES:
+        source = _read_field(config, image.field_path)
+        if not source:
+            continue
+        if not os.path.isabs(source):
+            source = os.path.join(base_dir, source)
+        if os.path.isfile(source):
+            jobs[image] = ImageJob(source, image.target, os.path.join(tmp_path, image.filename))
+        else:
+            logger.warning(f"模板图片不存在，已跳过: {source}")
+
+    images: Dict[str, Tuple[str, ImageTarget]] = {}
+    results = dict(zip(jobs, processor.run(list(jobs.values()))))
+    for image in SHARED_IMAGES:
+        if _read_field(template_config, image.field_path) is None:
+            continue
+        result = results.get(image)
+        if result is not None and result.ok:
+            images[image.filename] = (compute_file_hash(result.job.output_path), image.target)
+            set_field(template_config, image.field_path, image.filename)
+        else:
+            set_field(template_config, image.field_path, "")
+
+    data = {
+        "version": TEMPLATE_VERSION,
+        "name": name,
+        "fields": {field_name: encode_value(getattr(template_config, field_name)) for field_name in SHARED_FIELDS},
+        "images": {
+            filename: {"sha256": digest, "target": asdict(target)}
+            for filename, (digest, target) in images.items()
+        },
+    }
+    with open(os.path.join(tmp_path, TEMPLATE_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+    # 替换旧模板（已链接到项目中的旧图片不受影响）
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    _register(images.values())
+    logger.info(f"已保存模板 {name}: {len(images)} 张预处理图片")
+    return ProjectTemplate(name, path, template_config, images)
+
+
+def create_from_template(template: ProjectTemplate, base_dir: str) -> EPConfig:
+    """
+    按模板新建项目配置，预处理好的图片放进项目目录（已有相同内容的文件时直接使用）
+
+    Args:
+        template: 模板
+        base_dir: 新项目目录
+
+    Returns:
+        新的配置（新 UUID，图片为项目目录中的相对路径）
+
+    Raises:
+        OSError: 图片放入项目目录失败
+    """
+    config = EPConfig()
+    for field_name in SHARED_FIELDS:
+        value = getattr(template.config, field_name)
+        setattr(config, field_name, value.copy() if hasattr(value, "copy") else value)
+
+    for image in SHARED_IMAGES:
+        filename = _read_field(config, image.field_path)
+        if not filename:
+            continue
+        source = template.image_path(filename)
+        if filename not in template.images or not os.path.isfile(source):
+            logger.warning(f"模板 {template.name} 缺少图片 {filename}")
+            set_field(config, image.field_path, "")
+            continue
+        base_name, _ = os.path.splitext(image.filename)
+        result = import_asset(source, base_dir, base_name)
+        set_field(config, image.field_path, result.rel_path)
+        logger.debug(f"模板图片 {filename} -> {result.dest_path} ({result.method})")
+    return config
+
+
+# 所有模板中预处理图片的 (内容 SHA-256, 处理目标)，首次查询时从模板目录读取
+_prerendered: Optional[Set[Tuple[str, ImageTarget]]] = None
+_prerendered_lock = threading.Lock()
+
+
+def _register(entries):
+    with _prerendered_lock:
+        if _prerendered is not None:
+            _prerendered.update(entries)
+
+
+def is_prerendered(digest: str, target: ImageTarget) -> bool:
+    """
+    内容哈希为 digest 的图片是否已是模板中按 target 处理好的图片
+
+    作为 BatchImageProcessor 的 prerendered 参数，导出时这些图片直接链接，不再处理。
+    """
+    global _prerendered
+    with _prerendered_lock:
+        if _prerendered is None:
+            _prerendered = {entry for template in list_templates() for entry in template.images.values()}
+        return (digest, target) in _prerendered
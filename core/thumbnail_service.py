@@ -0,0 +1,223 @@
+"""
+缩略图服务 - 为时间轴胶片条稀疏解码视频
+
+只解码均匀分布的少量帧（间隔小时用 grab() 跳过中间帧，间隔大时直接 seek 到目标帧，
+由解码器从最近的关键帧开始解码），缩放到缩略图高度。
+结果按视频快速指纹缓存到磁盘，再次打开同一视频时直接读取。
+"""
+import os
+import logging
+from typing import Optional, Iterator, Tuple, List, Callable, TYPE_CHECKING
+
+import numpy as np
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from utils.file_utils import compute_quick_hash, get_cache_dir
+
+if TYPE_CHECKING:
+    from core.asset_index import AssetIndex
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+    logger.warning("OpenCV 未安装，时间轴缩略图不可用")
+
+THUMBNAIL_HEIGHT = 40
+MAX_THUMBNAILS = 120
+# 帧间隔不小于此值时改用 seek，而不是逐帧 grab()
+SEEK_STRIDE = 48
+
+
+def compute_stride(total_frames: int, max_count: int = MAX_THUMBNAILS) -> int:
+    """计算缩略图帧间隔"""
+    if total_frames <= 0:
+        return 1
+    return max(1, -(-total_frames // max_count))
+
+
+def iter_thumbnails(
+    video_path: str,
+    height: int = THUMBNAIL_HEIGHT,
+    max_count: int = MAX_THUMBNAILS,
+    should_stop: Optional[Callable[[], bool]] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    稀疏解码视频，逐个产出缩略图
+
+    Args:
+        video_path: 视频路径
+        height: 缩略图高度（宽度按比例）
+        max_count: 最多产出的缩略图数量
+        should_stop: 返回 True 时停止
+
+    Yields:
+        (帧号, BGR 缩略图)
+    """
+    if not HAS_CV2:
+        return
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.warning(f"无法打开视频: {video_path}")
+        return
+
+    try:
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        src_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if total_frames <= 0 or width <= 0 or src_height <= 0:
+            return
+
+        thumb_size = (max(1, round(width * height / src_height)), height)
+        stride = compute_stride(total_frames, max_count)
+        use_seek = stride >= SEEK_STRIDE
+
+        position = 0  # 下一次 grab() 将读取的帧号
+        for index in range(0, total_frames, stride):
+            if should_stop and should_stop():
+                return
+
+            if use_seek:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            else:
+                while position < index:
+                    if not cap.grab():
+                        return
+                    position += 1
+
+            ok, frame = cap.read()
+            position = index + 1
+            if not ok or frame is None:
+                return
+
+            yield index, cv2.resize(frame, thumb_size, interpolation=cv2.INTER_AREA)
+    finally:
+        cap.release()
+
+
+class ThumbnailCache:
+    """缩略图磁盘缓存（每个视频一个 .npz 文件）"""
+
+    def __init__(self, cache_dir: Optional[str] = None, asset_index: Optional["AssetIndex"] = None):
+        """
+        Args:
+            cache_dir: 缓存目录，None 使用默认缓存目录
+            asset_index: 项目素材索引，提供时复用其中的视频指纹，并登记缓存文件（视频变化后删除）
+        """
+        self.cache_dir = cache_dir or get_cache_dir("thumbs")
+        self._asset_index = asset_index
+
+    def _path(self, video_path: str, height: int, max_count: int) -> str:
+        if self._asset_index is not None:
+            key = self._asset_index.quick_hash(video_path)
+        else:
+            key = compute_quick_hash(video_path)
+        return os.path.join(self.cache_dir, f"{key}_{height}_{max_count}.npz")
+
+    def load(
+        self, video_path: str, height: int, max_count: int
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        读取缓存
+
+        Returns:
+            (帧号数组, 缩略图数组 N×H×W×3)，未命中返回 None
+        """
+        try:
+            path = self._path(video_path, height, max_count)
+            if not os.path.exists(path):
+                return None
+            with np.load(path) as data:
+                result = data["indices"], data["frames"]
+            if self._asset_index is not None:
+                self._asset_index.set_artifact(video_path, f"thumbs_{height}_{max_count}", path)
+            return result
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"读取缩略图缓存失败: {e}")
+            return None
+
+    def save(
+        self, video_path: str, height: int, max_count: int,
+        indices: List[int], frames: List[np.ndarray]
+    ):
+        """写入缓存"""
+        if not frames:
+            return
+        try:
+            path = self._path(video_path, height, max_count)
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(
+                tmp_path, indices=np.asarray(indices, dtype=np.int32), frames=np.stack(frames)
+            )
+            os.replace(tmp_path, path)
+            if self._asset_index is not None:
+                self._asset_index.set_artifact(video_path, f"thumbs_{height}_{max_count}", path)
+        except (OSError, ValueError) as e:
+            logger.debug(f"保存缩略图缓存失败: {e}")
+
+
+def bgr_to_qimage(frame: np.ndarray) -> QImage:
+    """BGR 数组转 QImage（深拷贝，可跨线程传递）"""
+    rgb = np.ascontiguousarray(frame[:, :, ::-1])
+    h, w = rgb.shape[:2]
+    return QImage(rgb.data, w, h, 3 * w, QImage.Format.Format_RGB888).copy()
+
+
+class ThumbnailWorker(QThread):
+    """
+    后台缩略图生成线程
+
+    缓存命中时一次性发出全部缩略图；否则边解码边发出，时间轴逐步显示。
+    """
+
+    thumbnail_ready = pyqtSignal(int, QImage)  # (帧号, 缩略图)
+    thumbnails_finished = pyqtSignal(int)      # 缩略图数量
+
+    def __init__(
+        self,
+        video_path: str,
+        height: int = THUMBNAIL_HEIGHT,
+        max_count: int = MAX_THUMBNAILS,
+        cache: Optional[ThumbnailCache] = None,
+        parent=None
+    ):
+        super().__init__(parent)
+        self.video_path = video_path
+        self._height = height
+        self._max_count = max_count
+        self._cache = cache or ThumbnailCache()
+
+    def run(self):
+        try:
+            cached = self._cache.load(self.video_path, self._height, self._max_count)
+            if cached is not None:
+                indices, frames = cached
+                for index, frame in zip(indices, frames):
+                    if self.isInterruptionRequested():
+                        return
+                    self.thumbnail_ready.emit(int(index), bgr_to_qimage(frame))
+                self.thumbnails_finished.emit(len(indices))
+                return
+
+            indices: List[int] = []
+            frames: List[np.ndarray] = []
+            for index, frame in iter_thumbnails(
+                self.video_path, self._height, self._max_count,
+                should_stop=self.isInterruptionRequested
+            ):
+                indices.append(index)
+                frames.append(frame)
+                self.thumbnail_ready.emit(index, bgr_to_qimage(frame))
+
+            if self.isInterruptionRequested():
+                return
+            self._cache.save(self.video_path, self._height, self._max_count, indices, frames)
+            self.thumbnails_finished.emit(len(indices))
+        except Exception as e:
+            logger.warning(f"生成缩略图失败: {e}")
@@ -25,7 +25,16 @@ urlopen() 会阻塞整个线程直到网络响应返回。
 
 ### 多源策略
 - 竞速策略 (Race)：同时请求所有源，取最快成功的结果 → 用于更新检测
-- 故障转移策略 (Failover)：按优先级依次尝试 → 用于文件下载
+- 故障转移策略 (Failover)：按优先级依次尝试 → 用于文件下载（见 core/download_engine.py）
+
+### 条件请求与缓存
+检查结果保存在 ReleaseCache 中（见 core/release_cache.py）：检查间隔内直接复用；
+超过间隔时附带 If-None-Match，Release 未变化时服务器返回 304，无需重新下载 JSON。
+
+### 镜像健康度
+MirrorHealthTracker（见 core/mirror_health.py）记录各源的响应时间、吞吐和失败率，
+竞速只请求得分最好的前几个源，并先给最快的源一段领先时间（对冲请求）；
+连续失败的源会被暂时熔断。
 """
 import os
 import re
@@ -34,17 +43,22 @@ import logging
 import tempfile
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, Future, FIRST_COMPLETED
 from typing import Optional, Tuple, List, Dict, Callable, TypeVar, Generic
 from dataclasses import dataclass
+from urllib.error import HTTPError
 from urllib.request import urlopen, Request
 
 from PyQt6.QtCore import QThread, pyqtSignal, QObject
 
 from config.constants import (
     GITHUB_OWNER, GITHUB_REPO,
-    UpdateSource, UPDATE_API_SOURCES, DOWNLOAD_SOURCES
+    UpdateSource, UPDATE_API_SOURCES, DOWNLOAD_SOURCES,
+    DOWNLOAD_PARALLEL_SEGMENTS, MIRROR_RACE_TOP_K
 )
+from core.download_engine import DownloadEngine, parse_asset_digest
+from core.mirror_health import MirrorHealthTracker
+from core.release_cache import ReleaseCache
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +66,10 @@ logger = logging.getLogger(__name__)
 GITHUB_API_BASE = "https://api.github.com"
 USER_AGENT = "ArknightsPassMaker-Updater/1.0"
 
+# 对冲请求：最快源在 (历史响应时间 × 系数) 内未返回时再请求其余源
+HEDGE_LATENCY_FACTOR = 2.0
+HEDGE_MIN_DELAY = 0.5
+
 T = TypeVar('T')
 
 
@@ -66,6 +84,7 @@ class ReleaseInfo:
     download_url: str      # Direct download URL for .exe installer
     download_size: int     # File size in bytes
     html_url: str          # Web URL to release page
+    download_sha256: str = ""  # SHA-256 of the installer (from asset digest), may be empty
 
 
 @dataclass
@@ -127,23 +146,36 @@ class MultiSourceRequestManager:
     实现依据: https://docs.python.org/3/library/concurrent.futures.html
 
     竞速策略 (race_request):
-        同时向所有源发起请求，使用 as_completed() 按完成顺序处理，
+        同时向多个源发起请求，使用 as_completed() 按完成顺序处理，
         返回第一个成功的结果，并取消其余请求。
 
     故障转移策略 (failover_request):
-        按优先级顺序依次尝试各源，直到成功或全部失败。
+        按顺序依次尝试各源，直到成功或全部失败。
+
+    提供 MirrorHealthTracker 时，源按历史表现排序（跳过熔断中的源），
+    竞速只请求得分最好的前 k 个源，全部失败后再尝试其余源；
+    每个请求的结果都会记录到跟踪器中。未提供时按 priority 排序、竞速请求全部源。
     """
 
-    def __init__(self, max_workers: int = 5):
+    def __init__(
+        self,
+        max_workers: int = 5,
+        health: Optional[MirrorHealthTracker] = None,
+        race_top_k: int = MIRROR_RACE_TOP_K
+    ):
         """
         初始化请求管理器
 
         Args:
             max_workers: 线程池最大线程数
+            health: 镜像健康度跟踪器
+            race_top_k: 有健康数据时竞速同时请求的源数量
         """
         self._executor: Optional[ThreadPoolExecutor] = None
         self._max_workers = max_workers
         self._cancelled = threading.Event()
+        self._health = health
+        self._race_top_k = max(1, race_top_k)
 
     def _ensure_executor(self):
         """确保线程池已创建"""
@@ -158,14 +190,22 @@ class MultiSourceRequestManager:
         """重置取消状态"""
         self._cancelled.clear()
 
+    def rank_sources(self, sources: List[UpdateSource]) -> List[UpdateSource]:
+        """按健康度（无跟踪器时按 priority）排序已启用的源"""
+        enabled_sources = [s for s in sources if s.enabled]
+        if self._health is not None:
+            return self._health.rank(enabled_sources)
+        return sorted(enabled_sources, key=lambda s: s.priority)
+
     def race_request(
         self,
         sources: List[UpdateSource],
         request_func: Callable[[UpdateSource], T],
-        progress_callback: Optional[Callable[[str], None]] = None
+        progress_callback: Optional[Callable[[str], None]] = None,
+        hedge_delay: Optional[float] = None
     ) -> SourceResult[T]:
         """
-        竞速策略：同时请求所有源，返回最快成功的结果
+        竞速策略：同时请求多个源，返回最快成功的结果
 
         根据 concurrent.futures 官方文档:
         "as_completed() returns an iterator over the Future instances...
@@ -175,25 +215,75 @@ class MultiSourceRequestManager:
             sources: 更新源列表
             request_func: 执行请求的函数，接收 UpdateSource 参数
             progress_callback: 可选的进度回调函数
+            hedge_delay: 对冲延迟（秒）。设置后先只请求排名第一的源，
+                在该时间内未成功返回时再请求其余源；None 时根据
+                排名第一的源的历史响应时间自动计算（无数据则同时请求）
 
         Returns:
             SourceResult 包含第一个成功源的数据，或错误信息
         """
-        enabled_sources = [s for s in sources if s.enabled]
-        if not enabled_sources:
+        ranked = self.rank_sources(sources)
+        if not ranked:
             return SourceResult(source_name="", success=False, error="没有可用的更新源")
 
         self.reset()
         self._ensure_executor()
+
+        if self._health is None:
+            rounds = [ranked]
+        else:
+            rounds = [ranked[:self._race_top_k], ranked[self._race_top_k:]]
+            if hedge_delay is None:
+                latency = self._health.get_latency(ranked[0].name)
+                if latency is not None:
+                    hedge_delay = min(
+                        max(latency * HEDGE_LATENCY_FACTOR, HEDGE_MIN_DELAY), ranked[0].timeout
+                    )
+
+        result = SourceResult(source_name="", success=False, error="所有更新源均无法访问")
+        for round_sources in rounds:
+            if not round_sources:
+                continue
+            result = self._race(round_sources, request_func, progress_callback, hedge_delay)
+            if result.success or self._cancelled.is_set():
+                return result
+            hedge_delay = None
+
+        return result
+
+    def _race(
+        self,
+        sources: List[UpdateSource],
+        request_func: Callable[[UpdateSource], T],
+        progress_callback: Optional[Callable[[str], None]],
+        hedge_delay: Optional[float]
+    ) -> SourceResult[T]:
+        """在一组源之间竞速"""
         futures: Dict[Future, UpdateSource] = {}
 
-        # 同时提交所有请求
-        for source in enabled_sources:
+        def submit(source: UpdateSource):
             if progress_callback:
                 progress_callback(f"正在尝试 {source.name}...")
             future = self._executor.submit(self._execute_request, source, request_func)
+            # 竞速失败方在返回后仍会完成，完成时同样记录健康数据
+            future.add_done_callback(self._record_future)
             futures[future] = source
 
+        pending = list(sources)
+        if hedge_delay is not None and len(pending) > 1:
+            submit(pending.pop(0))
+            done, _ = wait(list(futures.keys()), timeout=hedge_delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result.success:
+                    if progress_callback:
+                        progress_callback(f"通过 {result.source_name} 连接成功")
+                    return result
+
+        # 提交其余请求
+        for source in pending:
+            submit(source)
+
         # 按完成顺序处理结果
         for future in as_completed(futures.keys()):
             if self._cancelled.is_set():
@@ -221,6 +311,20 @@ class MultiSourceRequestManager:
 
         return SourceResult(source_name="", success=False, error="所有更新源均无法访问")
 
+    def _record_future(self, future: Future):
+        """Future 完成回调：记录健康数据"""
+        if future.cancelled():
+            return
+        self._record(future.result())
+
+    def _record(self, result: SourceResult):
+        if self._health is None or self._cancelled.is_set():
+            return
+        if result.success:
+            self._health.record_success(result.source_name, latency=result.response_time)
+        else:
+            self._health.record_failure(result.source_name)
+
     def failover_request(
         self,
         sources: List[UpdateSource],
@@ -228,18 +332,17 @@ class MultiSourceRequestManager:
         progress_callback: Optional[Callable[[str], None]] = None
     ) -> SourceResult[T]:
         """
-        故障转移策略：按优先级依次尝试各源
+        故障转移策略：按排名依次尝试各源
 
         Args:
-            sources: 更新源列表（将按 priority 排序）
+            sources: 更新源列表（按健康度或 priority 排序）
             request_func: 执行请求的函数
             progress_callback: 可选的进度回调函数
 
         Returns:
             SourceResult 包含第一个成功源的数据，或错误信息
         """
-        enabled_sources = [s for s in sources if s.enabled]
-        sorted_sources = sorted(enabled_sources, key=lambda s: s.priority)
+        sorted_sources = self.rank_sources(sources)
         last_error = "没有可用的更新源"
 
         for source in sorted_sources:
@@ -251,6 +354,7 @@ class MultiSourceRequestManager:
 
             try:
                 result = self._execute_request(source, request_func)
+                self._record(result)
                 if result.success:
                     if progress_callback:
                         progress_callback(f"通过 {source.name} 连接成功")
@@ -291,10 +395,15 @@ class MultiSourceRequestManager:
                 response_time=response_time
             )
 
-    def shutdown(self):
-        """关闭线程池"""
+    def shutdown(self, wait: bool = False):
+        """
+        关闭线程池
+
+        Args:
+            wait: 是否等待已开始的请求（竞速失败方）结束；未开始的请求总是被取消
+        """
         if self._executor:
-            self._executor.shutdown(wait=False)
+            self._executor.shutdown(wait=wait, cancel_futures=True)
             self._executor = None
 
 
@@ -314,27 +423,34 @@ class UpdateCheckWorker(QThread):
         self,
         current_version: str,
         sources: Optional[List[UpdateSource]] = None,
+        force: bool = False,
+        cache: Optional[ReleaseCache] = None,
+        health: Optional[MirrorHealthTracker] = None,
         parent=None
     ):
         super().__init__(parent)
         self._current_version = current_version
         self._sources = sources or UPDATE_API_SOURCES
-        self._request_manager = MultiSourceRequestManager(max_workers=len(self._sources))
+        self._force = force
+        self._cache = cache or ReleaseCache()
+        self._health = health or MirrorHealthTracker("api")
+        self._request_manager = MultiSourceRequestManager(
+            max_workers=len(self._sources), health=self._health
+        )
 
     def run(self):
-        """使用竞速策略从多个源检查更新"""
+        """使用竞速策略从多个源检查更新（检查间隔内直接使用缓存）"""
         try:
-            result = self._request_manager.race_request(
-                sources=self._sources,
-                request_func=self._fetch_from_source,
-                progress_callback=lambda msg: self.check_progress.emit(msg)
-            )
+            release_info = None
+            if not self._force and self._cache.is_fresh():
+                release_info = self._cache.get_release()
+                if release_info:
+                    logger.debug("更新检查间隔内，使用缓存的 Release 信息")
 
-            if not result.success:
-                self.check_failed.emit(result.error or "所有源均无法访问")
-                return
-
-            release_info = result.data
+            if release_info is None:
+                release_info = self._check_remote()
+                if release_info is None:
+                    return
 
             # 检查是否是更新版本
             if not VersionComparer.is_newer(release_info.version, self._current_version):
@@ -347,20 +463,59 @@ class UpdateCheckWorker(QThread):
             logger.exception("检查更新时发生错误")
             self.check_failed.emit(f"检查更新失败: {str(e)}")
         finally:
-            self._request_manager.shutdown()
+            # 等竞速失败方结束（最多一个源的超时时间）并记录健康数据后再保存
+            self._request_manager.shutdown(wait=True)
+            self._health.save()
+
+    def _check_remote(self) -> Optional[ReleaseInfo]:
+        """从网络检查，失败时发出 check_failed 并返回 None"""
+        result = self._request_manager.race_request(
+            sources=self._sources,
+            request_func=self._fetch_from_source,
+            progress_callback=lambda msg: self.check_progress.emit(msg)
+        )
+
+        if not result.success:
+            self.check_failed.emit(result.error or "所有源均无法访问")
+            return None
+
+        # 只记录被采用的源的 ETag，与其返回的 Release 一起保存
+        release_info, etag = result.data
+        self._cache.store_release(release_info, result.source_name, etag)
+        self._cache.save()
+        return release_info
+
+    def _fetch_from_source(self, source: UpdateSource) -> Tuple[ReleaseInfo, str]:
+        """
+        从指定源获取版本信息（附带 If-None-Match，未变化时使用缓存）
 
-    def _fetch_from_source(self, source: UpdateSource) -> ReleaseInfo:
-        """从指定源获取版本信息"""
+        不写入缓存：竞速失败方在返回后仍会完成，结果只在被采用时由 _check_remote 保存。
+
+        Returns:
+            (Release 信息, 该源返回的 ETag)
+        """
         url = source.url_template.format(owner=GITHUB_OWNER, repo=GITHUB_REPO)
 
         request = Request(url)
         request.add_header('User-Agent', USER_AGENT)
         request.add_header('Accept', 'application/vnd.github.v3+json')
 
-        with urlopen(request, timeout=source.timeout) as response:
-            data = json.loads(response.read().decode('utf-8'))
+        etag = self._cache.get_etag(source.name)
+        if etag:
+            request.add_header('If-None-Match', etag)
+
+        try:
+            with urlopen(request, timeout=source.timeout) as response:
+                data = json.loads(response.read().decode('utf-8'))
+                new_etag = response.headers.get('ETag', '')
+        except HTTPError as e:
+            cached = self._cache.get_release() if e.code == 304 else None
+            if cached is None:
+                raise
+            logger.debug(f"{source.name} 返回 304，Release 未变化")
+            return cached, etag
 
-        return self._parse_release_data(data)
+        return self._parse_release_data(data), new_etag
 
     def _parse_release_data(self, data: dict) -> ReleaseInfo:
         """解析 GitHub API 响应"""
@@ -370,12 +525,14 @@ class UpdateCheckWorker(QThread):
         # 查找 Windows 安装包
         download_url = None
         download_size = 0
+        download_sha256 = ""
 
         for asset in data.get('assets', []):
             name = asset.get('name', '')
             if name.endswith('_Setup.exe') or name.endswith('.exe'):
                 download_url = asset.get('browser_download_url')
                 download_size = asset.get('size', 0)
+                download_sha256 = parse_asset_digest(asset.get('digest', ''))
                 break
 
         if not download_url:
@@ -389,16 +546,17 @@ class UpdateCheckWorker(QThread):
             published_at=data.get('published_at', ''),
             download_url=download_url,
             download_size=download_size,
-            html_url=data.get('html_url', '')
+            html_url=data.get('html_url', ''),
+            download_sha256=download_sha256
         )
 
 
 class UpdateDownloadWorker(QThread):
     """
-    后台下载工作线程（多源故障转移策略）
+    后台下载工作线程（多源故障转移 + 断点续传）
 
-    按优先级依次尝试各下载源，适合大文件下载，
-    避免竞速策略带来的带宽浪费。
+    由 DownloadEngine 按镜像健康度依次尝试各下载源，切换源时从已下载位置续传；
+    安装包较大时同时从多个镜像分段下载。
     """
 
     progress_updated = pyqtSignal(int, str)   # (percentage, message)
@@ -415,38 +573,43 @@ class UpdateDownloadWorker(QThread):
         self._release_info = release_info
         self._sources = sources or DOWNLOAD_SOURCES
         self._cancelled = threading.Event()
-        self._request_manager = MultiSourceRequestManager(max_workers=1)
-        self._current_source_name = ""
+        self._health = MirrorHealthTracker("download")
 
     def cancel(self):
-        """取消下载"""
+        """取消下载（已下载部分保留，下次可续传）"""
         self._cancelled.set()
-        self._request_manager.cancel()
 
     def run(self):
-        """使用故障转移策略下载安装包"""
+        """下载安装包"""
         try:
-            # 构建下载源 URL
-            download_sources = self._build_download_sources()
-
-            result = self._request_manager.failover_request(
-                sources=download_sources,
-                request_func=self._download_from_source,
-                progress_callback=lambda msg: self.progress_updated.emit(0, msg)
+            temp_dir = tempfile.gettempdir()
+            filename = f"ArknightsPassMaker_v{self._release_info.version}_Setup.exe"
+
+            engine = DownloadEngine(
+                sources=self._build_download_sources(),
+                output_path=os.path.join(temp_dir, filename),
+                expected_size=self._release_info.download_size,
+                expected_sha256=self._release_info.download_sha256,
+                parallel_segments=DOWNLOAD_PARALLEL_SEGMENTS,
+                user_agent=USER_AGENT,
+                health=self._health,
+                cancel_event=self._cancelled,
+                progress_callback=self._on_progress
             )
 
-            if not result.success:
-                self.download_failed.emit(result.error or "所有下载源均失败")
-                return
+            self.progress_updated.emit(0, "正在连接下载源...")
+            result = engine.download()
 
             self.progress_updated.emit(100, "下载完成")
-            self.download_completed.emit(result.data)
+            self.download_completed.emit(result.path)
 
+        except InterruptedError:
+            self.download_failed.emit("下载已取消")
         except Exception as e:
             logger.exception("下载更新时发生错误")
             self.download_failed.emit(f"下载失败: {str(e)}")
         finally:
-            self._request_manager.shutdown()
+            self._health.save()
 
     def _build_download_sources(self) -> List[UpdateSource]:
         """根据原始下载 URL 构建多源下载地址"""
@@ -471,65 +634,18 @@ class UpdateDownloadWorker(QThread):
 
         return sources
 
-    def _download_from_source(self, source: UpdateSource) -> str:
-        """从指定源下载文件"""
-        url = source.url_template
-        total_size = self._release_info.download_size
+    def _on_progress(self, downloaded: int, total: int, source_name: str):
+        """把下载引擎的字节进度转换为百分比和提示文字"""
+        size_mb = downloaded / (1024 * 1024)
+        if total > 0:
+            percent = min(99, int((downloaded / total) * 100))
+            total_mb = total / (1024 * 1024)
+            msg = f"[{source_name}] 已下载 {size_mb:.1f} / {total_mb:.1f} MB"
+        else:
+            percent = 50  # Unknown size
+            msg = f"[{source_name}] 已下载 {size_mb:.1f} MB"
 
-        # 准备输出文件
-        temp_dir = tempfile.gettempdir()
-        filename = f"ArknightsPassMaker_v{self._release_info.version}_Setup.exe"
-        output_path = os.path.join(temp_dir, filename)
-
-        self._current_source_name = source.name
-
-        request = Request(url)
-        request.add_header('User-Agent', USER_AGENT)
-
-        self.progress_updated.emit(0, f"正在从 {source.name} 下载...")
-
-        try:
-            with urlopen(request, timeout=source.timeout) as response:
-                downloaded = 0
-                chunk_size = 8192  # 8KB chunks
-
-                with open(output_path, 'wb') as f:
-                    while True:
-                        if self._cancelled.is_set():
-                            f.close()
-                            if os.path.exists(output_path):
-                                os.remove(output_path)
-                            raise InterruptedError("下载已取消")
-
-                        chunk = response.read(chunk_size)
-                        if not chunk:
-                            break
-
-                        f.write(chunk)
-                        downloaded += len(chunk)
-
-                        if total_size > 0:
-                            percent = int((downloaded / total_size) * 100)
-                            size_mb = downloaded / (1024 * 1024)
-                            total_mb = total_size / (1024 * 1024)
-                            msg = f"[{source.name}] 已下载 {size_mb:.1f} / {total_mb:.1f} MB"
-                        else:
-                            percent = 50  # Unknown size
-                            size_mb = downloaded / (1024 * 1024)
-                            msg = f"[{source.name}] 已下载 {size_mb:.1f} MB"
-
-                        self.progress_updated.emit(percent, msg)
-
-            return output_path
-
-        except Exception as e:
-            # 清理部分下载的文件
-            if os.path.exists(output_path):
-                try:
-                    os.remove(output_path)
-                except Exception:
-                    pass
-            raise
+        self.progress_updated.emit(percent, msg)
 
 
 class UpdateService(QObject):
@@ -569,12 +685,22 @@ class UpdateService(QObject):
     def latest_release(self) -> Optional[ReleaseInfo]:
         return self._latest_release
 
-    def check_for_updates(self):
-        """开始后台检查更新（多源竞速策略）"""
+    @staticmethod
+    def is_check_due() -> bool:
+        """距上次成功检查是否已超过 UPDATE_CHECK_INTERVAL_HOURS"""
+        return not ReleaseCache().is_fresh()
+
+    def check_for_updates(self, force: bool = False):
+        """
+        开始后台检查更新（多源竞速策略）
+
+        Args:
+            force: 忽略检查间隔，立即向服务器确认（仍会发送条件请求）
+        """
         if self.is_checking:
             return
 
-        self._check_worker = UpdateCheckWorker(self._current_version, parent=self)
+        self._check_worker = UpdateCheckWorker(self._current_version, force=force, parent=self)
         self._check_worker.check_completed.connect(self._on_check_completed)
         self._check_worker.check_failed.connect(self._on_check_failed)
         self._check_worker.check_progress.connect(self.check_progress.emit)
@@ -2,10 +2,11 @@
 EPConfig 校验器 - 验证配置文件的完整性和正确性
 """
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Dict, Tuple
 from enum import Enum
 import os
 import re
+import threading
 import uuid
 
 from config.constants import RESOLUTION_SPECS, TRANSITION_TYPES, OVERLAY_TYPES
@@ -34,6 +35,94 @@ class ValidationResult:
         return f"[{level_str}] {self.field}: {self.message}"
 
 
+@dataclass(frozen=True)
+class FileProbe:
+    """文件探测结果"""
+    exists: bool
+    readable: bool
+    size: int = 0
+    mtime_ns: int = 0
+    image_size: Optional[Tuple[int, int]] = None  # 仅图片探测时填充
+    image_error: bool = False
+
+
+class FileProbeCache:
+    """
+    文件探测缓存（线程安全）
+
+    批量校验时多个配置常引用同一素材（如共用的职业图标），
+    通过缓存 exists/readable/图片尺寸 的结果避免重复的磁盘访问和图片解码。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._probes: Dict[Tuple[str, bool], FileProbe] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, abs_path: str, as_image: bool = False) -> FileProbe:
+        """
+        探测文件
+
+        Args:
+            abs_path: 文件绝对路径
+            as_image: 是否同时尝试读取图片尺寸
+
+        Returns:
+            探测结果
+        """
+        key = (os.path.normcase(os.path.abspath(abs_path)), as_image)
+        with self._lock:
+            cached = self._probes.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self._do_probe(abs_path, as_image)
+
+        with self._lock:
+            # 并发探测同一文件时保留先写入的结果
+            return self._probes.setdefault(key, result)
+
+    @staticmethod
+    def _do_probe(abs_path: str, as_image: bool) -> FileProbe:
+        """执行实际的磁盘探测"""
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return FileProbe(exists=False, readable=False)
+
+        readable = os.access(abs_path, os.R_OK)
+        image_size = None
+        image_error = False
+        if as_image and readable:
+            try:
+                from PIL import Image
+                with Image.open(abs_path) as img:
+                    image_size = img.size
+            except ImportError:
+                pass  # Pillow未安装，跳过
+            except Exception:
+                image_error = True
+
+        return FileProbe(
+            exists=True,
+            readable=readable,
+            size=st.st_size,
+            mtime_ns=st.st_mtime_ns,
+            image_size=image_size,
+            image_error=image_error
+        )
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._probes.clear()
+            self.hits = 0
+            self.misses = 0
+
+
 class EPConfigValidator:
     """epconfig.json 校验器"""
 
@@ -46,15 +135,17 @@ class EPConfigValidator:
         re.IGNORECASE
     )
 
-    def __init__(self, base_dir: str = ""):
+    def __init__(self, base_dir: str = "", probe_cache: Optional[FileProbeCache] = None):
         """
         初始化校验器
 
         Args:
             base_dir: 素材目录的基础路径
+            probe_cache: 可选的文件探测缓存，多个校验器可共享同一实例
         """
         self.base_dir = base_dir
         self.results: List[ValidationResult] = []
+        self._probe_cache = probe_cache or FileProbeCache()
 
     def validate(self, config: dict) -> List[ValidationResult]:
         """
@@ -304,10 +395,11 @@ class EPConfigValidator:
             return
 
         abs_path = os.path.join(self.base_dir, rel_path)
-        if not os.path.exists(abs_path):
+        probe = self._probe_cache.probe(abs_path)
+        if not probe.exists:
             self._add_result(ValidationLevel.ERROR, field,
                            f"文件不存在: {rel_path}")
-        elif not os.access(abs_path, os.R_OK):
+        elif not probe.readable:
             self._add_result(ValidationLevel.ERROR, field,
                            f"文件不可读: {rel_path}")
 
@@ -320,21 +412,18 @@ class EPConfigValidator:
             return
 
         abs_path = os.path.join(self.base_dir, rel_path)
-        if not os.path.exists(abs_path):
+        probe = self._probe_cache.probe(abs_path, as_image=True)
+        if not probe.exists:
             self._add_result(ValidationLevel.WARNING, field,
                            f"图片文件不存在，将被忽略: {rel_path}")
             return
 
-        # 尝试验证图片
-        try:
-            from PIL import Image
-            with Image.open(abs_path) as img:
-                w, h = img.size
-                if w <= 0 or h <= 0:
-                    self._add_result(ValidationLevel.WARNING, field,
-                                   f"图片尺寸不合法，将被忽略: {rel_path}")
-        except ImportError:
-            pass  # Pillow未安装，跳过
-        except Exception as e:
+        # 验证图片
+        if probe.image_error or not probe.readable:
             self._add_result(ValidationLevel.WARNING, field,
                            f"图片无法加载，将被忽略: {rel_path}")
+        elif probe.image_size is not None:
+            w, h = probe.image_size
+            if w <= 0 or h <= 0:
+                self._add_result(ValidationLevel.WARNING, field,
+                               f"图片尺寸不合法，将被忽略: {rel_path}")
@@ -0,0 +1,351 @@
+"""
+视频分析索引 - 场景切换、运动强度、平均亮度
+
+对源视频完整解码一次，通过生成器流水线逐帧计算:
+    解码 -> 缩小为灰度分析图 -> 逐帧指标（亮度、运动强度、直方图差异）
+然后一次性检测场景切换，结果保存为项目目录 .assetmaker/analysis/ 下的 .npz 文件，
+以视频快速指纹命名，再次打开项目时直接读取。
+
+索引同时保存每帧的灰度缩略图（高 MINIATURE_HEIGHT 像素），
+循环点查找、自动裁切等工具可以直接使用，不必重新解码视频。
+"""
+import os
+import logging
+from dataclasses import dataclass
+from typing import Optional, Iterator, Iterable, Tuple, List, Callable, TYPE_CHECKING
+
+import numpy as np
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from utils.file_utils import compute_quick_hash, get_project_cache_dir
+
+if TYPE_CHECKING:
+    from core.asset_index import AssetIndex
+
+logger = logging.getLogger(__name__)
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+    logger.warning("OpenCV 未安装，视频分析不可用")
+
+INDEX_VERSION = 1
+
+# 计算直方图和运动强度的分析图宽度
+ANALYSIS_WIDTH = 128
+# 保存到索引中的灰度缩略图高度
+MINIATURE_HEIGHT = 32
+HISTOGRAM_BINS = 32
+
+# 场景切换检测：直方图差异（0~1）需同时超过绝对阈值和邻近帧平均值的若干倍
+CUT_THRESHOLD = 0.3
+CUT_CONTRAST = 3.0
+CUT_WINDOW = 15            # 计算邻近平均值的窗口（单侧帧数）
+MIN_SCENE_SECONDS = 0.5    # 两次切换的最小间隔
+
+
+@dataclass
+class FrameMeasure:
+    """单帧指标"""
+    index: int
+    miniature: np.ndarray    # uint8 灰度缩略图
+    luma: float              # 平均亮度 0~1
+    motion: float            # 与上一帧的平均绝对差 0~1
+    hist_diff: float         # 与上一帧的直方图差异 0~1
+
+
+@dataclass
+class VideoAnalysis:
+    """视频分析结果"""
+    fps: float
+    width: int
+    height: int
+    luma: np.ndarray          # (N,) float32
+    motion: np.ndarray        # (N,) float32
+    hist_diff: np.ndarray     # (N,) float32
+    cuts: np.ndarray          # 场景切换帧号（新场景的第一帧）int32
+    miniatures: np.ndarray    # (N, h, w) uint8
+
+    @property
+    def total_frames(self) -> int:
+        return len(self.luma)
+
+    def next_cut(self, frame: int) -> Optional[int]:
+        """frame 之后的第一个场景切换"""
+        pos = int(np.searchsorted(self.cuts, frame, side='right'))
+        return int(self.cuts[pos]) if pos < len(self.cuts) else None
+
+    def prev_cut(self, frame: int) -> Optional[int]:
+        """frame 之前的最后一个场景切换"""
+        pos = int(np.searchsorted(self.cuts, frame, side='left')) - 1
+        return int(self.cuts[pos]) if pos >= 0 else None
+
+    def save(self, path: str):
+        """保存为 .npz（先写临时文件再替换）"""
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            version=np.int32(INDEX_VERSION),
+            meta=np.array([self.fps, self.width, self.height], dtype=np.float64),
+            luma=self.luma, motion=self.motion, hist_diff=self.hist_diff,
+            cuts=self.cuts, miniatures=self.miniatures
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["VideoAnalysis"]:
+        """读取 .npz，版本不符或文件损坏时返回 None"""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != INDEX_VERSION:
+                    return None
+                fps, width, height = data["meta"]
+                return cls(
+                    fps=float(fps), width=int(width), height=int(height),
+                    luma=data["luma"], motion=data["motion"], hist_diff=data["hist_diff"],
+                    cuts=data["cuts"], miniatures=data["miniatures"]
+                )
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"读取分析索引失败: {e}")
+            return None
+
+
+# ----------------------------------------------------------------------
+# 流水线各阶段
+# ----------------------------------------------------------------------
+
+def iter_frames(
+    cap, should_stop: Optional[Callable[[], bool]] = None
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """解码阶段：逐帧产出 (帧号, BGR 帧)"""
+    index = 0
+    while True:
+        if should_stop and should_stop():
+            return
+        ok, frame = cap.read()
+        if not ok or frame is None:
+            return
+        yield index, frame
+        index += 1
+
+
+def iter_reduced(
+    frames: Iterable[Tuple[int, np.ndarray]],
+    analysis_size: Tuple[int, int],
+    miniature_size: Tuple[int, int]
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """缩小阶段：产出 (帧号, 分析用灰度图, 灰度缩略图)"""
+    for index, frame in frames:
+        gray = cv2.cvtColor(
+            cv2.resize(frame, analysis_size, interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY
+        )
+        yield index, gray, cv2.resize(gray, miniature_size, interpolation=cv2.INTER_AREA)
+
+
+def iter_measures(
+    reduced: Iterable[Tuple[int, np.ndarray, np.ndarray]]
+) -> Iterator[FrameMeasure]:
+    """指标阶段：与上一帧比较，产出 FrameMeasure"""
+    prev_gray: Optional[np.ndarray] = None
+    prev_hist: Optional[np.ndarray] = None
+    for index, gray, miniature in reduced:
+        hist = np.bincount(
+            (gray // (256 // HISTOGRAM_BINS)).ravel(), minlength=HISTOGRAM_BINS
+        ).astype(np.float32)
+        hist /= max(1.0, hist.sum())
+
+        if prev_gray is None:
+            motion = hist_diff = 0.0
+        else:
+            motion = float(cv2.absdiff(gray, prev_gray).mean()) / 255.0
+            hist_diff = float(np.abs(hist - prev_hist).sum()) / 2.0
+
+        yield FrameMeasure(
+            index=index,
+            miniature=miniature,
+            luma=float(gray.mean()) / 255.0,
+            motion=motion,
+            hist_diff=hist_diff
+        )
+        prev_gray, prev_hist = gray, hist
+
+
+def detect_cuts(hist_diff: np.ndarray, fps: float) -> np.ndarray:
+    """
+    根据直方图差异检测场景切换
+
+    差异需超过 CUT_THRESHOLD，且为前后 CUT_WINDOW 帧平均差异的 CUT_CONTRAST 倍以上
+    （排除快速运动、闪烁造成的持续高差异）；间隔小于 MIN_SCENE_SECONDS 的只保留较强的一个。
+
+    Returns:
+        切换帧号数组（新场景的第一帧）
+    """
+    n = len(hist_diff)
+    if n < 2:
+        return np.zeros(0, dtype=np.int32)
+
+    # 邻近平均值（不含自身）
+    kernel = np.ones(2 * CUT_WINDOW + 1, dtype=np.float32)
+    kernel[CUT_WINDOW] = 0.0
+    sums = np.convolve(hist_diff, kernel, mode='same')
+    counts = np.convolve(np.ones(n, dtype=np.float32), kernel, mode='same')
+    local_mean = sums / np.maximum(counts, 1.0)
+
+    candidates = np.flatnonzero(
+        (hist_diff > CUT_THRESHOLD) & (hist_diff > CUT_CONTRAST * local_mean)
+    )
+
+    min_gap = max(1, int(round(fps * MIN_SCENE_SECONDS)))
+    cuts: List[int] = []
+    for frame in candidates:
+        if cuts and frame - cuts[-1] < min_gap:
+            if hist_diff[frame] > hist_diff[cuts[-1]]:
+                cuts[-1] = int(frame)
+            continue
+        cuts.append(int(frame))
+    return np.asarray(cuts, dtype=np.int32)
+
+
+def analyze_video(
+    video_path: str,
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Optional[VideoAnalysis]:
+    """
+    分析视频
+
+    Args:
+        video_path: 视频路径
+        should_stop: 返回 True 时停止
+        progress: 进度回调 (已处理帧数, 总帧数)
+
+    Returns:
+        分析结果，无法读取或被中断时返回 None
+    """
+    if not HAS_CV2:
+        return None
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.warning(f"无法打开视频: {video_path}")
+        return None
+
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            return None
+
+        analysis_size = (ANALYSIS_WIDTH, max(1, round(ANALYSIS_WIDTH * height / width)))
+        miniature_size = (max(1, round(MINIATURE_HEIGHT * width / height)), MINIATURE_HEIGHT)
+
+        luma: List[float] = []
+        motion: List[float] = []
+        hist_diff: List[float] = []
+        miniatures: List[np.ndarray] = []
+
+        pipeline = iter_measures(iter_reduced(
+            iter_frames(cap, should_stop), analysis_size, miniature_size
+        ))
+        for measure in pipeline:
+            luma.append(measure.luma)
+            motion.append(measure.motion)
+            hist_diff.append(measure.hist_diff)
+            miniatures.append(measure.miniature)
+            if progress and measure.index % 100 == 0:
+                progress(measure.index, total)
+
+        if (should_stop and should_stop()) or not luma:
+            return None
+
+        hist_diff_arr = np.asarray(hist_diff, dtype=np.float32)
+        return VideoAnalysis(
+            fps=fps, width=width, height=height,
+            luma=np.asarray(luma, dtype=np.float32),
+            motion=np.asarray(motion, dtype=np.float32),
+            hist_diff=hist_diff_arr,
+            cuts=detect_cuts(hist_diff_arr, fps),
+            miniatures=np.stack(miniatures)
+        )
+    finally:
+        cap.release()
+
+
+# ----------------------------------------------------------------------
+# 索引文件
+# ----------------------------------------------------------------------
+
+def get_index_path(video_path: str, base_dir: str = "", asset_index: Optional["AssetIndex"] = None) -> str:
+    """分析索引文件路径（<项目目录>/.assetmaker/analysis/<指纹>.npz）"""
+    key = asset_index.quick_hash(video_path) if asset_index is not None else compute_quick_hash(video_path)
+    return os.path.join(get_project_cache_dir(base_dir, "analysis"), f"{key}.npz")
+
+
+def load_or_analyze(
+    video_path: str,
+    base_dir: str = "",
+    should_stop: Optional[Callable[[], bool]] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+    asset_index: Optional["AssetIndex"] = None
+) -> Optional[VideoAnalysis]:
+    """
+    读取分析索引，不存在时分析视频并保存
+
+    Args:
+        video_path: 视频路径
+        base_dir: 项目目录（为空时使用全局缓存目录）
+        should_stop: 返回 True 时停止
+        progress: 进度回调 (已处理帧数, 总帧数)
+        asset_index: 项目素材索引，提供时复用视频指纹，并登记分析索引文件（视频变化后删除）
+    """
+    index_path = get_index_path(video_path, base_dir, asset_index)
+    if os.path.exists(index_path):
+        analysis = VideoAnalysis.load(index_path)
+        if analysis is not None:
+            return analysis
+
+    analysis = analyze_video(video_path, should_stop, progress)
+    if analysis is not None:
+        try:
+            analysis.save(index_path)
+            if asset_index is not None:
+                asset_index.set_artifact(video_path, "analysis", index_path)
+        except OSError as e:
+            logger.warning(f"保存分析索引失败: {e}")
+    return analysis
+
+
+class VideoAnalysisWorker(QThread):
+    """后台视频分析线程"""
+
+    progress_updated = pyqtSignal(int, int)        # (已处理帧数, 总帧数)
+    analysis_ready = pyqtSignal(str, object)       # (视频路径, VideoAnalysis)
+
+    def __init__(self, video_path: str, base_dir: str = "", asset_index: Optional["AssetIndex"] = None, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.base_dir = base_dir
+        self._asset_index = asset_index
+
+    def run(self):
+        try:
+            analysis = load_or_analyze(
+                self.video_path, self.base_dir,
+                should_stop=self.isInterruptionRequested,
+                progress=self.progress_updated.emit,
+                asset_index=self._asset_index
+            )
+            if analysis is not None and not self.isInterruptionRequested():
+                logger.info(
+                    f"视频分析完成: {os.path.basename(self.video_path)}, "
+                    f"{analysis.total_frames} 帧, {len(analysis.cuts)} 个场景切换"
+                )
+                self.analysis_ready.emit(self.video_path, analysis)
+        except Exception as e:
+            logger.warning(f"视频分析失败: {e}")
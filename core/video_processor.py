@@ -10,7 +10,8 @@ from dataclasses import dataclass
 from typing import Optional, Callable, Tuple, Dict, Any
 
 from config.constants import RESOLUTION_SPECS, get_resolution_spec
-from utils.file_utils import get_app_dir
+from core.encoders import select_video_encoder
+from utils.file_utils import find_tool
 
 logger = logging.getLogger(__name__)
 
@@ -75,26 +76,7 @@ class VideoProcessor:
 
     def find_ffmpeg(self) -> str:
         """查找系统中的ffmpeg（支持打包环境）"""
-        # 1. 先在应用程序目录查找（支持 Nuitka/PyInstaller 打包）
-        app_ffmpeg = os.path.join(get_app_dir(), "ffmpeg.exe")
-        if os.path.isfile(app_ffmpeg):
-            return app_ffmpeg
-
-        # 2. 在当前工作目录查找
-        local_ffmpeg = os.path.join(os.getcwd(), "ffmpeg.exe")
-        if os.path.isfile(local_ffmpeg):
-            return local_ffmpeg
-
-        # 3. 在系统 PATH 中查找
-        try:
-            cmd = ["where", "ffmpeg"] if os.name == 'nt' else ["which", "ffmpeg"]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip().split('\n')[0]
-        except Exception:
-            pass
-
-        return ""
+        return find_tool("ffmpeg")
 
     def get_video_info(self, input_path: str) -> Optional[VideoInfo]:
         """
@@ -210,12 +192,13 @@ class VideoProcessor:
         if filters:
             cmd.extend(["-vf", ",".join(filters)])
 
-        # 编码参数
+        # 编码参数（编码器由 core.encoders 选择，默认 libx264）
+        try:
+            encoder = select_video_encoder(self.ffmpeg_path)
+        except RuntimeError as e:
+            return False, str(e)
+        cmd.extend(encoder.quality_args(18))
         cmd.extend([
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-crf", "18",
-            "-pix_fmt", "yuv420p",
             "-an",  # 无音频
             output_path
         ])
@@ -286,9 +269,13 @@ class VideoProcessor:
             filters.append("rotate=PI")
 
         filter_str = ",".join(filters)
+        try:
+            encode_str = " ".join(select_video_encoder(self.ffmpeg_path).quality_args(18))
+        except RuntimeError:
+            encode_str = "-c:v libx264 -preset medium -crf 18 -pix_fmt yuv420p"
 
         return (f'ffmpeg -i "{input_path}" -vf "{filter_str}" '
-                f'-c:v libx264 -preset medium -crf 18 -pix_fmt yuv420p '
+                f'{encode_str} '
                 f'-an "{output_path}"')
 
     def get_resolution_info(self, resolution: str) -> Dict[str, Any]:
@@ -0,0 +1,284 @@
+"""
+多项目工作区 - 同时打开多个项目（通行证），项目之间共享解码器和帧缓存
+
+- ProjectSession: 一个打开的项目的全部编辑状态（配置、撤销历史、自动保存日志、素材索引、预览状态），
+  切到后台时由主窗口保存到这里，切回时恢复，不重新读取文件
+- Workspace: 打开的项目列表和当前项目
+- DecoderPool: 视频解码器池。预览器换视频或项目切到后台时把解码器归还到池中，
+  空闲解码器超过 MAX_IDLE_DECODERS 个时关闭最久未用的；切回项目时直接取回，不必重新打开文件
+- FrameCache: 所有项目共享的已解码帧缓存，总大小不超过 FRAME_CACHE_BYTES，
+  切换项目时立即显示上次的画面，在时间轴上来回拖动时看过的帧不再解码
+
+工具链探测（utils.file_utils.find_tool）和干员查询（core.operator_lookup.get_operator_lookup）
+本身就是进程内共享的，不在这里重复。
+"""
+import os
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from config.epconfig import EPConfig
+from core.command_history import CommandHistory
+
+if TYPE_CHECKING:
+    from core.asset_index import AssetIndex, AssetWatcher
+    from core.autosave import AutosaveJournal
+    from core.loop_finder import LoopCandidate
+
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+logger = logging.getLogger(__name__)
+
+# 池中最多保留的空闲解码器数（每个约占几 MB 到几十 MB，取决于分辨率和编码）
+MAX_IDLE_DECODERS = 4
+# 所有项目共享的帧缓存大小
+FRAME_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class DecoderPool:
+    """
+    视频解码器池（cv2.VideoCapture）
+
+    cap = pool.acquire(path)     # 有空闲的直接取回，否则打开
+    ...
+    pool.release(path, cap)      # 归还，超出空闲上限时关闭最久未用的
+    """
+
+    def __init__(self, max_idle: int = MAX_IDLE_DECODERS):
+        self.max_idle = max_idle
+        self._idle: "OrderedDict[Tuple[str, int], object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.open_count = 0  # 实际打开文件的次数（用于统计复用效果）
+
+    @staticmethod
+    def _key(path: str, cap) -> Tuple[str, int]:
+        return (os.path.normcase(os.path.abspath(path)), id(cap))
+
+    def acquire(self, path: str):
+        """
+        取得 path 的解码器
+
+        Returns:
+            已打开的 cv2.VideoCapture；OpenCV 不可用或无法打开时返回 None
+        """
+        if not HAS_CV2:
+            return None
+        norm = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            for key in reversed(self._idle):
+                if key[0] == norm:
+                    return self._idle.pop(key)
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        self.open_count += 1
+        return cap
+
+    def release(self, path: str, cap):
+        """归还解码器（之后调用方不应再使用它）"""
+        if cap is None:
+            return
+        if self.max_idle <= 0:
+            cap.release()
+            return
+        with self._lock:
+            self._idle[self._key(path, cap)] = cap
+            evicted = []
+            while len(self._idle) > self.max_idle:
+                evicted.append(self._idle.popitem(last=False)[1])
+        for old in evicted:
+            old.release()
+
+    def clear(self):
+        """关闭所有空闲解码器"""
+        with self._lock:
+            idle, self._idle = list(self._idle.values()), OrderedDict()
+        for cap in idle:
+            cap.release()
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+
+class FrameCache:
+    """
+    按字节预算的已解码帧 LRU 缓存（键为 (视频路径, 帧号)）
+
+    缓存的帧设为只读，多个预览器共享同一数组。
+    """
+
+    def __init__(self, max_bytes: int = FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[Tuple[str, int], np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, index: int) -> Optional[np.ndarray]:
+        with self._lock:
+            frame = self._frames.get((path, index))
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end((path, index))
+            self.hits += 1
+            return frame
+
+    def put(self, path: str, index: int, frame: np.ndarray):
+        if frame.nbytes > self.max_bytes:
+            return
+        frame.flags.writeable = False
+        key = (path, index)
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._frames[key] = frame
+            self._bytes += frame.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def discard(self, path: str):
+        """丢弃某个视频的所有帧（文件被替换时）"""
+        with self._lock:
+            for key in [key for key in self._frames if key[0] == path]:
+                self._bytes -= self._frames.pop(key).nbytes
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+
+# 模块级单例（所有项目、所有预览器共享）
+_decoder_pool: Optional[DecoderPool] = None
+_frame_cache: Optional[FrameCache] = None
+
+
+def get_decoder_pool() -> DecoderPool:
+    """获取共享的解码器池（单例）"""
+    global _decoder_pool
+    if _decoder_pool is None:
+        _decoder_pool = DecoderPool()
+    return _decoder_pool
+
+
+def get_frame_cache() -> FrameCache:
+    """获取共享的帧缓存（单例）"""
+    global _frame_cache
+    if _frame_cache is None:
+        _frame_cache = FrameCache()
+    return _frame_cache
+
+
+def project_title(project_path: str) -> str:
+    """项目标签页标题（项目文件通常都叫 epconfig.json，显示所在目录名）"""
+    if not project_path:
+        return "未命名"
+    return os.path.basename(os.path.dirname(os.path.abspath(project_path))) or os.path.basename(project_path)
+
+
+@dataclass
+class PreviewState:
+    """预览器切到后台时保存的状态（不含解码器，解码器已归还到池中）"""
+    video_path: str = ""
+    frame_index: int = 0
+    cropbox: Tuple[int, int, int, int] = (0, 0, 0, 0)
+    rotation: int = 0
+    crop_path: Optional[np.ndarray] = None
+    target_size: Tuple[int, int] = (0, 0)
+
+
+@dataclass
+class ProjectSession:
+    """一个打开的项目"""
+    config: EPConfig
+    project_path: str = ""
+    base_dir: str = ""
+    snapshot: Optional[EPConfig] = None
+    is_modified: bool = False
+    history: CommandHistory = field(default_factory=CommandHistory)
+    autosave: Optional["AutosaveJournal"] = None
+    asset_index: Optional["AssetIndex"] = None
+    asset_watcher: Optional["AssetWatcher"] = None
+    # 预览和时间轴
+    preview_tab: int = 0
+    intro_preview: PreviewState = field(default_factory=PreviewState)
+    loop_preview: PreviewState = field(default_factory=PreviewState)
+    intro_in_out: Tuple[int, int] = (0, 0)
+    loop_in_out: Tuple[int, int] = (0, 0)
+    loop_image_path: Optional[str] = None
+    # 自动循环点
+    loop_candidates: List["LoopCandidate"] = field(default_factory=list)
+    loop_candidates_key: Optional[tuple] = None
+    loop_candidate_index: int = 0
+
+    @property
+    def title(self) -> str:
+        """标签页标题"""
+        return project_title(self.project_path)
+
+    @property
+    def video_paths(self) -> List[str]:
+        """项目中打开的视频"""
+        return [p for p in (self.intro_preview.video_path, self.loop_preview.video_path) if p]
+
+
+class Workspace:
+    """打开的项目列表（顺序与标签页一致）"""
+
+    def __init__(self):
+        self.sessions: List[ProjectSession] = []
+        self.active_index: int = -1
+
+    @property
+    def active(self) -> Optional[ProjectSession]:
+        if 0 <= self.active_index < len(self.sessions):
+            return self.sessions[self.active_index]
+        return None
+
+    def add(self, session: ProjectSession) -> int:
+        """添加项目，返回其位置（不切换当前项目）"""
+        self.sessions.append(session)
+        return len(self.sessions) - 1
+
+    def remove(self, index: int) -> ProjectSession:
+        """移除项目（当前项目的位置随之调整，由调用方决定切换到哪个项目）"""
+        session = self.sessions.pop(index)
+        if index < self.active_index:
+            self.active_index -= 1
+        elif index == self.active_index:
+            self.active_index = -1
+        return session
+
+    def find(self, project_path: str) -> int:
+        """已打开的项目文件的位置，未打开时返回 -1"""
+        if not project_path:
+            return -1
+        target = os.path.normcase(os.path.abspath(project_path))
+        for index, session in enumerate(self.sessions):
+            if session.project_path and os.path.normcase(os.path.abspath(session.project_path)) == target:
+                return index
+        return -1
+
+    def video_paths(self) -> Dict[str, int]:
+        """所有项目打开的视频 -> 引用它的项目数"""
+        counts: Dict[str, int] = {}
+        for session in self.sessions:
+            for path in session.video_paths:
+                counts[path] = counts.get(path, 0) + 1
+        return counts
+
+    def __len__(self) -> int:
+        return len(self.sessions)
@@ -7,6 +7,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 
+from core.export_metrics import format_summary
+
 
 class ExportProgressDialog(QDialog):
     """导出进度对话框"""
@@ -51,6 +53,14 @@ class ExportProgressDialog(QDialog):
         self.label_detail.setStyleSheet("color: #666;")
         layout.addWidget(self.label_detail)
 
+        # 分阶段耗时（导出结束后显示）
+        self.label_metrics = QLabel("")
+        self.label_metrics.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.label_metrics.setWordWrap(True)
+        self.label_metrics.setStyleSheet("color: #888; font-size: 11px;")
+        self.label_metrics.hide()
+        layout.addWidget(self.label_metrics)
+
         # 按钮
         self.btn_action = QPushButton("取消")
         self.btn_action.clicked.connect(self._on_action_clicked)
@@ -61,6 +71,15 @@ class ExportProgressDialog(QDialog):
         self.progress_bar.setValue(value)
         self.label_detail.setText(message)
 
+    def set_stage_metrics(self, record: dict):
+        """显示导出结束时的分阶段耗时汇总（忽略单个任务的记录）"""
+        if record.get("event") != "export_summary" or not record.get("stages"):
+            return
+        text = format_summary(record)
+        self.label_metrics.setText(f"耗时 {record['total_ms'] / 1000:.1f}s: {text}")
+        self.label_metrics.setToolTip(format_summary(record, None))
+        self.label_metrics.show()
+
     def set_completed(self, success: bool, message: str):
         """设置完成状态"""
         self._is_completed = True
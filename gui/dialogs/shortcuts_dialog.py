@@ -115,6 +115,9 @@ class ShortcutsDialog(QDialog):
             ("Ctrl+O", "打开项目"),
             ("Ctrl+S", "保存项目"),
             ("Ctrl+Shift+S", "另存为"),
+            ("Ctrl+W", "关闭当前项目"),
+            ("Ctrl+Z", "撤销（配置、裁剪框、入点/出点）"),
+            ("Ctrl+Y / Ctrl+Shift+Z", "重做"),
             ("Ctrl+Q", "退出程序"),
         ]
 
@@ -269,7 +269,7 @@ class UpdateDialog(QDialog):
         """Start checking for updates"""
         self.stack.setCurrentIndex(0)  # Show checking page
         self.btn_close.setEnabled(True)
-        self._update_service.check_for_updates()
+        self._update_service.check_for_updates(force=True)
 
     def _on_check_started(self):
         """Called when check starts"""
@@ -4,24 +4,39 @@
 import os
 import sys
 import logging
-from typing import Optional
+from typing import Callable, Optional
 
 logger = logging.getLogger(__name__)
 
 from PyQt6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+    QMainWindow, QWidget, QVBoxLayout,
     QSplitter, QMenuBar, QMenu, QStatusBar,
-    QFileDialog, QMessageBox, QLabel, QTabWidget
+    QFileDialog, QMessageBox, QLabel, QTabWidget, QTabBar,
+    QApplication, QInputDialog
 )
-from PyQt6.QtCore import Qt, QSettings, QTimer
-from PyQt6.QtGui import QAction, QKeySequence, QIcon
+from PyQt6.QtCore import Qt, QSettings, QTimer, QThread
+from PyQt6.QtGui import QAction, QKeySequence, QIcon, QImage
 
-from config.epconfig import EPConfig
+from config.epconfig import EPConfig, diff, touches
 from config.constants import APP_NAME, APP_VERSION, get_resolution_spec
 from gui.widgets.config_panel import ConfigPanel
 from gui.widgets.video_preview import VideoPreviewWidget
 from gui.widgets.timeline import TimelineWidget
 from gui.widgets.json_preview import JsonPreviewWidget
+from core.simulator_client import SimulatorClient
+from core.thumbnail_service import ThumbnailWorker, ThumbnailCache
+from core.loop_finder import LoopFinderWorker, LoopCandidate
+from core.video_analysis import VideoAnalysisWorker, VideoAnalysis
+from core.auto_crop import AutoCropWorker
+from core.batch_image_processor import BatchImageProcessor, ImageJob, ImageTarget
+from core.asset_importer import detach_asset
+from core.asset_index import AssetIndex, AssetWatcher
+from core.autosave import AutosaveJournal, recover, discard_journal
+from core.command_history import (
+    CommandHistory, Command, KIND_CONFIG, KIND_CROPBOX, KIND_IN_OUT, apply_config
+)
+from core.workspace import Workspace, ProjectSession, project_title
+from core.templates import list_templates, save_template, create_from_template, is_prerendered
 
 
 class MainWindow(QMainWindow):
@@ -31,6 +46,7 @@ class MainWindow(QMainWindow):
         super().__init__(parent)
 
         self._config: Optional[EPConfig] = None
+        self._config_snapshot: Optional[EPConfig] = None  # 上次处理变更时的配置（用于 diff）
         self._project_path: str = ""
         self._base_dir: str = ""
         self._is_modified: bool = False
@@ -40,6 +56,53 @@ class MainWindow(QMainWindow):
         self._loop_in_out: tuple[int, int] = (0, 0)   # 循环视频的(入点, 出点)
         self._intro_in_out: tuple[int, int] = (0, 0)  # 入场视频的(入点, 出点)
 
+        # 常驻模拟器会话（首次预览时启动，之后的修改直接推送）
+        self._simulator_client: Optional[SimulatorClient] = None
+        self._simulator_sync_timer = QTimer(self)
+        self._simulator_sync_timer.setSingleShot(True)
+        self._simulator_sync_timer.setInterval(300)
+        self._simulator_sync_timer.timeout.connect(self._sync_simulator)
+
+        # 项目素材索引（切换项目目录时重建），素材变化后延迟重新校验
+        self._asset_index: Optional[AssetIndex] = None
+        self._asset_watcher: Optional[AssetWatcher] = None
+        self._revalidate_timer = QTimer(self)
+        self._revalidate_timer.setSingleShot(True)
+        self._revalidate_timer.setInterval(300)
+        self._revalidate_timer.timeout.connect(lambda: self.json_preview.revalidate())
+
+        # 时间轴胶片条缩略图生成线程
+        self._thumbnail_worker: Optional[ThumbnailWorker] = None
+
+        # 自动循环点（结果按 (视频路径, 裁切框) 缓存，再次点击切换下一个推荐）
+        self._loop_finder_worker: Optional[LoopFinderWorker] = None
+        self._loop_candidates: list[LoopCandidate] = []
+        self._loop_candidates_key: Optional[tuple] = None
+        self._loop_candidate_index = 0
+
+        # 视频分析索引（场景切换、运动强度），按视频路径保存打开的项目中视频的结果
+        self._video_analyses: dict[str, VideoAnalysis] = {}
+        self._analysis_workers: dict[str, VideoAnalysisWorker] = {}
+
+        # 自动跟随裁切
+        self._auto_crop_worker: Optional[AutoCropWorker] = None
+
+        # 导出用图片的批量处理（结果按内容哈希缓存，重复导出时复用；模板中预处理好的图片直接链接）
+        self._image_processor = BatchImageProcessor(prerendered=is_prerendered)
+
+        # 撤销/重做（配置字段、裁剪框、入点/出点）
+        self._history = CommandHistory()
+
+        # 自动保存日志（打开/新建项目时创建），保存也在其后台线程中完成
+        self._autosave: Optional[AutosaveJournal] = None
+        self._save_requested = False  # 用户主动保存（失败时弹窗，自动保存失败只显示在状态栏）
+        self._after_save: Optional[Callable[[], None]] = None  # 保存完成后继续执行的操作（关闭标签页/退出）
+
+        # 打开的项目（标签页）。上面的 _config、_history 等始终是当前项目的状态，
+        # 切换项目时保存到 ProjectSession 中，切回时恢复
+        self._workspace = Workspace()
+        self._loop_image_path: Optional[str] = None
+
         self._setup_ui()
         self._setup_menu()
         self._setup_icon()
@@ -48,6 +111,7 @@ class MainWindow(QMainWindow):
 
         self._update_title()
         self._check_first_run()
+        QTimer.singleShot(0, self._check_crash_recovery)
 
         # 启动时延迟检查更新（2秒后）
         QTimer.singleShot(2000, self._check_update_on_startup)
@@ -76,13 +140,22 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(central_widget)
 
         # 主布局
-        main_layout = QHBoxLayout(central_widget)
+        main_layout = QVBoxLayout(central_widget)
         main_layout.setContentsMargins(0, 0, 0, 0)
         main_layout.setSpacing(0)
 
+        # 项目标签页（打开多个项目时显示）
+        self.project_tabs = QTabBar()
+        self.project_tabs.setTabsClosable(True)
+        self.project_tabs.setMovable(False)
+        self.project_tabs.setDocumentMode(True)
+        self.project_tabs.setExpanding(False)
+        self.project_tabs.hide()
+        main_layout.addWidget(self.project_tabs)
+
         # 三栏分割器
         self.splitter = QSplitter(Qt.Orientation.Horizontal)
-        main_layout.addWidget(self.splitter)
+        main_layout.addWidget(self.splitter, stretch=1)
 
         # === 左侧: 配置面板 ===
         self.config_panel = ConfigPanel()
@@ -137,6 +210,9 @@ class MainWindow(QMainWindow):
         self.action_open.setShortcut(QKeySequence.StandardKey.Open)
         file_menu.addAction(self.action_open)
 
+        self.action_new_from_template = QAction("从模板新建项目(&T)...", self)
+        file_menu.addAction(self.action_new_from_template)
+
         self.action_save = QAction("保存(&S)", self)
         self.action_save.setShortcut(QKeySequence.StandardKey.Save)
         file_menu.addAction(self.action_save)
@@ -145,15 +221,46 @@ class MainWindow(QMainWindow):
         self.action_save_as.setShortcut(QKeySequence("Ctrl+Shift+S"))
         file_menu.addAction(self.action_save_as)
 
+        self.action_close_project = QAction("关闭项目(&C)", self)
+        self.action_close_project.setShortcut(QKeySequence("Ctrl+W"))
+        file_menu.addAction(self.action_close_project)
+
+        file_menu.addSeparator()
+
+        self.action_save_template = QAction("保存为模板(&M)...", self)
+        file_menu.addAction(self.action_save_template)
+
         file_menu.addSeparator()
 
         self.action_exit = QAction("退出(&X)", self)
         self.action_exit.setShortcut(QKeySequence.StandardKey.Quit)
         file_menu.addAction(self.action_exit)
 
+        # 编辑菜单
+        edit_menu = menubar.addMenu("编辑(&E)")
+
+        self.action_undo = QAction("撤销(&U)", self)
+        self.action_undo.setShortcut(QKeySequence.StandardKey.Undo)
+        edit_menu.addAction(self.action_undo)
+
+        self.action_redo = QAction("重做(&R)", self)
+        self.action_redo.setShortcut(QKeySequence.StandardKey.Redo)
+        edit_menu.addAction(self.action_redo)
+
+        self._update_undo_actions()
+
         # 工具菜单
         tools_menu = menubar.addMenu("工具(&T)")
 
+        self.action_auto_crop = QAction("自动跟随裁切(&C)", self)
+        self.action_auto_crop.setToolTip("按画面主体为当前视频的每一帧计算裁剪框")
+        tools_menu.addAction(self.action_auto_crop)
+
+        self.action_clear_auto_crop = QAction("清除自动裁切(&L)", self)
+        tools_menu.addAction(self.action_clear_auto_crop)
+
+        tools_menu.addSeparator()
+
         self.action_flasher = QAction("固件烧录(&R)...", self)
         tools_menu.addAction(self.action_flasher)
 
@@ -177,10 +284,21 @@ class MainWindow(QMainWindow):
         # 菜单动作
         self.action_new.triggered.connect(self._on_new_project)
         self.action_open.triggered.connect(self._on_open_project)
+        self.action_new_from_template.triggered.connect(self._on_new_from_template)
+        self.action_save_template.triggered.connect(self._on_save_template)
         self.action_save.triggered.connect(self._on_save_project)
         self.action_save_as.triggered.connect(self._on_save_as)
+        self.action_close_project.triggered.connect(
+            lambda: self._on_close_project_tab(self._workspace.active_index)
+        )
+        self.project_tabs.currentChanged.connect(self._on_project_tab_changed)
+        self.project_tabs.tabCloseRequested.connect(self._on_close_project_tab)
         self.action_exit.triggered.connect(self.close)
+        self.action_undo.triggered.connect(self._on_undo)
+        self.action_redo.triggered.connect(self._on_redo)
         self.action_flasher.triggered.connect(self._on_flasher)
+        self.action_auto_crop.triggered.connect(self._on_auto_crop)
+        self.action_clear_auto_crop.triggered.connect(self._on_clear_auto_crop)
         self.action_shortcuts.triggered.connect(self._on_shortcuts)
         self.action_check_update.triggered.connect(self._on_check_update)
         self.action_about.triggered.connect(self._on_about)
@@ -194,6 +312,9 @@ class MainWindow(QMainWindow):
         self.config_panel.validate_requested.connect(self._on_validate)
         self.config_panel.export_requested.connect(self._on_export)
         self.config_panel.capture_frame_requested.connect(self._on_capture_frame)
+        self.config_panel.import_progress.connect(
+            lambda percent, name: self.status_bar.showMessage(f"正在复制 {name}: {percent}%")
+        )
 
         # 标签页切换
         self.preview_tabs.currentChanged.connect(self._on_preview_tab_changed)
@@ -203,12 +324,20 @@ class MainWindow(QMainWindow):
         self.video_preview.frame_changed.connect(self._on_frame_changed)
         self.video_preview.playback_state_changed.connect(self._on_playback_changed)
         self.video_preview.rotation_changed.connect(self.timeline.set_rotation)
+        self.video_preview.cropbox_changed.connect(self._schedule_simulator_sync)
+        self.video_preview.cropbox_edited.connect(
+            lambda before, after: self._record_cropbox("loop", before, after)
+        )
+        self.video_preview.rotation_changed.connect(self._schedule_simulator_sync)
 
         # 入场视频预览
         self.intro_preview.video_loaded.connect(self._on_intro_video_loaded)
         self.intro_preview.frame_changed.connect(self._on_intro_frame_changed)
         self.intro_preview.playback_state_changed.connect(self._on_intro_playback_changed)
         self.intro_preview.rotation_changed.connect(self._on_intro_rotation_changed)
+        self.intro_preview.cropbox_edited.connect(
+            lambda before, after: self._record_cropbox("intro", before, after)
+        )
 
         # 时间轴（默认连接到入场视频预览）
         self._connect_timeline_to_preview(self.intro_preview)
@@ -220,6 +349,14 @@ class MainWindow(QMainWindow):
         self.timeline.set_in_point_clicked.connect(self._on_set_in_point)
         self.timeline.set_out_point_clicked.connect(self._on_set_out_point)
 
+        # 自动循环点（仅循环视频）
+        self.timeline.loop_search_clicked.connect(self._on_loop_search)
+        self.timeline.set_loop_search_enabled(False)
+
+        # 场景切换跳转
+        self.timeline.prev_cut_clicked.connect(lambda: self._on_jump_to_cut(forward=False))
+        self.timeline.next_cut_clicked.connect(lambda: self._on_jump_to_cut(forward=True))
+
     def _load_settings(self):
         """加载设置"""
         settings = QSettings("ArknightsPassMaker", "MainWindow")
@@ -259,36 +396,157 @@ class MainWindow(QMainWindow):
             title = f"* {title}"
         self.setWindowTitle(title)
 
-    def _on_new_project(self):
-        """新建项目"""
-        if not self._check_save():
+        index = self._workspace.active_index
+        if index >= 0:
+            tab_text = project_title(self._project_path)
+            self.project_tabs.setTabText(index, f"* {tab_text}" if self._is_modified else tab_text)
+            self.project_tabs.setTabToolTip(index, self._project_path)
+
+    def _set_base_dir(self, base_dir: str):
+        """切换当前项目的目录，重建素材索引和文件监视（其他项目的索引不受影响）"""
+        if base_dir == self._base_dir and self._asset_index is not None:
             return
+        self._base_dir = base_dir
+        if self._asset_watcher is not None:
+            self._asset_watcher.stop()
+            self._asset_watcher.deleteLater()
+        # 旧索引不主动关闭：后台线程可能仍在使用，没有引用后自动释放
+        self._asset_index = AssetIndex(base_dir)
+        watcher = AssetWatcher(self._asset_index, self)
+        watcher.assets_changed.connect(lambda path, watcher=watcher: self._on_assets_changed(watcher))
+        self._asset_watcher = watcher
+        self._image_processor.asset_index = self._asset_index
+
+    def _on_assets_changed(self, watcher: AssetWatcher):
+        """素材文件变化，延迟重新校验（后台项目的变化切回时会重新校验）"""
+        if watcher is self._asset_watcher:
+            self._revalidate_timer.start()
+
+    def _on_new_project(self):
+        """新建项目（在新标签页中，当前项目保持打开）"""
+        dir_path = self._ask_new_project_dir()
+        if dir_path:
+            self._new_project(dir_path, EPConfig())
 
-        # 选择目录
+    def _ask_new_project_dir(self) -> str:
+        """
+        选择新项目目录
+
+        该目录的项目已打开时切换到它；目录中已有 epconfig.json 时询问打开已有项目还是覆盖。
+
+        Returns:
+            新项目目录，不新建项目时返回空字符串
+        """
         dir_path = QFileDialog.getExistingDirectory(
             self, "选择项目目录", ""
         )
         if not dir_path:
-            return
+            return ""
+
+        project_path = os.path.join(dir_path, "epconfig.json")
+        existing = self._workspace.find(project_path)
+        if existing >= 0:
+            self.project_tabs.setCurrentIndex(existing)
+            self.status_bar.showMessage(f"该目录的项目已打开: {dir_path}")
+            return ""
+        if os.path.exists(project_path):
+            result = QMessageBox.question(
+                self, "新建项目",
+                f"{project_path}\n\n该目录中已有项目。是否打开已有项目?\n"
+                "选择“否”将新建项目，保存时覆盖已有的 epconfig.json。",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+            )
+            if result == QMessageBox.StandardButton.Yes:
+                self._open_project_file(project_path)
+                return ""
+            if result != QMessageBox.StandardButton.No:
+                return ""
+        return dir_path
 
-        # 创建新配置
-        self._config = EPConfig()
-        self._base_dir = dir_path
+    def _new_project(self, dir_path: str, config: EPConfig, message: str = ""):
+        """
+        在新标签页中创建项目
+
+        Args:
+            dir_path: 项目目录
+            config: 新项目的配置
+            message: 状态栏提示，默认为 "新建项目: <目录>"
+        """
+        self._detach_active_session()
+        self._config = config
+        self._config_snapshot = self._config.copy()
+        self._history.clear()
+        self._update_undo_actions()
+        self._set_base_dir(dir_path)
         self._project_path = os.path.join(dir_path, "epconfig.json")
+        # 用户第一次保存前不自动写入 epconfig.json（目录中可能已有被确认覆盖的旧项目）
+        self._start_autosave(write_project=False)
         self._is_modified = True
+        self._add_session_tab()
 
         # 更新UI
         self.config_panel.set_config(self._config, self._base_dir)
-        self.json_preview.set_config(self._config, self._base_dir)
+        self.json_preview.set_config(self._config, self._base_dir, self._asset_index)
         self.video_preview.set_epconfig(self._config)
         self._update_title()
-        self.status_bar.showMessage(f"新建项目: {dir_path}")
+        self.status_bar.showMessage(message or f"新建项目: {dir_path}")
+
+    def _on_new_from_template(self):
+        """从模板新建项目（共用的叠加样式和预处理好的图片直接链接进项目，不重新处理）"""
+        templates = list_templates()
+        if not templates:
+            QMessageBox.information(
+                self, "提示",
+                "还没有模板\n\n打开一个项目后，使用 文件 > 保存为模板 创建"
+            )
+            return
+        names = [template.name for template in templates]
+        name, ok = QInputDialog.getItem(self, "从模板新建项目", "模板:", names, 0, False)
+        if not ok:
+            return
+        template = templates[names.index(name)]
 
-    def _on_open_project(self):
-        """打开项目"""
-        if not self._check_save():
+        dir_path = self._ask_new_project_dir()
+        if not dir_path:
+            return
+        try:
+            config = create_from_template(template, dir_path)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"从模板新建项目失败:\n{e}")
             return
+        self._new_project(dir_path, config, f"已从模板 {template.name} 新建项目: {dir_path}")
 
+    def _on_save_template(self):
+        """把当前项目的共用部分（叠加样式、职业图标、Logo、过渡效果）保存为模板"""
+        if not self._config:
+            QMessageBox.information(self, "提示", "请先创建或打开项目")
+            return
+
+        default_name = self._config.name or project_title(self._project_path)
+        name, ok = QInputDialog.getText(self, "保存为模板", "模板名称:", text=default_name)
+        name = name.strip()
+        if not ok or not name:
+            return
+        if any(template.name == name for template in list_templates()):
+            result = QMessageBox.question(
+                self, "保存为模板", f"模板 {name} 已存在，是否替换?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if result != QMessageBox.StandardButton.Yes:
+                return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            template = save_template(name, self._config, self._base_dir, self._image_processor)
+        except OSError as e:
+            QMessageBox.critical(self, "错误", f"保存模板失败:\n{e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.status_bar.showMessage(f"已保存模板 {template.name}（{len(template.images)} 张预处理图片）")
+
+    def _on_open_project(self):
+        """打开项目（在新标签页中，当前项目保持打开）"""
         path, _ = QFileDialog.getOpenFileName(
             self, "打开配置文件", "",
             "JSON文件 (*.json);;所有文件 (*.*)"
@@ -296,15 +554,49 @@ class MainWindow(QMainWindow):
         if not path:
             return
 
+        self._open_project_file(path)
+
+    def _open_project_file(self, path: str, recovered: Optional[EPConfig] = None):
+        """
+        打开项目文件
+
+        Args:
+            path: 项目文件路径
+            recovered: 已确认恢复的崩溃前配置；None 时读取项目文件，并检查是否有未保存的修改可恢复
+        """
+        existing = self._workspace.find(path)
+        if existing >= 0:
+            # 已打开：切换到它的标签页
+            self.project_tabs.setCurrentIndex(existing)
+            return
+
         try:
-            self._config = EPConfig.load_from_file(path)
+            if recovered is None:
+                config = EPConfig.load_from_file(path)
+                recovered = recover(path, config)
+                if recovered is not None and self._ask_recover(path):
+                    config = recovered
+                elif recovered is not None:
+                    discard_journal(path)
+                    recovered = None
+            else:
+                config = recovered
+            self._detach_active_session()
+            self._config = config
+            self._config_snapshot = self._config.copy()
+            self._history.clear()
+            self._update_undo_actions()
             self._project_path = path
-            self._base_dir = os.path.dirname(path)
-            self._is_modified = False
+            self._set_base_dir(os.path.dirname(path))
+            # 恢复的可能是从未保存过的新项目，同样等用户保存后才写入项目文件
+            self._start_autosave(write_project=os.path.exists(path))
+            self._is_modified = recovered is not None
+            self._add_session_tab()
+            session = self._workspace.active
 
             # 更新UI
             self.config_panel.set_config(self._config, self._base_dir)
-            self.json_preview.set_config(self._config, self._base_dir)
+            self.json_preview.set_config(self._config, self._base_dir, self._asset_index)
             self.video_preview.set_epconfig(self._config)
 
             # 尝试加载循环素材（延迟执行，避免阻塞UI）
@@ -319,11 +611,11 @@ class MainWindow(QMainWindow):
                     if self._config.loop.is_image:
                         # 图片模式：加载图片到预览器
                         logger.info(f"尝试加载循环图片: {file_path}")
-                        QTimer.singleShot(100, lambda fp=file_path: self._load_loop_image(fp))
+                        QTimer.singleShot(100, lambda fp=file_path, s=session: self._load_if_active(s, self._load_loop_image, fp))
                     else:
                         # 视频模式
                         logger.info(f"尝试加载循环视频: {file_path}")
-                        QTimer.singleShot(100, lambda vp=file_path: self.video_preview.load_video(vp))
+                        QTimer.singleShot(100, lambda vp=file_path, s=session: self._load_if_active(s, self.video_preview.load_video, vp))
                 else:
                     logger.warning(f"循环素材文件不存在: {file_path}")
 
@@ -335,14 +627,121 @@ class MainWindow(QMainWindow):
                 if os.path.exists(intro_path):
                     from PyQt6.QtCore import QTimer
                     logger.info(f"尝试加载入场视频: {intro_path}")
-                    QTimer.singleShot(200, lambda vp=intro_path: self.intro_preview.load_video(vp))
+                    QTimer.singleShot(200, lambda vp=intro_path, s=session: self._load_if_active(s, self.intro_preview.load_video, vp))
 
             self._update_title()
-            self.status_bar.showMessage(f"已打开: {path}")
+            if recovered is not None:
+                self.status_bar.showMessage(f"已恢复未保存的修改: {path}")
+            else:
+                self.status_bar.showMessage(f"已打开: {path}")
 
         except Exception as e:
             QMessageBox.critical(self, "错误", f"打开文件失败:\n{e}")
 
+    def _load_if_active(self, session: ProjectSession, load, path: str):
+        """延迟加载素材时项目仍是当前项目才加载（期间可能已切换到其他标签页）"""
+        if self._workspace.active is session:
+            load(path)
+
+    def _ask_recover(self, path: str) -> bool:
+        """询问是否恢复崩溃前未保存的修改"""
+        result = QMessageBox.question(
+            self, "恢复未保存的修改",
+            f"{path}\n\n上次编辑时程序未正常退出，有未保存的修改。是否恢复?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        return result == QMessageBox.StandardButton.Yes
+
+    def _check_crash_recovery(self):
+        """启动时检查上次会话是否未正常退出（打开的项目的自动保存日志中有未写入项目文件的修改）"""
+        settings = QSettings("ArknightsPassMaker", "MainWindow")
+        paths = settings.value("autosave_sessions", [], type=list)
+        if not paths or len(self._workspace) > 0:
+            return
+        for path in paths:
+            try:
+                saved = EPConfig.load_from_file(path) if os.path.exists(path) else None
+            except (OSError, ValueError) as e:
+                logger.warning(f"无法读取上次的项目文件 {path}: {e}")
+                saved = None
+            recovered = recover(path, saved)
+            if recovered is None:
+                continue
+            if self._ask_recover(path):
+                self._open_project_file(path, recovered)
+            else:
+                discard_journal(path)
+        self._update_autosave_sessions()
+
+    def _update_autosave_sessions(self):
+        """记录打开的项目（程序未正常退出时，下次启动检查这些项目的自动保存日志）"""
+        paths = [
+            session.project_path for index, session in enumerate(self._workspace.sessions)
+            if index != self._workspace.active_index and session.project_path
+        ]
+        if self._project_path:
+            paths.append(self._project_path)
+        settings = QSettings("ArknightsPassMaker", "MainWindow")
+        if paths:
+            settings.setValue("autosave_sessions", paths)
+        else:
+            settings.remove("autosave_sessions")
+
+    def _start_autosave(self, write_project: bool = True):
+        """
+        为当前项目创建自动保存日志（关闭之前的日志）
+
+        Args:
+            write_project: False 时在用户第一次保存前只记录日志，不自动写入项目文件
+        """
+        self._stop_autosave(discard=True)
+        journal = AutosaveJournal(self._project_path, self._config, self, write_project=write_project)
+        # 后台项目的日志继续运行，信号带上日志对象以区分是哪个项目
+        journal.saved.connect(lambda path, journal=journal: self._on_autosaved(journal, path))
+        journal.save_failed.connect(lambda message, journal=journal: self._on_autosave_failed(journal, message))
+        self._autosave = journal
+        self._update_autosave_sessions()
+
+    def _stop_autosave(self, discard: bool):
+        """关闭自动保存日志；discard 为 False 且有未写入的修改时保留日志以便下次恢复"""
+        if self._autosave is None:
+            return
+        self._autosave.close(discard=discard)
+        self._autosave.deleteLater()
+        self._autosave = None
+
+    def _on_autosaved(self, journal: AutosaveJournal, path: str):
+        """配置已写入项目文件（自动保存或用户保存）"""
+        if journal is not self._autosave:
+            # 后台项目的自动保存
+            for index, session in enumerate(self._workspace.sessions):
+                if session.autosave is journal and not journal.pending:
+                    session.is_modified = False
+                    self.project_tabs.setTabText(index, session.title)
+            self.status_bar.showMessage(f"已自动保存: {path}")
+            return
+        after_save, self._after_save = self._after_save, None
+        if not journal.pending:
+            self._is_modified = False
+            self._update_title()
+        self.status_bar.showMessage(f"已保存: {path}" if self._save_requested else f"已自动保存: {path}")
+        self._save_requested = False
+        # 保存期间又有修改时不继续被中止的操作（关闭时会再次询问）
+        if after_save is not None and not self._is_modified:
+            after_save()
+
+    def _on_autosave_failed(self, journal: AutosaveJournal, message: str):
+        """写入项目文件失败"""
+        if journal is not self._autosave:
+            self.status_bar.showMessage(f"自动保存失败: {journal.project_path}: {message}")
+            return
+        self._after_save = None
+        if self._save_requested:
+            QMessageBox.critical(self, "错误", f"保存失败:\n{message}")
+        else:
+            self.status_bar.showMessage(f"自动保存失败: {message}")
+        self._save_requested = False
+
     def _on_save_project(self):
         """保存项目"""
         if not self._config:
@@ -352,13 +751,12 @@ class MainWindow(QMainWindow):
             self._on_save_as()
             return
 
-        try:
-            self._config.save_to_file(self._project_path)
-            self._is_modified = False
-            self._update_title()
-            self.status_bar.showMessage(f"已保存: {self._project_path}")
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"保存失败:\n{e}")
+        # 在自动保存线程中写入，完成后由 _on_autosaved / _on_autosave_failed 更新状态
+        if self._autosave is None:
+            self._start_autosave()
+        self._save_requested = True
+        self._autosave.save(self._config)
+        self.status_bar.showMessage(f"正在保存: {self._project_path}")
 
     def _on_save_as(self):
         """另存为"""
@@ -372,16 +770,18 @@ class MainWindow(QMainWindow):
         )
         if not path:
             return
+        existing = self._workspace.find(path)
+        if existing >= 0 and existing != self._workspace.active_index:
+            QMessageBox.warning(self, "提示", f"该文件已在另一个标签页中打开:\n{path}")
+            return
 
-        try:
-            self._config.save_to_file(path)
-            self._project_path = path
-            self._base_dir = os.path.dirname(path)
-            self._is_modified = False
-            self._update_title()
-            self.status_bar.showMessage(f"已保存: {path}")
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"保存失败:\n{e}")
+        # 之后的修改记录到新项目文件的日志中
+        self._project_path = path
+        self._set_base_dir(os.path.dirname(path))
+        self._start_autosave()
+        self.json_preview.set_config(self._config, self._base_dir, self._asset_index)
+        self._update_title()
+        self._on_save_project()
 
     def _on_validate(self):
         """验证配置"""
@@ -391,7 +791,7 @@ class MainWindow(QMainWindow):
 
         from core.validator import EPConfigValidator
 
-        validator = EPConfigValidator(self._base_dir)
+        validator = EPConfigValidator(self._base_dir, probe_cache=self._asset_index)
         results = validator.validate_config(self._config)
 
         if not validator.has_errors():
@@ -420,7 +820,7 @@ class MainWindow(QMainWindow):
 
         # 验证配置
         from core.validator import EPConfigValidator
-        validator = EPConfigValidator(self._base_dir)
+        validator = EPConfigValidator(self._base_dir, probe_cache=self._asset_index)
         validator.validate_config(self._config)
 
         if validator.has_errors():
@@ -482,6 +882,9 @@ class MainWindow(QMainWindow):
         self._export_service.progress_updated.connect(
             self._export_dialog.update_progress
         )
+        self._export_service.stage_metrics.connect(
+            self._export_dialog.set_stage_metrics
+        )
         self._export_service.export_completed.connect(
             lambda msg: self._on_export_completed(True, msg)
         )
@@ -507,9 +910,7 @@ class MainWindow(QMainWindow):
         self._export_dialog.exec()
 
     def _on_simulator(self):
-        """打开模拟器预览"""
-        import subprocess
-
+        """打开模拟器预览（复用已运行的模拟器会话）"""
         if not self._config:
             QMessageBox.information(self, "提示", "请先创建或打开项目")
             return
@@ -547,43 +948,50 @@ class MainWindow(QMainWindow):
             )
             return
 
-        try:
-            # 使用项目目录中的 epconfig.json
-            config_path = os.path.join(self._base_dir, "epconfig.json")
-
-            # 确保配置已保存（避免内存中的修改与文件不一致）
-            if not os.path.exists(config_path):
-                QMessageBox.warning(
-                    self, "警告",
-                    "请先保存项目配置\n\n"
-                    "文件 → 保存项目"
-                )
-                return
-
-            # 获取 cropbox 参数（使用原始坐标系）
-            cropbox = self.video_preview.get_cropbox_for_export()
-            rotation = self.video_preview.get_rotation()
-
-            # 启动 Rust 模拟器
-            popen_kwargs = {}
-            if sys.platform == 'win32':
-                popen_kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+        # 素材路径相对于项目目录解析
+        if not self._base_dir:
+            QMessageBox.warning(
+                self, "警告",
+                "请先保存项目配置\n\n"
+                "文件 → 保存项目"
+            )
+            return
 
-            subprocess.Popen([
-                simulator_path,
-                "--config", config_path,
-                "--base-dir", self._base_dir,
-                "--app-dir", app_dir,
-                "--cropbox", f"{cropbox[0]},{cropbox[1]},{cropbox[2]},{cropbox[3]}",
-                "--rotation", str(rotation)
-            ], **popen_kwargs)
+        try:
+            client = self._simulator_client
+            if client is None or not client.is_running:
+                client = SimulatorClient(simulator_path, app_dir)
+                client.start()
+                self._simulator_client = client
+                logger.info(f"模拟器已启动: {simulator_path}")
 
-            logger.info(f"模拟器已启动: {simulator_path}")
+            # 推送当前（可能尚未保存的）配置并开始播放
+            self._sync_simulator(force=True)
 
         except Exception as e:
             logger.error(f"启动模拟器失败: {e}")
             QMessageBox.critical(self, "错误", f"启动模拟器失败:\n{e}")
 
+    def _schedule_simulator_sync(self, *args):
+        """配置或裁切框变化后延迟同步到模拟器（合并连续修改）"""
+        if self._simulator_client is not None and self._simulator_client.is_running:
+            self._simulator_sync_timer.start()
+
+    def _sync_simulator(self, force: bool = False):
+        """把当前配置推送到运行中的模拟器（内容未变化时跳过）"""
+        client = self._simulator_client
+        if client is None or not client.is_running or not self._config:
+            return
+
+        # 获取 cropbox 参数（使用原始坐标系）
+        cropbox = self.video_preview.get_cropbox_for_export()
+        rotation = self.video_preview.get_rotation()
+
+        if client.load_config(
+            self._config.to_dict(), self._base_dir, cropbox, rotation, force=force
+        ):
+            client.control("play")
+
     def _on_flasher(self):
         """启动固件烧录工具"""
         import subprocess
@@ -667,8 +1075,7 @@ class MainWindow(QMainWindow):
 
     def _check_update_on_startup(self):
         """启动时后台检查更新"""
-        from datetime import datetime, timedelta
-        from config.constants import UPDATE_CHECK_INTERVAL_HOURS
+        from core.update_service import UpdateService
 
         settings = QSettings("ArknightsPassMaker", "MainWindow")
 
@@ -677,28 +1084,17 @@ class MainWindow(QMainWindow):
         if not auto_check_enabled:
             return
 
-        # 检查上次检查时间（避免频繁检查）
-        last_check = settings.value("last_update_check", "")
-        if last_check:
-            try:
-                last_check_time = datetime.fromisoformat(last_check)
-                if datetime.now() - last_check_time < timedelta(hours=UPDATE_CHECK_INTERVAL_HOURS):
-                    logger.debug("跳过更新检查（24小时内已检查）")
-                    return
-            except ValueError:
-                pass
+        # 检查间隔内已有缓存的检查结果（避免频繁检查）
+        if not UpdateService.is_check_due():
+            logger.debug("跳过更新检查（检查间隔内已检查）")
+            return
 
         # 创建更新服务进行后台检查
-        from core.update_service import UpdateService
-
         self._startup_update_service = UpdateService(APP_VERSION, self)
         self._startup_update_service.check_completed.connect(self._on_startup_update_check_completed)
         self._startup_update_service.check_failed.connect(self._on_startup_update_check_failed)
         self._startup_update_service.check_for_updates()
 
-        # 记录检查时间
-        settings.setValue("last_update_check", datetime.now().isoformat())
-
     def _on_startup_update_check_completed(self, release_info):
         """启动时更新检查完成"""
         if release_info:
@@ -726,16 +1122,35 @@ class MainWindow(QMainWindow):
             del self._startup_update_service
 
     def _on_config_changed(self):
-        """配置变更"""
+        """配置变更（与上次的快照比较，只更新受影响的部分）"""
+        if not self._config:
+            return
+        changes = diff(self._config_snapshot, self._config) if self._config_snapshot is not None else None
+        if changes == []:
+            # 控件发出了信号但配置内容没有变化（如重新设置相同的文本）
+            return
+        if changes is not None:
+            logger.debug(f"配置变更: {', '.join(changes)}")
+            self._history.record_config(self._config_snapshot, self._config, changes)
+            self._update_undo_actions()
+        self._config_snapshot = self._config.copy()
+        self._refresh_after_config_change(changes)
+
+    def _refresh_after_config_change(self, changes: Optional[list]):
+        """配置变更后记录到自动保存日志，并更新标题、预览和模拟器（changes 为 None 时全部更新）"""
+        if self._autosave is not None and changes:
+            self._autosave.record(self._config, changes)
         self._is_modified = True
         self._update_title()
 
-        # 更新JSON预览
-        if self._config:
-            self.json_preview.set_config(self._config, self._base_dir)
-            # 更新视频预览的叠加UI配置
+        # 更新JSON预览和校验状态
+        self.json_preview.update_preview(changes)
+        # 更新视频预览的叠加UI配置
+        if changes is None or touches(changes, "overlay", "screen"):
             self.video_preview.set_epconfig(self._config)
 
+        self._schedule_simulator_sync()
+
     def _on_video_file_selected(self, path: str):
         """视频文件被选择"""
         logger.info(f"视频文件被选择: {path}")
@@ -807,6 +1222,138 @@ class MainWindow(QMainWindow):
             self.timeline.set_rotation(preview.get_rotation())
             self.timeline.set_playing(preview.is_playing)
 
+        self._load_timeline_thumbnails(preview.video_path)
+        self._update_timeline_analysis(preview.video_path)
+
+    def _stop_thumbnail_worker(self):
+        """停止并释放缩略图生成线程"""
+        worker = self._thumbnail_worker
+        if worker is not None:
+            self._thumbnail_worker = None
+            worker.thumbnail_ready.disconnect()
+            worker.requestInterruption()
+            worker.wait()
+            worker.deleteLater()
+
+    def _load_timeline_thumbnails(self, video_path: str):
+        """后台生成时间轴胶片条缩略图"""
+        if (self._thumbnail_worker is not None
+                and self._thumbnail_worker.video_path == video_path
+                and self._thumbnail_worker.isRunning()):
+            return
+
+        self._stop_thumbnail_worker()
+        self.timeline.clear_thumbnails()
+        if not video_path:
+            return
+
+        worker = ThumbnailWorker(video_path, cache=ThumbnailCache(asset_index=self._asset_index), parent=self)
+        worker.thumbnail_ready.connect(
+            lambda frame, image, worker=worker: self._on_thumbnail_ready(worker, frame, image)
+        )
+        self._thumbnail_worker = worker
+        worker.start()
+
+    def _on_thumbnail_ready(self, worker: ThumbnailWorker, frame: int, image: QImage):
+        """缩略图生成完成（停止前已发出、仍在事件队列中的旧视频缩略图丢弃）"""
+        if worker is self._thumbnail_worker:
+            self.timeline.add_thumbnail(frame, image)
+
+    def _start_video_analysis(self, video_path: str):
+        """后台分析视频（已有结果或正在分析时跳过）"""
+        if not video_path or video_path in self._video_analyses or video_path in self._analysis_workers:
+            return
+
+        worker = VideoAnalysisWorker(video_path, self._base_dir, asset_index=self._asset_index, parent=self)
+        worker.analysis_ready.connect(self._on_video_analysis_ready)
+        worker.finished.connect(lambda path=video_path: self._analysis_workers.pop(path, None))
+        self._analysis_workers[video_path] = worker
+        worker.start(QThread.Priority.LowPriority)
+
+    def _on_video_analysis_ready(self, video_path: str, analysis: VideoAnalysis):
+        """视频分析完成"""
+        # 只保留打开的项目中的视频的结果（切换项目时不必重新分析）
+        current = {self.intro_preview.video_path, self.video_preview.video_path}
+        current.update(self._workspace.video_paths())
+        if video_path not in current:
+            return
+        for path in list(self._video_analyses):
+            if path not in current:
+                del self._video_analyses[path]
+        self._video_analyses[video_path] = analysis
+
+        active = self.intro_preview if self.preview_tabs.currentIndex() == 0 else self.video_preview
+        if active.video_path == video_path:
+            self._update_timeline_analysis(video_path)
+
+    def _update_timeline_analysis(self, video_path: str):
+        """在时间轴上显示视频的场景切换和运动强度"""
+        analysis = self._video_analyses.get(video_path)
+        if analysis is None:
+            self.timeline.set_scene_analysis([])
+        else:
+            self.timeline.set_scene_analysis(analysis.cuts.tolist(), analysis.motion)
+
+    def _on_jump_to_cut(self, forward: bool):
+        """跳到上一个/下一个场景切换"""
+        preview = self.intro_preview if self.preview_tabs.currentIndex() == 0 else self.video_preview
+        analysis = self._video_analyses.get(preview.video_path)
+        if analysis is None:
+            self.status_bar.showMessage("视频分析尚未完成")
+            return
+
+        current = preview.current_frame_index
+        target = analysis.next_cut(current) if forward else analysis.prev_cut(current)
+        if target is None:
+            self.status_bar.showMessage("没有更多场景切换")
+            return
+        preview.seek_to_frame(target)
+
+    def _on_auto_crop(self):
+        """为当前预览的视频计算自动跟随裁切路径"""
+        preview = self.intro_preview if self.preview_tabs.currentIndex() == 0 else self.video_preview
+        if not preview.video_path:
+            self.status_bar.showMessage("请先加载视频")
+            return
+        if self._auto_crop_worker is not None and self._auto_crop_worker.isRunning():
+            return
+
+        # 保持当前裁剪框尺寸，只计算每帧位置
+        _, _, w, h = preview.get_cropbox_for_export()
+        analysis = self._video_analyses.get(preview.video_path)
+        cuts = analysis.cuts.tolist() if analysis is not None else None
+
+        worker = AutoCropWorker(preview.video_path, (w, h), cuts, parent=self)
+        worker.progress_updated.connect(
+            lambda done, total: self.status_bar.showMessage(
+                f"正在计算自动裁切... {done * 100 // max(1, total)}%"
+            )
+        )
+        worker.path_ready.connect(self._on_auto_crop_ready)
+        worker.crop_failed.connect(
+            lambda message: self.status_bar.showMessage(f"自动裁切失败: {message}")
+        )
+        self._auto_crop_worker = worker
+        self.status_bar.showMessage("正在计算自动裁切...")
+        worker.start()
+
+    def _on_auto_crop_ready(self, video_path: str, path):
+        """自动裁切路径计算完成"""
+        for preview in (self.intro_preview, self.video_preview):
+            if preview.video_path == video_path:
+                preview.set_crop_path(path)
+                self.status_bar.showMessage(
+                    f"已应用自动跟随裁切（{len(path)} 帧），手动调整裁剪框将恢复固定裁剪"
+                )
+                return
+
+    def _on_clear_auto_crop(self):
+        """清除当前预览的自动跟随裁切"""
+        preview = self.intro_preview if self.preview_tabs.currentIndex() == 0 else self.video_preview
+        if preview.get_crop_path() is not None:
+            preview.set_crop_path(None)
+            self.status_bar.showMessage("已清除自动跟随裁切")
+
     def _on_preview_tab_changed(self, index: int):
         """预览标签页切换"""
         # 保存当前标签页的入点/出点
@@ -817,21 +1364,31 @@ class MainWindow(QMainWindow):
         if index == 0:
             # 即将切换到入场视频，保存循环视频的入点/出点
             self._loop_in_out = (current_in, current_out)
-            # 连接入场视频预览
-            self._connect_timeline_to_preview(self.intro_preview)
-            # 恢复入场视频的入点/出点
-            self.timeline.set_in_point(self._intro_in_out[0])
-            self.timeline.set_out_point(self._intro_in_out[1])
             logger.debug("切换到入场视频预览")
         else:
             # 即将切换到循环视频，保存入场视频的入点/出点
             self._intro_in_out = (current_in, current_out)
-            # 连接循环视频预览
+            logger.debug("切换到循环视频预览")
+        self._show_preview_in_timeline(index)
+
+    def _show_preview_in_timeline(self, index: int):
+        """把时间轴连接到标签页 index 的预览器，并恢复其入点/出点"""
+        if index == 0:
+            # 连接入场视频预览，恢复入场视频的入点/出点
+            self._connect_timeline_to_preview(self.intro_preview)
+            self.timeline.set_in_point(self._intro_in_out[0])
+            self.timeline.set_out_point(self._intro_in_out[1])
+            self.timeline.set_loop_suggestions([])
+            self.timeline.set_loop_search_enabled(False)
+        else:
+            # 连接循环视频预览，恢复循环视频的入点/出点
             self._connect_timeline_to_preview(self.video_preview)
-            # 恢复循环视频的入点/出点
             self.timeline.set_in_point(self._loop_in_out[0])
             self.timeline.set_out_point(self._loop_in_out[1])
-            logger.debug("切换到循环视频预览")
+            self.timeline.set_loop_suggestions(
+                [(c.in_frame, c.out_frame) for c in self._loop_candidates]
+            )
+            self.timeline.set_loop_search_enabled(True)
 
     def _on_intro_video_loaded(self, total_frames: int, fps: float):
         """入场视频加载完成"""
@@ -841,6 +1398,8 @@ class MainWindow(QMainWindow):
             self.timeline.set_fps(fps)
             self.timeline.set_in_point(0)
             self.timeline.set_out_point(total_frames - 1)
+            self._load_timeline_thumbnails(self.intro_preview.video_path)
+        self._start_video_analysis(self.intro_preview.video_path)
         # 更新存储
         self._intro_in_out = (0, total_frames - 1)
         self.status_bar.showMessage(f"入场视频已加载: {total_frames} 帧, {fps:.1f} FPS")
@@ -870,7 +1429,7 @@ class MainWindow(QMainWindow):
             # 循环视频
             current_frame = self.video_preview.current_frame_index
 
-        self.timeline.set_in_point(current_frame)
+        self._edit_in_out(lambda: self.timeline.set_in_point(current_frame), "设置入点")
         logger.debug(f"设置入点: {current_frame}")
 
     def _on_set_out_point(self):
@@ -883,9 +1442,148 @@ class MainWindow(QMainWindow):
             # 循环视频
             current_frame = self.video_preview.current_frame_index
 
-        self.timeline.set_out_point(current_frame)
+        self._edit_in_out(lambda: self.timeline.set_out_point(current_frame), "设置出点")
         logger.debug(f"设置出点: {current_frame}")
 
+    def _apply_in_out(self, in_point: int, out_point: int):
+        """把时间轴的入点/出点设为给定值（先设出点，避免被旧入点截断）"""
+        self.timeline.set_out_point(out_point)
+        self.timeline.set_in_point(in_point)
+
+    def _edit_in_out(self, edit, label: str):
+        """执行修改当前时间轴入点/出点的操作，并记录到撤销历史"""
+        tab = "intro" if self.preview_tabs.currentIndex() == 0 else "loop"
+        before = (self.timeline.get_in_point(), self.timeline.get_out_point())
+        edit()
+        after = (self.timeline.get_in_point(), self.timeline.get_out_point())
+        self._history.record(KIND_IN_OUT, {f"in_out:{tab}": (before, after)}, label)
+        self._update_undo_actions()
+
+    def _record_cropbox(self, tab: str, before: tuple, after: tuple):
+        """记录用户对裁剪框的修改（连续的拖动/按键合并为一条）"""
+        self._history.record(KIND_CROPBOX, {f"cropbox:{tab}": (before, after)}, "调整裁剪框")
+        self._update_undo_actions()
+
+    # ========== 撤销/重做 ==========
+
+    def _update_undo_actions(self):
+        """更新撤销/重做菜单项的可用状态和描述"""
+        self.action_undo.setEnabled(self._history.can_undo)
+        self.action_undo.setText(f"撤销 {self._history.undo_label}(&U)" if self._history.can_undo else "撤销(&U)")
+        self.action_redo.setEnabled(self._history.can_redo)
+        self.action_redo.setText(f"重做 {self._history.redo_label}(&R)" if self._history.can_redo else "重做(&R)")
+
+    def _on_undo(self):
+        """撤销"""
+        command = self._history.undo()
+        if command is not None:
+            self._apply_command(command, undo=True)
+            self.status_bar.showMessage(f"已撤销: {command.label}")
+        self._update_undo_actions()
+
+    def _on_redo(self):
+        """重做"""
+        command = self._history.redo()
+        if command is not None:
+            self._apply_command(command, undo=False)
+            self.status_bar.showMessage(f"已重做: {command.label}")
+        self._update_undo_actions()
+
+    def _apply_command(self, command: Command, undo: bool):
+        """把命令的修改前（撤销）或修改后（重做）的值应用回界面和配置"""
+        if command.kind == KIND_CONFIG:
+            if not self._config:
+                return
+            apply_config(self._config, command, undo)
+            self._config_snapshot = self._config.copy()
+            self.config_panel.set_config(self._config, self._base_dir)
+            self._refresh_after_config_change(list(command.changes))
+            return
+
+        values = command.before() if undo else command.after()
+        for key, value in values.items():
+            tab = key.split(":", 1)[1]
+            if command.kind == KIND_CROPBOX:
+                preview = self.intro_preview if tab == "intro" else self.video_preview
+                preview.set_cropbox(*value)
+            elif command.kind == KIND_IN_OUT:
+                if (tab == "intro") == (self.preview_tabs.currentIndex() == 0):
+                    self._apply_in_out(*value)
+                elif tab == "intro":
+                    self._intro_in_out = tuple(value)
+                else:
+                    self._loop_in_out = tuple(value)
+
+    def _on_loop_search(self):
+        """查找循环视频的无缝循环点；已有结果时切换到下一个推荐"""
+        video_path = self.video_preview.video_path
+        if not video_path:
+            self.status_bar.showMessage("请先加载循环视频")
+            return
+
+        key = (video_path, self.video_preview.get_cropbox_for_export())
+        if self._loop_candidates and key == self._loop_candidates_key:
+            self._loop_candidate_index = (self._loop_candidate_index + 1) % len(self._loop_candidates)
+            self._apply_loop_candidate()
+            return
+
+        if self._loop_finder_worker is not None and self._loop_finder_worker.isRunning():
+            return
+
+        worker = LoopFinderWorker(
+            video_path, key[1], analysis=self._video_analyses.get(video_path), parent=self
+        )
+        worker.progress_updated.connect(self._on_loop_search_progress)
+        worker.candidates_found.connect(
+            lambda candidates: self._on_loop_candidates_found(key, candidates)
+        )
+        worker.search_failed.connect(
+            lambda message: self.status_bar.showMessage(f"查找循环点失败: {message}")
+        )
+        worker.finished.connect(lambda: self.timeline.set_loop_search_enabled(
+            self.preview_tabs.currentIndex() == 1
+        ))
+        self._loop_finder_worker = worker
+        self.timeline.set_loop_search_enabled(False)
+        self.status_bar.showMessage("正在查找循环点...")
+        worker.start()
+
+    def _on_loop_search_progress(self, done: int, total: int):
+        """循环点查找进度"""
+        if total > 0:
+            self.status_bar.showMessage(f"正在查找循环点... {done * 100 // total}%")
+
+    def _on_loop_candidates_found(self, key: tuple, candidates: list):
+        """循环点查找完成"""
+        if key[0] != self.video_preview.video_path:
+            # 查找期间切换了项目或视频
+            return
+        self._loop_candidates = candidates
+        self._loop_candidates_key = key
+        self._loop_candidate_index = 0
+        if self.preview_tabs.currentIndex() == 1:
+            self.timeline.set_loop_suggestions([(c.in_frame, c.out_frame) for c in candidates])
+            self._apply_loop_candidate()
+
+    def _apply_loop_candidate(self):
+        """将当前推荐的循环点设为入点/出点"""
+        candidate = self._loop_candidates[self._loop_candidate_index]
+        self._edit_in_out(lambda: self._apply_in_out(candidate.in_frame, candidate.out_frame), "推荐循环点")
+        self.video_preview.seek_to_frame(candidate.in_frame)
+        self.status_bar.showMessage(
+            f"推荐循环点 {self._loop_candidate_index + 1}/{len(self._loop_candidates)}: "
+            f"{candidate.in_frame} - {candidate.out_frame} "
+            f"({candidate.length} 帧, 差异 {candidate.score:.3f})"
+        )
+
+    def _clear_loop_candidates(self):
+        """清除循环点推荐（循环视频变化时）"""
+        self._loop_candidates = []
+        self._loop_candidates_key = None
+        self._loop_candidate_index = 0
+        if self.preview_tabs.currentIndex() == 1:
+            self.timeline.set_loop_suggestions([])
+
     def _load_loop_image(self, path: str):
         """加载循环图片到预览器"""
         import cv2
@@ -946,6 +1644,7 @@ class MainWindow(QMainWindow):
         # 清空时间轴
         self.timeline.set_total_frames(0)
         self._loop_in_out = (0, 0)
+        self._clear_loop_candidates()
 
         logger.info(f"循环模式切换为: {'图片' if is_image else '视频'}")
 
@@ -955,6 +1654,10 @@ class MainWindow(QMainWindow):
         self.timeline.set_fps(fps)
         self.timeline.set_in_point(0)
         self.timeline.set_out_point(total_frames - 1)
+        self._clear_loop_candidates()
+        self._start_video_analysis(self.video_preview.video_path)
+        if self.preview_tabs.currentIndex() == 1:
+            self._load_timeline_thumbnails(self.video_preview.video_path)
         # 更新存储
         self._loop_in_out = (0, total_frames - 1)
         self.status_bar.showMessage(f"视频已加载: {total_frames} 帧, {fps:.1f} FPS")
@@ -1005,6 +1708,8 @@ class MainWindow(QMainWindow):
 
         # 3. 保存为图标文件
         icon_path = os.path.join(self._base_dir, "icon.png")
+        # icon.png 可能是导入时创建的硬链接，不能原地改写
+        detach_asset(icon_path)
         success = cv2.imwrite(icon_path, frame)
 
         if success:
@@ -1017,9 +1722,10 @@ class MainWindow(QMainWindow):
     def _collect_export_data(self) -> dict:
         """收集导出所需的数据"""
         from core.export_service import VideoExportParams
-        from core.image_processor import ImageProcessor
 
         data = {}
+        # 图片处理任务，最后在线程池中一起处理: 导出数据键 -> 任务
+        image_jobs = {}
 
         # 收集 Logo/Icon 图片
         icon_path = self._config.icon
@@ -1027,9 +1733,7 @@ class MainWindow(QMainWindow):
             if not os.path.isabs(icon_path):
                 icon_path = os.path.join(self._base_dir, icon_path)
             if os.path.exists(icon_path):
-                logo_img = ImageProcessor.load_image(icon_path)
-                if logo_img is not None:
-                    data['logo_mat'] = ImageProcessor.process_for_logo(logo_img)
+                image_jobs['logo_mat'] = ImageJob(icon_path, ImageTarget.logo())
 
         # 收集循环素材参数
         if self._config.loop.is_image:
@@ -1052,7 +1756,8 @@ class MainWindow(QMainWindow):
                 end_frame=out_point,
                 fps=self.video_preview.video_fps,
                 resolution=self._config.screen.value,
-                rotation=rotation
+                rotation=rotation,
+                crop_path=self.video_preview.get_crop_path()
             )
 
         # 收集入场视频参数 (如果启用)
@@ -1070,7 +1775,8 @@ class MainWindow(QMainWindow):
                     end_frame=self.intro_preview.total_frames,
                     fps=self.intro_preview.video_fps,
                     resolution=self._config.screen.value,
-                    rotation=rotation
+                    rotation=rotation,
+                    crop_path=self.intro_preview.get_crop_path()
                 )
             else:
                 # 回退：直接读取文件信息
@@ -1106,16 +1812,16 @@ class MainWindow(QMainWindow):
                 if not os.path.isabs(img_path):
                     img_path = os.path.join(self._base_dir, img_path)
                 if os.path.exists(img_path):
-                    overlay_img = ImageProcessor.load_image(img_path)
-                    if overlay_img is not None:
-                        # 获取目标分辨率
-                        spec = get_resolution_spec(self._config.screen.value)
-                        target_size = (spec['width'], spec['height'])
+                    # 缩放到目标分辨率
+                    spec = get_resolution_spec(self._config.screen.value)
+                    image_jobs['overlay_mat'] = ImageJob(
+                        img_path, ImageTarget.resize(spec['width'], spec['height'])
+                    )
 
-                        # 缩放到目标分辨率
-                        import cv2
-                        overlay_img = cv2.resize(overlay_img, target_size)
-                        data['overlay_mat'] = overlay_img
+        results = self._image_processor.run(list(image_jobs.values()))
+        for key, result in zip(image_jobs, results):
+            if result.ok:
+                data[key] = result.image
 
         return data
 
@@ -1130,8 +1836,6 @@ class MainWindow(QMainWindow):
         """
         from config.epconfig import OverlayType
         from config.constants import ARK_CLASS_ICON_SIZE, ARK_LOGO_SIZE
-        from core.image_processor import ImageProcessor
-        import cv2
 
         if not self._config:
             return
@@ -1144,49 +1848,29 @@ class MainWindow(QMainWindow):
         if not ark_opts:
             return
 
-        # 处理职业图标 (50x50)
-        if ark_opts.operator_class_icon:
-            src_path = ark_opts.operator_class_icon
+        # 选项名 -> (显示名, 目标尺寸, 导出文件名)
+        targets = {
+            "operator_class_icon": ("职业图标", ARK_CLASS_ICON_SIZE, "class_icon.png"),  # 50x50
+            "logo": ("Logo", ARK_LOGO_SIZE, "ark_logo.png"),                            # 75x35
+        }
+        jobs = {}
+        for option, (_label, size, dst_filename) in targets.items():
+            src_path = getattr(ark_opts, option)
+            if not src_path:
+                continue
             if not os.path.isabs(src_path):
                 src_path = os.path.join(self._base_dir, src_path)
-
             if os.path.exists(src_path):
-                img = ImageProcessor.load_image(src_path)
-                if img is not None:
-                    # 缩放到目标尺寸
-                    img = cv2.resize(img, ARK_CLASS_ICON_SIZE)
-                    # 保存到导出目录
-                    dst_filename = "class_icon.png"
-                    dst_path = os.path.join(output_dir, dst_filename)
-                    success, encoded = cv2.imencode('.png', img)
-                    if success:
-                        with open(dst_path, 'wb') as f:
-                            f.write(encoded.tobytes())
-                        # 更新配置中的路径为相对路径
-                        ark_opts.operator_class_icon = dst_filename
-                        logger.info(f"已导出职业图标: {dst_path}")
-
-        # 处理Logo (75x35)
-        if ark_opts.logo:
-            src_path = ark_opts.logo
-            if not os.path.isabs(src_path):
-                src_path = os.path.join(self._base_dir, src_path)
+                # 缩放到目标尺寸并保存到导出目录
+                jobs[option] = ImageJob(
+                    src_path, ImageTarget.resize(*size), os.path.join(output_dir, dst_filename)
+                )
 
-            if os.path.exists(src_path):
-                img = ImageProcessor.load_image(src_path)
-                if img is not None:
-                    # 缩放到目标尺寸
-                    img = cv2.resize(img, ARK_LOGO_SIZE)
-                    # 保存到导出目录
-                    dst_filename = "ark_logo.png"
-                    dst_path = os.path.join(output_dir, dst_filename)
-                    success, encoded = cv2.imencode('.png', img)
-                    if success:
-                        with open(dst_path, 'wb') as f:
-                            f.write(encoded.tobytes())
-                        # 更新配置中的路径为相对路径
-                        ark_opts.logo = dst_filename
-                        logger.info(f"已导出Logo: {dst_path}")
+        for option, result in zip(jobs, self._image_processor.run(list(jobs.values()))):
+            if result.ok:
+                # 更新配置中的路径为相对路径
+                setattr(ark_opts, option, os.path.basename(result.job.output_path))
+                logger.info(f"已导出{targets[option][0]}: {result.job.output_path}")
 
     def _process_image_overlay(self):
         """处理 ImageOverlay 的路径标准化"""
@@ -1215,14 +1899,207 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("导出失败")
             logger.error(f"导出失败: {message}")
 
-    def _check_save(self) -> bool:
-        """检查是否需要保存"""
+    # ========== 多项目 ==========
+
+    def _add_session_tab(self):
+        """为刚打开/新建的当前项目添加标签页"""
+        index = self._workspace.add(ProjectSession(config=self._config))
+        self._workspace.active_index = index
+        self.project_tabs.blockSignals(True)
+        self.project_tabs.addTab(project_title(self._project_path))
+        self.project_tabs.setCurrentIndex(index)
+        self.project_tabs.blockSignals(False)
+        self.project_tabs.show()
+        self._update_title()
+
+    def _store_session(self, session: ProjectSession):
+        """把当前项目的状态保存到 session，预览器的解码器归还到共享池"""
+        in_out = (self.timeline.get_in_point(), self.timeline.get_out_point())
+        if self.preview_tabs.currentIndex() == 0:
+            self._intro_in_out = in_out
+        else:
+            self._loop_in_out = in_out
+
+        session.config = self._config
+        session.snapshot = self._config_snapshot
+        session.project_path = self._project_path
+        session.base_dir = self._base_dir
+        session.is_modified = self._is_modified
+        session.history = self._history
+        session.autosave = self._autosave
+        session.asset_index = self._asset_index
+        session.asset_watcher = self._asset_watcher
+        session.preview_tab = self.preview_tabs.currentIndex()
+        session.intro_preview = self.intro_preview.save_state()
+        session.loop_preview = self.video_preview.save_state()
+        session.intro_in_out = self._intro_in_out
+        session.loop_in_out = self._loop_in_out
+        session.loop_image_path = self._loop_image_path
+        session.loop_candidates = self._loop_candidates
+        session.loop_candidates_key = self._loop_candidates_key
+        session.loop_candidate_index = self._loop_candidate_index
+
+    def _load_session(self, session: ProjectSession):
+        """恢复 session 保存的项目状态（不重新读取项目文件）"""
+        self._config = session.config
+        self._config_snapshot = session.snapshot
+        self._project_path = session.project_path
+        self._base_dir = session.base_dir
+        self._is_modified = session.is_modified
+        self._history = session.history
+        self._autosave = session.autosave
+        self._asset_index = session.asset_index
+        self._asset_watcher = session.asset_watcher
+        self._image_processor.asset_index = self._asset_index
+        self._intro_in_out = session.intro_in_out
+        self._loop_in_out = session.loop_in_out
+        self._loop_image_path = session.loop_image_path
+        self._loop_candidates = session.loop_candidates
+        self._loop_candidates_key = session.loop_candidates_key
+        self._loop_candidate_index = session.loop_candidate_index
+
+        self._update_undo_actions()
+        self.config_panel.set_config(self._config, self._base_dir)
+        self.json_preview.set_config(self._config, self._base_dir, self._asset_index)
+        self.video_preview.set_epconfig(self._config)
+        self.intro_preview.restore_state(session.intro_preview)
+        self.video_preview.restore_state(session.loop_preview)
+        if self._loop_image_path and self._config.loop.is_image:
+            self._load_loop_image(self._loop_image_path)
+
+        self.preview_tabs.blockSignals(True)
+        self.preview_tabs.setCurrentIndex(session.preview_tab)
+        self.preview_tabs.blockSignals(False)
+        active = self.intro_preview if session.preview_tab == 0 else self.video_preview
+        if active.total_frames <= 0:
+            self.timeline.set_total_frames(0)
+        self._show_preview_in_timeline(session.preview_tab)
+        self._update_title()
+
+    def _reset_project_state(self):
+        """清空当前项目的状态（对象已保存到 ProjectSession 或已关闭）"""
+        self._config = None
+        self._config_snapshot = None
+        self._project_path = ""
+        self._base_dir = ""
+        self._is_modified = False
+        self._history = CommandHistory()
+        self._autosave = None
+        self._asset_index = None
+        self._asset_watcher = None
+        self._image_processor.asset_index = None
+        self._intro_in_out = (0, 0)
+        self._loop_in_out = (0, 0)
+        self._loop_image_path = None
+        self._loop_candidates = []
+        self._loop_candidates_key = None
+        self._loop_candidate_index = 0
+
+        self.intro_preview.clear()
+        self.video_preview.clear()
+        self.timeline.set_total_frames(0)
+        self.timeline.set_loop_suggestions([])
+        self._load_timeline_thumbnails("")
+        self._update_timeline_analysis("")
+        self._update_undo_actions()
+
+    def _detach_active_session(self):
+        """把当前项目切到后台，准备在新标签页中打开/新建项目"""
+        session = self._workspace.active
+        if session is None:
+            return
+        self._store_session(session)
+        self._workspace.active_index = -1
+        self._reset_project_state()
+
+    def _on_project_tab_changed(self, index: int):
+        """切换项目标签页"""
+        if index < 0 or index == self._workspace.active_index:
+            return
+        active = self._workspace.active
+        if active is not None:
+            self._store_session(active)
+        self._after_save = None
+        self._workspace.active_index = index
+        self._load_session(self._workspace.sessions[index])
+        self._schedule_simulator_sync()
+        self.status_bar.showMessage(f"当前项目: {self._project_path or project_title(self._project_path)}")
+
+    def _on_close_project_tab(self, index: int):
+        """关闭项目标签页（有未保存的修改时先询问）"""
+        if not 0 <= index < len(self._workspace):
+            return
+        if index != self._workspace.active_index:
+            self.project_tabs.setCurrentIndex(index)
+        if not self._check_save(retry=lambda session=self._workspace.active: self._close_session(session)):
+            return
+
+        # 用户已保存或放弃修改
+        self._stop_autosave(discard=True)
+        if self._asset_watcher is not None:
+            self._asset_watcher.stop()
+            self._asset_watcher.deleteLater()
+        self._workspace.remove(index)
+        self._reset_project_state()
+        self.project_tabs.blockSignals(True)
+        self.project_tabs.removeTab(index)
+        self.project_tabs.blockSignals(False)
+
+        if len(self._workspace) > 0:
+            index = min(index, len(self._workspace) - 1)
+            self.project_tabs.blockSignals(True)
+            self.project_tabs.setCurrentIndex(index)
+            self.project_tabs.blockSignals(False)
+            self._workspace.active_index = index
+            self._load_session(self._workspace.sessions[index])
+            self._schedule_simulator_sync()
+        else:
+            self.config_panel.clear_config()
+            self.json_preview.set_config(None)
+            self.project_tabs.hide()
+            self._update_title()
+        self._update_autosave_sessions()
+
+    def _close_session(self, session: ProjectSession):
+        """关闭项目（保存完成后继续关闭时使用，项目可能已被关闭）"""
+        if session in self._workspace.sessions:
+            self._on_close_project_tab(self._workspace.sessions.index(session))
+
+    def _confirm_close_all(self) -> bool:
+        """
+        依次询问保存所有有未保存修改的项目
+
+        Returns:
+            是否可以退出；用户取消或正在保存（保存完成后自动再次关闭窗口）时返回 False
+        """
+        for index, session in enumerate(self._workspace.sessions):
+            modified = self._is_modified if index == self._workspace.active_index else session.is_modified
+            if not modified:
+                continue
+            self.project_tabs.setCurrentIndex(index)
+            if not self._check_save(retry=self.close):
+                return False
+        return True
+
+    def _check_save(self, retry: Optional[Callable[[], None]] = None) -> bool:
+        """
+        检查是否需要保存
+
+        选择保存时在自动保存线程中写入，界面线程不等待磁盘：本次返回 False 中止操作，
+        写入成功后（_on_autosaved）调用 retry 重新执行被中止的操作。
+
+        Args:
+            retry: 保存完成后重新执行的操作（如关闭标签页、退出）
+
+        Returns:
+            是否可以继续（没有修改或用户放弃修改）
+        """
         if not self._is_modified:
             return True
 
         result = QMessageBox.question(
             self, "保存更改",
-            "当前项目有未保存的更改，是否保存?",
+            f"项目 {project_title(self._project_path)} 有未保存的更改，是否保存?",
             QMessageBox.StandardButton.Save |
             QMessageBox.StandardButton.Discard |
             QMessageBox.StandardButton.Cancel
@@ -1230,7 +2107,11 @@ class MainWindow(QMainWindow):
 
         if result == QMessageBox.StandardButton.Save:
             self._on_save_project()
-            return not self._is_modified
+            if not self._save_requested:
+                # 另存为时取消了选择文件
+                return not self._is_modified
+            self._after_save = retry
+            return False
         elif result == QMessageBox.StandardButton.Discard:
             return True
         else:
@@ -1238,8 +2119,27 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         """关闭事件"""
-        if self._check_save():
+        if self._confirm_close_all():
             self._save_settings()
+            self._stop_thumbnail_worker()
+            if self._loop_finder_worker is not None:
+                self._loop_finder_worker.requestInterruption()
+                self._loop_finder_worker.wait()
+            if self._auto_crop_worker is not None:
+                self._auto_crop_worker.requestInterruption()
+                self._auto_crop_worker.wait()
+            for worker in list(self._analysis_workers.values()):
+                worker.requestInterruption()
+                worker.wait()
+            self.config_panel.cancel_imports()
+            if self._simulator_client is not None:
+                self._simulator_client.shutdown()
+            # 正常退出：日志中剩余的修改已保存或被用户放弃
+            self._stop_autosave(discard=True)
+            for session in self._workspace.sessions:
+                if session.autosave is not None:
+                    session.autosave.close(discard=True)
+            QSettings("ArknightsPassMaker", "MainWindow").remove("autosave_sessions")
             event.accept()
         else:
             event.ignore()
@@ -2,8 +2,7 @@
 配置面板 - 左侧配置选项卡容器
 """
 import os
-import shutil
-from typing import Optional
+from typing import Optional, Callable
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QTabWidget, QScrollArea,
@@ -22,9 +21,10 @@ from config.epconfig import (
 )
 from config.constants import (
     RESOLUTION_SPECS, TRANSITION_TYPES, OVERLAY_TYPES,
-    OPERATOR_CLASS_PRESETS, DEFAULT_TRANSITION_DURATION,
+    OPERATOR_CLASS_PRESETS, DEFAULT_TRANSITION_DURATION, TRANSITION_IMAGE_SIZE,
     microseconds_to_seconds, seconds_to_microseconds
 )
+from core.asset_importer import AssetImportWorker, detach_asset
 
 
 class ConfigPanel(QWidget):
@@ -38,6 +38,7 @@ class ConfigPanel(QWidget):
     validate_requested = pyqtSignal()  # 验证配置请求信号
     export_requested = pyqtSignal()  # 导出素材请求信号
     capture_frame_requested = pyqtSignal()  # 截取视频帧请求信号
+    import_progress = pyqtSignal(int, str)  # 素材导入进度 (百分比, 文件名)，仅跨文件系统复制时发出
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -45,6 +46,7 @@ class ConfigPanel(QWidget):
         self._config: Optional[EPConfig] = None
         self._base_dir: str = ""
         self._updating = False  # 防止循环更新
+        self._import_workers = []  # 进行中的素材导入线程
 
         self._setup_ui()
         self._connect_signals()
@@ -604,6 +606,11 @@ class ConfigPanel(QWidget):
         finally:
             self._updating = False
 
+    def clear_config(self):
+        """清空配置（关闭最后一个项目时），控件恢复为默认值"""
+        self.set_config(EPConfig())
+        self._config = None
+
     def get_config(self) -> Optional[EPConfig]:
         """获取配置"""
         return self._config
@@ -722,35 +729,8 @@ class ConfigPanel(QWidget):
             "图片文件 (*.png *.jpg *.jpeg)"
         )
         if path:
-            # 如果项目目录已设置，复制文件到项目目录
-            if self._base_dir:
-                # 生成目标文件名
-                filename = os.path.basename(path)
-                name, ext = os.path.splitext(filename)
-                dest_path = os.path.join(self._base_dir, f"icon{ext}")
-
-                # 如果目标文件已存在且不同，生成唯一文件名
-                if os.path.exists(dest_path) and not os.path.samefile(path, dest_path):
-                    counter = 1
-                    while os.path.exists(dest_path):
-                        dest_path = os.path.join(self._base_dir, f"icon_{counter}{ext}")
-                        counter += 1
-
-                # 复制文件（如果不是同一文件）
-                if not os.path.exists(dest_path) or not os.path.samefile(path, dest_path):
-                    try:
-                        shutil.copy2(path, dest_path)
-                    except Exception as e:
-                        # 复制失败时使用原路径
-                        self.edit_icon.setText(path)
-                        return
-
-                # 使用相对路径
-                rel_path = os.path.basename(dest_path)
-                self.edit_icon.setText(rel_path)
-            else:
-                # 没有项目目录时使用原路径
-                self.edit_icon.setText(path)
+            # 导入到项目目录并使用相对路径（没有项目目录时使用原路径）
+            self._import_to_project_dir(path, "icon", self.edit_icon.setText)
 
     def _browse_loop(self):
         """浏览循环视频/图片"""
@@ -823,11 +803,12 @@ class ConfigPanel(QWidget):
             "图片文件 (*.png *.jpg *.jpeg *.bmp)"
         )
         if file_path:
-            # 复制到项目目录并使用相对路径
-            rel_path = self._copy_to_project_dir(file_path, "class_icon")
-            if rel_path:
-                self.edit_ark_class_icon.setText(rel_path)
-                self._on_config_changed()
+            # 导入到项目目录并使用相对路径
+            self._import_to_project_dir(file_path, "class_icon", self._set_ark_class_icon)
+
+    def _set_ark_class_icon(self, path: str):
+        self.edit_ark_class_icon.setText(path)
+        self._on_config_changed()
 
     def _on_clear_class_icon(self):
         """清除职业图标"""
@@ -841,54 +822,60 @@ class ConfigPanel(QWidget):
             "图片文件 (*.png *.jpg *.jpeg *.bmp)"
         )
         if file_path:
-            # 复制到项目目录并使用相对路径
-            rel_path = self._copy_to_project_dir(file_path, "ark_logo")
-            if rel_path:
-                self.edit_ark_logo.setText(rel_path)
-                self._on_config_changed()
+            # 导入到项目目录并使用相对路径
+            self._import_to_project_dir(file_path, "ark_logo", self._set_ark_logo)
+
+    def _set_ark_logo(self, path: str):
+        self.edit_ark_logo.setText(path)
+        self._on_config_changed()
 
     def _on_clear_logo(self):
         """清除Logo"""
         self.edit_ark_logo.clear()
         self._on_config_changed()
 
-    def _copy_to_project_dir(self, src_path: str, base_name: str) -> str:
+    def _import_to_project_dir(self, src_path: str, base_name: str, on_imported: Callable[[str], None]):
         """
-        将文件复制到项目目录
+        将文件导入项目目录（见 core.asset_importer，后台线程中完成）
+
+        项目中已有相同内容的文件时直接复用；同一文件系统上使用 reflink/硬链接，
+        只有跨文件系统时才复制，并通过 import_progress 报告进度。
 
         Args:
             src_path: 源文件路径
             base_name: 目标文件基础名称
-
-        Returns:
-            相对路径，失败返回空字符串
+            on_imported: 完成后以相对路径调用；没有项目目录或导入失败时以原路径调用
         """
         if not self._base_dir:
-            # 没有项目目录，返回原路径
-            return src_path
+            # 没有项目目录，使用原路径
+            on_imported(src_path)
+            return
 
-        try:
-            _, ext = os.path.splitext(src_path)
-            dest_path = os.path.join(self._base_dir, f"{base_name}{ext}")
-
-            # 如果目标已存在且不同，生成唯一文件名
-            counter = 1
-            while os.path.exists(dest_path):
-                if os.path.samefile(src_path, dest_path):
-                    # 同一文件，直接返回相对路径
-                    return f"{base_name}{ext}"
-                dest_path = os.path.join(self._base_dir, f"{base_name}_{counter}{ext}")
-                counter += 1
-
-            # 复制文件
-            shutil.copy2(src_path, dest_path)
-            return os.path.basename(dest_path)
-
-        except Exception as e:
-            # 复制失败，返回原路径
-            import logging
-            logging.getLogger(__name__).warning(f"复制文件失败: {e}")
-            return src_path
+        base_dir = self._base_dir
+        worker = AssetImportWorker(src_path, base_dir, base_name, self)
+        worker.progress_updated.connect(self.import_progress.emit)
+        worker.import_completed.connect(
+            lambda result: self._on_import_done(base_dir, result.rel_path, on_imported)
+        )
+        # 导入失败，使用原路径
+        worker.import_failed.connect(
+            lambda message: self._on_import_done(base_dir, src_path, on_imported)
+        )
+        worker.finished.connect(lambda: self._import_workers.remove(worker))
+        self._import_workers.append(worker)
+        worker.start()
+
+    def _on_import_done(self, base_dir: str, path: str, on_imported: Callable[[str], None]):
+        """导入完成；期间已切换到其他项目时丢弃结果（相对路径只在原项目目录中有效）"""
+        if base_dir != self._base_dir:
+            return
+        on_imported(path)
+
+    def cancel_imports(self):
+        """取消并等待所有进行中的导入（关闭窗口时调用）"""
+        for worker in list(self._import_workers):
+            worker.requestInterruption()
+            worker.wait()
 
     def _browse_transition_image(self, trans_type: str):
         """浏览过渡图片"""
@@ -910,12 +897,14 @@ class ConfigPanel(QWidget):
                     return
 
                 # 缩放到 360x640
-                img = ImageProcessor.resize_image(img, 360, 640, keep_aspect=True)
+                img = ImageProcessor.resize_image(img, *TRANSITION_IMAGE_SIZE, keep_aspect=True)
 
                 # 保存到项目目录
                 base_name = f"trans_{trans_type}_image"
                 _, ext = os.path.splitext(file_path)
                 dest_path = os.path.join(self._base_dir, f"{base_name}{ext}")
+                # 同名文件可能是导入时创建的硬链接，不能原地改写
+                detach_asset(dest_path)
 
                 if ImageProcessor.save_image(img, dest_path):
                     rel_path = os.path.basename(dest_path)
@@ -934,7 +923,8 @@ class ConfigPanel(QWidget):
             "图片文件 (*.png *.jpg *.jpeg)"
         )
         if file_path:
-            rel_path = self._copy_to_project_dir(file_path, "overlay")
-            if rel_path:
-                self.edit_img_overlay.setText(rel_path)
-                self._on_config_changed()
+            self._import_to_project_dir(file_path, "overlay", self._set_img_overlay)
+
+    def _set_img_overlay(self, path: str):
+        self.edit_img_overlay.setText(path)
+        self._on_config_changed()
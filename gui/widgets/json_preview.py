@@ -2,7 +2,7 @@
 JSON预览组件 - 实时显示配置JSON和验证状态
 """
 import json
-from typing import Optional
+from typing import Optional, List
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QTextEdit, QLabel,
@@ -12,7 +12,7 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont, QColor, QTextCharFormat, QSyntaxHighlighter, QTextDocument
 
 from config.epconfig import EPConfig
-from core.validator import EPConfigValidator, ValidationLevel
+from core.validator import EPConfigValidator, FileProbeCache, ValidationLevel
 
 
 class JsonSyntaxHighlighter(QSyntaxHighlighter):
@@ -72,6 +72,7 @@ class JsonPreviewWidget(QWidget):
 
         self._config: Optional[EPConfig] = None
         self._validator: Optional[EPConfigValidator] = None
+        self._shown_dict: Optional[dict] = None  # 当前显示的 JSON 内容，未变化时不重新格式化
 
         self._setup_ui()
 
@@ -133,10 +134,16 @@ class JsonPreviewWidget(QWidget):
 
         layout.addWidget(self.status_frame)
 
-    def set_config(self, config: EPConfig, base_dir: str = ""):
-        """设置配置"""
+    def set_config(self, config: EPConfig, base_dir: str = "", asset_index: Optional[FileProbeCache] = None):
+        """
+        设置配置
+
+        Args:
+            asset_index: 项目素材索引（见 core.asset_index），文件探测结果在多次校验间复用
+        """
         self._config = config
-        self._validator = EPConfigValidator(base_dir)
+        self._validator = EPConfigValidator(base_dir, probe_cache=asset_index)
+        self._shown_dict = None
 
         # 更新JSON显示
         self._update_json()
@@ -144,15 +151,26 @@ class JsonPreviewWidget(QWidget):
         # 更新验证状态
         self._update_validation()
 
-    def update_preview(self):
-        """更新预览"""
-        if self._config:
+    def update_preview(self, changes: Optional[List[str]] = None):
+        """
+        更新预览
+
+        Args:
+            changes: 变化的字段路径（见 config.epconfig.diff），None 表示全部更新，空列表时跳过
+        """
+        if self._config and changes != []:
             self._update_json()
             self._update_validation()
 
+    def revalidate(self):
+        """素材文件变化后重新校验（JSON 内容不变）"""
+        if self._config:
+            self._update_validation()
+
     def _update_json(self):
         """更新JSON显示"""
         if self._config is None:
+            self._shown_dict = None
             self.text_edit.setText("")
             return
 
@@ -188,6 +206,10 @@ class JsonPreviewWidget(QWidget):
                 if opts.get("image"):
                     opts["image"] = "overlay.argb"
 
+        # 标准化后内容相同（如只改了素材的源路径）时不重新格式化和高亮
+        if config_dict == self._shown_dict:
+            return
+        self._shown_dict = config_dict
         json_str = json.dumps(config_dict, ensure_ascii=False, indent=4)
         self.text_edit.setText(json_str)
 
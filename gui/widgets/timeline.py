@@ -1,12 +1,98 @@
 """
 时间轴组件 - 播放控制和时间标记
 """
+import bisect
+
+import numpy as np
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QSizePolicy
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QRect, QPoint
-from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QMouseEvent, QPaintEvent
+from PyQt6.QtGui import (
+    QPainter, QColor, QPen, QBrush, QMouseEvent, QPaintEvent, QImage, QPixmap
+)
+
+
+class FilmstripWidget(QWidget):
+    """
+    缩略图胶片条
+
+    缩略图由后台线程逐个送达；每个格子显示帧号不超过该位置的最近缩略图，
+    尚未送达的部分先用已有的缩略图填充。
+    """
+
+    seek_requested = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self._total_frames = 1
+        self._frames: list = []       # 已送达缩略图的帧号（有序）
+        self._pixmaps: dict = {}      # 帧号 -> QPixmap
+        self._margin = 10             # 与 TimelineSlider 对齐
+
+        self._bg_color = QColor(40, 40, 40)
+
+        self.setFixedHeight(40)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    def set_total_frames(self, count: int):
+        """设置总帧数"""
+        self._total_frames = max(1, count)
+        self.update()
+
+    def clear(self):
+        """清空缩略图"""
+        self._frames.clear()
+        self._pixmaps.clear()
+        self.update()
+
+    def add_thumbnail(self, frame: int, image: QImage):
+        """添加一张缩略图"""
+        if frame not in self._pixmaps:
+            bisect.insort(self._frames, frame)
+        self._pixmaps[frame] = QPixmap.fromImage(image)
+        self.update()
+
+    def _x_to_frame(self, x: int) -> int:
+        track_width = self.width() - 2 * self._margin
+        if track_width <= 0:
+            return 0
+        ratio = max(0.0, min(1.0, (x - self._margin) / track_width))
+        return int(ratio * max(1, self._total_frames - 1))
+
+    def paintEvent(self, event: QPaintEvent):
+        """绘制"""
+        painter = QPainter(self)
+        w, h = self.width(), self.height()
+        painter.fillRect(0, 0, w, h, self._bg_color)
+
+        if not self._frames:
+            return
+
+        sample = self._pixmaps[self._frames[0]]
+        tile_w = max(1, round(sample.width() * h / max(1, sample.height())))
+        track_width = w - 2 * self._margin
+
+        x = self._margin
+        while x < self._margin + track_width:
+            # 取格子左边缘对应帧之前最近的缩略图
+            frame = self._x_to_frame(x)
+            pos = bisect.bisect_right(self._frames, frame) - 1
+            pixmap = self._pixmaps[self._frames[max(0, pos)]]
+            width = min(tile_w, self._margin + track_width - x)
+            painter.drawPixmap(
+                QRect(x, 0, width, h), pixmap,
+                QRect(0, 0, round(width * pixmap.width() / tile_w), pixmap.height())
+            )
+            x += tile_w
+
+    def mousePressEvent(self, event: QMouseEvent):
+        """点击缩略图跳转"""
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.seek_requested.emit(self._x_to_frame(int(event.position().x())))
 
 
 class TimelineSlider(QWidget):
@@ -22,6 +108,10 @@ class TimelineSlider(QWidget):
         self._in_point = 0
         self._out_point = 100
         self._dragging = False
+        self._loop_suggestions: list = []  # 推荐的 (入点, 出点)
+        self._scene_cuts: list = []        # 场景切换帧号
+        self._activity = None              # 运动强度曲线（0~1，按帧）
+        self._activity_columns = None      # (轨道宽度, 每列高度比例) 缓存
 
         self._margin = 10
         self._track_height = 30
@@ -33,6 +123,9 @@ class TimelineSlider(QWidget):
         self._in_color = QColor(76, 175, 80)  # 绿色
         self._out_color = QColor(244, 67, 54)  # 红色
         self._current_color = QColor(255, 255, 255)  # 白色
+        self._suggestion_color = QColor(255, 193, 7, 180)  # 琥珀色
+        self._cut_color = QColor(0, 188, 212)  # 青色
+        self._activity_color = QColor(120, 120, 120)
 
         self.setMinimumHeight(50)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
@@ -72,6 +165,34 @@ class TimelineSlider(QWidget):
             self._in_point = self._out_point
         self.update()
 
+    def set_loop_suggestions(self, suggestions: list):
+        """设置推荐的循环点 [(入点, 出点), ...]"""
+        self._loop_suggestions = list(suggestions)
+        self.update()
+
+    def set_scene_analysis(self, cuts: list, activity=None):
+        """
+        设置场景切换标记和运动强度曲线
+
+        Args:
+            cuts: 场景切换帧号
+            activity: 每帧运动强度（0~1 的序列），None 不绘制
+        """
+        self._scene_cuts = list(cuts)
+        self._activity = None if activity is None else np.asarray(activity, dtype=np.float32)
+        self._activity_columns = None
+        self.update()
+
+    def _get_activity_columns(self, track_width: int):
+        """运动强度按像素列取最大值并归一化（按轨道宽度缓存）"""
+        if self._activity_columns is None or self._activity_columns[0] != track_width:
+            n = len(self._activity)
+            edges = np.arange(track_width) * n // track_width
+            values = np.maximum.reduceat(self._activity, edges)
+            peak = float(values.max())
+            self._activity_columns = (track_width, values / peak if peak > 0 else values)
+        return self._activity_columns[1]
+
     def get_in_point(self) -> int:
         """获取入点"""
         return self._in_point
@@ -113,6 +234,16 @@ class TimelineSlider(QWidget):
             self._track_color
         )
 
+        # 运动强度曲线
+        if self._activity is not None and len(self._activity) > 1 and track_width > 0:
+            painter.setPen(QPen(self._activity_color, 1))
+            bottom = track_y + self._track_height
+            for col, value in enumerate(self._get_activity_columns(track_width)):
+                height = int(value * (self._track_height - 2))
+                if height > 0:
+                    x = self._margin + col
+                    painter.drawLine(x, bottom, x, bottom - height)
+
         # 选中范围
         if self._total_frames > 1:
             in_x = self._frame_to_x(self._in_point)
@@ -122,6 +253,24 @@ class TimelineSlider(QWidget):
                 self._selection_color
             )
 
+        # 场景切换标记：轨道上方的短竖线
+        if self._scene_cuts:
+            painter.setPen(QPen(self._cut_color, 2))
+            for cut in self._scene_cuts:
+                cut_x = self._frame_to_x(cut)
+                painter.drawLine(cut_x, track_y, cut_x, track_y + self._track_height // 3)
+
+        # 推荐循环点：轨道下方的括号标记
+        if self._loop_suggestions:
+            painter.setPen(QPen(self._suggestion_color, 1))
+            bracket_y = track_y + self._track_height + 3
+            for s_in, s_out in self._loop_suggestions:
+                s_in_x = self._frame_to_x(s_in)
+                s_out_x = self._frame_to_x(s_out)
+                painter.drawLine(s_in_x, track_y, s_in_x, bracket_y)
+                painter.drawLine(s_out_x, track_y, s_out_x, bracket_y)
+                painter.drawLine(s_in_x, bracket_y, s_out_x, bracket_y)
+
         # 入点标记
         in_x = self._frame_to_x(self._in_point)
         painter.setBrush(QBrush(self._in_color))
@@ -180,6 +329,9 @@ class TimelineWidget(QWidget):
     set_out_point_clicked = pyqtSignal()
     simulator_requested = pyqtSignal()  # 模拟器启动请求信号
     rotation_clicked = pyqtSignal()  # 旋转按钮点击信号
+    loop_search_clicked = pyqtSignal()  # 自动循环点按钮点击信号
+    prev_cut_clicked = pyqtSignal()     # 跳到上一个场景切换
+    next_cut_clicked = pyqtSignal()     # 跳到下一个场景切换
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -227,6 +379,16 @@ class TimelineWidget(QWidget):
         self.btn_goto_end.setToolTip("跳到结束")
         control_layout.addWidget(self.btn_goto_end)
 
+        self.btn_prev_cut = QPushButton("<<")
+        self.btn_prev_cut.setFixedWidth(35)
+        self.btn_prev_cut.setToolTip("跳到上一个场景切换")
+        control_layout.addWidget(self.btn_prev_cut)
+
+        self.btn_next_cut = QPushButton(">>")
+        self.btn_next_cut.setFixedWidth(35)
+        self.btn_next_cut.setToolTip("跳到下一个场景切换")
+        control_layout.addWidget(self.btn_next_cut)
+
         control_layout.addWidget(QLabel("|"))
 
         self.btn_set_in = QPushButton("[ 入点")
@@ -237,6 +399,10 @@ class TimelineWidget(QWidget):
         self.btn_set_out.setToolTip("设置出点")
         control_layout.addWidget(self.btn_set_out)
 
+        self.btn_loop_search = QPushButton("自动循环点")
+        self.btn_loop_search.setToolTip("查找画面衔接最自然的入点/出点（再次点击切换下一个推荐）")
+        control_layout.addWidget(self.btn_loop_search)
+
         control_layout.addWidget(QLabel("|"))
 
         self.label_frame = QLabel("0 / 100")
@@ -261,15 +427,20 @@ class TimelineWidget(QWidget):
 
         control_layout.addStretch()
 
+        # 缩略图胶片条
+        self.filmstrip = FilmstripWidget()
+        self.filmstrip.setToolTip("点击缩略图跳转")
+
         # 时间轴滑块
         self.timeline_slider = TimelineSlider()
         self.timeline_slider.setToolTip("拖动或点击跳转")
 
         main_layout.addLayout(control_layout)
+        main_layout.addWidget(self.filmstrip)
         main_layout.addWidget(self.timeline_slider)
 
-        self.setMinimumHeight(100)
-        self.setMaximumHeight(150)
+        self.setMinimumHeight(145)
+        self.setMaximumHeight(195)
         self.setStyleSheet("""
             TimelineWidget {
                 background-color: #2d2d2d;
@@ -302,16 +473,21 @@ class TimelineWidget(QWidget):
         self.btn_play_pause.clicked.connect(self.play_pause_clicked.emit)
         self.btn_next_frame.clicked.connect(self.next_frame_clicked.emit)
         self.btn_goto_end.clicked.connect(self.goto_end_clicked.emit)
+        self.btn_prev_cut.clicked.connect(self.prev_cut_clicked.emit)
+        self.btn_next_cut.clicked.connect(self.next_cut_clicked.emit)
         self.btn_set_in.clicked.connect(self.set_in_point_clicked.emit)
         self.btn_set_out.clicked.connect(self.set_out_point_clicked.emit)
         self.timeline_slider.seek_requested.connect(self.seek_requested.emit)
+        self.filmstrip.seek_requested.connect(self.seek_requested.emit)
         self.btn_preview.clicked.connect(self.simulator_requested.emit)
         self.btn_rotate.clicked.connect(self.rotation_clicked.emit)
+        self.btn_loop_search.clicked.connect(self.loop_search_clicked.emit)
 
     def set_total_frames(self, count: int):
         """设置总帧数"""
         self._total_frames = max(1, count)
         self.timeline_slider.set_total_frames(count)
+        self.filmstrip.set_total_frames(count)
         self._update_label()
 
     def set_current_frame(self, index: int):
@@ -344,6 +520,29 @@ class TimelineWidget(QWidget):
         """获取出点"""
         return self.timeline_slider.get_out_point()
 
+    def set_loop_suggestions(self, suggestions: list):
+        """设置推荐的循环点 [(入点, 出点), ...]"""
+        self.timeline_slider.set_loop_suggestions(suggestions)
+
+    def set_scene_analysis(self, cuts: list, activity=None):
+        """设置场景切换标记和运动强度曲线"""
+        self.timeline_slider.set_scene_analysis(cuts, activity)
+        has_cuts = bool(len(cuts))
+        self.btn_prev_cut.setEnabled(has_cuts)
+        self.btn_next_cut.setEnabled(has_cuts)
+
+    def set_loop_search_enabled(self, enabled: bool):
+        """设置自动循环点按钮是否可用"""
+        self.btn_loop_search.setEnabled(enabled)
+
+    def clear_thumbnails(self):
+        """清空胶片条"""
+        self.filmstrip.clear()
+
+    def add_thumbnail(self, frame: int, image: QImage):
+        """添加胶片条缩略图"""
+        self.filmstrip.add_thumbnail(frame, image)
+
     def set_fps(self, fps: float):
         """设置FPS"""
         self._fps = fps
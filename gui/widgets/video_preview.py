@@ -18,6 +18,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QPoint
 from PyQt6.QtGui import QImage, QPixmap, QMouseEvent, QKeyEvent
 
+from core.workspace import PreviewState, get_decoder_pool, get_frame_cache
+
 if TYPE_CHECKING:
     from config.epconfig import EPConfig
 
@@ -33,6 +35,7 @@ class VideoPreviewWidget(QWidget):
 
     # 信号
     cropbox_changed = pyqtSignal(int, int, int, int)  # x, y, w, h
+    cropbox_edited = pyqtSignal(object, object)  # 用户拖动/按键修改裁剪框: (修改前, 修改后)
     frame_changed = pyqtSignal(int)  # 当前帧号
     playback_state_changed = pyqtSignal(bool)  # 播放状态
     video_loaded = pyqtSignal(int, float)  # 总帧数, fps
@@ -58,6 +61,8 @@ class VideoPreviewWidget(QWidget):
         self.total_frames: int = 0
         self.current_frame_index: int = 0
         self.current_frame = None
+        # 从帧缓存显示后解码器位置与 current_frame_index 不一致，下次顺序读取前需要先定位
+        self._decoder_stale: bool = False
 
         # 播放状态
         self.is_playing: bool = False
@@ -69,6 +74,8 @@ class VideoPreviewWidget(QWidget):
         self.target_height = DEFAULT_TARGET_HEIGHT
         self.target_aspect_ratio = self.target_width / self.target_height
         self.cropbox = [0, 0, self.target_width, self.target_height]
+        # 自动跟随裁切路径 (N, 4)，原始坐标系；手动调整裁剪框时清除
+        self._crop_path: Optional[np.ndarray] = None
 
         # 显示缩放
         self.display_scale: float = 1.0
@@ -143,17 +150,21 @@ class VideoPreviewWidget(QWidget):
             self.video_label.setText(f"文件不存在: {path}")
             return False
 
-        if self.cap is not None:
-            self.cap.release()
+        self._release_decoder()
         self.pause()
 
-        self.cap = cv2.VideoCapture(path)
-        if not self.cap.isOpened():
+        # 解码器从共享池中取得（最近用过的视频不必重新打开）；文件可能已被替换，丢弃缓存的帧
+        get_frame_cache().discard(path)
+        self.cap = get_decoder_pool().acquire(path)
+        if self.cap is None:
             logger.error(f"无法打开视频: {path}")
             self.video_label.setText("无法加载视频")
             return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self._decoder_stale = False
 
         self.video_path = path
+        self._crop_path = None
         self.video_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
         self.video_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.video_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -229,18 +240,38 @@ class VideoPreviewWidget(QWidget):
             logger.warning("_read_and_display_frame: cap 为 None")
             return
 
+        if self._decoder_stale:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame_index)
+            self._decoder_stale = False
         ret, frame = self.cap.read()
         if not ret:
             logger.warning(f"无法读取帧 {self.current_frame_index}")
             self.pause()
             return
 
-        self.current_frame = frame
         logger.debug(f"读取帧 {self.current_frame_index}, 尺寸: {frame.shape}")
+        get_frame_cache().put(self.video_path, self.current_frame_index, frame)
+        self._show_frame(frame)
+
+    def _show_frame(self, frame):
+        """显示当前帧号对应的已解码帧"""
+        self.current_frame = frame
         self._display_frame(frame)
         self.frame_changed.emit(self.current_frame_index)
         self._update_info_label()
 
+    def _seek_and_display(self, index: int):
+        """跳到指定帧：看过的帧直接从共享帧缓存显示，否则定位解码器后读取"""
+        self.current_frame_index = index
+        cached = get_frame_cache().get(self.video_path, index)
+        if cached is not None:
+            self._decoder_stale = True
+            self._show_frame(cached)
+            return
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+        self._decoder_stale = False
+        self._read_and_display_frame()
+
     def _display_frame(self, frame):
         """显示帧"""
         if frame is None or not HAS_CV2:
@@ -249,7 +280,14 @@ class VideoPreviewWidget(QWidget):
         # 应用旋转
         rotated_frame = self._apply_rotation(frame)
 
+        # 自动跟随裁切：裁剪框随帧移动（不发送 cropbox_changed）
+        if self._crop_path is not None and self.current_frame_index < len(self._crop_path):
+            self.cropbox = list(self._original_to_rotated_coords(
+                *(int(v) for v in self._crop_path[self.current_frame_index])
+            ))
+
         x, y, w, h = self.cropbox
+        box_color = (255, 0, 255) if self._crop_path is not None else (0, 255, 0)
 
         if self._preview_mode:
             # 预览模式：显示裁剪后的最终效果
@@ -259,7 +297,7 @@ class VideoPreviewWidget(QWidget):
             display_frame = rotated_frame.copy()
 
             # cropbox 已经在旋转后坐标系中，直接使用
-            cv2.rectangle(display_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            cv2.rectangle(display_frame, (x, y), (x + w, y + h), box_color, 2)
 
             # 绘制角落手柄
             hs = 8
@@ -336,7 +374,7 @@ class VideoPreviewWidget(QWidget):
         self.current_frame_index += 1
         if self.current_frame_index >= self.total_frames:
             self.current_frame_index = 0
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._decoder_stale = True
         self._read_and_display_frame()
 
     def play(self):
@@ -367,27 +405,20 @@ class VideoPreviewWidget(QWidget):
         if self.cap is None:
             return
         self.pause()
-        self.current_frame_index = min(self.current_frame_index + 1, self.total_frames - 1)
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame_index)
-        self._read_and_display_frame()
+        self._seek_and_display(min(self.current_frame_index + 1, self.total_frames - 1))
 
     def prev_frame(self):
         """上一帧"""
         if self.cap is None:
             return
         self.pause()
-        self.current_frame_index = max(self.current_frame_index - 1, 0)
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame_index)
-        self._read_and_display_frame()
+        self._seek_and_display(max(self.current_frame_index - 1, 0))
 
     def seek_to_frame(self, index: int):
         """跳转到指定帧"""
         if self.cap is None:
             return
-        index = max(0, min(index, self.total_frames - 1))
-        self.current_frame_index = index
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
-        self._read_and_display_frame()
+        self._seek_and_display(max(0, min(index, self.total_frames - 1)))
 
     def get_current_frame(self) -> int:
         """获取当前帧号"""
@@ -410,6 +441,38 @@ class VideoPreviewWidget(QWidget):
             return (self.video_width - y - h, x, h, w)
         return (x, y, w, h)
 
+    def _original_to_rotated_coords(self, x: int, y: int, w: int, h: int) -> Tuple[int, int, int, int]:
+        """将 cropbox 从原始视频坐标系变换到旋转后坐标系（用于显示）"""
+        if self._rotation == 90:
+            return (self.video_height - y - h, x, h, w)
+        elif self._rotation == 180:
+            return (self.video_width - x - w, self.video_height - y - h, w, h)
+        elif self._rotation == 270:
+            return (y, self.video_width - x - w, h, w)
+        return (x, y, w, h)
+
+    def set_crop_path(self, path: Optional[np.ndarray]):
+        """
+        设置自动跟随裁切路径
+
+        Args:
+            path: (N, 4) 数组，每帧 (x, y, w, h)，原始坐标系；None 恢复固定裁剪框
+        """
+        self._crop_path = path
+        if self.current_frame is not None:
+            self._display_frame(self.current_frame)
+        self._emit_cropbox_changed()
+
+    def get_crop_path(self) -> Optional[np.ndarray]:
+        """获取自动跟随裁切路径（未设置时为 None）"""
+        return self._crop_path
+
+    def _clear_crop_path_for_edit(self):
+        """手动调整裁剪框前清除自动路径（保留当前帧的裁剪框作为起点）"""
+        if self._crop_path is not None:
+            self._crop_path = None
+            logger.info("手动调整裁剪框，已清除自动跟随裁切")
+
     def get_cropbox_for_export(self) -> Tuple[int, int, int, int]:
         """获取导出用的 cropbox（原始坐标系）"""
         x, y, w, h = self.cropbox
@@ -524,6 +587,7 @@ class VideoPreviewWidget(QWidget):
             rx, ry = self._display_to_rotated_coords(event.pos())
             self.drag_mode = self._get_drag_mode(rx, ry)
             if self.drag_mode != self.DRAG_NONE:
+                self._clear_crop_path_for_edit()
                 self.drag_start_pos = event.pos()
                 self.drag_start_cropbox = self.cropbox.copy()
         super().mousePressEvent(event)
@@ -576,6 +640,8 @@ class VideoPreviewWidget(QWidget):
     def mouseReleaseEvent(self, event: QMouseEvent):
         """鼠标释放"""
         if event.button() == Qt.MouseButton.LeftButton:
+            if self.drag_mode != self.DRAG_NONE and self.cropbox != self.drag_start_cropbox:
+                self.cropbox_edited.emit(tuple(self.drag_start_cropbox), tuple(self.cropbox))
             self.drag_mode = self.DRAG_NONE
             self.drag_start_pos = None
         super().mouseReleaseEvent(event)
@@ -588,6 +654,7 @@ class VideoPreviewWidget(QWidget):
 
         key = event.key()
         step = 10
+        before = tuple(self.cropbox)
 
         if key == Qt.Key.Key_Space:
             self.toggle_play()
@@ -607,25 +674,83 @@ class VideoPreviewWidget(QWidget):
             super().keyPressEvent(event)
             return
 
+        if key in (Qt.Key.Key_W, Qt.Key.Key_S, Qt.Key.Key_A, Qt.Key.Key_D):
+            self._clear_crop_path_for_edit()
         self._bound_cropbox()
         self._emit_cropbox_changed()
+        if tuple(self.cropbox) != before:
+            self.cropbox_edited.emit(before, tuple(self.cropbox))
         if self.current_frame is not None:
             self._display_frame(self.current_frame)
 
     def closeEvent(self, event):
         """关闭事件"""
         self.pause()
-        if self.cap is not None:
-            self.cap.release()
+        self._release_decoder()
         super().closeEvent(event)
 
+    def _release_decoder(self):
+        """把解码器归还到共享池"""
+        if self.cap is not None:
+            get_decoder_pool().release(self.video_path, self.cap)
+            self.cap = None
+
+    def save_state(self) -> PreviewState:
+        """
+        保存状态并归还解码器（项目切到后台时调用，之后应调用 restore_state 或 clear）
+
+        Returns:
+            恢复时使用的状态
+        """
+        self.pause()
+        state = PreviewState(
+            video_path=self.video_path if self.cap is not None else "",
+            frame_index=self.current_frame_index,
+            cropbox=tuple(self.cropbox),
+            rotation=self._rotation,
+            crop_path=self._crop_path,
+            target_size=(self.target_width, self.target_height)
+        )
+        if self.current_frame is not None and state.video_path:
+            get_frame_cache().put(self.video_path, self.current_frame_index, self.current_frame)
+        self._release_decoder()
+        return state
+
+    def restore_state(self, state: PreviewState) -> bool:
+        """
+        恢复 save_state 保存的状态（不发出 video_loaded）
+
+        解码器从共享池取回，当前帧在帧缓存中时直接显示，不解码。
+
+        Returns:
+            是否恢复了视频（视频文件已不存在或无法打开时清空预览并返回 False）
+        """
+        self.clear()
+        if state.target_size[0] > 0:
+            self.target_width, self.target_height = state.target_size
+            self.target_aspect_ratio = self.target_width / self.target_height
+        self._rotation = state.rotation
+        if not state.video_path or not HAS_CV2:
+            return False
+        self.cap = get_decoder_pool().acquire(state.video_path)
+        if self.cap is None:
+            return False
+        self.video_path = state.video_path
+        self.video_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.video_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.video_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.cropbox = list(state.cropbox)
+        self._crop_path = state.crop_path
+        self._seek_and_display(max(0, min(state.frame_index, self.total_frames - 1)))
+        return True
+
     def clear(self):
         """清空预览状态"""
         self.pause()
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
+        self._release_decoder()
         self.video_path = ""
+        self._crop_path = None
         self.total_frames = 0
         self.current_frame_index = 0
         self.current_frame = None
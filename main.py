@@ -55,8 +55,27 @@ def check_dependencies():
         sys.exit(1)
 
 
+def run_cli_command(argv: list) -> bool:
+    """
+    处理命令行子命令（无需启动GUI）
+
+    Args:
+        argv: 命令行参数（不含程序名）
+
+    Returns:
+        是否识别为子命令（识别时进程以子命令的退出码退出）
+    """
+    if not argv or argv[0] != "validate-all":
+        return False
+
+    logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
+    from core.batch_validator import main as validate_all_main
+    sys.exit(validate_all_main(argv[1:]))
+
+
 def main():
     """应用程序入口"""
+    run_cli_command(sys.argv[1:])
     check_dependencies()
 
     # 初始化日志系统
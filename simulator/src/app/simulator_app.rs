@@ -362,7 +362,11 @@ impl SimulatorApp {
 
         for msg in messages {
             match msg {
-                IpcMessage::LoadConfig { config, base_dir } => {
+                IpcMessage::LoadConfig { config, base_dir, cropbox, rotation } => {
+                    self.video_player.set_loop_transform(
+                        cropbox.map(|[x, y, w, h]| (x, y, w, h)),
+                        rotation,
+                    );
                     self.load_config(config, PathBuf::from(base_dir));
                 }
                 IpcMessage::Control(cmd) => match cmd {
@@ -2299,6 +2303,9 @@ impl eframe::App for SimulatorApp {
         // Request repaint if playing
         if self.state.is_playing {
             ctx.request_repaint();
+        } else if self.ipc_rx.is_some() {
+            // Keep polling IPC while idle so editor updates apply without user input
+            ctx.request_repaint_after(std::time::Duration::from_millis(100));
         }
     }
 }
@@ -29,10 +29,17 @@ pub enum IpcMessage {
     // === Editor -> Simulator ===
 
     /// Load configuration
+    ///
+    /// `cropbox` (original video coordinates, `[x, y, w, h]`) and `rotation`
+    /// apply to the loop video; when omitted the current values are kept.
     #[serde(rename = "load_config")]
     LoadConfig {
         config: EPConfig,
         base_dir: String,
+        #[serde(default)]
+        cropbox: Option<[u32; 4]>,
+        #[serde(default)]
+        rotation: Option<i32>,
     },
 
     /// Control command
@@ -128,6 +135,27 @@ mod tests {
         assert!(matches!(parsed, IpcMessage::Ready));
     }
 
+    #[test]
+    fn test_load_config_optional_transform() {
+        let json = r#"{"type":"load_config","payload":{"config":{},"base_dir":"."}}"#;
+        match IpcMessage::from_json(json) {
+            Ok(IpcMessage::LoadConfig { cropbox, rotation, .. }) => {
+                assert!(cropbox.is_none());
+                assert!(rotation.is_none());
+            }
+            other => panic!("unexpected: {:?}", other),
+        }
+
+        let json = r#"{"type":"load_config","payload":{"config":{},"base_dir":".","cropbox":[1,2,3,4],"rotation":90}}"#;
+        match IpcMessage::from_json(json) {
+            Ok(IpcMessage::LoadConfig { cropbox, rotation, .. }) => {
+                assert_eq!(cropbox, Some([1, 2, 3, 4]));
+                assert_eq!(rotation, Some(90));
+            }
+            other => panic!("unexpected: {:?}", other),
+        }
+    }
+
     #[test]
     fn test_control_command() {
         let msg = IpcMessage::Control(ControlCommand::Play);
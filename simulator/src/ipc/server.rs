@@ -31,15 +31,22 @@ impl IpcServer {
         info!("Starting stdio IPC server");
 
         let stdin = std::io::stdin();
-        let mut stdout = std::io::stdout();
         let reader = BufReader::new(stdin.lock());
 
         // Send ready message
-        let ready_msg = IpcMessage::ready();
-        if let Ok(json) = ready_msg.to_json() {
-            let _ = writeln!(stdout, "{}", json);
-            let _ = stdout.flush();
-        }
+        write_stdio_message(&IpcMessage::ready());
+
+        // Forward outgoing messages on their own thread so state updates reach
+        // the editor while stdin is idle (the reader below blocks on each line)
+        let (_unused_tx, placeholder_rx) = std::sync::mpsc::channel();
+        let from_app = std::mem::replace(&mut self.from_app, placeholder_rx);
+        std::thread::spawn(move || {
+            for msg in from_app.iter() {
+                if !write_stdio_message(&msg) {
+                    break;
+                }
+            }
+        });
 
         // Read messages from stdin
         for line in reader.lines() {
@@ -53,26 +60,25 @@ impl IpcServer {
 
                     match IpcMessage::from_json(&line) {
                         Ok(msg) => {
-                            if matches!(msg, IpcMessage::Shutdown) {
-                                info!("Received shutdown command");
-                                break;
-                            }
+                            let is_shutdown = matches!(msg, IpcMessage::Shutdown);
 
+                            // Forward shutdown too so the app can exit
                             if self.to_app.send(msg).is_err() {
                                 error!("Failed to send message to app");
                                 break;
                             }
+
+                            if is_shutdown {
+                                info!("Received shutdown command");
+                                break;
+                            }
                         }
                         Err(e) => {
                             warn!("Failed to parse message: {}", e);
-                            let error_msg = IpcMessage::error(
+                            write_stdio_message(&IpcMessage::error(
                                 super::protocol::error_codes::INTERNAL_ERROR,
                                 format!("Parse error: {}", e),
-                            );
-                            if let Ok(json) = error_msg.to_json() {
-                                let _ = writeln!(stdout, "{}", json);
-                                let _ = stdout.flush();
-                            }
+                            ));
                         }
                     }
                 }
@@ -81,14 +87,6 @@ impl IpcServer {
                     break;
                 }
             }
-
-            // Check for outgoing messages
-            while let Ok(msg) = self.from_app.try_recv() {
-                if let Ok(json) = msg.to_json() {
-                    let _ = writeln!(stdout, "{}", json);
-                    let _ = stdout.flush();
-                }
-            }
         }
 
         info!("Stdio IPC server stopped");
@@ -203,6 +201,21 @@ impl IpcServer {
     }
 }
 
+/// Write a single line-delimited message to stdout
+///
+/// Returns false once stdout is closed (the editor went away).
+fn write_stdio_message(msg: &IpcMessage) -> bool {
+    let json = match msg.to_json() {
+        Ok(json) => json,
+        Err(e) => {
+            warn!("Failed to serialize message: {}", e);
+            return true;
+        }
+    };
+    let mut stdout = std::io::stdout().lock();
+    writeln!(stdout, "{}", json).and_then(|_| stdout.flush()).is_ok()
+}
+
 /// IPC message receiver for the main application
 pub struct IpcReceiver {
     rx: Receiver<IpcMessage>,
@@ -62,8 +62,10 @@ fn main() -> Result<()> {
 
     // Initialize logging
     let level = if args.debug { Level::DEBUG } else { Level::INFO };
+    // Log to stderr: stdout carries the IPC protocol in --stdio mode
     let subscriber = FmtSubscriber::builder()
         .with_max_level(level)
+        .with_writer(std::io::stderr)
         .finish();
     tracing::subscriber::set_global_default(subscriber)?;
 
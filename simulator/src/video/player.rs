@@ -49,6 +49,22 @@ impl VideoPlayer {
         }
     }
 
+    /// Update the loop video cropbox and/or rotation
+    ///
+    /// Takes effect on the next `load_from_config` call. `None` keeps the current value.
+    pub fn set_loop_transform(
+        &mut self,
+        cropbox: Option<(u32, u32, u32, u32)>,
+        rotation: Option<i32>,
+    ) {
+        if let Some(cropbox) = cropbox {
+            self.loop_cropbox = Some(cropbox);
+        }
+        if let Some(rotation) = rotation {
+            self.loop_rotation = rotation;
+        }
+    }
+
     /// Load videos from EPConfig
     ///
     /// # Arguments
@@ -3,9 +3,15 @@
 """
 import os
 import sys
-from typing import Optional, Tuple
+import hashlib
+import tempfile
+import threading
+import subprocess
+from typing import Dict, Optional, Tuple
 
-from config.constants import SUPPORTED_VIDEO_FORMATS, SUPPORTED_IMAGE_FORMATS
+from config.constants import (
+    SUPPORTED_VIDEO_FORMATS, SUPPORTED_IMAGE_FORMATS, PROJECT_CACHE_DIRNAME
+)
 
 
 def get_relative_path(base_dir: str, file_path: str) -> str:
@@ -202,3 +208,160 @@ def get_app_dir() -> str:
     else:
         # 开发环境，返回项目根目录
         return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_cache_dir(name: str = "") -> str:
+    """
+    获取可写的缓存目录（与日志目录相同的多级降级策略）
+
+    Args:
+        name: 子目录名称，如 "media"
+
+    Returns:
+        缓存目录路径
+    """
+    dirs_to_try = [os.path.join(get_app_dir(), 'cache')]
+    appdata = os.getenv('LOCALAPPDATA')
+    if appdata:
+        dirs_to_try.append(os.path.join(appdata, 'ArknightsPassMaker', 'cache'))
+    dirs_to_try.append(os.path.join(tempfile.gettempdir(), 'ArknightsPassMaker_cache'))
+
+    for base in dirs_to_try:
+        path = os.path.join(base, name) if name else base
+        try:
+            os.makedirs(path, exist_ok=True)
+            if os.access(path, os.W_OK):
+                return path
+        except OSError:
+            continue
+    return tempfile.gettempdir()
+
+
+def get_project_cache_dir(base_dir: str, name: str = "") -> str:
+    """
+    获取项目目录下的缓存目录（<项目目录>/.assetmaker/<name>）
+
+    没有项目目录或目录不可写时退回到全局缓存目录。
+
+    Args:
+        base_dir: 项目目录
+        name: 子目录名称，如 "analysis"
+
+    Returns:
+        缓存目录路径
+    """
+    if base_dir:
+        path = os.path.join(base_dir, PROJECT_CACHE_DIRNAME, name)
+        try:
+            os.makedirs(path, exist_ok=True)
+            if os.access(path, os.W_OK):
+                return path
+        except OSError:
+            pass
+    return get_cache_dir(name)
+
+
+def compute_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算文件内容的 SHA-256
+
+    Args:
+        file_path: 文件路径
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_quick_hash(file_path: str, sample_size: int = 1024 * 1024) -> str:
+    """
+    计算文件的快速指纹（文件大小 + 首尾各一段内容的 SHA-256）
+
+    用于大视频文件的缓存键：不必读取整个文件，内容被替换时指纹会变化。
+
+    Args:
+        file_path: 文件路径
+        sample_size: 首尾各读取的字节数
+
+    Returns:
+        十六进制摘要
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha256(str(size).encode('ascii'))
+    with open(file_path, 'rb') as f:
+        digest.update(f.read(sample_size))
+        if size > sample_size * 2:
+            f.seek(-sample_size, os.SEEK_END)
+            digest.update(f.read(sample_size))
+    return digest.hexdigest()
+
+
+def find_executable(name: str) -> str:
+    """
+    查找外部工具（如 ffmpeg/ffprobe，支持打包环境）
+
+    查找顺序与导出服务一致：应用程序目录 -> 当前工作目录 -> 系统 PATH
+
+    Args:
+        name: 工具名称（不含扩展名）
+
+    Returns:
+        可执行文件路径，未找到返回空字符串
+    """
+    exe_name = f"{name}.exe"
+
+    # 1. 先在应用程序目录查找（支持 Nuitka/PyInstaller 打包）
+    app_exe = os.path.join(get_app_dir(), exe_name)
+    if os.path.isfile(app_exe):
+        return app_exe
+
+    # 2. 在当前工作目录查找
+    local_exe = os.path.join(os.getcwd(), exe_name)
+    if os.path.isfile(local_exe):
+        return local_exe
+
+    # 3. 在系统 PATH 中查找
+    try:
+        cmd = ["where", name] if os.name == 'nt' else ["which", name]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip().split('\n')[0]
+    except Exception:
+        pass
+
+    return ""
+
+
+_tool_cache: Dict[str, str] = {}
+_tool_cache_lock = threading.Lock()
+
+
+def find_tool(name: str) -> str:
+    """
+    find_executable 的缓存版本（进程内所有项目共享，每个工具只查找一次）
+
+    只缓存找到的路径：未找到时下次调用重新查找（程序运行期间安装的工具也能用上）。
+
+    Args:
+        name: 工具名称（不含扩展名）
+
+    Returns:
+        可执行文件路径，未找到返回空字符串
+    """
+    with _tool_cache_lock:
+        path = _tool_cache.get(name)
+        if path and os.path.isfile(path):
+            return path
+        path = find_executable(name)
+        if path:
+            _tool_cache[name] = path
+        return path
@@ -2,11 +2,15 @@
 日志系统配置
 """
 import os
+import json
 import logging
 import tempfile
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
-from typing import Optional
+from typing import Optional, Dict, Any
+
+# 结构化指标日志（JSON lines，每行一条记录），与普通日志分开写入 metrics_YYYYMMDD.jsonl
+METRICS_LOGGER_NAME = "metrics"
 
 
 def setup_logger(log_dir: Optional[str] = None) -> logging.Logger:
@@ -93,6 +97,8 @@ def setup_logger(log_dir: Optional[str] = None) -> logging.Logger:
         root_logger.addHandler(file_handler)
     root_logger.addHandler(console_handler)
 
+    _setup_metrics_logger(actual_log_dir)
+
     # 记录启动信息
     if file_handler:
         root_logger.info(f"日志系统已初始化，日志文件: {log_file}")
@@ -102,6 +108,44 @@ def setup_logger(log_dir: Optional[str] = None) -> logging.Logger:
     return root_logger
 
 
+def _setup_metrics_logger(log_dir: str):
+    """配置指标日志（只写文件，不传给根日志记录器）"""
+    metrics_logger = logging.getLogger(METRICS_LOGGER_NAME)
+    metrics_logger.setLevel(logging.INFO)
+    metrics_logger.propagate = False
+    metrics_logger.handlers.clear()
+
+    metrics_file = os.path.join(log_dir, f'metrics_{datetime.now():%Y%m%d}.jsonl')
+    try:
+        handler = RotatingFileHandler(
+            metrics_file,
+            maxBytes=5 * 1024 * 1024,  # 5MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+    except (PermissionError, OSError) as e:
+        print(f"[WARNING] 无法创建指标日志文件: {e}")
+        return
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    metrics_logger.addHandler(handler)
+
+
+def log_metrics(record: Dict[str, Any]):
+    """
+    写入一条结构化指标（JSON lines）
+
+    未调用 setup_logger 时（如基准测试、命令行工具）不输出
+
+    Args:
+        record: 可 JSON 序列化的 dict，自动补充时间戳 ts
+    """
+    metrics_logger = logging.getLogger(METRICS_LOGGER_NAME)
+    if not metrics_logger.handlers:
+        return
+    line = {"ts": datetime.now().isoformat(timespec='milliseconds'), **record}
+    metrics_logger.info(json.dumps(line, ensure_ascii=False, default=str))
+
+
 def cleanup_old_logs(log_dir: Optional[str] = None, days: int = 30):
     """
     清理超过指定天数的旧日志文件
@@ -124,12 +168,17 @@ def cleanup_old_logs(log_dir: Optional[str] = None, days: int = 30):
     cutoff_date = datetime.now() - timedelta(days=days)
     logger = logging.getLogger(__name__)
 
-    for log_file in glob.glob(os.path.join(log_dir, 'app_*.log*')):
+    log_files = (
+        glob.glob(os.path.join(log_dir, 'app_*.log*'))
+        + glob.glob(os.path.join(log_dir, 'metrics_*.jsonl*'))
+    )
+    for log_file in log_files:
         try:
-            # 从文件名提取日期
+            # 从文件名提取日期（app_YYYYMMDD.log / metrics_YYYYMMDD.jsonl）
             filename = os.path.basename(log_file)
-            if filename.startswith('app_') and len(filename) >= 12:
-                date_str = filename[4:12]  # app_YYYYMMDD.log
+            prefix, _, rest = filename.partition('_')
+            if prefix in ('app', 'metrics') and len(rest) >= 8:
+                date_str = rest[:8]
                 file_date = datetime.strptime(date_str, '%Y%m%d')
 
                 if file_date < cutoff_date: